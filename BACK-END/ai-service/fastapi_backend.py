@@ -27,7 +27,19 @@ from dotenv import load_dotenv
 
 # Import du module News
 from modules.news.routes import router as news_router
-from modules.news.database import news_db
+from modules.news.database import news_db, EmbeddingColumnMismatch
+from modules.news.index_manager import news_index_manager
+from modules.news.redis_pool import news_redis
+from modules.news.metrics import news_metrics
+from modules.news.cache_manager import news_cache
+from modules.news.news_logger import news_logger
+from modules.news.jobs import news_jobs
+from modules.news.scraper_client import news_scraper
+from modules.news.extractor import news_extractor
+from modules.news.batch_processor import news_batch_processor
+from modules.news.retry_scheduler import news_retry_scheduler
+from modules.news.log_partitions import news_log_partitions
+from modules.news.warmup import news_warmup
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -88,6 +100,9 @@ USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://user-service:8444")
 BACKEND_EXTERNAL_URL = os.getenv("BACKEND_EXTERNAL_URL", "__AI_API_URL__")
 USER_SERVICE_EXTERNAL_URL = os.getenv("USER_SERVICE_EXTERNAL_URL", "__USERS_API_URL__")
 
+# --- News (smart-summary) ---
+NEWS_MIN_SIMILARITY = float(os.getenv("NEWS_MIN_SIMILARITY", "0.7"))
+
 # --- Analytics Helper ---
 async def track_analytics_event(user_email: str, event_type: str, properties: dict) -> None:
     """Send analytics event to user-service. Fire-and-forget, never blocks response."""
@@ -395,20 +410,16 @@ async def build_smart_news_context(post_text: str, language: str = "fr", limit:
     """
     try:
         # Importer ici pour éviter les imports circulaires
-        from modules.news.service import news_processor
-
-        # Effectuer la recherche vectorielle
-        results = await news_processor.search_similar_news(post_text, language, limit)
-
-        if not results:
-            logger.info("🔍 Aucune actualité pertinente trouvée via recherche vectorielle")
-            return "", []
+        from modules.news.lexical_gate import news_lexical_gate
 
-        # Filtrer par seuil de similarité (0.7)
-        filtered_results = [r for r in results if r.get("similarity", 0) > 0.7]
+        # Filtre lexical puis recherche vectorielle sur les actualités récentes
+        # (seuil 0.7 appliqué en SQL); sans terme commun, aucun appel embeddings
+        filtered_results = await news_lexical_gate.gated_search(
+            post_text, language, limit, min_similarity=NEWS_MIN_SIMILARITY
+        )
 
         if not filtered_results:
-            logger.info(f"🔍 Aucune actualité avec similarité > 0.7 (max: {max([r.get('similarity', 0) for r in results]):.2f})")
+            logger.info(f"🔍 Aucune actualité récente avec similarité > {NEWS_MIN_SIMILARITY}")
             return "", []
 
         # Construire le bloc de contexte ET la liste des actualités
@@ -1469,10 +1480,34 @@ async def startup_event():
     logger.info("🆔 Extension IDs supportés: chrome-extension://*")
     logger.info("🌐 Support multilingue activé: FR/EN")
 
+    # Connexion Redis du module News (cache + métriques), repli en mémoire si indisponible
+    await news_redis.connect()
+    news_metrics.start()
+    # Index du cache construit en tâche de fond s'il n'existe pas encore (SCAN)
+    news_cache.start()
+    # Purge périodique du cache HTML local (fichiers expirés)
+    news_scraper.start()
+
     # Initialiser la base de données News
     try:
         await news_db.connect()
+        # Workers d'ingestion (reprise des jobs persistés)
+        await news_jobs.start()
+        # Maintenance des index vectoriels (dérive, changement de type) en tâche de fond
+        news_index_manager.start(news_db.pool)
+        # Suivi des batchs OpenAI (NEWS_PROCESSING_MODE=batch)
+        await news_batch_processor.start()
+        # Reprise différée des URLs en échec (backoff persistant)
+        await news_retry_scheduler.start()
+        # Partitions mensuelles des logs de traitement (création d'avance + purge)
+        news_log_partitions.start(news_db.pool)
+        # Préchargement des actualités du jour, du cache et des index vectoriels
+        await news_warmup.start()
         logger.info("📰 Module News initialisé")
+    except EmbeddingColumnMismatch as e:
+        # Toutes les insertions échoueraient: refuser de démarrer
+        logger.error(f"❌ {e}")
+        raise
     except Exception as e:
         logger.error(f"❌ Erreur initialisation module News: {e}")
 
@@ -1483,7 +1518,20 @@ async def shutdown_event():
 
     # Fermer la connexion à la base de données News
     try:
+        await news_jobs.stop()
+        await news_index_manager.stop()
+        await news_batch_processor.stop()
+        await news_retry_scheduler.stop()
+        await news_log_partitions.stop()
+        await news_warmup.stop()
+        await news_scraper.stop()
+        await news_scraper.close()
+        news_extractor.close()
+        await news_cache.stop()
+        await news_metrics.stop()
+        await news_redis.close()
         await news_db.close()
+        news_logger.close()
         logger.info("📰 Module News fermé proprement")
     except Exception as e:
         logger.error(f"❌ Erreur fermeture module News: {e}")
\ No newline at end of file
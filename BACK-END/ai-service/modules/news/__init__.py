@@ -2,12 +2,21 @@
 Module News - Enrichissement des commentaires avec les actualités LinkedIn
 
 v2.2+ Features:
-- Cache Redis avec TTL configurable
-- Retry logic avec backoff exponentiel
+- Cache Redis avec TTL configurable (client asynchrone, pool partagé)
+- Reprise différée des URLs en échec (backoff exponentiel persistant en base)
 - Parallélisation (max 5 concurrents)
 - Métriques en temps réel (moyenne glissante)
 - Logging structuré (JSON + debug)
 - Endpoints de monitoring (/stats, /debug)
+- Index vectoriels partiels par langue (HNSW / IVFFlat selon le volume)
+- Embeddings réduits / quantisés configurables (dimension, halfvec, binaire)
+- Filtre lexical évitant l'appel embeddings quand aucune actualité ne peut correspondre
+- Enregistrement asynchrone (jobs persistés, pool de workers borné)
+- Client de scraping partagé (requêtes conditionnelles, cache HTML compressé)
+- Résumés et embeddings d'ingestion regroupés en micro-lots (client OpenAI asynchrone)
+- Mode différé: résumés et embeddings via l'API Batch d'OpenAI (NEWS_PROCESSING_MODE=batch)
+- Logs de traitement partitionnés par mois (rétention automatique, compteurs pré-agrégés)
+- Préchargement périodique des actualités du jour, du cache Redis et des index vectoriels
 """
 
 from .routes import router
@@ -16,6 +25,17 @@ from .service import news_processor
 from .cache_manager import news_cache
 from .metrics import news_metrics
 from .news_logger import news_logger
+from .redis_pool import news_redis
+from .index_manager import news_index_manager
+from .embedding_storage import embedding_storage
+from .lexical_gate import news_lexical_gate
+from .jobs import news_jobs
+from .scraper_client import news_scraper
+from .ai_pipeline import news_ai_pipeline
+from .batch_processor import news_batch_processor
+from .retry_scheduler import news_retry_scheduler
+from .log_partitions import news_log_partitions
+from .warmup import news_warmup
 
 __all__ = [
     "router",
@@ -23,5 +43,16 @@ __all__ = [
     "news_processor",
     "news_cache",
     "news_metrics",
-    "news_logger"
+    "news_logger",
+    "news_redis",
+    "news_index_manager",
+    "embedding_storage",
+    "news_lexical_gate",
+    "news_jobs",
+    "news_scraper",
+    "news_ai_pipeline",
+    "news_batch_processor",
+    "news_retry_scheduler",
+    "news_log_partitions",
+    "news_warmup"
 ]
@@ -0,0 +1,310 @@
+"""
+Appels OpenAI regroupés pour l'ingestion des actualités
+- Les tâches concurrentes (workers d'ingestion) soumettent leurs articles à des
+  micro-lots: envoi dès que le lot est plein ou après NEWS_BATCH_WAIT_MS
+- Embeddings: un seul appel embeddings.create avec une liste d'entrées
+- Résumés: plusieurs articles par appel chat.completions, sortie JSON structurée
+  (repli article par article si un résumé manque)
+- Client asynchrone: aucun appel bloquant dans la boucle d'événements
+- Latence par lot et tokens par article remontés dans les métriques
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Tuple
+
+from openai import AsyncOpenAI
+
+from .metrics import news_metrics
+from .embedding_storage import embedding_storage
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Regroupe des soumissions concurrentes en lots
+
+    handler(items) doit renvoyer un résultat par élément, dans le même ordre.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_size: int,
+        max_wait_s: float
+    ):
+        self.name = name
+        self.handler = handler
+        self.max_size = max(1, max_size)
+        self.max_wait_s = max_wait_s
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: set = set()
+
+    async def submit(self, item: Any) -> Any:
+        """Ajoute un élément au lot courant et attend son résultat"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.handler([item for item, _ in batch])
+        except Exception as e:
+            logger.error(f"❌ Erreur lot {self.name} ({len(batch)} éléments): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if results is None or len(results) != len(batch):
+            # Un résultat par élément: sinon impossible d'associer, et les
+            # appelants sans résultat attendraient indéfiniment
+            error = RuntimeError(
+                f"Lot {self.name}: {0 if results is None else len(results)} résultats pour {len(batch)} éléments"
+            )
+            logger.error(f"❌ {error}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def summary_prompts(content: str, lang: str) -> Tuple[str, str]:
+    """Prompts du résumé d'un article seul"""
+    if lang == "en":
+        system_prompt = "You are a professional summarizer. Create concise, informative summaries."
+        user_prompt = f"""Summarize the following LinkedIn article in 2-3 sentences (max 100 words).
+Focus on the key information and main message.
+
+Content:
+{content}
+
+Summary:"""
+    else:
+        system_prompt = "Tu es un expert en résumé. Crée des résumés concis et informatifs."
+        user_prompt = f"""Résume cet article LinkedIn en 2-3 phrases (max 100 mots).
+Concentre-toi sur les informations clés et le message principal.
+
+Contenu:
+{content}
+
+Résumé:"""
+    return system_prompt, user_prompt
+
+
+def batch_summary_prompts(articles: List[str], lang: str) -> Tuple[str, str]:
+    """Prompts du résumé groupé: un résumé par article, indexé par id"""
+    numbered = "\n\n".join(f"[{i}]\n{content}" for i, content in enumerate(articles))
+    if lang == "en":
+        system_prompt = (
+            "You are a professional summarizer. Create concise, informative summaries. "
+            "Answer in JSON only."
+        )
+        user_prompt = f"""Summarize each of the following LinkedIn articles in 2-3 sentences (max 100 words each).
+Focus on the key information and main message.
+Answer with {{"summaries": [{{"id": <article number>, "summary": "<summary>"}}, ...]}}.
+
+Articles:
+{numbered}"""
+    else:
+        system_prompt = (
+            "Tu es un expert en résumé. Crée des résumés concis et informatifs. "
+            "Réponds uniquement en JSON."
+        )
+        user_prompt = f"""Résume chacun des articles LinkedIn suivants en 2-3 phrases (max 100 mots chacun).
+Concentre-toi sur les informations clés et le message principal.
+Réponds avec {{"summaries": [{{"id": <numéro de l'article>, "summary": "<résumé>"}}, ...]}}.
+
+Articles:
+{numbered}"""
+    return system_prompt, user_prompt
+
+
+def parse_batch_summaries(raw: str, count: int) -> List[Optional[str]]:
+    """Résumés indexés par id depuis la réponse JSON (None si absent ou invalide)"""
+    summaries: List[Optional[str]] = [None] * count
+    try:
+        data = json.loads(raw)
+    except (TypeError, ValueError):
+        return summaries
+
+    items = data.get("summaries", []) if isinstance(data, dict) else []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        summary = item.get("summary")
+        if 0 <= index < count and isinstance(summary, str) and summary.strip():
+            summaries[index] = summary.strip()
+    return summaries
+
+
+class NewsAIPipeline:
+    """Résumés et embeddings par micro-lots (client OpenAI asynchrone)"""
+
+    def __init__(self):
+        self.model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.embedding_model = "text-embedding-3-small"
+        self.embed_batch_size = int(os.getenv("NEWS_EMBED_BATCH_SIZE", "32"))
+        self.summary_batch_size = int(os.getenv("NEWS_SUMMARY_BATCH_SIZE", "5"))
+        self.max_wait_s = float(os.getenv("NEWS_BATCH_WAIT_MS", "50")) / 1000
+
+        self._client: Optional[AsyncOpenAI] = None
+        self._embed_batcher = MicroBatcher("embeddings", self._embed_batch, self.embed_batch_size, self.max_wait_s)
+        # Un lot de résumés par langue (prompt commun)
+        self._summary_batchers: Dict[str, MicroBatcher] = {}
+
+        logger.info(
+            f"📦 NewsAIPipeline initialisé (embeddings x{self.embed_batch_size}, "
+            f"résumés x{self.summary_batch_size}, attente {self.max_wait_s * 1000:.0f}ms)"
+        )
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Client OpenAI asynchrone, créé au premier usage"""
+        if self._client is None:
+            self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    async def summarize(self, content: str, lang: str = "fr") -> Optional[str]:
+        """Résumé d'un article (regroupé avec les soumissions concurrentes)"""
+        if lang not in self._summary_batchers:
+            self._summary_batchers[lang] = MicroBatcher(
+                f"résumés {lang}",
+                lambda articles, lang=lang: self._summarize_batch(articles, lang),
+                self.summary_batch_size,
+                self.max_wait_s
+            )
+        try:
+            return await self._summary_batchers[lang].submit(content)
+        except Exception as e:
+            logger.error(f"❌ Erreur génération résumé: {e}")
+            return None
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """Embedding d'un texte (regroupé avec les soumissions concurrentes)"""
+        try:
+            return await self._embed_batcher.submit(text)
+        except Exception as e:
+            logger.error(f"❌ Erreur génération embedding: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Lots
+    # ------------------------------------------------------------------
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        extra = {}
+        if embedding_storage.request_dimensions:
+            extra["dimensions"] = embedding_storage.request_dimensions
+
+        start = time.perf_counter()
+        response = await self.client.embeddings.create(
+            model=self.embedding_model,
+            input=texts,
+            **extra
+        )
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        tokens = response.usage.total_tokens if response.usage else 0
+        news_metrics.record_ai_batch("embeddings", len(texts), latency_ms, tokens)
+        logger.info(f"✅ {len(texts)} embeddings générés en un appel ({latency_ms:.0f}ms, {tokens} tokens)")
+        return embeddings
+
+    async def _summarize_batch(self, articles: List[str], lang: str) -> List[Optional[str]]:
+        if len(articles) == 1:
+            return [await self._summarize_one(articles[0], lang)]
+
+        system_prompt, user_prompt = batch_summary_prompts(articles, lang)
+        start = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=150 * len(articles) + 50,
+            temperature=0.5,
+            timeout=30 + 5 * len(articles)
+        )
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        tokens = response.usage.total_tokens if response.usage else 0
+        summaries = parse_batch_summaries(response.choices[0].message.content, len(articles))
+
+        # Articles comptés une seule fois: les résumés manquants le sont par leur repli
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+        news_metrics.record_ai_batch("summaries", len(articles) - len(missing), latency_ms, tokens)
+
+        # Repli individuel pour les résumés manquants
+        if missing:
+            logger.warning(f"⚠️ {len(missing)} résumés manquants dans le lot, repli individuel")
+            fallbacks = await asyncio.gather(
+                *(self._summarize_one(articles[i], lang) for i in missing),
+                return_exceptions=True
+            )
+            for i, summary in zip(missing, fallbacks):
+                summaries[i] = summary if isinstance(summary, str) else None
+
+        logger.info(f"✅ {len(articles)} résumés générés en un appel ({latency_ms:.0f}ms, {tokens} tokens)")
+        return summaries
+
+    async def _summarize_one(self, content: str, lang: str) -> Optional[str]:
+        """Résumé d'un article seul (même prompt que NewsProcessor.generate_summary)"""
+        system_prompt, user_prompt = summary_prompts(content, lang)
+
+        start = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=150,
+            temperature=0.5,
+            timeout=30
+        )
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        tokens = response.usage.total_tokens if response.usage else 0
+        news_metrics.record_ai_batch("summaries", 1, latency_ms, tokens)
+        return response.choices[0].message.content.strip()
+
+
+# Instance globale
+news_ai_pipeline = NewsAIPipeline()
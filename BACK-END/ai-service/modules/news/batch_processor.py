@@ -0,0 +1,633 @@
+"""
+Mode différé: résumés et embeddings des actualités via l'API Batch d'OpenAI
+- NEWS_PROCESSING_MODE=batch: après le scraping, l'actualité est enregistrée avec
+  summary_status='pending' et son texte est mis en attente (news_batch_items)
+- Une tâche de fond écrit les articles en attente dans un fichier JSONL, crée un
+  batch (/v1/chat/completions puis /v1/embeddings), suit son avancement et
+  applique les résultats en bloc dans `news`
+- Les articles sont réservés (FOR UPDATE SKIP LOCKED, batch provisoire
+  'submitting') avant l'appel payant: deux cycles concurrents ne soumettent
+  jamais le même article, et une réservation orpheline (arrêt après la
+  soumission) est rattachée au batch OpenAI retrouvé par metadata.claim_id
+- Un article sans résultat est remis en file au plus NEWS_BATCH_MAX_ATTEMPTS
+  fois, puis abandonné (summary_status='failed')
+- Le volume de tokens des actualités quitte le quota temps réel (génération
+  de commentaires) pour un coût unitaire réduit
+"""
+import io
+import os
+import json
+import uuid
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any
+
+from openai import AsyncOpenAI
+
+from .database import news_db, ProcessingLog
+from .embedding_storage import embedding_storage
+from .ai_pipeline import summary_prompts
+
+logger = logging.getLogger(__name__)
+
+
+STAGE_SUMMARY = "summary"
+STAGE_EMBEDDING = "embedding"
+
+ENDPOINTS = {
+    STAGE_SUMMARY: "/v1/chat/completions",
+    STAGE_EMBEDDING: "/v1/embeddings",
+}
+
+# Statuts OpenAI terminaux sans résultats exploitables
+FAILED_STATUSES = {"failed", "expired", "cancelled"}
+
+# Batch provisoire: articles réservés, soumission à OpenAI en cours
+STATUS_SUBMITTING = "submitting"
+
+
+def custom_id_for(news_id: int) -> str:
+    return f"news-{news_id}"
+
+
+def news_id_from(custom_id: str) -> Optional[int]:
+    try:
+        return int(custom_id.rsplit("-", 1)[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def build_summary_request(news_id: int, content: str, lang: str, model: str) -> Dict[str, Any]:
+    """Ligne JSONL d'une demande de résumé (même prompt que le mode temps réel)"""
+    system_prompt, user_prompt = summary_prompts(content, lang)
+    return {
+        "custom_id": custom_id_for(news_id),
+        "method": "POST",
+        "url": ENDPOINTS[STAGE_SUMMARY],
+        "body": {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": 150,
+            "temperature": 0.5
+        }
+    }
+
+
+def build_embedding_request(news_id: int, text: str, model: str, dimensions: Optional[int] = None) -> Dict[str, Any]:
+    """Ligne JSONL d'une demande d'embedding"""
+    body: Dict[str, Any] = {"model": model, "input": text}
+    if dimensions:
+        body["dimensions"] = dimensions
+    return {
+        "custom_id": custom_id_for(news_id),
+        "method": "POST",
+        "url": ENDPOINTS[STAGE_EMBEDDING],
+        "body": body
+    }
+
+
+def to_jsonl(requests: List[Dict[str, Any]]) -> bytes:
+    return "\n".join(json.dumps(r, ensure_ascii=False) for r in requests).encode("utf-8") + b"\n"
+
+
+def parse_batch_output(text: str, stage: str) -> Dict[int, Any]:
+    """
+    Résultats réussis d'un fichier de sortie Batch, par id d'actualité
+
+    Returns:
+        {news_id: résumé (str) ou embedding (list)}
+    """
+    results: Dict[int, Any] = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+
+        news_id = news_id_from(entry.get("custom_id", ""))
+        response = entry.get("response") or {}
+        if news_id is None or entry.get("error") or response.get("status_code") != 200:
+            continue
+
+        body = response.get("body") or {}
+        try:
+            if stage == STAGE_SUMMARY:
+                value = body["choices"][0]["message"]["content"].strip()
+            else:
+                value = body["data"][0]["embedding"]
+        except (KeyError, IndexError, TypeError, AttributeError):
+            continue
+        if value:
+            results[news_id] = value
+    return results
+
+
+class OpenAIBatchClient:
+    """Soumission et suivi des batchs OpenAI (fichier JSONL en entrée et en sortie)"""
+
+    def __init__(self, client: Optional[AsyncOpenAI] = None):
+        self._client = client
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            self._client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    async def submit(self, requests: List[Dict[str, Any]], endpoint: str, claim_id: Optional[str] = None) -> str:
+        """Envoie le fichier JSONL et crée le batch (fenêtre 24h), marqué de la réservation"""
+        upload = await self.client.files.create(
+            file=("news_batch.jsonl", io.BytesIO(to_jsonl(requests))),
+            purpose="batch"
+        )
+        options: Dict[str, Any] = {"metadata": {"claim_id": claim_id}} if claim_id else {}
+        batch = await self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint=endpoint,
+            completion_window="24h",
+            **options
+        )
+        return batch.id
+
+    async def find_by_claim(self, claim_id: str) -> Optional[str]:
+        """Batch créé pour une réservation (parmi les 100 plus récents), None si absent"""
+        page = await self.client.batches.list(limit=100)
+        for batch in page.data:
+            if (batch.metadata or {}).get("claim_id") == claim_id:
+                return batch.id
+        return None
+
+    async def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        """
+        Statut du batch: {"status", "output_file_id", "error_file_id"}
+
+        Un batch dont toutes les requêtes ont échoué est "completed" sans
+        output_file_id (seulement error_file_id).
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        return {
+            "status": batch.status,
+            "output_file_id": batch.output_file_id,
+            "error_file_id": batch.error_file_id,
+        }
+
+    async def download(self, file_id: str) -> str:
+        """Contenu JSONL d'un fichier de sortie"""
+        response = await self.client.files.content(file_id)
+        return response.text
+
+
+class NewsBatchProcessor:
+    """File d'attente différée et application des résultats Batch"""
+
+    def __init__(self, batch_client: Optional[OpenAIBatchClient] = None):
+        self.enabled = os.getenv("NEWS_PROCESSING_MODE", "realtime").lower() == "batch"
+        self.model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.embedding_model = "text-embedding-3-small"
+        self.poll_interval_s = float(os.getenv("NEWS_BATCH_POLL_S", "300"))
+        self.max_items = int(os.getenv("NEWS_BATCH_MAX_ITEMS", "1000"))
+        # Un batch est créé dès min_items articles, ou quand le plus ancien attend depuis max_wait_s
+        self.min_items = int(os.getenv("NEWS_BATCH_MIN_ITEMS", "50"))
+        self.max_wait_s = int(os.getenv("NEWS_BATCH_MAX_WAIT_S", "1800"))
+        # Batchs sans résultat tolérés par article avant abandon
+        self.max_attempts = int(os.getenv("NEWS_BATCH_MAX_ATTEMPTS", "3"))
+        # Réservation considérée orpheline (arrêt pendant la soumission) après ce délai
+        self.claim_timeout_s = int(os.getenv("NEWS_BATCH_CLAIM_TIMEOUT_S", "900"))
+
+        self.batch_client = batch_client or OpenAIBatchClient()
+        self._task: Optional[asyncio.Task] = None
+
+        logger.info(f"🗂️ NewsBatchProcessor initialisé (enabled={self.enabled})")
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    async def initialize_schema(self, conn) -> None:
+        """Crée les tables de suivi des batchs si nécessaire (news.summary_status: voir database)"""
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_batches (
+                id TEXT PRIMARY KEY,
+                stage VARCHAR(20) NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'in_progress',
+                item_count INT NOT NULL,
+                created_at TIMESTAMP DEFAULT NOW(),
+                completed_at TIMESTAMP,
+                error TEXT
+            );
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_batch_items (
+                news_id INT PRIMARY KEY REFERENCES news(id) ON DELETE CASCADE,
+                lang VARCHAR(10) NOT NULL,
+                content TEXT NOT NULL,
+                content_hash TEXT,
+                stage VARCHAR(20) NOT NULL DEFAULT 'summary',
+                batch_id TEXT REFERENCES news_batches(id) ON DELETE SET NULL,
+                created_at TIMESTAMP DEFAULT NOW()
+            );
+        """)
+        await conn.execute("ALTER TABLE news_batch_items ADD COLUMN IF NOT EXISTS attempts INT NOT NULL DEFAULT 0;")
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_news_batch_items_unassigned
+            ON news_batch_items(stage, created_at) WHERE batch_id IS NULL;
+        """)
+
+    async def start(self) -> None:
+        """Crée le schéma et lance la boucle de soumission / suivi"""
+        if not news_db.pool:
+            return
+        async with news_db.pool.acquire() as conn:
+            await self.initialize_schema(conn)
+        if self.enabled and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._loop())
+            logger.info(f"🗂️ Mode batch actif (suivi toutes les {self.poll_interval_s:.0f}s)")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Erreur cycle batch: {e}")
+            await asyncio.sleep(self.poll_interval_s)
+
+    async def run_once(self, force: bool = False) -> Dict[str, Any]:
+        """Un cycle: réservations orphelines, suivi des batchs en cours puis soumission des articles en attente"""
+        await self.recover_claims()
+        applied = await self.poll()
+        submitted = {}
+        for stage in (STAGE_SUMMARY, STAGE_EMBEDDING):
+            batch_id = await self.submit_pending(stage, force=force)
+            if batch_id:
+                submitted[stage] = batch_id
+        return {"applied": applied, "submitted": submitted}
+
+    # ------------------------------------------------------------------
+    # Mise en attente
+    # ------------------------------------------------------------------
+
+    async def defer(
+        self,
+        url: str,
+        title: str,
+        lang: str,
+        content: str,
+        content_hash: Optional[str],
+        log: Optional[ProcessingLog] = None
+    ) -> int:
+        """
+        Enregistre l'actualité sans résumé (summary_status='pending') et met son texte en file
+
+        Actualité, élément de file et ligne de log écrits en une requête (CTE).
+        """
+        log = log or ProcessingLog("success")
+        async with news_db.pool.acquire() as conn:
+            news_id = await conn.fetchval(
+                """
+                WITH pending AS (
+                    INSERT INTO news (url, title, summary, lang, embedding, processed, summary_status, processing_time_ms)
+                    VALUES ($1, $2, NULL, $3, NULL, FALSE, 'pending', $7)
+                    ON CONFLICT (url) DO UPDATE
+                    SET title = EXCLUDED.title,
+                        summary = NULL,
+                        embedding = NULL,
+                        processed = FALSE,
+                        summary_status = 'pending',
+                        canonical_id = NULL,
+                        retry_count = 0,
+                        last_error = NULL,
+                        next_retry_at = NULL,
+                        processing_time_ms = COALESCE(EXCLUDED.processing_time_ms, news.processing_time_ms)
+                    RETURNING id, url
+                ),
+                queued AS (
+                    INSERT INTO news_batch_items (news_id, lang, content, content_hash)
+                    SELECT id, $3, $4, $5 FROM pending
+                    ON CONFLICT (news_id) DO UPDATE
+                    SET content = EXCLUDED.content,
+                        content_hash = EXCLUDED.content_hash,
+                        stage = 'summary',
+                        batch_id = NULL,
+                        attempts = 0
+                ),
+                logged AS (
+                    INSERT INTO news_processing_log (url, status, duration_ms, error_message, metadata)
+                    SELECT url, $6, $7, $8, $9::jsonb FROM pending
+                )
+                SELECT id FROM pending
+                """,
+                url, title, lang, content, content_hash, *log.params()
+            )
+        logger.info(f"🗂️ Actualité en attente de résumé (batch): {url}")
+        return news_id
+
+    async def submit_pending(self, stage: str, force: bool = False) -> Optional[str]:
+        """
+        Crée un batch pour les articles en attente d'une étape (None si rien à envoyer)
+
+        Les articles sont d'abord réservés sous un batch provisoire (claim-...),
+        dans une transaction validée avant l'appel à OpenAI; l'identifiant OpenAI
+        remplace ensuite le provisoire.
+        """
+        claim_id = f"claim-{uuid.uuid4().hex}"
+        async with news_db.pool.acquire() as conn:
+            async with conn.transaction():
+                stats = await conn.fetchrow(
+                    """
+                    SELECT count(*) AS n, EXTRACT(EPOCH FROM NOW() - min(created_at)) AS oldest_s
+                    FROM news_batch_items WHERE stage = $1 AND batch_id IS NULL
+                    """,
+                    stage
+                )
+                if not stats["n"]:
+                    return None
+                if not force and stats["n"] < self.min_items and (stats["oldest_s"] or 0) < self.max_wait_s:
+                    return None
+
+                await conn.execute(
+                    "INSERT INTO news_batches (id, stage, status, item_count) VALUES ($1, $2, $3, 0)",
+                    claim_id, stage, STATUS_SUBMITTING
+                )
+                # Les lignes déjà verrouillées par un cycle concurrent sont sautées
+                rows = await conn.fetch(
+                    """
+                    WITH claimed AS (
+                        SELECT news_id FROM news_batch_items
+                        WHERE stage = $1 AND batch_id IS NULL
+                        ORDER BY created_at LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    UPDATE news_batch_items i SET batch_id = $3
+                    FROM claimed c, news n
+                    WHERE i.news_id = c.news_id AND n.id = i.news_id
+                    RETURNING i.news_id, i.lang, i.content, n.summary
+                    """,
+                    stage, self.max_items, claim_id
+                )
+                if not rows:
+                    await conn.execute("DELETE FROM news_batches WHERE id = $1", claim_id)
+                    return None
+                await conn.execute("UPDATE news_batches SET item_count = $2 WHERE id = $1", claim_id, len(rows))
+
+        if stage == STAGE_SUMMARY:
+            requests = [build_summary_request(r["news_id"], r["content"], r["lang"], self.model_name) for r in rows]
+        else:
+            requests = [
+                build_embedding_request(
+                    r["news_id"], r["summary"], self.embedding_model, embedding_storage.request_dimensions
+                )
+                for r in rows
+            ]
+
+        try:
+            batch_id = await self.batch_client.submit(requests, ENDPOINTS[stage], claim_id=claim_id)
+        except Exception as e:
+            # Le batch a pu être créé avant l'erreur: rattachement ou libération des articles
+            logger.error(f"❌ Soumission du batch {stage} échouée: {e}")
+            await self._recover_claim(claim_id)
+            raise
+
+        await self._attach(claim_id, batch_id)
+        logger.info(f"🗂️ Batch {stage} créé: {batch_id} ({len(requests)} articles)")
+        return batch_id
+
+    async def _attach(self, claim_id: str, batch_id: str) -> None:
+        """Remplace le batch provisoire par le batch OpenAI"""
+        async with news_db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    INSERT INTO news_batches (id, stage, item_count, created_at)
+                    SELECT $2, stage, item_count, created_at FROM news_batches WHERE id = $1
+                    ON CONFLICT (id) DO NOTHING
+                    """,
+                    claim_id, batch_id
+                )
+                await conn.execute("UPDATE news_batch_items SET batch_id = $2 WHERE batch_id = $1", claim_id, batch_id)
+                await conn.execute("DELETE FROM news_batches WHERE id = $1", claim_id)
+
+    async def _recover_claim(self, claim_id: str) -> Optional[str]:
+        """Rattache une réservation au batch OpenAI créé pour elle, sinon libère ses articles"""
+        try:
+            batch_id = await self.batch_client.find_by_claim(claim_id)
+        except Exception as e:
+            # OpenAI injoignable: la réservation sera reprise par recover_claims
+            logger.error(f"❌ Recherche du batch de {claim_id} impossible: {e}")
+            return None
+
+        if batch_id:
+            await self._attach(claim_id, batch_id)
+            logger.warning(f"⚠️ Réservation {claim_id} rattachée au batch {batch_id}")
+            return batch_id
+
+        # Suppression du provisoire: ON DELETE SET NULL remet les articles en file
+        async with news_db.pool.acquire() as conn:
+            await conn.execute("DELETE FROM news_batches WHERE id = $1", claim_id)
+        logger.warning(f"⚠️ Réservation {claim_id} libérée: articles remis en file")
+        return None
+
+    async def recover_claims(self) -> int:
+        """Reprend les réservations orphelines (instance arrêtée pendant la soumission)"""
+        async with news_db.pool.acquire() as conn:
+            claims = await conn.fetch(
+                """
+                SELECT id FROM news_batches
+                WHERE status = $1 AND created_at < NOW() - make_interval(secs => $2::float)
+                """,
+                STATUS_SUBMITTING, float(self.claim_timeout_s)
+            )
+        for claim in claims:
+            await self._recover_claim(claim["id"])
+        return len(claims)
+
+    # ------------------------------------------------------------------
+    # Suivi et application des résultats
+    # ------------------------------------------------------------------
+
+    async def poll(self) -> int:
+        """Vérifie les batchs en cours et applique ceux qui sont terminés"""
+        async with news_db.pool.acquire() as conn:
+            batches = await conn.fetch("SELECT id, stage FROM news_batches WHERE status = 'in_progress'")
+
+        applied = 0
+        for batch in batches:
+            # Une erreur sur un batch ne bloque pas le suivi des autres
+            try:
+                info = await self.batch_client.retrieve(batch["id"])
+                if info["status"] == "completed" and info["output_file_id"]:
+                    output = await self.batch_client.download(info["output_file_id"])
+                    applied += await self.apply_results(
+                        batch["id"], batch["stage"], parse_batch_output(output, batch["stage"])
+                    )
+                elif info["status"] == "completed":
+                    # Toutes les requêtes en erreur: rien à appliquer
+                    await self._release(
+                        batch["id"], "failed", f"completed without output (error file {info.get('error_file_id')})"
+                    )
+                elif info["status"] in FAILED_STATUSES:
+                    await self._release(batch["id"], info["status"])
+            except Exception as e:
+                logger.error(f"❌ Suivi du batch {batch['id']} impossible: {e}")
+        return applied
+
+    async def apply_results(self, batch_id: str, stage: str, results: Dict[int, Any]) -> int:
+        """
+        Écrit les résultats en bloc puis remet en file les articles sans résultat
+
+        - Résumés: news.summary renseigné, article passé à l'étape embedding
+        - Embeddings: news.embedding renseigné, summary_status='done', article retiré de la file
+
+        Seuls les articles encore rattachés à ce batch sont modifiés: un batch
+        tardif n'écrase pas un article remis en file depuis dans un autre batch.
+        """
+        async with news_db.pool.acquire() as conn:
+            async with conn.transaction():
+                if stage == STAGE_SUMMARY:
+                    await conn.executemany(
+                        """
+                        UPDATE news SET summary = $2, summary_status = 'summarized'
+                        WHERE id = $1
+                          AND EXISTS (SELECT 1 FROM news_batch_items WHERE news_id = $1 AND batch_id = $3)
+                        """,
+                        [(news_id, summary, batch_id) for news_id, summary in results.items()]
+                    )
+                    await conn.execute(
+                        """
+                        UPDATE news_batch_items SET stage = 'embedding', batch_id = NULL, attempts = 0
+                        WHERE news_id = ANY($1::int[]) AND batch_id = $2
+                        """,
+                        list(results), batch_id
+                    )
+                else:
+                    await conn.executemany(
+                        f"""
+                        UPDATE news n
+                        SET embedding = {embedding_storage.cast("$2")},
+                            processed = TRUE,
+                            summary_status = 'done',
+                            content_hash = i.content_hash
+                        FROM news_batch_items i
+                        WHERE n.id = $1 AND i.news_id = n.id AND i.batch_id = $3
+                        """,
+                        [
+                            (news_id, embedding_storage.to_sql(embedding), batch_id)
+                            for news_id, embedding in results.items()
+                        ]
+                    )
+                    done = await conn.fetch(
+                        """
+                        DELETE FROM news_batch_items i USING news n
+                        WHERE i.news_id = ANY($1::int[]) AND i.batch_id = $2 AND n.id = i.news_id
+                        RETURNING n.url, i.lang
+                        """,
+                        list(results), batch_id
+                    )
+                    await news_db.log_processing_many(
+                        [
+                            (row["url"], ProcessingLog("success", metadata={
+                                "lang": row["lang"], "summary_status": "done", "batch_id": batch_id
+                            }))
+                            for row in done
+                        ],
+                        conn=conn
+                    )
+
+                await self._requeue(conn, batch_id, "no batch result")
+                await conn.execute(
+                    "UPDATE news_batches SET status = 'completed', completed_at = NOW() WHERE id = $1",
+                    batch_id
+                )
+
+        logger.info(f"✅ Batch {stage} {batch_id} appliqué: {len(results)} résultats")
+        return len(results)
+
+    async def _release(self, batch_id: str, status: str, error: Optional[str] = None) -> None:
+        """Batch en échec: ses articles repartent dans la file"""
+        error = error or status
+        async with news_db.pool.acquire() as conn:
+            async with conn.transaction():
+                await self._requeue(conn, batch_id, f"batch {error}")
+                await conn.execute(
+                    "UPDATE news_batches SET status = $2, completed_at = NOW(), error = $3 WHERE id = $1",
+                    batch_id, status, error
+                )
+        logger.warning(f"⚠️ Batch {batch_id} terminé en {status} ({error}): articles remis en file")
+
+    async def _requeue(self, conn, batch_id: str, reason: str) -> None:
+        """
+        Remet en file les articles restés dans le batch (sans résultat)
+
+        Après max_attempts batchs sans résultat, l'article quitte la file:
+        summary_status='failed', last_error renseigné et ligne de log en erreur.
+        """
+        abandoned = await conn.fetch(
+            """
+            WITH dropped AS (
+                DELETE FROM news_batch_items
+                WHERE batch_id = $1 AND attempts + 1 >= $2
+                RETURNING news_id, lang, stage
+            )
+            UPDATE news n SET summary_status = 'failed', last_error = $3
+            FROM dropped d WHERE n.id = d.news_id
+            RETURNING n.url, d.lang, d.stage
+            """,
+            batch_id, self.max_attempts, reason
+        )
+        await conn.execute(
+            "UPDATE news_batch_items SET batch_id = NULL, attempts = attempts + 1 WHERE batch_id = $1",
+            batch_id
+        )
+        if abandoned:
+            await news_db.log_processing_many(
+                [
+                    (row["url"], ProcessingLog("error", error_message=reason, metadata={
+                        "lang": row["lang"], "stage": row["stage"], "summary_status": "failed", "batch_id": batch_id
+                    }))
+                    for row in abandoned
+                ],
+                conn=conn
+            )
+            logger.warning(f"⚠️ {len(abandoned)} articles abandonnés après {self.max_attempts} batchs sans résultat")
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Articles en attente par étape et batchs en cours"""
+        async with news_db.pool.acquire() as conn:
+            items = await conn.fetch(
+                "SELECT stage, count(*) AS n FROM news_batch_items GROUP BY stage"
+            )
+            batches = await conn.fetch(
+                """
+                SELECT id, stage, status, item_count, created_at, completed_at FROM news_batches
+                ORDER BY created_at DESC LIMIT 20
+                """
+            )
+        return {
+            "enabled": self.enabled,
+            "pending": {row["stage"]: row["n"] for row in items},
+            "batches": [
+                {
+                    **dict(row),
+                    "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+                    "completed_at": row["completed_at"].isoformat() if row["completed_at"] else None
+                }
+                for row in batches
+            ]
+        }
+
+
+# Instance globale
+news_batch_processor = NewsBatchProcessor()
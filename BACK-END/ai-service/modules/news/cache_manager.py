@@ -2,14 +2,20 @@
 Gestion du cache Redis pour le module News
 - Cache des URLs traitées avec TTL configurable
 - Évite le retraitement inutile des actualités
+- Client asynchrone partagé (redis_pool), sans blocage de la boucle d'événements
+- Taille du cache suivie à l'écriture (sorted set url -> expiration), statistiques
+  en O(log N) sans KEYS; SCAN réservé à la maintenance (reconcile_index)
 """
-import redis
 import os
+import time
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Set
 import json
 from datetime import datetime
 
+from .redis_pool import news_redis
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,36 +23,60 @@ class NewsCacheManager:
     """Gestionnaire de cache Redis pour les actualités"""
 
     def __init__(self):
-        redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
         self.ttl_hours = int(os.getenv("NEWS_TTL_HOURS", "48"))
         self.ttl_seconds = self.ttl_hours * 3600
-
-        try:
-            self.client = redis.from_url(redis_url, decode_responses=True)
-            self.client.ping()
-            logger.info(f"✅ Connexion Redis établie (TTL: {self.ttl_hours}h)")
-        except Exception as e:
-            logger.error(f"❌ Erreur connexion Redis: {e}")
-            self.client = None
+        # Index url -> timestamp d'expiration (hors du motif news:cache:*)
+        self.index_key = "news:cache_index"
+        # Les infos serveur (INFO) sont mises en cache localement
+        self.info_ttl_s = float(os.getenv("NEWS_CACHE_INFO_TTL_S", "60"))
+        self._info_cache: Optional[Dict[str, Any]] = None
+        self._info_fetched_at = 0.0
+        # Référence gardée: une tâche non référencée peut être collectée en cours d'exécution
+        self._index_task: Optional[asyncio.Task] = None
 
     def _get_cache_key(self, url: str) -> str:
         """Génère la clé de cache pour une URL"""
         return f"news:cache:{url}"
 
-    def is_cached(self, url: str) -> bool:
+    def _url_from_key(self, key: str) -> str:
+        """Inverse de _get_cache_key"""
+        return key[len("news:cache:"):]
+
+    async def is_cached(self, url: str) -> bool:
         """Vérifie si une URL est en cache"""
-        if not self.client:
+        client = await news_redis.ensure()
+        if not client:
             return False
 
         try:
             key = self._get_cache_key(url)
-            exists = self.client.exists(key)
+            exists = await client.exists(key)
             return bool(exists)
         except Exception as e:
             logger.error(f"❌ Erreur vérification cache: {e}")
+            news_redis.mark_unavailable(e)
             return False
 
-    def set_cached(self, url: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+    async def get_cached_urls(self, urls: List[str]) -> Set[str]:
+        """
+        Sous-ensemble des URLs présentes en cache (un seul MGET)
+
+        Returns:
+            URLs en cache (ensemble vide si Redis est indisponible)
+        """
+        client = await news_redis.ensure()
+        if not client or not urls:
+            return set()
+
+        try:
+            values = await client.mget([self._get_cache_key(url) for url in urls])
+            return {url for url, value in zip(urls, values) if value is not None}
+        except Exception as e:
+            logger.error(f"❌ Erreur vérification cache (lot): {e}")
+            news_redis.mark_unavailable(e)
+            return set()
+
+    async def set_cached(self, url: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
         """
         Marque une URL comme traitée dans le cache
 
@@ -54,7 +84,8 @@ class NewsCacheManager:
             url: L'URL de l'actualité
             metadata: Métadonnées optionnelles (title, lang, etc.)
         """
-        if not self.client:
+        client = await news_redis.ensure()
+        if not client:
             return False
 
         try:
@@ -65,96 +96,223 @@ class NewsCacheManager:
                 **(metadata or {})
             }
 
-            # SETEX = SET with EXpiration
-            self.client.setex(
-                key,
-                self.ttl_seconds,
-                json.dumps(value)
-            )
+            # SETEX = SET with EXpiration, et suivi de l'expiration dans l'index
+            now = time.time()
+            pipe = client.pipeline(transaction=False)
+            pipe.setex(key, self.ttl_seconds, json.dumps(value))
+            pipe.zadd(self.index_key, {url: now + self.ttl_seconds})
+            # Purge amortie des entrées expirées (O(log N + expirées))
+            pipe.zremrangebyscore(self.index_key, "-inf", now)
+            await pipe.execute()
             logger.debug(f"✅ URL mise en cache: {url} (TTL: {self.ttl_hours}h)")
             return True
         except Exception as e:
             logger.error(f"❌ Erreur mise en cache: {e}")
+            news_redis.mark_unavailable(e)
+            return False
+
+    async def set_cached_many(self, entries: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Met en cache plusieurs URLs en un seul pipeline
+
+        Args:
+            entries: {url: métadonnées}
+        """
+        client = await news_redis.ensure()
+        if not client or not entries:
+            return False
+
+        try:
+            now = time.time()
+            cached_at = datetime.utcnow().isoformat()
+            pipe = client.pipeline(transaction=False)
+            for url, metadata in entries.items():
+                value = {"url": url, "cached_at": cached_at, **(metadata or {})}
+                pipe.setex(self._get_cache_key(url), self.ttl_seconds, json.dumps(value))
+            pipe.zadd(self.index_key, {url: now + self.ttl_seconds for url in entries})
+            pipe.zremrangebyscore(self.index_key, "-inf", now)
+            await pipe.execute()
+            logger.debug(f"✅ {len(entries)} URLs mises en cache (TTL: {self.ttl_hours}h)")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erreur mise en cache (lot): {e}")
+            news_redis.mark_unavailable(e)
             return False
 
-    def get_cached_metadata(self, url: str) -> Optional[Dict[str, Any]]:
+    async def get_cached_metadata(self, url: str) -> Optional[Dict[str, Any]]:
         """Récupère les métadonnées d'une URL en cache"""
-        if not self.client:
+        client = await news_redis.ensure()
+        if not client:
             return None
 
         try:
             key = self._get_cache_key(url)
-            data = self.client.get(key)
+            data = await client.get(key)
             if data:
                 return json.loads(data)
             return None
         except Exception as e:
             logger.error(f"❌ Erreur récupération cache: {e}")
+            news_redis.mark_unavailable(e)
             return None
 
-    def refresh_ttl(self, url: str) -> bool:
+    async def refresh_ttl(self, url: str) -> bool:
         """
         Prolonge la durée de vie d'une URL en cache
         Utile quand l'URL existe en DB mais a expiré du cache
         """
-        if not self.client:
+        client = await news_redis.ensure()
+        if not client:
             return False
 
         try:
             key = self._get_cache_key(url)
-            if self.client.exists(key):
-                self.client.expire(key, self.ttl_seconds)
+            # EXPIRE renvoie False si la clé n'existe pas: un seul aller-retour
+            refreshed = await client.expire(key, self.ttl_seconds)
+            if refreshed:
+                await client.zadd(self.index_key, {url: time.time() + self.ttl_seconds}, xx=True)
                 logger.debug(f"🔄 TTL rafraîchi pour: {url}")
-                return True
-            return False
+            return bool(refreshed)
         except Exception as e:
             logger.error(f"❌ Erreur refresh TTL: {e}")
+            news_redis.mark_unavailable(e)
             return False
 
-    def invalidate(self, url: str) -> bool:
+    async def invalidate(self, url: str) -> bool:
         """Supprime une URL du cache (forcer le retraitement)"""
-        if not self.client:
+        client = await news_redis.ensure()
+        if not client:
             return False
 
         try:
             key = self._get_cache_key(url)
-            deleted = self.client.delete(key)
+            pipe = client.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.zrem(self.index_key, url)
+            deleted, _ = await pipe.execute()
             if deleted:
                 logger.info(f"🗑️ URL supprimée du cache: {url}")
             return bool(deleted)
         except Exception as e:
             logger.error(f"❌ Erreur suppression cache: {e}")
+            news_redis.mark_unavailable(e)
             return False
 
-    def get_cache_stats(self) -> Dict[str, Any]:
+    async def get_cache_stats(self) -> Dict[str, Any]:
         """Récupère des statistiques sur le cache"""
-        if not self.client:
+        client = await news_redis.ensure()
+        if not client:
             return {
                 "status": "disconnected",
                 "cached_urls": 0
             }
 
         try:
-            # Compter les clés news:cache:*
-            pattern = "news:cache:*"
-            keys = self.client.keys(pattern)
+            # URLs non expirées: ZCOUNT sur l'index, indépendant du nombre de clés
+            cached_urls = await client.zcount(self.index_key, time.time(), "+inf")
 
             return {
                 "status": "connected",
-                "cached_urls": len(keys),
+                "cached_urls": cached_urls,
                 "ttl_hours": self.ttl_hours,
-                "redis_info": {
-                    "used_memory_human": self.client.info("memory").get("used_memory_human"),
-                    "connected_clients": self.client.info("clients").get("connected_clients")
-                }
+                "redis_info": await self._get_server_info(client)
             }
         except Exception as e:
             logger.error(f"❌ Erreur stats cache: {e}")
+            news_redis.mark_unavailable(e)
             return {
                 "status": "error",
                 "error": str(e)
             }
 
+    async def _get_server_info(self, client) -> Dict[str, Any]:
+        """INFO memory + clients, mis en cache NEWS_CACHE_INFO_TTL_S secondes"""
+        if self._info_cache is None or time.monotonic() - self._info_fetched_at >= self.info_ttl_s:
+            pipe = client.pipeline(transaction=False)
+            pipe.info("memory")
+            pipe.info("clients")
+            memory_info, clients_info = await pipe.execute()
+            self._info_cache = {
+                "used_memory_human": memory_info.get("used_memory_human"),
+                "connected_clients": clients_info.get("connected_clients")
+            }
+            self._info_fetched_at = time.monotonic()
+        return self._info_cache
+
+    async def reconcile_index(self, batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Maintenance hors chemin critique: resynchronise l'index avec les clés réelles
+
+        - Purge les entrées expirées de l'index
+        - SCAN des clés news:cache:* (jamais KEYS) pour indexer celles qui manquent
+          (clés créées avant l'index ou par un autre client)
+        """
+        client = await news_redis.ensure()
+        if not client:
+            return {"status": "disconnected"}
+
+        try:
+            purged = await client.zremrangebyscore(self.index_key, "-inf", time.time())
+
+            indexed, scanned = 0, 0
+            batch: List[str] = []
+            async for key in client.scan_iter(match="news:cache:*", count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    indexed += await self._index_keys(client, batch)
+                    scanned += len(batch)
+                    batch = []
+            if batch:
+                indexed += await self._index_keys(client, batch)
+                scanned += len(batch)
+
+            logger.info(f"🧹 Index du cache réconcilié: {scanned} clés, {indexed} indexées, {purged} expirées purgées")
+            return {"status": "ok", "scanned": scanned, "indexed": indexed, "purged": purged}
+        except Exception as e:
+            logger.error(f"❌ Erreur réconciliation index cache: {e}")
+            return {"status": "error", "error": str(e)}
+
+    async def _index_keys(self, client, keys: List[str]) -> int:
+        """Ajoute à l'index les clés absentes, avec leur TTL réel"""
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.ttl(key)
+        ttls = await pipe.execute()
+
+        now = time.time()
+        mapping = {
+            self._url_from_key(key): now + ttl
+            for key, ttl in zip(keys, ttls) if ttl and ttl > 0
+        }
+        if not mapping:
+            return 0
+        # NX: ne pas écraser les expirations déjà suivies
+        return await client.zadd(self.index_key, mapping, nx=True)
+
+    def start(self) -> None:
+        """Lance ensure_index en tâche de fond (démarrage de l'application)"""
+        if self._index_task is None or self._index_task.done():
+            self._index_task = asyncio.create_task(self.ensure_index())
+
+    async def stop(self) -> None:
+        if self._index_task:
+            self._index_task.cancel()
+            try:
+                await self._index_task
+            except asyncio.CancelledError:
+                pass
+            self._index_task = None
+
+    async def ensure_index(self) -> None:
+        """Construit l'index au démarrage s'il n'existe pas encore (migration)"""
+        client = await news_redis.ensure()
+        if client:
+            try:
+                if not await client.exists(self.index_key):
+                    await self.reconcile_index()
+            except Exception as e:
+                logger.error(f"❌ Erreur vérification index cache: {e}")
+
 
 # Instance globale
 news_cache = NewsCacheManager()
@@ -0,0 +1,164 @@
+"""
+Évaluation des formats d'embedding réduits contre la précision complète
+
+Pour chaque configuration (dimension x précision), mesure le rappel@k du top-k
+obtenu sur les vecteurs réduits par rapport au top-k exact en float32 / 1536
+dimensions. Les requêtes sont des embeddings du corpus (leave-one-out).
+
+Usage (depuis BACK-END/ai-service, colonne news.embedding encore en vector(1536)):
+    python -m modules.news.embedding_eval --lang fr --dims 1536,1024,512,256
+"""
+import argparse
+import asyncio
+import random
+from typing import List, Sequence, Dict, Any, Tuple
+
+from .embedding_storage import (
+    PRECISIONS,
+    PRECISION_HALFVEC,
+    PRECISION_BINARY,
+    truncate_embedding,
+    to_half_precision,
+    binary_quantize,
+    hamming_distance,
+    estimated_row_bytes,
+    estimated_index_entry_bytes,
+)
+
+
+def _dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+def _top_k(query: Sequence[float], corpus: List[Sequence[float]], k: int, exclude: int) -> List[int]:
+    """Top-k par produit scalaire (vecteurs normalisés = cosinus)"""
+    scored = [(_dot(query, vec), idx) for idx, vec in enumerate(corpus) if idx != exclude]
+    scored.sort(reverse=True)
+    return [idx for _, idx in scored[:k]]
+
+
+def _transform(corpus: List[Sequence[float]], dims: int, precision: str) -> Tuple[List[List[float]], List[int]]:
+    """Applique réduction + quantisation; renvoie (vecteurs de re-classement, codes binaires)"""
+    reduced = [truncate_embedding(vec, dims) for vec in corpus]
+    if precision in (PRECISION_HALFVEC, PRECISION_BINARY):
+        reduced = [to_half_precision(vec) for vec in reduced]
+    codes = [binary_quantize(vec) for vec in reduced] if precision == PRECISION_BINARY else []
+    return reduced, codes
+
+
+def evaluate_configs(
+    corpus: List[Sequence[float]],
+    query_indexes: List[int],
+    configs: List[Tuple[int, str]],
+    k: int = 3,
+    rerank_factor: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Calcule le rappel@k de chaque configuration
+
+    Args:
+        corpus: Embeddings pleine précision
+        query_indexes: Indices du corpus utilisés comme requêtes
+        configs: Liste de (dimension, précision)
+        k: Taille du top-k
+        rerank_factor: Candidats binaires re-classés par résultat
+
+    Returns:
+        [{"dimensions": 512, "precision": "halfvec", "recall_at_k": 0.96, ...}]
+    """
+    full_dims = len(corpus[0])
+    normalized = [truncate_embedding(vec, full_dims) for vec in corpus]
+    baseline = {q: set(_top_k(normalized[q], normalized, k, q)) for q in query_indexes}
+
+    results = []
+    for dims, precision in configs:
+        vectors, codes = _transform(corpus, dims, precision)
+        recalls = []
+
+        for q in query_indexes:
+            if precision == PRECISION_BINARY:
+                by_hamming = sorted(
+                    (hamming_distance(codes[q], code), idx)
+                    for idx, code in enumerate(codes) if idx != q
+                )
+                candidates = [idx for _, idx in by_hamming[:k * rerank_factor]]
+                reranked = sorted(candidates, key=lambda idx: _dot(vectors[q], vectors[idx]), reverse=True)
+                found = set(reranked[:k])
+            else:
+                found = set(_top_k(vectors[q], vectors, k, q))
+
+            if baseline[q]:
+                recalls.append(len(found & baseline[q]) / len(baseline[q]))
+
+        results.append({
+            "dimensions": dims,
+            "precision": precision,
+            "recall_at_k": round(sum(recalls) / len(recalls), 4) if recalls else None,
+            "row_bytes": estimated_row_bytes(dims, precision),
+            "index_entry_bytes": estimated_index_entry_bytes(dims, precision),
+            "size_ratio": round(estimated_row_bytes(full_dims, "vector") / estimated_row_bytes(dims, precision), 1)
+        })
+
+    return results
+
+
+async def _load_corpus(lang: str, limit: int) -> List[List[float]]:
+    """Charge les embeddings pleine précision depuis la base"""
+    from .database import news_db
+
+    # Lecture seule des embeddings existants, quel que soit leur type
+    await news_db.connect(check_embedding_type=False)
+    try:
+        async with news_db.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT embedding::text AS embedding
+                FROM news
+                WHERE lang = $1 AND embedding IS NOT NULL
+                ORDER BY created_at DESC
+                LIMIT $2
+                """,
+                lang, limit
+            )
+    finally:
+        await news_db.close()
+
+    return [[float(x) for x in row["embedding"].strip("[]").split(",")] for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rappel@k des formats d'embedding réduits")
+    parser.add_argument("--lang", default="fr")
+    parser.add_argument("--dims", default="1536,1024,512,256")
+    parser.add_argument("--precisions", default=",".join(PRECISIONS))
+    parser.add_argument("--corpus", type=int, default=2000, help="Nombre max de lignes chargées")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rerank-factor", type=int, default=10)
+    args = parser.parse_args()
+
+    corpus = asyncio.run(_load_corpus(args.lang, args.corpus))
+    if len(corpus) <= args.k:
+        print(f"❌ Corpus trop petit ({len(corpus)} embeddings)")
+        return
+    if len(corpus[0]) != 1536:
+        print(f"⚠️ Embeddings stockés en {len(corpus[0])} dimensions: la référence n'est pas la pleine précision")
+
+    queries = random.sample(range(len(corpus)), min(args.queries, len(corpus)))
+    configs = [
+        (int(d), p)
+        for d in args.dims.split(",") if int(d) <= len(corpus[0])
+        for p in args.precisions.split(",")
+    ]
+
+    print(f"📊 {len(corpus)} embeddings, {len(queries)} requêtes, k={args.k}")
+    print(f"{'dims':>6} {'précision':>10} {'rappel@k':>9} {'octets/ligne':>13} {'octets/index':>13} {'gain':>6}")
+    for r in evaluate_configs(corpus, queries, configs, args.k, args.rerank_factor):
+        print(
+            f"{r['dimensions']:>6} {r['precision']:>10} {r['recall_at_k']:>9} "
+            f"{r['row_bytes']:>13} {r['index_entry_bytes']:>13} {r['size_ratio']:>5}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Migration de la colonne news.embedding vers le format configuré
+(NEWS_EMBEDDING_DIMENSIONS / NEWS_EMBEDDING_PRECISION)
+
+Étapes:
+1. Ajout d'une colonne temporaire embedding_next au nouveau type
+2. Backfill par lots (keyset sur id):
+   - truncate: réduction SQL des vecteurs existants (aucun appel OpenAI,
+     équivalent au paramètre `dimensions` pour text-embedding-3)
+   - reembed: nouvel embedding du résumé via l'API, par lots
+3. Bascule des colonnes dans une transaction, puis reconstruction des index
+
+Usage (depuis BACK-END/ai-service):
+    NEWS_EMBEDDING_DIMENSIONS=512 NEWS_EMBEDDING_PRECISION=halfvec \\
+        python -m modules.news.embedding_migration --mode truncate
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+from .database import news_db
+from .embedding_storage import embedding_storage
+from .index_manager import news_index_manager, LEGACY_INDEX_NAME
+from .service import news_processor
+
+logger = logging.getLogger(__name__)
+
+
+async def _current_column_type(conn, column: str):
+    return await conn.fetchval(
+        """
+        SELECT format_type(atttypid, atttypmod)
+        FROM pg_attribute
+        WHERE attrelid = 'news'::regclass AND attname = $1 AND NOT attisdropped
+        """,
+        column
+    )
+
+
+def _dimensions_of(column_type: str) -> int:
+    """vector(1536) -> 1536"""
+    return int(column_type.split("(")[1].rstrip(")"))
+
+
+async def _backfill_truncate(conn, ids: List[int], source_dims: int) -> None:
+    """Réduction côté SQL: subvector puis cast vers le type cible"""
+    target = embedding_storage.column_type
+    source = f"embedding::vector({source_dims})"
+    await conn.execute(
+        f"""
+        UPDATE news
+        SET embedding_next = subvector({source}, 1, {embedding_storage.dimensions})::{target}
+        WHERE id = ANY($1::int[])
+        """,
+        ids
+    )
+
+
+async def _backfill_reembed(conn, rows) -> None:
+    """Nouvel embedding des résumés en un seul appel API par lot"""
+    texts = [row["summary"] or row["title"] for row in rows]
+    extra = {}
+    if embedding_storage.request_dimensions:
+        extra["dimensions"] = embedding_storage.request_dimensions
+
+    response = await asyncio.to_thread(
+        news_processor.openai_client.embeddings.create,
+        model=news_processor.embedding_model,
+        input=texts,
+        **extra
+    )
+    embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    await conn.executemany(
+        f"UPDATE news SET embedding_next = {embedding_storage.cast('$2')} WHERE id = $1",
+        [(row["id"], embedding_storage.to_sql(emb)) for row, emb in zip(rows, embeddings)]
+    )
+
+
+async def migrate(mode: str = "truncate", batch_size: int = 500) -> None:
+    """Migre la colonne embedding vers le format configuré"""
+    # La colonne n'a pas encore le type configuré: c'est l'objet de la migration
+    await news_db.connect(check_embedding_type=False)
+    target = embedding_storage.column_type
+
+    try:
+        async with news_db.pool.acquire() as conn:
+            current = await _current_column_type(conn, "embedding")
+            if current == target:
+                print(f"✅ news.embedding est déjà en {target}, rien à migrer")
+                return
+
+            source_dims = _dimensions_of(current)
+            if mode == "truncate" and source_dims < embedding_storage.dimensions:
+                raise SystemExit(f"❌ Impossible d'agrandir {current} -> {target} par troncature, utiliser --mode reembed")
+
+            staging = await _current_column_type(conn, "embedding_next")
+            if staging and staging != target:
+                await conn.execute("ALTER TABLE news DROP COLUMN embedding_next")
+            await conn.execute(f"ALTER TABLE news ADD COLUMN IF NOT EXISTS embedding_next {target}")
+            print(f"🔄 Migration {current} -> {target} (mode={mode})")
+
+            # Backfill reprenable: seules les lignes sans embedding_next sont traitées
+            last_id, done, start = 0, 0, time.time()
+            while True:
+                rows = await conn.fetch(
+                    """
+                    SELECT id, title, summary
+                    FROM news
+                    WHERE id > $1 AND embedding IS NOT NULL AND embedding_next IS NULL
+                    ORDER BY id
+                    LIMIT $2
+                    """,
+                    last_id, batch_size
+                )
+                if not rows:
+                    break
+
+                if mode == "truncate":
+                    await _backfill_truncate(conn, [row["id"] for row in rows], source_dims)
+                else:
+                    await _backfill_reembed(conn, rows)
+
+                last_id = rows[-1]["id"]
+                done += len(rows)
+                print(f"   {done} lignes ({done / max(time.time() - start, 0.001):.0f}/s)")
+
+            # Bascule: les index vectoriels dépendent de l'ancienne colonne
+            async with conn.transaction():
+                for row in await conn.fetch("SELECT index_name FROM news_index_state WHERE index_name IS NOT NULL"):
+                    await conn.execute(f"DROP INDEX IF EXISTS {row['index_name']}")
+                await conn.execute(f"DROP INDEX IF EXISTS {LEGACY_INDEX_NAME}")
+                await conn.execute("DELETE FROM news_index_state")
+                await conn.execute("ALTER TABLE news DROP COLUMN embedding")
+                await conn.execute("ALTER TABLE news RENAME COLUMN embedding_next TO embedding")
+            print(f"✅ Colonne basculée en {target} ({done} lignes)")
+
+        report = await news_index_manager.ensure_indexes(news_db.pool, force=True)
+        print(f"✅ Index reconstruits: {report}")
+
+    finally:
+        await news_db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migration du format des embeddings news")
+    parser.add_argument("--mode", choices=["truncate", "reembed"], default="truncate")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(migrate(args.mode, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Format de stockage des embeddings de la table news
+- Dimension configurable (text-embedding-3-small accepte des sorties raccourcies)
+- Précision configurable: vector (float32), halfvec (float16) ou binary
+  (index sur binary_quantize + re-classement sur halfvec)
+- Fonctions pures de réduction/quantisation (partagées avec le script d'évaluation)
+"""
+import os
+import math
+import struct
+import logging
+from typing import List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+FULL_DIMENSIONS = 1536
+
+PRECISION_VECTOR = "vector"
+PRECISION_HALFVEC = "halfvec"
+PRECISION_BINARY = "binary"
+PRECISIONS = (PRECISION_VECTOR, PRECISION_HALFVEC, PRECISION_BINARY)
+
+
+def truncate_embedding(embedding: Sequence[float], dimensions: int) -> List[float]:
+    """
+    Raccourcit un embedding et le renormalise (norme L2 = 1)
+
+    Équivalent au paramètre `dimensions` de l'API pour les modèles text-embedding-3.
+    """
+    head = list(embedding[:dimensions])
+    norm = math.sqrt(sum(x * x for x in head))
+    if norm == 0:
+        return head
+    return [x / norm for x in head]
+
+
+def to_half_precision(embedding: Sequence[float]) -> List[float]:
+    """Arrondit chaque composante en float16 (comme le type halfvec)"""
+    packed = struct.pack(f"{len(embedding)}e", *embedding)
+    return list(struct.unpack(f"{len(embedding)}e", packed))
+
+
+def binary_quantize(embedding: Sequence[float]) -> int:
+    """Quantisation binaire (bit = composante > 0), comme binary_quantize() de pgvector"""
+    bits = 0
+    for x in embedding:
+        bits = (bits << 1) | (1 if x > 0 else 0)
+    return bits
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Distance de Hamming entre deux embeddings binaires"""
+    return bin(a ^ b).count("1")
+
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    """Similarité cosinus (même métrique que l'opérateur <=> de pgvector)"""
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if norm_a == 0 or norm_b == 0:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+
+def estimated_row_bytes(dimensions: int, precision: str) -> int:
+    """Taille approximative d'un embedding stocké (hors en-tête de ligne)"""
+    if precision == PRECISION_VECTOR:
+        return 4 * dimensions + 8
+    # binary conserve un halfvec pour le re-classement
+    return 2 * dimensions + 8
+
+
+def estimated_index_entry_bytes(dimensions: int, precision: str) -> int:
+    """Taille approximative d'une entrée d'index (hors voisins HNSW)"""
+    if precision == PRECISION_BINARY:
+        return math.ceil(dimensions / 8) + 8
+    return estimated_row_bytes(dimensions, precision)
+
+
+class EmbeddingStorage:
+    """Configuration du stockage et de la recherche des embeddings news"""
+
+    def __init__(self):
+        self.dimensions = int(os.getenv("NEWS_EMBEDDING_DIMENSIONS", str(FULL_DIMENSIONS)))
+        self.precision = os.getenv("NEWS_EMBEDDING_PRECISION", PRECISION_VECTOR).lower()
+        # Nombre de candidats binaires re-classés par résultat demandé
+        self.rerank_factor = int(os.getenv("NEWS_BINARY_RERANK_FACTOR", "10"))
+
+        if not 1 <= self.dimensions <= FULL_DIMENSIONS:
+            raise ValueError(f"NEWS_EMBEDDING_DIMENSIONS doit être entre 1 et {FULL_DIMENSIONS}")
+        if self.precision not in PRECISIONS:
+            raise ValueError(f"NEWS_EMBEDDING_PRECISION invalide: {self.precision} (attendu: {', '.join(PRECISIONS)})")
+
+        logger.info(f"📐 Stockage embeddings: {self.column_type} (précision={self.precision})")
+
+    @property
+    def base_type(self) -> str:
+        """Type pgvector de la colonne (binary re-classe sur du halfvec)"""
+        return PRECISION_VECTOR if self.precision == PRECISION_VECTOR else PRECISION_HALFVEC
+
+    @property
+    def column_type(self) -> str:
+        """Type SQL de la colonne embedding, ex: halfvec(512)"""
+        return f"{self.base_type}({self.dimensions})"
+
+    @property
+    def request_dimensions(self):
+        """Paramètre `dimensions` à envoyer à l'API (None = sortie complète)"""
+        return self.dimensions if self.dimensions < FULL_DIMENSIONS else None
+
+    @property
+    def opclass(self) -> str:
+        """Classe d'opérateurs de l'index vectoriel"""
+        if self.precision == PRECISION_BINARY:
+            return "bit_hamming_ops"
+        return f"{self.base_type}_cosine_ops"
+
+    @property
+    def index_expression(self) -> str:
+        """Expression indexée (colonne ou quantisation binaire)"""
+        if self.precision == PRECISION_BINARY:
+            return f"(binary_quantize(embedding)::bit({self.dimensions}))"
+        return "embedding"
+
+    def cast(self, param: str = "$1") -> str:
+        """Cast d'un paramètre texte vers le type de la colonne"""
+        return f"{param}::{self.column_type}"
+
+    def prepare(self, embedding: Sequence[float]) -> List[float]:
+        """Ramène un embedding à la dimension configurée"""
+        if len(embedding) > self.dimensions:
+            return truncate_embedding(embedding, self.dimensions)
+        return list(embedding)
+
+    def to_sql(self, embedding: Sequence[float]) -> str:
+        """Format texte pgvector: [0.1,0.2,...]"""
+        return "[" + ",".join(map(str, self.prepare(embedding))) + "]"
+
+    def search_sql(self, select: str, where: str, param: str = "$1", limit: str = "$3") -> str:
+        """
+        Requête top-k ordonnée par distance cosinus
+
+        En précision binaire, les candidats sont pré-sélectionnés par distance de
+        Hamming (index compact) puis re-classés par cosinus sur le halfvec.
+        """
+        distance = f"embedding <=> {self.cast(param)}"
+
+        if self.precision != PRECISION_BINARY:
+            return f"""
+                SELECT {select}, 1 - ({distance}) AS similarity
+                FROM news
+                WHERE {where}
+                ORDER BY {distance}
+                LIMIT {limit}
+            """
+
+        hamming = f"{self.index_expression} <~> binary_quantize({self.cast(param)})::bit({self.dimensions})"
+        return f"""
+            SELECT {select}, 1 - ({distance}) AS similarity
+            FROM (
+                SELECT *
+                FROM news
+                WHERE {where}
+                ORDER BY {hamming}
+                LIMIT {limit} * {int(self.rerank_factor)}
+            ) candidates
+            ORDER BY {distance}
+            LIMIT {limit}
+        """
+
+
+# Instance globale
+embedding_storage = EmbeddingStorage()
@@ -0,0 +1,207 @@
+"""
+Extraction du texte principal d'une page d'actualité
+- Fonctions pures (HTML -> texte), exécutées hors de la boucle d'événements
+  dans un pool de processus (ou de threads, NEWS_EXTRACT_EXECUTOR=thread)
+- Parseur lxml; les balises script/style/nav/footer/header sont ignorées
+  pendant le parcours au lieu d'être supprimées de l'arbre
+- Parcours interrompu dès que le budget de caractères est atteint
+- Empreinte du texte normalisé (content_hash) pour éviter de résumer / vectoriser
+  deux fois le même contenu
+- Benchmark sur une page sauvegardée:
+    python -m modules.news.extractor linkedin_news_raw.html
+"""
+import os
+import re
+import sys
+import time
+import hashlib
+import unicodedata
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Iterator, List
+
+import lxml.html
+import lxml.etree
+
+logger = logging.getLogger(__name__)
+
+
+# Budget de texte envoyé au résumé
+MAX_CONTENT_CHARS = 3000
+
+SKIPPED_TAGS = {"script", "style", "nav", "footer", "header", "noscript", "template"}
+MAIN_CLASS_RE = re.compile(r"(article|content|main|post)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _iter_text(element) -> Iterator[str]:
+    """Textes d'un sous-arbre dans l'ordre du document, hors balises ignorées"""
+    if isinstance(element.tag, str) and element.tag not in SKIPPED_TAGS:
+        if element.text:
+            yield element.text
+        for child in element:
+            yield from _iter_text(child)
+    # Le texte qui suit une balise appartient au parent
+    if element.tail:
+        yield element.tail
+
+
+def _collect_text(element, max_chars: int) -> str:
+    """Texte normalisé (espaces simples) d'un sous-arbre, arrêté au budget"""
+    pieces: List[str] = []
+    length = 0
+    for text in _iter_text(element):
+        piece = WHITESPACE_RE.sub(" ", text).strip()
+        if piece:
+            pieces.append(piece)
+            length += len(piece) + 1
+            if length >= max_chars:
+                break
+    return " ".join(pieces)[:max_chars].strip()
+
+
+def _subtree_text(element, max_chars: int) -> str:
+    """Texte d'un élément sans sa queue (texte suivant la balise fermante)"""
+    tail, element.tail = element.tail, None
+    try:
+        return _collect_text(element, max_chars)
+    finally:
+        element.tail = tail
+
+
+def extract_article_text(html: str, max_chars: int = MAX_CONTENT_CHARS) -> Optional[str]:
+    """
+    Extrait le contenu principal d'une page
+
+    Ordre de recherche (comme l'extraction historique):
+    1. Première balise <article>
+    2. Premier <div> dont la classe contient article/content/main/post
+    3. <body>
+
+    Returns:
+        Texte normalisé d'au plus max_chars caractères, None si vide
+    """
+    if not html or not html.strip():
+        return None
+
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return None
+
+    article = next((a for a in doc.iter("article") if not _in_skipped(a)), None)
+    if article is not None:
+        content = _subtree_text(article, max_chars)
+        if content:
+            return content
+
+    for div in doc.iter("div"):
+        if MAIN_CLASS_RE.search(div.get("class", "")) and not _in_skipped(div):
+            content = _subtree_text(div, max_chars)
+            if content:
+                return content
+            # Comme l'extraction historique: seul le premier div correspondant est essayé
+            break
+
+    body = doc.find("body")
+    if body is not None:
+        content = _subtree_text(body, max_chars)
+        if content:
+            return content
+
+    return None
+
+
+def _in_skipped(element) -> bool:
+    """L'élément est-il dans une balise ignorée (supprimée avant la recherche historiquement)"""
+    return any(ancestor.tag in SKIPPED_TAGS for ancestor in element.iterancestors())
+
+
+def content_fingerprint(text: str) -> str:
+    """
+    Empreinte SHA-256 du texte normalisé (NFKC, casse, espaces)
+
+    Deux extractions ne différant que par la casse ou les espaces ont la même empreinte.
+    """
+    normalized = WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text).casefold()).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def extract_article_text_legacy(html: str, max_chars: int = MAX_CONTENT_CHARS) -> Optional[str]:
+    """Extraction historique (BeautifulSoup + html.parser), conservée pour le benchmark"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup(["script", "style", "nav", "footer", "header"]):
+        script.decompose()
+
+    content = None
+    article = soup.find("article")
+    if article:
+        content = article.get_text(separator=" ", strip=True)
+    if not content:
+        main_content = soup.find("div", class_=MAIN_CLASS_RE)
+        if main_content:
+            content = main_content.get_text(separator=" ", strip=True)
+    if not content:
+        body = soup.find("body")
+        if body:
+            content = body.get_text(separator=" ", strip=True)
+
+    if content:
+        content = WHITESPACE_RE.sub(" ", content)
+        return content[:max_chars].strip()
+    return None
+
+
+class NewsExtractor:
+    """Exécution de l'extraction hors de la boucle d'événements"""
+
+    def __init__(self):
+        self.executor_kind = os.getenv("NEWS_EXTRACT_EXECUTOR", "process").lower()
+        self.workers = int(os.getenv("NEWS_EXTRACT_WORKERS", "2"))
+        self.max_chars = int(os.getenv("NEWS_CONTENT_MAX_CHARS", str(MAX_CONTENT_CHARS)))
+        self._executor: Optional[Executor] = None
+
+    @property
+    def executor(self) -> Executor:
+        """Pool créé au premier usage"""
+        if self._executor is None:
+            if self.executor_kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="news-extract")
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            logger.info(f"🧩 Pool d'extraction HTML: {self.executor_kind} x{self.workers}")
+        return self._executor
+
+    async def extract(self, html: str) -> Optional[str]:
+        """Extrait le texte principal dans le pool (ne bloque pas la boucle)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, extract_article_text, html, self.max_chars)
+
+    def close(self) -> None:
+        """Arrête le pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Instance globale
+news_extractor = NewsExtractor()
+
+
+def benchmark(html: str, iterations: int = 20) -> None:
+    """Compare l'extraction lxml à l'extraction historique sur une page"""
+    for name, func in (("lxml", extract_article_text), ("legacy", extract_article_text_legacy)):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            content = func(html)
+        elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+        print(f"{name:>7}: {elapsed_ms:8.2f} ms/page, {len(content or '')} caractères")
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else "linkedin_news_raw.html"
+    with open(path, "r", encoding="utf-8") as f:
+        benchmark(f.read())
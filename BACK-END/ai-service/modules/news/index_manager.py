@@ -0,0 +1,405 @@
+"""
+Gestion du cycle de vie des index vectoriels pgvector pour la table news
+- Choix HNSW / IVFFlat selon le volume de données
+- Index partiels par langue (le filtre lang est appliqué pendant le scan ANN)
+- Paramètres de recherche par requête (ivfflat.probes / hnsw.ef_search)
+- Reconstruction quand la dérive des données dépasse un seuil, en tâche de
+  fond (start) ou via POST /news/index/rebuild, jamais pendant une requête
+- Une seule instance à la fois (verrou consultatif PostgreSQL)
+- Benchmark rappel/latence contre la recherche exacte
+"""
+import asyncpg
+import asyncio
+import os
+import re
+import math
+import json
+import time
+import random
+import logging
+from typing import Optional, List, Dict, Any
+
+from .embedding_storage import embedding_storage
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_TYPE_EXACT = "exact"
+INDEX_TYPE_HNSW = "hnsw"
+INDEX_TYPE_IVFFLAT = "ivfflat"
+
+# Ancien index global créé au démarrage sur une table potentiellement vide
+LEGACY_INDEX_NAME = "news_embedding_idx"
+
+# Clé du verrou consultatif de maintenance (partagée par tous les workers)
+MAINTENANCE_LOCK = "news_index_maintenance"
+
+
+def choose_index_plan(
+    row_count: int,
+    exact_threshold: int = 1000,
+    ivfflat_threshold: int = 1_000_000
+) -> Dict[str, Any]:
+    """
+    Choisit le type d'index adapté au volume d'une langue
+
+    - Moins de `exact_threshold` lignes: pas d'index, le scan exact est plus rapide
+    - Jusqu'à `ivfflat_threshold`: HNSW (pas d'entraînement, meilleur rappel)
+    - Au-delà: IVFFlat, entraîné sur les données existantes (build moins coûteux)
+
+    Returns:
+        {"type": "exact" | "hnsw" | "ivfflat", "params": {...}}
+    """
+    if row_count < exact_threshold:
+        return {"type": INDEX_TYPE_EXACT, "params": {}}
+
+    if row_count < ivfflat_threshold:
+        return {"type": INDEX_TYPE_HNSW, "params": {"m": 16, "ef_construction": 64}}
+
+    # Recommandation pgvector: rows / 1000 jusqu'à 1M lignes, sqrt(rows) au-delà
+    # (les deux se croisent à 1M: le plus petit des deux suit la recommandation)
+    lists = max(10, min(row_count // 1000, math.isqrt(row_count)))
+    return {"type": INDEX_TYPE_IVFFLAT, "params": {"lists": lists}}
+
+
+def compute_drift(built_row_count: int, current_row_count: int) -> float:
+    """Ratio de dérive entre le volume au moment du build et le volume actuel"""
+    if built_row_count <= 0:
+        return float("inf") if current_row_count > 0 else 0.0
+    return abs(current_row_count - built_row_count) / built_row_count
+
+
+def index_name_for(lang: str, index_type: str) -> str:
+    """Nom d'index partiel pour une langue (identifiant SQL sûr)"""
+    safe_lang = re.sub(r"[^a-z0-9]", "_", lang.lower())[:20]
+    return f"news_embedding_{index_type}_{safe_lang}_idx"
+
+
+class NewsIndexManager:
+    """Gestionnaire des index vectoriels de la table news"""
+
+    def __init__(self):
+        self.exact_threshold = int(os.getenv("NEWS_INDEX_EXACT_THRESHOLD", "1000"))
+        self.ivfflat_threshold = int(os.getenv("NEWS_INDEX_IVFFLAT_THRESHOLD", "1000000"))
+        self.drift_threshold = float(os.getenv("NEWS_INDEX_DRIFT_THRESHOLD", "0.5"))
+        self.ivfflat_probes = int(os.getenv("NEWS_IVFFLAT_PROBES", "10"))
+        self.hnsw_ef_search = int(os.getenv("NEWS_HNSW_EF_SEARCH", "40"))
+        self.check_interval_s = int(os.getenv("NEWS_INDEX_CHECK_INTERVAL_S", "600"))
+
+        # Type d'index actif par langue (relu dans news_index_state, mis à jour par ensure_indexes)
+        self.active_indexes: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        logger.info(
+            f"🗂️ NewsIndexManager initialisé (exact<{self.exact_threshold}, "
+            f"ivfflat>={self.ivfflat_threshold}, drift={self.drift_threshold})"
+        )
+
+    async def initialize_schema(self, conn: asyncpg.Connection) -> None:
+        """Crée la table d'état des index"""
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_index_state (
+                lang VARCHAR(10) PRIMARY KEY,
+                index_name TEXT,
+                index_type VARCHAR(20) NOT NULL,
+                params JSONB,
+                row_count_at_build INT NOT NULL DEFAULT 0,
+                built_at TIMESTAMP DEFAULT NOW()
+            );
+        """)
+
+    async def ensure_indexes(self, pool: asyncpg.Pool, force: bool = False) -> Dict[str, Any]:
+        """
+        Vérifie chaque langue et (re)construit son index partiel si nécessaire
+
+        Sans effet (rapport vide) si une autre instance fait déjà la maintenance.
+
+        Args:
+            pool: Pool asyncpg
+            force: Reconstruit même si la dérive est sous le seuil
+
+        Returns:
+            Rapport par langue {"fr": {"action": "...", "type": "...", ...}}
+        """
+        report: Dict[str, Any] = {}
+
+        async with pool.acquire() as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", MAINTENANCE_LOCK):
+                logger.info("🗂️ Maintenance des index déjà en cours sur une autre instance")
+                return report
+            try:
+                await self._ensure_all(conn, report, force)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", MAINTENANCE_LOCK)
+
+        return report
+
+    async def _ensure_all(self, conn: asyncpg.Connection, report: Dict[str, Any], force: bool) -> None:
+        """Parcourt les langues (verrou de maintenance détenu sur conn)"""
+        counts = await conn.fetch("""
+            SELECT lang, COUNT(*) AS row_count
+            FROM news
+            WHERE embedding IS NOT NULL
+            GROUP BY lang
+        """)
+        states = {
+            row["lang"]: dict(row)
+            for row in await conn.fetch("SELECT * FROM news_index_state")
+        }
+
+        # L'index global entraîné sur une table vide est remplacé par les index partiels
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {LEGACY_INDEX_NAME};")
+
+        for row in counts:
+            lang = row["lang"]
+            row_count = int(row["row_count"])
+            try:
+                report[lang] = await self._ensure_lang_index(
+                    conn, lang, row_count, states.get(lang), force
+                )
+            except Exception as e:
+                logger.error(f"❌ Erreur maintenance index ({lang}): {e}")
+                report[lang] = {"action": "error", "error": str(e)}
+
+    async def load_state(self, pool: asyncpg.Pool) -> Dict[str, str]:
+        """Relit le type d'index de chaque langue (construit par n'importe quelle instance)"""
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT lang, index_type FROM news_index_state")
+        self.active_indexes.update({row["lang"]: row["index_type"] for row in rows})
+        return self.active_indexes
+
+    def start(self, pool: Optional[asyncpg.Pool]) -> None:
+        """Lance la vérification périodique des index (hors démarrage et hors requêtes)"""
+        if pool and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._loop(pool))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self, pool: asyncpg.Pool) -> None:
+        while True:
+            try:
+                report = await self.ensure_indexes(pool)
+                if report:
+                    logger.info(f"✅ Index vectoriels vérifiés: {report}")
+                await self.load_state(pool)
+            except Exception as e:
+                logger.error(f"❌ Erreur maintenance périodique des index: {e}")
+            await asyncio.sleep(self.check_interval_s)
+
+    async def _ensure_lang_index(
+        self,
+        conn: asyncpg.Connection,
+        lang: str,
+        row_count: int,
+        state: Optional[Dict[str, Any]],
+        force: bool
+    ) -> Dict[str, Any]:
+        """Décide et applique l'action pour une langue"""
+        plan = choose_index_plan(row_count, self.exact_threshold, self.ivfflat_threshold)
+        current_type = state["index_type"] if state else None
+        built_rows = state["row_count_at_build"] if state else 0
+        drift = compute_drift(built_rows, row_count)
+
+        # Le format de stockage fait partie du plan: un changement impose un rebuild
+        plan["params"]["storage"] = embedding_storage.opclass + ":" + embedding_storage.column_type
+        built_params = state.get("params") if state else None
+        if isinstance(built_params, str):
+            built_params = json.loads(built_params)
+        built_storage = (built_params or {}).get("storage")
+
+        needs_rebuild = (
+            force
+            or current_type != plan["type"]
+            or (plan["type"] != INDEX_TYPE_EXACT and built_storage != plan["params"]["storage"])
+            # Seul IVFFlat souffre de la dérive (centroïdes figés au build)
+            or (plan["type"] == INDEX_TYPE_IVFFLAT and drift > self.drift_threshold)
+        )
+
+        if not needs_rebuild:
+            self.active_indexes[lang] = plan["type"]
+            return {"action": "kept", "type": plan["type"], "rows": row_count, "drift": round(drift, 3)}
+
+        old_name = state["index_name"] if state else None
+        new_name = None
+
+        if plan["type"] != INDEX_TYPE_EXACT:
+            new_name = index_name_for(lang, plan["type"])
+            # Construire sous un nom temporaire pour ne jamais laisser la langue sans index
+            build_name = f"{new_name[:50]}_new" if new_name == old_name else new_name
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {build_name};")
+            await conn.execute(self._build_index_sql(build_name, lang, plan))
+            if build_name != new_name:
+                await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {new_name};")
+                await conn.execute(f"ALTER INDEX {build_name} RENAME TO {new_name};")
+
+        if old_name and old_name != new_name:
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {old_name};")
+
+        await conn.execute(
+            """
+            INSERT INTO news_index_state (lang, index_name, index_type, params, row_count_at_build, built_at)
+            VALUES ($1, $2, $3, $4::jsonb, $5, NOW())
+            ON CONFLICT (lang) DO UPDATE
+            SET index_name = EXCLUDED.index_name,
+                index_type = EXCLUDED.index_type,
+                params = EXCLUDED.params,
+                row_count_at_build = EXCLUDED.row_count_at_build,
+                built_at = EXCLUDED.built_at
+            """,
+            lang, new_name, plan["type"], json.dumps(plan["params"]), row_count
+        )
+
+        self.active_indexes[lang] = plan["type"]
+        logger.info(f"🗂️ Index {lang}: {current_type or 'aucun'} → {plan['type']} ({row_count} lignes, dérive {drift:.2f})")
+        return {"action": "rebuilt", "type": plan["type"], "rows": row_count, "drift": round(drift, 3)}
+
+    def _build_index_sql(self, name: str, lang: str, plan: Dict[str, Any]) -> str:
+        """SQL de création d'un index partiel (CONCURRENTLY: pas de verrou en écriture)"""
+        params = plan["params"]
+        if plan["type"] == INDEX_TYPE_HNSW:
+            with_clause = f"m = {int(params['m'])}, ef_construction = {int(params['ef_construction'])}"
+        else:
+            with_clause = f"lists = {int(params['lists'])}"
+
+        lang_literal = lang.replace("'", "''")
+        return f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+            ON news USING {plan['type']} ({embedding_storage.index_expression} {embedding_storage.opclass})
+            WITH ({with_clause})
+            WHERE lang = '{lang_literal}' AND embedding IS NOT NULL;
+        """
+
+    async def configure_search(self, conn: asyncpg.Connection, lang: str) -> None:
+        """
+        Applique les paramètres de recherche pour la requête en cours
+
+        Doit être appelé dans une transaction (SET LOCAL).
+        """
+        # Un plan générique (lang = $2) ne peut pas utiliser un index partiel
+        # WHERE lang = 'fr': on force un plan spécifique à la valeur
+        await conn.execute("SET LOCAL plan_cache_mode = force_custom_plan")
+
+        index_type = self.active_indexes.get(lang)
+        if index_type == INDEX_TYPE_IVFFLAT:
+            await conn.execute(f"SET LOCAL ivfflat.probes = {int(self.ivfflat_probes)}")
+        elif index_type == INDEX_TYPE_HNSW:
+            await conn.execute(f"SET LOCAL hnsw.ef_search = {int(self.hnsw_ef_search)}")
+
+    async def get_status(self, pool: asyncpg.Pool) -> List[Dict[str, Any]]:
+        """État des index par langue (pour debug)"""
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("""
+                SELECT s.*, (
+                    SELECT COUNT(*) FROM news n
+                    WHERE n.lang = s.lang AND n.embedding IS NOT NULL
+                ) AS current_rows
+                FROM news_index_state s
+                ORDER BY s.lang
+            """)
+
+        status = []
+        for row in rows:
+            item = dict(row)
+            item["drift"] = round(compute_drift(item["row_count_at_build"], item["current_rows"]), 3)
+            item["built_at"] = item["built_at"].isoformat() if item["built_at"] else None
+            if isinstance(item.get("params"), str):
+                item["params"] = json.loads(item["params"])
+            status.append(item)
+        return status
+
+    async def benchmark(
+        self,
+        pool: asyncpg.Pool,
+        lang: str,
+        samples: int = 50,
+        k: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Compare la recherche indexée à la recherche exacte
+
+        Les requêtes sont des embeddings existants de la langue (échantillon aléatoire).
+
+        Returns:
+            {"recall_at_k": 0.97, "ann_latency_ms": {...}, "exact_latency_ms": {...}, ...}
+        """
+        ann_query = embedding_storage.search_sql(select="id", where="lang = $2 AND embedding IS NOT NULL")
+        exact_query = f"""
+            SELECT id FROM news
+            WHERE lang = $2 AND embedding IS NOT NULL
+            ORDER BY embedding <=> {embedding_storage.cast("$1")}
+            LIMIT $3
+        """
+
+        async with pool.acquire() as conn:
+            ids = await conn.fetch(
+                "SELECT id FROM news WHERE lang = $1 AND embedding IS NOT NULL",
+                lang
+            )
+            if not ids:
+                return {"lang": lang, "samples": 0, "message": "Aucun embedding pour cette langue"}
+
+            sample_ids = random.sample([r["id"] for r in ids], min(samples, len(ids)))
+            recalls, ann_times, exact_times = [], [], []
+
+            for news_id in sample_ids:
+                embedding = await conn.fetchval(
+                    "SELECT embedding::text FROM news WHERE id = $1",
+                    news_id
+                )
+
+                async with conn.transaction():
+                    await self.configure_search(conn, lang)
+                    start = time.perf_counter()
+                    ann_rows = await conn.fetch(ann_query, embedding, lang, k)
+                    ann_times.append((time.perf_counter() - start) * 1000)
+
+                async with conn.transaction():
+                    # Désactive les index: parcours séquentiel = vérité terrain
+                    await conn.execute("SET LOCAL enable_indexscan = off")
+                    await conn.execute("SET LOCAL enable_bitmapscan = off")
+                    start = time.perf_counter()
+                    exact_rows = await conn.fetch(exact_query, embedding, lang, k)
+                    exact_times.append((time.perf_counter() - start) * 1000)
+
+                exact_ids = {r["id"] for r in exact_rows}
+                if exact_ids:
+                    hits = len(exact_ids & {r["id"] for r in ann_rows})
+                    recalls.append(hits / len(exact_ids))
+
+        return {
+            "lang": lang,
+            "index_type": self.active_indexes.get(lang, INDEX_TYPE_EXACT),
+            "samples": len(sample_ids),
+            "k": k,
+            "recall_at_k": round(sum(recalls) / len(recalls), 4) if recalls else None,
+            "ann_latency_ms": _latency_summary(ann_times),
+            "exact_latency_ms": _latency_summary(exact_times),
+            "search_params": {
+                "ivfflat.probes": self.ivfflat_probes,
+                "hnsw.ef_search": self.hnsw_ef_search
+            }
+        }
+
+
+def _latency_summary(times_ms: List[float]) -> Dict[str, float]:
+    """p50 / p95 / moyenne d'une série de latences"""
+    if not times_ms:
+        return {"p50": 0.0, "p95": 0.0, "avg": 0.0}
+    ordered = sorted(times_ms)
+    p95_idx = min(len(ordered) - 1, int(math.ceil(0.95 * len(ordered))) - 1)
+    return {
+        "p50": round(ordered[len(ordered) // 2], 2),
+        "p95": round(ordered[p95_idx], 2),
+        "avg": round(sum(ordered) / len(ordered), 2)
+    }
+
+
+# Instance globale
+news_index_manager = NewsIndexManager()
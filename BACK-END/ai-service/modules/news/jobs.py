@@ -0,0 +1,414 @@
+"""
+Traitement asynchrone des enregistrements d'actualités (/news/register)
+- L'enregistrement crée un job persistant et répond immédiatement (202)
+- Pool de workers borné par MAX_NEWS_CONCURRENCY
+- Jobs et URLs stockés en base (news_jobs / news_job_items): reprise après
+  redémarrage, réservation des URLs par FOR UPDATE SKIP LOCKED
+- Une URL déjà en file dans un autre job n'est pas ajoutée une seconde fois
+- Bail des URLs "running" renouvelé par l'instance qui les traite; celles dont
+  le bail a expiré (crash, redémarrage) sont remises en file périodiquement
+"""
+import os
+import uuid
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any, Set, Tuple
+
+from .database import news_db
+from .service import news_processor
+from .url_canonicalizer import canonicalize_urls
+
+logger = logging.getLogger(__name__)
+
+
+ITEM_PENDING = "pending"
+ITEM_RUNNING = "running"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+
+
+def build_job_status(
+    job: Dict[str, Any],
+    counts: Dict[str, int],
+    failed_urls: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    État d'un job à partir de sa ligne news_jobs et du décompte de ses URLs par statut
+
+    - registered: URLs déjà connues à la création + URLs traitées avec succès
+    - skipped: doublons (dans la requête ou déjà en file) + échecs
+    """
+    pending = counts.get(ITEM_PENDING, 0)
+    running = counts.get(ITEM_RUNNING, 0)
+    done = counts.get(ITEM_DONE, 0)
+    failed = counts.get(ITEM_FAILED, 0)
+
+    if pending + running == 0:
+        status = JOB_COMPLETED
+    elif running or done or failed:
+        status = JOB_RUNNING
+    else:
+        status = JOB_QUEUED
+
+    def iso(value):
+        return value.isoformat() if value else None
+
+    return {
+        "job_id": str(job["id"]),
+        "status": status,
+        "lang": job["lang"],
+        "total": job["total"],
+        "queued": pending + running + done + failed,
+        "pending": pending,
+        "running": running,
+        "registered": job["known"] + done,
+        "failed": failed,
+        "skipped": job["duplicates"] + failed,
+        "failed_urls": failed_urls or [],
+        "created_at": iso(job["created_at"]),
+        "finished_at": iso(job["finished_at"])
+    }
+
+
+class NewsJobQueue:
+    """File persistante de traitement des URLs d'actualités"""
+
+    def __init__(self):
+        self.workers = int(os.getenv("MAX_NEWS_CONCURRENCY", "5"))
+        # Attente max d'un worker inactif avant de relire la file (autre instance, reprise)
+        self.poll_interval_s = float(os.getenv("NEWS_JOB_POLL_S", "5"))
+        # Une URL "running" depuis plus longtemps est considérée abandonnée (crash)
+        self.lease_s = int(os.getenv("NEWS_JOB_LEASE_S", "600"))
+        # Renouvellement des baux et reprise des URLs abandonnées
+        self.sweep_interval_s = float(os.getenv("NEWS_JOB_SWEEP_S", "60"))
+        self.complete_attempts = int(os.getenv("NEWS_JOB_COMPLETE_ATTEMPTS", "3"))
+        self.retention_days = int(os.getenv("NEWS_JOB_RETENTION_DAYS", "7"))
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._in_progress: Set[Tuple[uuid.UUID, str]] = set()
+
+        logger.info(f"📬 NewsJobQueue initialisée (workers={self.workers})")
+
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    async def initialize_schema(self, conn) -> None:
+        """Crée les tables de jobs si nécessaire"""
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_jobs (
+                id UUID PRIMARY KEY,
+                lang VARCHAR(10) NOT NULL,
+                total INT NOT NULL,
+                known INT NOT NULL DEFAULT 0,
+                duplicates INT NOT NULL DEFAULT 0,
+                created_at TIMESTAMP DEFAULT NOW(),
+                finished_at TIMESTAMP
+            );
+        """)
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_job_items (
+                job_id UUID NOT NULL REFERENCES news_jobs(id) ON DELETE CASCADE,
+                url TEXT NOT NULL,
+                lang VARCHAR(10) NOT NULL,
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                attempts INT NOT NULL DEFAULT 0,
+                error TEXT,
+                enqueued_at TIMESTAMP DEFAULT NOW(),
+                claimed_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                PRIMARY KEY (job_id, url)
+            );
+        """)
+        # Une URL ne peut être en file qu'une fois, tous jobs confondus
+        await conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_news_job_items_active_url
+            ON news_job_items(url) WHERE status IN ('pending', 'running');
+        """)
+        await conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_news_job_items_pending
+            ON news_job_items(enqueued_at) WHERE status = 'pending';
+        """)
+
+    async def start(self) -> None:
+        """Crée le schéma, reprend les URLs abandonnées et lance les workers"""
+        if not news_db.pool or self._tasks:
+            return
+
+        async with news_db.pool.acquire() as conn:
+            await self.initialize_schema(conn)
+            purged = await conn.execute(
+                """
+                DELETE FROM news_jobs
+                WHERE finished_at < NOW() - $1::int * INTERVAL '1 day'
+                """,
+                self.retention_days
+            )
+
+        logger.debug(f"🗑️ Jobs expirés purgés: {purged}")
+
+        self._wakeup = asyncio.Event()
+        await self._sweep()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep_loop()))
+        logger.info(f"📬 {self.workers} workers d'ingestion démarrés")
+
+    async def stop(self) -> None:
+        """Arrête les workers et remet en file les URLs en cours"""
+        # Relevé avant l'annulation: les workers retirent leur URL en s'arrêtant
+        in_progress = list(self._in_progress)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if in_progress and news_db.pool:
+            try:
+                await self._requeue(in_progress)
+            except Exception as e:
+                logger.error(f"❌ Erreur remise en file des URLs en cours: {e}")
+        self._in_progress.clear()
+
+    async def _requeue(self, keys: List[Tuple[uuid.UUID, str]]) -> None:
+        """Remet en file des URLs réservées par cette instance"""
+        async with news_db.pool.acquire() as conn:
+            await conn.executemany(
+                """
+                UPDATE news_job_items SET status = 'pending', claimed_at = NULL
+                WHERE job_id = $1 AND url = $2 AND status = 'running'
+                """,
+                keys
+            )
+
+    # ------------------------------------------------------------------
+    # Enregistrement
+    # ------------------------------------------------------------------
+
+    async def enqueue(self, urls: List[str], lang: str = "fr") -> Dict[str, Any]:
+        """
+        Crée un job pour les URLs inconnues et rend la main immédiatement
+
+        Les URLs déjà en cache ou en base sont comptées comme enregistrées sans
+        passer par la file.
+        """
+        canonical_urls = canonicalize_urls(urls)
+        known, new = await news_processor.split_known_urls(canonical_urls, lang)
+        job_id = uuid.uuid4()
+
+        async with news_db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "INSERT INTO news_jobs (id, lang, total, known) VALUES ($1, $2, $3, $4)",
+                    job_id, lang, len(urls), len(known)
+                )
+                # ON CONFLICT: URL déjà en file dans un autre job (index unique partiel)
+                queued = await conn.fetch(
+                    """
+                    INSERT INTO news_job_items (job_id, url, lang)
+                    SELECT $1, url, $3 FROM unnest($2::text[]) AS url
+                    ON CONFLICT DO NOTHING
+                    RETURNING url
+                    """,
+                    job_id, new, lang
+                )
+                duplicates = len(urls) - len(known) - len(queued)
+                await conn.execute(
+                    """
+                    UPDATE news_jobs
+                    SET duplicates = $2,
+                        finished_at = CASE WHEN $3::boolean THEN NOW() END
+                    WHERE id = $1
+                    """,
+                    job_id, duplicates, not queued
+                )
+
+        if queued and self._wakeup:
+            self._wakeup.set()
+
+        logger.info(
+            f"📬 Job {job_id}: {len(queued)} URLs en file, {len(known)} déjà connues, "
+            f"{duplicates} doublons"
+        )
+        return await self.get_status(job_id)
+
+    async def get_status(self, job_id) -> Optional[Dict[str, Any]]:
+        """État et progression d'un job (None si inconnu)"""
+        if not isinstance(job_id, uuid.UUID):
+            try:
+                job_id = uuid.UUID(str(job_id))
+            except ValueError:
+                return None
+
+        async with news_db.pool.acquire() as conn:
+            job = await conn.fetchrow("SELECT * FROM news_jobs WHERE id = $1", job_id)
+            if not job:
+                return None
+            rows = await conn.fetch(
+                "SELECT status, count(*) AS n FROM news_job_items WHERE job_id = $1 GROUP BY status",
+                job_id
+            )
+            failed_urls = await conn.fetch(
+                "SELECT url FROM news_job_items WHERE job_id = $1 AND status = 'failed' LIMIT 20",
+                job_id
+            )
+
+        counts = {row["status"]: row["n"] for row in rows}
+        return build_job_status(dict(job), counts, [row["url"] for row in failed_urls])
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        """Réserve la plus ancienne URL en attente (sans bloquer les autres workers)"""
+        async with news_db.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                UPDATE news_job_items
+                SET status = 'running', claimed_at = NOW(), attempts = attempts + 1
+                WHERE (job_id, url) = (
+                    SELECT job_id, url FROM news_job_items
+                    WHERE status = 'pending'
+                    ORDER BY enqueued_at
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING job_id, url, lang
+            """)
+            return dict(row) if row else None
+
+    async def _complete(self, item: Dict[str, Any], success: bool, error: Optional[str]) -> None:
+        """
+        Termine une URL et clôture le job si c'était la dernière
+
+        La ligne du job est verrouillée avant la mise à jour: deux workers qui
+        terminent les dernières URLs en même temps passent l'un après l'autre,
+        et le second voit l'URL du premier terminée (READ COMMITTED).
+        """
+        async with news_db.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT 1 FROM news_jobs WHERE id = $1 FOR UPDATE", item["job_id"])
+                await conn.execute(
+                    """
+                    UPDATE news_job_items
+                    SET status = $3, error = $4, finished_at = NOW()
+                    WHERE job_id = $1 AND url = $2
+                    """,
+                    item["job_id"], item["url"], ITEM_DONE if success else ITEM_FAILED, error
+                )
+                await conn.execute(
+                    """
+                    UPDATE news_jobs SET finished_at = NOW()
+                    WHERE id = $1
+                      AND finished_at IS NULL
+                      AND NOT EXISTS (
+                          SELECT 1 FROM news_job_items
+                          WHERE job_id = $1 AND status IN ('pending', 'running')
+                      )
+                    """,
+                    item["job_id"]
+                )
+
+    async def _sweep(self) -> int:
+        """
+        Renouvelle le bail des URLs en cours ici, puis remet en file celles dont
+        le bail a expiré (worker arrêté ou instance redémarrée)
+        """
+        async with news_db.pool.acquire() as conn:
+            if self._in_progress:
+                await conn.executemany(
+                    """
+                    UPDATE news_job_items SET claimed_at = NOW()
+                    WHERE job_id = $1 AND url = $2 AND status = 'running'
+                    """,
+                    list(self._in_progress)
+                )
+            recovered = await conn.fetchval(
+                """
+                WITH recovered AS (
+                    UPDATE news_job_items
+                    SET status = 'pending', claimed_at = NULL
+                    WHERE status = 'running'
+                      AND claimed_at < NOW() - $1::int * INTERVAL '1 second'
+                    RETURNING 1
+                )
+                SELECT count(*) FROM recovered
+                """,
+                self.lease_s
+            )
+        if recovered:
+            logger.info(f"📬 {recovered} URLs abandonnées remises en file")
+            if self._wakeup:
+                self._wakeup.set()
+        return recovered
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_s)
+            try:
+                await self._sweep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur reprise des URLs abandonnées: {e}")
+
+    async def _finish(self, item: Dict[str, Any], success: bool, error: Optional[str]) -> None:
+        """
+        _complete avec nouvelles tentatives; en dernier recours l'URL est remise
+        en file (sinon elle resterait "running" et bloquerait l'URL)
+        """
+        for attempt in range(1, self.complete_attempts + 1):
+            try:
+                await self._complete(item, success, error)
+                return
+            except Exception as e:
+                logger.warning(f"⚠️ Clôture de {item['url']} échouée ({attempt}/{self.complete_attempts}): {e}")
+                if attempt < self.complete_attempts:
+                    await asyncio.sleep(min(2 ** attempt, self.poll_interval_s))
+        try:
+            await self._requeue([(item["job_id"], item["url"])])
+        except Exception as e:
+            # Le bail expirera: l'URL sera reprise par _sweep
+            logger.error(f"❌ Remise en file de {item['url']} échouée: {e}")
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            try:
+                self._wakeup.clear()
+                item = await self._claim()
+                if not item:
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_s)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                key = (item["job_id"], item["url"])
+                self._in_progress.add(key)
+                try:
+                    error = None
+                    try:
+                        title = news_processor.title_from_url(item["url"])
+                        success = await news_processor.process_new_url(item["url"], title, item["lang"])
+                        if not success:
+                            error = "Traitement échoué"
+                    except Exception as e:
+                        success, error = False, str(e)[:500]
+
+                    await self._finish(item, success, error)
+                finally:
+                    self._in_progress.discard(key)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur worker d'ingestion {index}: {e}")
+                await asyncio.sleep(self.poll_interval_s)
+
+
+# Instance globale
+news_jobs = NewsJobQueue()
@@ -0,0 +1,147 @@
+"""
+Pré-filtre lexical devant la recherche vectorielle (mode smart-summary)
+- Index plein texte (tsvector GIN) sur titre + résumé, maintenu à l'insertion
+  par une colonne générée
+- Si le post ne partage aucun terme significatif avec une actualité récente,
+  l'appel embeddings OpenAI est évité
+- Échantillon "shadow" des requêtes filtrées pour mesurer les faux négatifs
+"""
+import os
+import re
+import random
+import logging
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+from .database import news_db
+from .service import news_processor
+from .metrics import news_metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Mots fréquents sans valeur discriminante (en plus des stopwords Postgres)
+STOPWORDS = {
+    "fr": {
+        "avec", "dans", "pour", "sans", "sous", "chez", "entre", "vers", "depuis", "pendant",
+        "cette", "cela", "ceci", "celui", "celle", "ceux", "comme", "mais", "donc", "alors",
+        "aussi", "tout", "tous", "toute", "toutes", "plus", "moins", "très", "bien", "encore",
+        "leur", "leurs", "notre", "nous", "vous", "elle", "elles", "être", "avoir", "fait",
+        "faire", "sont", "était", "peut", "quand", "quoi", "quel", "quelle", "dont", "même",
+        "merci", "aujourd", "post", "linkedin", "partager", "découvrez",
+    },
+    "en": {
+        "with", "from", "that", "this", "these", "those", "there", "their", "they", "them",
+        "have", "been", "will", "would", "could", "should", "about", "into", "over", "more",
+        "most", "some", "such", "than", "then", "very", "what", "when", "where", "which",
+        "while", "your", "yours", "just", "also", "only", "like", "make", "made", "really",
+        "thanks", "today", "post", "linkedin", "share",
+    },
+}
+
+# Configuration plein texte Postgres par langue (doit correspondre à la colonne générée)
+TS_CONFIGS = {"en": "english", "fr": "french"}
+
+
+def ts_config_for(lang: str) -> str:
+    """Configuration plein texte d'une langue (français par défaut)"""
+    return TS_CONFIGS.get(lang, "french")
+
+
+def extract_terms(text: str, lang: str = "fr", max_terms: int = 30, min_length: int = 4) -> List[str]:
+    """
+    Extrait les termes significatifs d'un texte (les plus fréquents d'abord)
+
+    Seules des lettres sont conservées: les termes peuvent être injectés
+    sans échappement dans une tsquery.
+    """
+    stopwords = STOPWORDS.get(lang, STOPWORDS["fr"])
+    words = re.findall(rf"[^\W\d_]{{{min_length},}}", text.lower())
+    counts = Counter(w for w in words if w not in stopwords)
+    return [w for w, _ in counts.most_common(max_terms)]
+
+
+def build_tsquery(terms: List[str]) -> str:
+    """Disjonction des termes: 'ia | emploi | marché'"""
+    return " | ".join(terms)
+
+
+class NewsLexicalGate:
+    """Filtre lexical bon marché avant l'embedding de la requête"""
+
+    def __init__(self):
+        self.enabled = os.getenv("NEWS_LEXICAL_GATE", "true").lower() == "true"
+        self.max_terms = int(os.getenv("NEWS_LEXICAL_GATE_MAX_TERMS", "30"))
+        # Part des requêtes filtrées envoyées quand même au chemin vectoriel (mesure)
+        self.shadow_rate = float(os.getenv("NEWS_LEXICAL_GATE_SHADOW_RATE", "0.05"))
+
+        logger.info(f"🚪 NewsLexicalGate initialisé (enabled={self.enabled}, shadow_rate={self.shadow_rate})")
+
+    async def may_match(self, post_text: str, lang: str, max_age_days: Optional[float] = None) -> bool:
+        """
+        Indique si au moins une actualité récente partage un terme avec le post
+
+        En cas de doute (base indisponible, erreur), le filtre laisse passer.
+        """
+        if not self.enabled or not news_db.pool:
+            return True
+
+        terms = extract_terms(post_text, lang, self.max_terms)
+        if not terms:
+            return False
+
+        if max_age_days is None:
+            max_age_days = news_db.freshness_days
+
+        try:
+            async with news_db.pool.acquire() as conn:
+                return await conn.fetchval(
+                    """
+                    SELECT EXISTS(
+                        SELECT 1 FROM news
+                        WHERE lang = $1
+                          AND scraped_at >= NOW() - $3::float8 * INTERVAL '1 day'
+                          AND search_tsv @@ to_tsquery($4::regconfig, $2)
+                    )
+                    """,
+                    lang, build_tsquery(terms), max_age_days, ts_config_for(lang)
+                )
+        except Exception as e:
+            logger.error(f"❌ Erreur filtre lexical: {e}")
+            return True
+
+    async def gated_search(
+        self,
+        post_text: str,
+        lang: str = "fr",
+        limit: int = 3,
+        min_similarity: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Recherche vectorielle précédée du filtre lexical
+
+        Returns:
+            Résultats de la recherche vectorielle, ou [] si le filtre a écarté le post
+            (hors échantillon shadow)
+        """
+        passed = await self.may_match(post_text, lang)
+        shadow = not passed and random.random() < self.shadow_rate
+
+        if not passed and not shadow:
+            logger.info("🚪 Filtre lexical: aucun terme commun avec les actualités récentes, embedding évité")
+            news_metrics.record_gate_decision(passed=False)
+            return []
+
+        results = await news_processor.search_similar_news(
+            post_text, lang, limit, min_similarity=min_similarity
+        )
+        news_metrics.record_gate_decision(passed=passed, vector_hit=bool(results), shadow=shadow)
+
+        if shadow and results:
+            # L'appel est déjà payé: les résultats sont utilisés
+            logger.info("🚪 Filtre lexical (shadow): faux négatif, la recherche vectorielle avait des résultats")
+        return results
+
+
+# Instance globale
+news_lexical_gate = NewsLexicalGate()
@@ -0,0 +1,236 @@
+"""
+Partitionnement mensuel de news_processing_log
+- Table partitionnée par mois sur created_at (news_processing_log_YYYY_MM) avec
+  une partition DEFAULT de secours, comme analytics.events côté user-service
+- Partitions des mois à venir créées d'avance, partitions au-delà de la rétention
+  supprimées en bloc (DROP TABLE au lieu de DELETE)
+- Lignes d'un mois sans partition reçues par DEFAULT: déplacées dans la
+  partition du mois quand elle est créée (sinon la création échouerait)
+- Compteurs journaliers pré-agrégés (news_processing_daily) maintenus par un
+  trigger par instruction: les statistiques ne parcourent plus les logs
+- Tâche de fond quotidienne (création + purge)
+"""
+import os
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS news_processing_log (
+    id BIGSERIAL,
+    url TEXT NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    duration_ms FLOAT,
+    error_message TEXT,
+    metadata JSONB,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS news_processing_log_default
+    PARTITION OF news_processing_log DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_news_processing_log_url
+    ON news_processing_log(url, created_at DESC);
+"""
+
+FUNCTIONS_SQL = """
+DROP FUNCTION IF EXISTS news_create_log_partitions(INTEGER);
+
+CREATE OR REPLACE FUNCTION news_create_log_partitions(
+    months_ahead INTEGER DEFAULT 2,
+    from_date DATE DEFAULT CURRENT_DATE
+)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE := DATE_TRUNC('month', from_date)::date;
+    last_month DATE := (DATE_TRUNC('month', CURRENT_DATE) + make_interval(months => months_ahead))::date;
+    month_end DATE;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    -- Mois de from_date jusqu'au mois courant + months_ahead
+    WHILE month_start <= last_month LOOP
+        month_end := (month_start + INTERVAL '1 month')::date;
+        partition_name := 'news_processing_log_' || TO_CHAR(month_start, 'YYYY_MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Les lignes du mois déjà tombées dans DEFAULT empêcheraient la création:
+            -- elles sont déplacées dans la nouvelle table avant son rattachement
+            -- (verrou: aucune insertion dans DEFAULT entre le déplacement et l'ATTACH)
+            LOCK TABLE news_processing_log_default IN ACCESS EXCLUSIVE MODE;
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE news_processing_log INCLUDING DEFAULTS)',
+                partition_name
+            );
+            EXECUTE format(
+                'WITH moved AS ('
+                '    DELETE FROM news_processing_log_default'
+                '    WHERE created_at >= %L AND created_at < %L RETURNING *'
+                ') INSERT INTO %I SELECT * FROM moved',
+                month_start, month_end, partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE news_processing_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, month_end
+            );
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION news_purge_log_partitions(retention_days INTEGER DEFAULT 90)
+RETURNS INTEGER AS $$
+DECLARE
+    partition_record RECORD;
+    cutoff DATE := DATE_TRUNC('month', CURRENT_DATE - retention_days)::date;
+    dropped INTEGER := 0;
+BEGIN
+    -- Mois entièrement antérieurs à la rétention
+    FOR partition_record IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'news_processing_log'::regclass
+          AND c.relname ~ '^news_processing_log_[0-9]{4}_[0-9]{2}$'
+    LOOP
+        IF TO_DATE(RIGHT(partition_record.relname, 7), 'YYYY_MM') < cutoff THEN
+            EXECUTE format('DROP TABLE %I', partition_record.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+
+    -- Lignes arrivées dans la partition par défaut (mois sans partition)
+    DELETE FROM news_processing_log_default WHERE created_at < cutoff;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+COUNTERS_SQL = """
+CREATE TABLE IF NOT EXISTS news_processing_daily (
+    day DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    events BIGINT NOT NULL DEFAULT 0,
+    total_duration_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    timed_events BIGINT NOT NULL DEFAULT 0,
+    last_at TIMESTAMP,
+    PRIMARY KEY (day, status)
+);
+"""
+
+TRIGGER_SQL = """
+CREATE OR REPLACE FUNCTION news_processing_daily_refresh()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO news_processing_daily AS d (day, status, events, total_duration_ms, timed_events, last_at)
+    SELECT created_at::date, status, count(*), coalesce(sum(duration_ms), 0), count(duration_ms), max(created_at)
+    FROM new_rows
+    GROUP BY 1, 2
+    ON CONFLICT (day, status) DO UPDATE
+    SET events = d.events + EXCLUDED.events,
+        total_duration_ms = d.total_duration_ms + EXCLUDED.total_duration_ms,
+        timed_events = d.timed_events + EXCLUDED.timed_events,
+        last_at = GREATEST(d.last_at, EXCLUDED.last_at);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'trg_news_processing_daily'
+          AND tgrelid = 'news_processing_log'::regclass
+    ) THEN
+        CREATE TRIGGER trg_news_processing_daily
+            AFTER INSERT ON news_processing_log
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION news_processing_daily_refresh();
+    END IF;
+END;
+$$;
+"""
+
+
+class NewsLogPartitionManager:
+    """Création et purge des partitions mensuelles de news_processing_log"""
+
+    def __init__(self):
+        self.months_ahead = int(os.getenv("NEWS_LOG_PARTITION_MONTHS_AHEAD", "2"))
+        self.retention_days = int(os.getenv("NEWS_LOG_RETENTION_DAYS", "90"))
+        self.check_interval_s = float(os.getenv("NEWS_LOG_PARTITION_CHECK_H", "24")) * 3600
+
+        self._pool = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def initialize_schema(self, conn) -> None:
+        """
+        Crée la table partitionnée, ses fonctions et les compteurs journaliers
+
+        Une table news_processing_log non partitionnée (installation antérieure)
+        n'est pas convertie automatiquement: migration 011.
+        """
+        relkind = await conn.fetchval(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass('news_processing_log')"
+        )
+        await conn.execute(COUNTERS_SQL)
+        if relkind == "r":
+            logger.warning(
+                "⚠️ news_processing_log non partitionnée: appliquer "
+                "database/migrations/011_partition_news_processing_log.sql"
+            )
+            return
+
+        await conn.execute(SCHEMA_SQL)
+        await conn.execute(FUNCTIONS_SQL)
+        await conn.execute(TRIGGER_SQL)
+        await conn.fetchval("SELECT news_create_log_partitions($1)", self.months_ahead)
+        logger.info("✅ Table news_processing_log (partitions mensuelles) prête")
+
+    async def maintain(self, pool) -> Dict[str, Any]:
+        """Crée les partitions à venir et supprime celles au-delà de la rétention"""
+        async with pool.acquire() as conn:
+            partitioned = await conn.fetchval(
+                "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('news_processing_log')"
+            )
+            if not partitioned:
+                return {"partitioned": False}
+            created = await conn.fetchval("SELECT news_create_log_partitions($1)", self.months_ahead)
+            dropped = await conn.fetchval("SELECT news_purge_log_partitions($1)", self.retention_days)
+
+        if created or dropped:
+            logger.info(f"🗂️ Partitions news_processing_log: {created} créées, {dropped} supprimées")
+        return {"partitioned": True, "created": created, "dropped": dropped}
+
+    def start(self, pool) -> None:
+        """Lance la maintenance quotidienne"""
+        self._pool = pool
+        if pool and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.maintain(self._pool)
+            except Exception as e:
+                logger.error(f"❌ Erreur maintenance des partitions de logs: {e}")
+            await asyncio.sleep(self.check_interval_s)
+
+
+# Instance globale
+news_log_partitions = NewsLogPartitionManager()
@@ -3,43 +3,160 @@ Système de métriques pour le module News
 - Moyenne glissante sur les 100 dernières opérations
 - Compteurs de cache hits/misses
 - Statistiques de performance
+- Écritures non bloquantes: compteurs en mémoire immédiatement, mises à jour
+  Redis regroupées et envoyées en pipeline par une tâche de fond; si Redis est
+  indisponible ou que le pipeline échoue, elles restent en attente du flush suivant
 """
-import redis
 import os
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 from datetime import datetime, timedelta
 from collections import deque
-import json
+
+from .redis_pool import news_redis
 
 logger = logging.getLogger(__name__)
 
 
+GATE_COUNTERS = ("skipped", "passed", "passed_hit", "shadow_checked", "shadow_missed")
+AI_BATCH_KINDS = ("embeddings", "summaries")
+AI_BATCH_COUNTERS = ("batches", "items", "tokens")
+RETRY_COUNTERS = ("scheduled", "attempted", "succeeded", "exhausted")
+
+
 class NewsMetrics:
     """Gestionnaire de métriques pour les actualités"""
 
     def __init__(self):
-        redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
-        self.redis_client = None
-
-        try:
-            self.redis_client = redis.from_url(redis_url, decode_responses=True)
-            self.redis_client.ping()
-            logger.info("✅ Métriques Redis connectées")
-        except Exception as e:
-            logger.warning(f"⚠️ Redis non disponible pour métriques: {e}")
+        self.flush_interval_s = float(os.getenv("NEWS_METRICS_FLUSH_MS", "500")) / 1000
+        self.max_pending = int(os.getenv("NEWS_METRICS_MAX_PENDING", "200"))
 
-        # Stockage en mémoire pour moyenne glissante (fallback)
+        # Stockage en mémoire (valeurs locales + repli si Redis indisponible)
         self.processing_times = deque(maxlen=100)  # 100 dernières opérations
         self.total_processed = 0
         self.cache_hits = 0
         self.cache_misses = 0
+        self.content_reused = 0
+        self.near_duplicates = 0
+        self.processed_today: Dict[str, int] = {}
         self.last_update = datetime.utcnow()
+        self.gate_counters = {name: 0 for name in GATE_COUNTERS}
+        self.ai_counters = {kind: {name: 0 for name in AI_BATCH_COUNTERS} for kind in AI_BATCH_KINDS}
+        self.ai_latencies = {kind: deque(maxlen=100) for kind in AI_BATCH_KINDS}
+        self.retry_counters = {name: 0 for name in RETRY_COUNTERS}
+
+        # Mises à jour Redis en attente du prochain pipeline
+        self._pending_incr: Dict[str, int] = {}
+        # Redis ne garde que les 100 derniers temps (ltrim): tampon borné pendant une coupure
+        self._pending_times: deque = deque(maxlen=100)
+        self._pending_last_update: Optional[str] = None
+        self._pending_ops = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_event: Optional[asyncio.Event] = None
 
     def _get_key(self, metric_name: str) -> str:
         """Génère la clé Redis pour une métrique"""
         return f"news:metrics:{metric_name}"
 
+    # ------------------------------------------------------------------
+    # Cycle de vie
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Démarre la tâche de flush (à appeler depuis la boucle d'événements)"""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_event = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+            logger.info(f"📈 Flush des métriques toutes les {self.flush_interval_s * 1000:.0f}ms")
+
+    async def stop(self) -> None:
+        """Arrête la tâche de flush et envoie les dernières mises à jour"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    def _has_pending(self) -> bool:
+        return bool(self._pending_incr or self._pending_times or self._pending_last_update)
+
+    def _pending_count(self) -> int:
+        # Nombre d'écritures en attente (un compteur de tokens compte pour une)
+        return self._pending_ops + len(self._pending_times)
+
+    def _queue_incr(self, metric_name: str, amount: int = 1) -> None:
+        key = self._get_key(metric_name)
+        self._pending_incr[key] = self._pending_incr.get(key, 0) + amount
+        self._pending_ops += 1
+        if self._flush_event and self._pending_count() >= self.max_pending:
+            self._flush_event.set()
+
+    async def flush(self) -> None:
+        """Envoie les mises à jour en attente dans un seul pipeline Redis"""
+        if not self._has_pending():
+            return
+
+        client = await news_redis.ensure()
+        if not client:
+            # Repli: les compteurs en mémoire restent la source de vérité locale,
+            # les deltas attendent le retour de Redis
+            return
+
+        # Deltas sortis du tampon: les écritures pendant l'envoi vont dans un nouveau tampon
+        incr, times, last_update = self._pending_incr, self._pending_times, self._pending_last_update
+        self._pending_incr, self._pending_times, self._pending_last_update = {}, deque(maxlen=100), None
+        self._pending_ops = 0
+
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, amount in incr.items():
+                pipe.incrby(key, amount)
+                if ":processed_today:" in key:
+                    pipe.expire(key, self._processed_today_ttl())
+            if times:
+                key = self._get_key("processing_times")
+                pipe.lpush(key, *times)
+                pipe.ltrim(key, 0, 99)  # Garder seulement les 100 derniers
+            if last_update:
+                pipe.set(self._get_key("last_update"), last_update)
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Erreur flush métriques: {e}")
+            news_redis.mark_unavailable(e)
+            self._restore_pending(incr, times, last_update)
+
+    def _restore_pending(self, incr: Dict[str, int], times: Sequence[float], last_update: Optional[str]) -> None:
+        """Remet les deltas d'un pipeline en échec devant ceux arrivés entre-temps"""
+        for key, amount in incr.items():
+            self._pending_incr[key] = self._pending_incr.get(key, 0) + amount
+        self._pending_times = deque([*times, *self._pending_times], maxlen=100)
+        self._pending_last_update = self._pending_last_update or last_update
+        self._pending_ops += len(incr)
+
+    @staticmethod
+    def _processed_today_ttl() -> int:
+        """Expiration à minuit + 24h (pour garder l'historique d'hier)"""
+        now = datetime.utcnow()
+        midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return int((midnight - now).total_seconds()) + 86400
+
+    # ------------------------------------------------------------------
+    # Écritures (synchrones, sans I/O)
+    # ------------------------------------------------------------------
+
     def record_processing_time(self, duration_ms: float) -> None:
         """
         Enregistre le temps de traitement d'une actualité
@@ -47,158 +164,188 @@ class NewsMetrics:
         Args:
             duration_ms: Durée en millisecondes
         """
-        # Stockage en mémoire
         self.processing_times.append(duration_ms)
-
-        # Stockage Redis (liste limitée à 100)
-        if self.redis_client:
-            try:
-                key = self._get_key("processing_times")
-                self.redis_client.lpush(key, duration_ms)
-                self.redis_client.ltrim(key, 0, 99)  # Garder seulement les 100 derniers
-            except Exception as e:
-                logger.error(f"❌ Erreur enregistrement temps: {e}")
-
-    def get_avg_processing_time(self) -> float:
-        """Calcule la moyenne glissante des temps de traitement"""
-        if self.redis_client:
-            try:
-                key = self._get_key("processing_times")
-                times = self.redis_client.lrange(key, 0, -1)
-                if times:
-                    times_float = [float(t) for t in times]
-                    return sum(times_float) / len(times_float)
-            except Exception as e:
-                logger.error(f"❌ Erreur calcul moyenne Redis: {e}")
-
-        # Fallback sur mémoire locale
-        if self.processing_times:
-            return sum(self.processing_times) / len(self.processing_times)
-        return 0.0
+        self._pending_times.append(duration_ms)
 
     def increment_total_processed(self) -> None:
         """Incrémente le compteur total d'actualités traitées"""
         self.total_processed += 1
-
-        if self.redis_client:
-            try:
-                key = self._get_key("total_processed")
-                self.redis_client.incr(key)
-            except Exception as e:
-                logger.error(f"❌ Erreur incrémentation total: {e}")
+        self._queue_incr("total_processed")
 
     def increment_cache_hit(self) -> None:
         """Incrémente le compteur de cache hits"""
         self.cache_hits += 1
-
-        if self.redis_client:
-            try:
-                key = self._get_key("cache_hits")
-                self.redis_client.incr(key)
-            except Exception as e:
-                logger.error(f"❌ Erreur incrémentation cache_hits: {e}")
+        self._queue_incr("cache_hits")
 
     def increment_cache_miss(self) -> None:
         """Incrémente le compteur de cache misses"""
         self.cache_misses += 1
+        self._queue_incr("cache_misses")
 
-        if self.redis_client:
-            try:
-                key = self._get_key("cache_misses")
-                self.redis_client.incr(key)
-            except Exception as e:
-                logger.error(f"❌ Erreur incrémentation cache_misses: {e}")
+    def increment_content_reused(self) -> None:
+        """Incrémente le compteur de résumés / embeddings réutilisés (contenu identique)"""
+        self.content_reused += 1
+        self._queue_incr("content_reused")
+
+    def increment_near_duplicate(self) -> None:
+        """Incrémente le compteur de quasi-doublons rattachés à une actualité canonique"""
+        self.near_duplicates += 1
+        self._queue_incr("near_duplicates")
 
     def increment_processed_today(self) -> None:
         """Incrémente le compteur journalier avec expiration automatique"""
-        if self.redis_client:
-            try:
-                # Clé avec date du jour
-                today = datetime.utcnow().strftime("%Y-%m-%d")
-                key = self._get_key(f"processed_today:{today}")
-
-                # Incrémenter
-                self.redis_client.incr(key)
-
-                # Définir expiration à minuit + 24h (pour garder l'historique d'hier)
-                tomorrow = datetime.utcnow() + timedelta(days=1)
-                midnight = tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
-                ttl_seconds = int((midnight - datetime.utcnow()).total_seconds()) + 86400
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        self.processed_today = {today: self.processed_today.get(today, 0) + 1}
+        self._queue_incr(f"processed_today:{today}")
 
-                self.redis_client.expire(key, ttl_seconds)
-            except Exception as e:
-                logger.error(f"❌ Erreur incrémentation journalière: {e}")
-
-    def get_processed_today(self) -> int:
-        """Récupère le nombre d'actualités traitées aujourd'hui"""
-        if self.redis_client:
-            try:
-                today = datetime.utcnow().strftime("%Y-%m-%d")
-                key = self._get_key(f"processed_today:{today}")
-                count = self.redis_client.get(key)
-                return int(count) if count else 0
-            except Exception as e:
-                logger.error(f"❌ Erreur récupération compteur journalier: {e}")
-        return 0
+    def set_last_update(self) -> None:
+        """Enregistre l'horodatage de la dernière mise à jour"""
+        self.last_update = datetime.utcnow()
+        self._pending_last_update = self.last_update.isoformat()
+
+    def record_gate_decision(
+        self,
+        passed: bool,
+        vector_hit: Optional[bool] = None,
+        shadow: bool = False
+    ) -> None:
+        """
+        Enregistre une décision du filtre lexical
 
-    def get_total_processed(self) -> int:
-        """Récupère le nombre total d'actualités traitées"""
-        if self.redis_client:
-            try:
-                key = self._get_key("total_processed")
-                count = self.redis_client.get(key)
-                return int(count) if count else self.total_processed
-            except Exception as e:
-                logger.error(f"❌ Erreur récupération total: {e}")
-        return self.total_processed
+        Args:
+            passed: Le filtre a laissé passer la requête
+            vector_hit: La recherche vectorielle a renvoyé des résultats (None si non exécutée)
+            shadow: Requête filtrée mais exécutée pour mesure (comptée à part, pas
+                dans skipped: l'embedding n'a pas été évité)
+        """
+        counters = []
+        if shadow:
+            counters.append("shadow_checked")
+            if vector_hit:
+                counters.append("shadow_missed")
+        elif passed:
+            counters.append("passed")
+            if vector_hit:
+                counters.append("passed_hit")
+        else:
+            counters.append("skipped")
+
+        for name in counters:
+            self.gate_counters[name] += 1
+            self._queue_incr(f"gate:{name}")
+
+    def record_ai_batch(self, kind: str, size: int, latency_ms: float, tokens: int) -> None:
+        """
+        Enregistre un appel OpenAI groupé (micro-lot d'ingestion)
 
-    def get_cache_hits(self) -> int:
-        """Récupère le nombre de cache hits"""
-        if self.redis_client:
-            try:
-                key = self._get_key("cache_hits")
-                count = self.redis_client.get(key)
-                return int(count) if count else self.cache_hits
-            except Exception as e:
-                logger.error(f"❌ Erreur récupération cache_hits: {e}")
-        return self.cache_hits
+        Args:
+            kind: "embeddings" ou "summaries"
+            size: Nombre d'articles du lot
+            latency_ms: Durée de l'appel
+            tokens: Tokens consommés (usage.total_tokens)
+        """
+        if kind not in self.ai_counters:
+            return
+        self.ai_latencies[kind].append(latency_ms)
+        for name, amount in (("batches", 1), ("items", size), ("tokens", tokens)):
+            self.ai_counters[kind][name] += amount
+            self._queue_incr(f"ai:{kind}:{name}", amount)
+
+    def record_retry(self, event: str) -> None:
+        """
+        Enregistre un événement de la reprise différée des URLs en échec
 
-    def get_cache_misses(self) -> int:
-        """Récupère le nombre de cache misses"""
-        if self.redis_client:
-            try:
-                key = self._get_key("cache_misses")
-                count = self.redis_client.get(key)
-                return int(count) if count else self.cache_misses
-            except Exception as e:
-                logger.error(f"❌ Erreur récupération cache_misses: {e}")
-        return self.cache_misses
+        Args:
+            event: "scheduled" (échec reprogrammé), "attempted", "succeeded"
+                ou "exhausted" (nombre max de tentatives atteint)
+        """
+        if event not in self.retry_counters:
+            return
+        self.retry_counters[event] += 1
+        self._queue_incr(f"retry:{event}")
+
+    # ------------------------------------------------------------------
+    # Lectures (un seul aller-retour Redis)
+    # ------------------------------------------------------------------
+
+    async def _read_redis(self) -> Optional[Dict[str, Any]]:
+        """Lit toutes les métriques Redis en un pipeline (None si indisponible)"""
+        await self.flush()
+        client = await news_redis.ensure()
+        if not client:
+            return None
+
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        scalar_names = [
+            "total_processed", "cache_hits", "cache_misses", "content_reused", "near_duplicates",
+            f"processed_today:{today}", "last_update"
+        ]
+        scalar_names += [f"gate:{name}" for name in GATE_COUNTERS]
+        scalar_names += [f"ai:{kind}:{name}" for kind in AI_BATCH_KINDS for name in AI_BATCH_COUNTERS]
+        scalar_names += [f"retry:{name}" for name in RETRY_COUNTERS]
 
-    def set_last_update(self) -> None:
-        """Enregistre l'horodatage de la dernière mise à jour"""
-        self.last_update = datetime.utcnow()
+        try:
+            pipe = client.pipeline(transaction=False)
+            for name in scalar_names:
+                pipe.get(self._get_key(name))
+            pipe.lrange(self._get_key("processing_times"), 0, -1)
+            values = await pipe.execute()
+        except Exception as e:
+            logger.error(f"❌ Erreur lecture métriques Redis: {e}")
+            news_redis.mark_unavailable(e)
+            return None
+
+        data = dict(zip(scalar_names, values[:-1]))
+        data["processed_today"] = data.pop(f"processed_today:{today}")
+        data["processing_times"] = values[-1]
+        return data
+
+    def _avg(self, times) -> float:
+        if times:
+            times_float = [float(t) for t in times]
+            return sum(times_float) / len(times_float)
+        return 0.0
 
-        if self.redis_client:
-            try:
-                key = self._get_key("last_update")
-                self.redis_client.set(key, self.last_update.isoformat())
-            except Exception as e:
-                logger.error(f"❌ Erreur enregistrement last_update: {e}")
+    def _gate_stats(self, counters: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Statistiques du filtre lexical
+
+        - skip_rate: part des requêtes dont l'embedding a été évité (les requêtes
+          shadow sont exécutées: elles comptent dans le total, pas dans skipped)
+        - precision: part des requêtes acceptées pour lesquelles la recherche
+          vectorielle a trouvé une actualité
+        - shadow_miss_rate: part des requêtes filtrées (échantillon) qui auraient
+          eu un résultat (faux négatifs)
+        """
+        total = counters["skipped"] + counters["passed"] + counters["shadow_checked"]
+        return {
+            **counters,
+            "skip_rate": round(counters["skipped"] / total, 4) if total else 0.0,
+            "precision": round(counters["passed_hit"] / counters["passed"], 4) if counters["passed"] else None,
+            "shadow_miss_rate": (
+                round(counters["shadow_missed"] / counters["shadow_checked"], 4)
+                if counters["shadow_checked"] else None
+            )
+        }
 
-    def get_last_update(self) -> str:
-        """Récupère l'horodatage de la dernière mise à jour"""
-        if self.redis_client:
-            try:
-                key = self._get_key("last_update")
-                timestamp = self.redis_client.get(key)
-                if timestamp:
-                    return timestamp
-            except Exception as e:
-                logger.error(f"❌ Erreur récupération last_update: {e}")
+    def _ai_batch_stats(self, counters: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+        """Taille moyenne des lots, tokens par article et latence (locale) par lot"""
+        stats = {}
+        for kind in AI_BATCH_KINDS:
+            c = counters[kind]
+            stats[kind] = {
+                **c,
+                "avg_batch_size": round(c["items"] / c["batches"], 2) if c["batches"] else 0.0,
+                "tokens_per_article": round(c["tokens"] / c["items"], 1) if c["items"] else 0.0,
+                "avg_batch_latency_ms": round(self._avg(self.ai_latencies[kind]), 2)
+            }
+        return stats
 
-        return self.last_update.isoformat()
+    async def get_gate_stats(self) -> Dict[str, Any]:
+        """Statistiques du filtre lexical (Redis, repli mémoire)"""
+        return (await self.get_all_stats())["lexical_gate"]
 
-    def get_all_stats(self) -> Dict[str, Any]:
+    async def get_all_stats(self) -> Dict[str, Any]:
         """
         Récupère toutes les statistiques en une seule fois
 
@@ -212,33 +359,84 @@ class NewsMetrics:
                 "last_update": "2025-10-25T18:42:00Z"
             }
         """
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        data = await self._read_redis()
+
+        if data is None:
+            # Repli sur mémoire locale
+            return {
+                "total_processed": self.total_processed,
+                "processed_today": self.processed_today.get(today, 0),
+                "avg_processing_time_ms": round(self._avg(self.processing_times), 2),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "content_reused": self.content_reused,
+                "near_duplicates": self.near_duplicates,
+                "last_update": self.last_update.isoformat(),
+                "lexical_gate": self._gate_stats(dict(self.gate_counters)),
+                "ai_batches": self._ai_batch_stats(self.ai_counters),
+                "retries": dict(self.retry_counters)
+            }
+
+        def as_int(value, default: int) -> int:
+            return int(value) if value else default
+
+        gate = {
+            name: as_int(data[f"gate:{name}"], self.gate_counters[name])
+            for name in GATE_COUNTERS
+        }
         return {
-            "total_processed": self.get_total_processed(),
-            "processed_today": self.get_processed_today(),
-            "avg_processing_time_ms": round(self.get_avg_processing_time(), 2),
-            "cache_hits": self.get_cache_hits(),
-            "cache_misses": self.get_cache_misses(),
-            "last_update": self.get_last_update()
+            "total_processed": as_int(data["total_processed"], self.total_processed),
+            "processed_today": as_int(data["processed_today"], 0),
+            "avg_processing_time_ms": round(self._avg(data["processing_times"] or self.processing_times), 2),
+            "cache_hits": as_int(data["cache_hits"], self.cache_hits),
+            "cache_misses": as_int(data["cache_misses"], self.cache_misses),
+            "content_reused": as_int(data["content_reused"], self.content_reused),
+            "near_duplicates": as_int(data["near_duplicates"], self.near_duplicates),
+            "last_update": data["last_update"] or self.last_update.isoformat(),
+            "lexical_gate": self._gate_stats(gate),
+            "ai_batches": self._ai_batch_stats({
+                kind: {
+                    name: as_int(data[f"ai:{kind}:{name}"], self.ai_counters[kind][name])
+                    for name in AI_BATCH_COUNTERS
+                }
+                for kind in AI_BATCH_KINDS
+            }),
+            "retries": {
+                name: as_int(data[f"retry:{name}"], self.retry_counters[name])
+                for name in RETRY_COUNTERS
+            }
         }
 
-    def reset_stats(self) -> None:
+    async def reset_stats(self) -> None:
         """Réinitialise toutes les statistiques (admin uniquement)"""
-        if self.redis_client:
+        self._pending_incr, self._pending_times, self._pending_last_update = {}, deque(maxlen=100), None
+        self._pending_ops = 0
+
+        client = await news_redis.ensure()
+        if client:
             try:
                 # Supprimer toutes les clés de métriques
-                pattern = "news:metrics:*"
-                keys = self.redis_client.keys(pattern)
+                keys = [key async for key in client.scan_iter(match="news:metrics:*", count=500)]
                 if keys:
-                    self.redis_client.delete(*keys)
+                    await client.delete(*keys)
                 logger.info("🔄 Métriques réinitialisées")
             except Exception as e:
                 logger.error(f"❌ Erreur reset stats: {e}")
+                news_redis.mark_unavailable(e)
 
         # Reset mémoire locale
         self.processing_times.clear()
         self.total_processed = 0
         self.cache_hits = 0
         self.cache_misses = 0
+        self.content_reused = 0
+        self.near_duplicates = 0
+        self.processed_today = {}
+        self.gate_counters = {name: 0 for name in GATE_COUNTERS}
+        self.ai_counters = {kind: {name: 0 for name in AI_BATCH_COUNTERS} for kind in AI_BATCH_KINDS}
+        self.ai_latencies = {kind: deque(maxlen=100) for kind in AI_BATCH_KINDS}
+        self.retry_counters = {name: 0 for name in RETRY_COUNTERS}
         self.last_update = datetime.utcnow()
 
 
@@ -31,11 +31,31 @@ class NewsRegisterResponse(BaseModel):
     processed_urls: List[str]
 
 
+class NewsJobStatus(BaseModel):
+    """État d'un job d'enregistrement asynchrone"""
+    job_id: str
+    status: str  # queued | running | completed
+    lang: str
+    total: int
+    queued: int
+    pending: int
+    running: int
+    registered: int
+    failed: int
+    skipped: int
+    failed_urls: List[str] = []
+    created_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    status_url: Optional[str] = None
+
+
 class NewsSearchRequest(BaseModel):
     """Requête de recherche vectorielle"""
     query: str
     lang: str = "fr"
     limit: int = 3
+    min_similarity: Optional[float] = None
+    max_age_days: Optional[float] = None
 
 
 class NewsSearchResult(BaseModel):
@@ -44,6 +64,8 @@ class NewsSearchResult(BaseModel):
     title: str
     summary: str
     similarity: float
+    score: Optional[float] = None
+    scraped_at: Optional[str] = None
 
 
 class NewsSearchResponse(BaseModel):
@@ -3,17 +3,138 @@ Système de logging structuré pour le module News
 - Logs JSON pour traçabilité
 - Mode debug avec détails complets
 - Fichiers séparés (logs normaux + debug)
+- JSONL append-only avec rotation (taille / jour), écrit par un thread de fond:
+  aucune I/O disque sur la boucle d'événements
+- Lecture des logs récents par la fin du fichier (tail inverse)
 """
 import os
 import json
+import queue
+import atexit
 import logging
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, List, Iterator
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 
+def iter_lines_reversed(path: Path, block_size: int = 8192) -> Iterator[str]:
+    """
+    Lit un fichier texte ligne par ligne en partant de la fin
+
+    Seuls les blocs nécessaires sont lus: le coût dépend du nombre de lignes
+    consommées, pas de la taille du fichier.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            chunk = f.read(read_size) + remainder
+            lines = chunk.split(b"\n")
+            # La première ligne du bloc peut être incomplète
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode("utf-8", errors="replace")
+
+        if remainder.strip():
+            yield remainder.decode("utf-8", errors="replace")
+
+
+class JsonlLogWriter:
+    """
+    Écriture append-only en arrière-plan (thread + queue)
+
+    - Une ligne JSON par entrée, jamais de réécriture du fichier
+    - Rotation à la taille (max_bytes) ou au changement de jour:
+      news_logs.jsonl -> news_logs.jsonl.1 -> ... -> news_logs.jsonl.N
+    """
+
+    def __init__(self, path: Path, max_bytes: int, backup_count: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=10000)
+        self._current_day = self._file_day()
+        self._thread = threading.Thread(target=self._run, name="news-log-writer", daemon=True)
+        self._thread.start()
+
+    def _file_day(self) -> str:
+        if self.path.exists():
+            return datetime.utcfromtimestamp(self.path.stat().st_mtime).strftime("%Y-%m-%d")
+        return datetime.utcnow().strftime("%Y-%m-%d")
+
+    def write(self, target: Path, line: str) -> None:
+        """Ajoute une ligne à écrire (non bloquant, entrée perdue si la file est pleine)"""
+        try:
+            self._queue.put_nowait((target, line))
+        except queue.Full:
+            logger.warning("⚠️ File de logs pleine, entrée ignorée")
+
+    def flush(self) -> None:
+        """Attend que toutes les entrées en file soient écrites"""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Vide la file et arrête le thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            items = [self._queue.get()]
+            # Regrouper les entrées déjà en attente (une ouverture de fichier par lot)
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            batch: Dict[Path, List[str]] = {}
+            for item in items:
+                if item is None:
+                    stop = True
+                else:
+                    batch.setdefault(item[0], []).append(item[1])
+
+            for target, lines in batch.items():
+                try:
+                    if target == self.path:
+                        self._rotate_if_needed()
+                    with open(target, "a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+                except Exception as e:
+                    logger.error(f"❌ Erreur écriture log: {e}")
+
+            for _ in items:
+                self._queue.task_done()
+
+    def _rotate_if_needed(self) -> None:
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        if not self.path.exists():
+            self._current_day = today
+            return
+        if self.path.stat().st_size < self.max_bytes and self._current_day == today:
+            return
+
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{i}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        self._current_day = today
+
+
 class NewsLogger:
     """Gestionnaire de logs structurés pour les actualités"""
 
@@ -25,37 +146,39 @@ class NewsLogger:
         self.logs_dir.mkdir(exist_ok=True)
 
         # Fichiers de logs
-        self.logs_file = self.logs_dir / "news_logs.json"
+        self.logs_file = self.logs_dir / "news_logs.jsonl"
         self.debug_file = self.logs_dir / "news_debug.log"
 
+        # Rotation: 10 Mo ou changement de jour, 7 fichiers conservés
+        self.max_bytes = int(os.getenv("NEWS_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+        self.backup_count = int(os.getenv("NEWS_LOG_BACKUP_COUNT", "7"))
+        self.writer = JsonlLogWriter(self.logs_file, self.max_bytes, self.backup_count)
+        atexit.register(self.writer.close)
+
         logger.info(f"📝 NewsLogger initialisé (DEBUG_NEWS={self.debug_mode})")
 
-    def _append_json_log(self, log_entry: Dict[str, Any]) -> None:
-        """Ajoute une entrée au fichier JSON de logs"""
-        try:
-            # Charger les logs existants
-            if self.logs_file.exists():
-                with open(self.logs_file, "r", encoding="utf-8") as f:
+    def _log_files(self) -> List[Path]:
+        """Fichier courant puis fichiers tournés, du plus récent au plus ancien"""
+        files = [self.logs_file]
+        files += [self.logs_file.with_name(f"{self.logs_file.name}.{i}") for i in range(1, self.backup_count + 1)]
+        return [f for f in files if f.exists()]
+
+    def _iter_recent(self) -> Iterator[Dict[str, Any]]:
+        """Entrées du plus récent au plus ancien (lecture inverse, paresseuse)"""
+        for path in self._log_files():
+            try:
+                for line in iter_lines_reversed(path):
                     try:
-                        logs = json.load(f)
-                        if not isinstance(logs, list):
-                            logs = []
+                        yield json.loads(line)
                     except json.JSONDecodeError:
-                        logs = []
-            else:
-                logs = []
-
-            # Ajouter la nouvelle entrée
-            logs.append(log_entry)
-
-            # Limiter à 1000 entrées (garder les plus récentes)
-            if len(logs) > 1000:
-                logs = logs[-1000:]
-
-            # Sauvegarder
-            with open(self.logs_file, "w", encoding="utf-8") as f:
-                json.dump(logs, f, indent=2, ensure_ascii=False)
+                        continue
+            except OSError as e:
+                logger.error(f"❌ Erreur lecture logs {path}: {e}")
 
+    def _append_json_log(self, log_entry: Dict[str, Any]) -> None:
+        """Ajoute une entrée au fichier JSONL (écriture en arrière-plan)"""
+        try:
+            self.writer.write(self.logs_file, json.dumps(log_entry, ensure_ascii=False, default=str))
         except Exception as e:
             logger.error(f"❌ Erreur écriture JSON log: {e}")
 
@@ -65,9 +188,8 @@ class NewsLogger:
             return
 
         try:
-            with open(self.debug_file, "a", encoding="utf-8") as f:
-                timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"[{timestamp}] {message}\n")
+            timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+            self.writer.write(self.debug_file, f"[{timestamp}] {message}")
         except Exception as e:
             logger.error(f"❌ Erreur écriture debug log: {e}")
 
@@ -199,7 +321,7 @@ Text Preview:
 
     def get_recent_logs(self, limit: int = 50) -> list:
         """
-        Récupère les logs récents depuis le fichier JSON
+        Récupère les logs récents (lecture inverse, sans charger l'historique)
 
         Args:
             limit: Nombre maximum de logs à retourner
@@ -207,69 +329,59 @@ Text Preview:
         Returns:
             Liste des logs récents (plus récents en premier)
         """
-        try:
-            if not self.logs_file.exists():
-                return []
-
-            with open(self.logs_file, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-                if isinstance(logs, list):
-                    # Retourner les plus récents
-                    return logs[-limit:][::-1]
-                return []
-        except Exception as e:
-            logger.error(f"❌ Erreur lecture logs: {e}")
-            return []
+        logs = []
+        for log in self._iter_recent():
+            if len(logs) >= limit:
+                break
+            logs.append(log)
+        return logs
+
+    def get_error_logs(self, limit: int = 20, max_scan: int = 5000) -> list:
+        """
+        Récupère uniquement les logs d'erreur (plus récents en premier)
 
-    def get_error_logs(self, limit: int = 20) -> list:
-        """Récupère uniquement les logs d'erreur"""
-        try:
-            all_logs = self.get_recent_logs(limit=1000)
-            error_logs = [log for log in all_logs if log.get("status") == "error"]
-            return error_logs[-limit:][::-1]
-        except Exception as e:
-            logger.error(f"❌ Erreur récupération error logs: {e}")
-            return []
+        Args:
+            limit: Nombre maximum de logs d'erreur à retourner
+            max_scan: Nombre maximum d'entrées parcourues
+        """
+        error_logs = []
+        for scanned, log in enumerate(self._iter_recent()):
+            if len(error_logs) >= limit or scanned >= max_scan:
+                break
+            if log.get("status") == "error":
+                error_logs.append(log)
+        return error_logs
 
     def clear_old_logs(self, days: int = 7) -> None:
         """
-        Supprime les logs plus anciens que X jours
+        Supprime les fichiers tournés plus anciens que X jours
+
+        Les fichiers ne sont jamais réécrits: la purge se fait par fichier entier.
 
         Args:
             days: Nombre de jours à conserver
         """
         try:
-            if not self.logs_file.exists():
-                return
+            cutoff = datetime.utcnow().timestamp() - (days * 86400)
+            removed = 0
+            for path in self._log_files()[1:]:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
 
-            with open(self.logs_file, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-
-            if not isinstance(logs, list):
-                return
-
-            # Filtrer les logs récents
-            cutoff_date = datetime.utcnow().timestamp() - (days * 86400)
-            filtered_logs = []
-
-            for log in logs:
-                try:
-                    log_time = datetime.fromisoformat(log["timestamp"]).timestamp()
-                    if log_time >= cutoff_date:
-                        filtered_logs.append(log)
-                except:
-                    # Garder les logs sans timestamp valide
-                    filtered_logs.append(log)
-
-            # Sauvegarder
-            with open(self.logs_file, "w", encoding="utf-8") as f:
-                json.dump(filtered_logs, f, indent=2, ensure_ascii=False)
-
-            logger.info(f"🗑️ Logs nettoyés: {len(logs) - len(filtered_logs)} supprimés")
+            logger.info(f"🗑️ Logs nettoyés: {removed} fichiers supprimés")
 
         except Exception as e:
             logger.error(f"❌ Erreur nettoyage logs: {e}")
 
+    def flush(self) -> None:
+        """Attend l'écriture des entrées en attente"""
+        self.writer.flush()
+
+    def close(self) -> None:
+        """Écrit les entrées en attente et arrête le thread d'écriture"""
+        self.writer.close()
+
 
 # Instance globale
 news_logger = NewsLogger()
@@ -0,0 +1,83 @@
+"""
+Client Redis asynchrone partagé par le module News (cache + métriques)
+- Pool de connexions unique (redis.asyncio)
+- Connexion paresseuse au démarrage de l'application (plus de ping à l'import)
+- Repli non bloquant: si Redis est indisponible, `client` vaut None et une
+  reconnexion est retentée au plus toutes les NEWS_REDIS_RETRY_S secondes
+"""
+import os
+import time
+import logging
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+logger = logging.getLogger(__name__)
+
+
+class NewsRedisPool:
+    """Pool Redis asynchrone avec repli en mémoire"""
+
+    def __init__(self):
+        self.redis_url = os.getenv("REDIS_URL", "redis://redis:6379")
+        self.max_connections = int(os.getenv("NEWS_REDIS_MAX_CONNECTIONS", "20"))
+        self.socket_timeout = float(os.getenv("NEWS_REDIS_TIMEOUT_S", "0.5"))
+        self.retry_interval_s = float(os.getenv("NEWS_REDIS_RETRY_S", "30"))
+
+        self._client: Optional[aioredis.Redis] = None
+        self._available = False
+        self._last_attempt = 0.0
+
+    async def connect(self) -> bool:
+        """Crée le pool et vérifie la connexion (appelé au démarrage)"""
+        self._last_attempt = time.monotonic()
+        try:
+            if self._client is None:
+                pool = aioredis.ConnectionPool.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    max_connections=self.max_connections,
+                    socket_timeout=self.socket_timeout,
+                    socket_connect_timeout=self.socket_timeout
+                )
+                self._client = aioredis.Redis(connection_pool=pool)
+            await self._client.ping()
+            self._available = True
+            logger.info(f"✅ Connexion Redis établie (pool max={self.max_connections})")
+        except Exception as e:
+            self._available = False
+            logger.warning(f"⚠️ Redis non disponible, repli en mémoire: {e}")
+        return self._available
+
+    async def close(self) -> None:
+        """Ferme le pool de connexions"""
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except Exception as e:
+                logger.error(f"❌ Erreur fermeture Redis: {e}")
+            self._client = None
+            self._available = False
+
+    @property
+    def client(self) -> Optional[aioredis.Redis]:
+        """Client Redis si disponible, None sinon (repli en mémoire)"""
+        return self._client if self._available else None
+
+    def mark_unavailable(self, error: Exception) -> None:
+        """Signale une erreur réseau: les appels suivants passent en mémoire"""
+        if self._available:
+            logger.warning(f"⚠️ Redis indisponible, repli en mémoire: {error}")
+        self._available = False
+
+    async def ensure(self) -> Optional[aioredis.Redis]:
+        """Client disponible, avec reconnexion throttlée si Redis était tombé"""
+        if self._available:
+            return self._client
+        if self._client is not None and time.monotonic() - self._last_attempt >= self.retry_interval_s:
+            await self.connect()
+        return self.client
+
+
+# Instance globale
+news_redis = NewsRedisPool()
@@ -0,0 +1,86 @@
+"""
+Reprise différée des URLs d'actualités en échec
+- Un échec de traitement n'est plus réessayé dans la requête (aucune attente
+  ne bloque le semaphore ni la réponse HTTP): NewsDatabase.record_failure
+  incrémente retry_count et programme next_retry_at (backoff exponentiel)
+- Une tâche de fond réserve les URLs dues par FOR UPDATE SKIP LOCKED
+  (plusieurs instances sans double traitement) et les retraite
+- Nombre de tentatives plafonné (NEWS_RETRY_MAX_ATTEMPTS), compteurs exportés
+  dans les métriques (scheduled / attempted / succeeded / exhausted)
+"""
+import os
+import asyncio
+import logging
+from typing import Optional, Dict, Any
+
+from .database import news_db
+from .service import news_processor
+from .cache_manager import news_cache
+from .metrics import news_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class NewsRetryScheduler:
+    """Tâche de fond de reprise des URLs en échec"""
+
+    def __init__(self):
+        self.poll_interval_s = float(os.getenv("NEWS_RETRY_POLL_S", "30"))
+        self.batch_size = int(os.getenv("NEWS_RETRY_BATCH_SIZE", "10"))
+        # Bail d'une URL réservée: reprise par une autre instance si dépassé
+        self.lease_s = float(os.getenv("NEWS_RETRY_LEASE_S", "600"))
+
+        self._task: Optional[asyncio.Task] = None
+
+        logger.info(f"🔁 NewsRetryScheduler initialisé (toutes les {self.poll_interval_s:.0f}s, lot={self.batch_size})")
+
+    async def start(self) -> None:
+        """Lance la boucle de reprise"""
+        if not news_db.pool or (self._task and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                # Lot plein: des URLs sont peut-être encore dues, pas d'attente
+                if await self.run_once() >= self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur reprise des URLs en échec: {e}")
+            await asyncio.sleep(self.poll_interval_s)
+
+    async def run_once(self) -> int:
+        """Réserve et retraite les URLs dont la tentative est due (nombre d'URLs réservées)"""
+        rows = await news_db.claim_retries(self.batch_size, self.lease_s)
+        if rows:
+            logger.info(f"🔁 {len(rows)} URLs en échec reprises")
+            await asyncio.gather(*(self._retry(row) for row in rows))
+        return len(rows)
+
+    async def _retry(self, row: Dict[str, Any]) -> bool:
+        news_metrics.record_retry("attempted")
+        async with news_processor.semaphore:
+            success = await news_processor.process_url_with_retry(
+                row["url"], row["title"], row["lang"], attempt=row["retry_count"]
+            )
+        if success:
+            news_metrics.record_retry("succeeded")
+            await news_cache.set_cached(row["url"], {"title": row["title"], "lang": row["lang"]})
+            logger.info(f"✅ Reprise réussie après {row['retry_count']} échecs: {row['url']}")
+        return success
+
+
+# Instance globale
+news_retry_scheduler = NewsRetryScheduler()
@@ -1,10 +1,15 @@
 """
 Routes FastAPI pour le module News
-- POST /news/register: Enregistrer des URLs d'actualités (avec batch optimisé)
+- POST /news/register: Enregistrer des URLs d'actualités (job asynchrone, 202)
+- GET /news/jobs/{job_id}: Progression d'un job d'enregistrement
 - POST /news/vector-search: Recherche vectorielle
 - GET /news/stats: Statistiques et métriques
 - GET /news/debug/{url}: Debug d'une URL spécifique
 - GET /news/health: Health check
+- GET /news/index/status: État des index vectoriels par langue
+- POST /news/index/rebuild: Reconstruction des index vectoriels
+- GET /news/index/benchmark: Rappel et latence vs recherche exacte
+- POST /news/cache/reconcile: Maintenance de l'index du cache (SCAN)
 """
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Dict, Any, Optional
@@ -12,7 +17,7 @@ import logging
 
 from .models import (
     NewsRegisterRequest,
-    NewsRegisterResponse,
+    NewsJobStatus,
     NewsSearchRequest,
     NewsSearchResponse,
     NewsSearchResult
@@ -22,23 +27,29 @@ from .database import news_db
 from .cache_manager import news_cache
 from .metrics import news_metrics
 from .news_logger import news_logger
+from .index_manager import news_index_manager
+from .jobs import news_jobs
+from .batch_processor import news_batch_processor
+from .warmup import news_warmup
+from .url_canonicalizer import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/news", tags=["news"])
 
 
-@router.post("/register", response_model=NewsRegisterResponse)
+@router.post("/register", response_model=NewsJobStatus, status_code=202)
 async def register_news(request: NewsRegisterRequest):
     """
-    Enregistre des URLs d'actualités LinkedIn avec optimisations
+    Enregistre des URLs d'actualités LinkedIn de façon asynchrone
 
-    Nouveau comportement (v2.2+):
-    - Vérification cache Redis (TTL 48h)
-    - Vérification PostgreSQL
-    - Traitement en parallèle (max 5 concurrents)
-    - Retry logic avec backoff exponentiel
-    - Métriques et logging
+    Nouveau comportement (v2.3+):
+    - URLs canonicalisées (paramètres de tracking, slash final) et dédoublonnées
+    - Vérification en bloc: un MGET Redis (TTL 48h) puis un `url = ANY($1)` PostgreSQL
+    - Les URLs inconnues sont mises en file (job persistant) et la réponse est
+      immédiate (202); une URL déjà en file n'est pas ajoutée deux fois
+    - Traitement par un pool de workers (MAX_NEWS_CONCURRENCY), suivi via
+      GET /news/jobs/{job_id}
 
     Body:
     {
@@ -46,33 +57,26 @@ async def register_news(request: NewsRegisterRequest):
         "lang": "fr"
     }
 
-    Response:
+    Response (202):
     {
-        "registered": 2,
-        "skipped": 1,
-        "processed_urls": [...]
+        "job_id": "3f1c...",
+        "status": "queued",
+        "total": 3,
+        "queued": 2,
+        "registered": 1,
+        "skipped": 0,
+        "status_url": "/news/jobs/3f1c..."
     }
     """
     logger.info(f"📥 Requête d'enregistrement: {len(request.urls)} URLs, langue: {request.lang}")
 
+    if not news_db.pool:
+        raise HTTPException(status_code=503, detail="Base de données News indisponible")
+
     try:
-        # Utiliser la nouvelle méthode batch optimisée
-        result = await news_processor.process_urls_batch(request.urls, request.lang)
-
-        # Liste des URLs traitées
-        processed_urls = []
-        for url in request.urls:
-            # Vérifier si l'URL a été traitée (cache ou DB)
-            if news_cache.is_cached(url) or await news_db.url_exists(url):
-                processed_urls.append(url)
-
-        logger.info(f"📊 Résultat: {result['registered']} enregistrées, {result['skipped']} ignorées")
-
-        return NewsRegisterResponse(
-            registered=result["registered"],
-            skipped=result["skipped"],
-            processed_urls=processed_urls[:result["registered"]]  # Limiter à celles vraiment enregistrées
-        )
+        job = await news_jobs.enqueue(request.urls, request.lang)
+        logger.info(f"📬 Job {job['job_id']}: {job['queued']} en file, {job['registered']} déjà connues")
+        return NewsJobStatus(**job, status_url=f"/news/jobs/{job['job_id']}")
 
     except Exception as e:
         logger.error(f"❌ Erreur lors de l'enregistrement: {e}")
@@ -82,6 +86,20 @@ async def register_news(request: NewsRegisterRequest):
         )
 
 
+@router.get("/jobs/{job_id}", response_model=NewsJobStatus)
+async def get_job_status(job_id: str):
+    """
+    Progression d'un job d'enregistrement (statut, URLs traitées, échecs)
+    """
+    if not news_db.pool:
+        raise HTTPException(status_code=503, detail="Base de données News indisponible")
+
+    job = await news_jobs.get_status(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job non trouvé: {job_id}")
+    return NewsJobStatus(**job, status_url=f"/news/jobs/{job['job_id']}")
+
+
 @router.post("/vector-search", response_model=NewsSearchResponse)
 async def vector_search(request: NewsSearchRequest):
     """
@@ -91,7 +109,9 @@ async def vector_search(request: NewsSearchRequest):
     {
         "query": "marché de l'emploi dans l'IA",
         "lang": "fr",
-        "limit": 3
+        "limit": 3,
+        "min_similarity": 0.7,    # optionnel
+        "max_age_days": 7         # optionnel (défaut NEWS_FRESHNESS_DAYS)
     }
 
     Response:
@@ -101,7 +121,9 @@ async def vector_search(request: NewsSearchRequest):
                 "url": "...",
                 "title": "...",
                 "summary": "...",
-                "similarity": 0.87
+                "similarity": 0.87,
+                "score": 0.84,
+                "scraped_at": "2025-10-25T18:32:00"
             }
         ]
     }
@@ -113,7 +135,9 @@ async def vector_search(request: NewsSearchRequest):
         results = await news_processor.search_similar_news(
             request.query,
             request.lang,
-            request.limit
+            request.limit,
+            min_similarity=request.min_similarity,
+            max_age_days=request.max_age_days
         )
 
         # Convertir en modèle Pydantic
@@ -122,7 +146,9 @@ async def vector_search(request: NewsSearchRequest):
                 url=result["url"],
                 title=result["title"],
                 summary=result["summary"],
-                similarity=result["similarity"]
+                similarity=result["similarity"],
+                score=result.get("score"),
+                scraped_at=result.get("scraped_at")
             )
             for result in results
         ]
@@ -163,13 +189,13 @@ async def get_news_stats():
     """
     try:
         # Métriques Redis/mémoire
-        metrics_stats = news_metrics.get_all_stats()
+        metrics_stats = await news_metrics.get_all_stats()
 
         # Statistiques DB
         db_stats = await news_db.get_stats_from_db()
 
         # Statistiques cache
-        cache_stats = news_cache.get_cache_stats()
+        cache_stats = await news_cache.get_cache_stats()
 
         # Fusionner toutes les stats
         combined_stats = {
@@ -222,8 +248,11 @@ async def debug_news_by_url(url: str):
     }
     """
     try:
+        # Même clé que lors de l'enregistrement
+        url = canonicalize_url(url)
+
         # Vérifier le cache
-        cached = news_cache.is_cached(url)
+        cached = await news_cache.is_cached(url)
 
         # Récupérer depuis la DB
         news_item = await news_db.get_news_by_url(url)
@@ -303,11 +332,11 @@ async def news_health():
         all_news = await news_db.get_all_news(limit=1)
 
         # Vérifier Redis
-        cache_stats = news_cache.get_cache_stats()
+        cache_stats = await news_cache.get_cache_stats()
         redis_status = cache_stats.get("status", "unknown")
 
         # Vérifier les métriques
-        metrics_stats = news_metrics.get_all_stats()
+        metrics_stats = await news_metrics.get_all_stats()
 
         return {
             "status": "ok",
@@ -335,6 +364,145 @@ async def news_health():
         }
 
 
+@router.get("/index/status")
+async def index_status():
+    """
+    État des index vectoriels par langue
+
+    Response:
+    {
+        "active": {"fr": "hnsw"},
+        "indexes": [{"lang": "fr", "index_type": "hnsw", "row_count_at_build": 1200, "current_rows": 1350, "drift": 0.125, ...}]
+    }
+    """
+    if not news_db.pool:
+        raise HTTPException(status_code=503, detail="Base de données non connectée")
+
+    try:
+        indexes = await news_index_manager.get_status(news_db.pool)
+        return {
+            "active": news_index_manager.active_indexes,
+            "indexes": indexes
+        }
+    except Exception as e:
+        logger.error(f"❌ Erreur état des index: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/index/rebuild")
+async def index_rebuild(force: bool = Query(False, description="Reconstruire même sous le seuil de dérive")):
+    """Vérifie et reconstruit les index vectoriels si nécessaire"""
+    if not news_db.pool:
+        raise HTTPException(status_code=503, detail="Base de données non connectée")
+
+    try:
+        report = await news_index_manager.ensure_indexes(news_db.pool, force=force)
+        return {"report": report}
+    except Exception as e:
+        logger.error(f"❌ Erreur reconstruction des index: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/index/benchmark")
+async def index_benchmark(
+    lang: str = Query("fr", description="Langue à évaluer"),
+    samples: int = Query(50, description="Nombre de requêtes échantillonnées", ge=1, le=500),
+    k: int = Query(3, description="Taille du top-k", ge=1, le=50)
+):
+    """
+    Benchmark rappel@k et latence de l'index vectoriel contre la recherche exacte
+
+    Response:
+    {
+        "lang": "fr",
+        "index_type": "hnsw",
+        "samples": 50,
+        "k": 3,
+        "recall_at_k": 0.98,
+        "ann_latency_ms": {"p50": 1.2, "p95": 2.4, "avg": 1.4},
+        "exact_latency_ms": {"p50": 9.8, "p95": 12.1, "avg": 10.2}
+    }
+    """
+    if not news_db.pool:
+        raise HTTPException(status_code=503, detail="Base de données non connectée")
+
+    try:
+        return await news_index_manager.benchmark(news_db.pool, lang, samples=samples, k=k)
+    except Exception as e:
+        logger.error(f"❌ Erreur benchmark index: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/batches")
+async def batches_status():
+    """
+    Mode différé (API Batch): articles en attente par étape et derniers batchs
+
+    Response:
+    {
+        "enabled": true,
+        "pending": {"summary": 12, "embedding": 40},
+        "batches": [{"id": "batch_abc", "stage": "summary", "status": "in_progress", "item_count": 40, ...}]
+    }
+    """
+    if not news_db.pool:
+        raise HTTPException(status_code=503, detail="Base de données non connectée")
+
+    try:
+        return await news_batch_processor.get_status()
+    except Exception as e:
+        logger.error(f"❌ Erreur état des batchs: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/batches/run")
+async def batches_run(force: bool = Query(False, description="Soumettre même sous le seuil NEWS_BATCH_MIN_ITEMS")):
+    """Suit les batchs en cours et soumet les articles en attente sans attendre le prochain cycle"""
+    if not news_db.pool:
+        raise HTTPException(status_code=503, detail="Base de données non connectée")
+
+    try:
+        return await news_batch_processor.run_once(force=force)
+    except Exception as e:
+        logger.error(f"❌ Erreur cycle batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/warmup")
+async def warmup_status():
+    """Configuration et rapport du dernier préchargement"""
+    return {
+        "enabled": news_warmup.enabled,
+        "langs": sorted(news_warmup.seeds),
+        "interval_h": news_warmup.interval_s / 3600,
+        "last_report": news_warmup.last_report
+    }
+
+
+@router.post("/warmup/run")
+async def warmup_run():
+    """Lance un préchargement immédiat (enregistrement, cache, index)"""
+    if not news_db.pool:
+        raise HTTPException(status_code=503, detail="Base de données non connectée")
+
+    try:
+        return await news_warmup.run_once()
+    except Exception as e:
+        logger.error(f"❌ Erreur préchargement: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/cache/reconcile")
+async def cache_reconcile():
+    """
+    Maintenance du cache: resynchronise le compteur d'URLs en cache
+
+    Parcourt les clés avec SCAN (hors chemin critique), les statistiques
+    et health checks lisent uniquement l'index maintenu à l'écriture.
+    """
+    return await news_cache.reconcile_index()
+
+
 @router.get("/debug/all")
 async def debug_all_news(
     lang: Optional[str] = Query(None, description="Filtrer par langue (fr, en)"),
@@ -373,7 +541,7 @@ async def debug_all_news(
 @router.get("/debug/logs")
 async def debug_recent_logs(limit: int = Query(50, description="Nombre de logs", ge=1, le=200)):
     """
-    [DEBUG] Récupère les logs récents depuis news_logs.json
+    [DEBUG] Récupère les logs récents depuis news_logs.jsonl (lecture inverse)
     """
     try:
         logs = news_logger.get_recent_logs(limit=limit)
@@ -0,0 +1,283 @@
+"""
+Client HTTP partagé pour le scraping des actualités
+- Un seul httpx.AsyncClient (keep-alive, pool de connexions) au lieu d'un client
+  par URL et par tentative
+- Limite de connexions simultanées par hôte
+- Requêtes conditionnelles (ETag / Last-Modified): une page inchangée répond 304
+- Cache local du HTML brut compressé (gzip), indexé par URL et par hash de contenu:
+  un retraitement récent ne fait aucune requête réseau; purge périodique des
+  fichiers expirés (NEWS_HTML_CACHE_PURGE_H)
+"""
+import os
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
+}
+
+
+def content_hash(html: str) -> str:
+    """Hash SHA-256 du HTML (clé du fichier compressé)"""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class FetchResult:
+    """Résultat d'un téléchargement"""
+    url: str
+    html: str
+    content_hash: str
+    from_cache: bool = False      # Servi depuis le cache local sans requête
+    not_modified: bool = False    # Requête conditionnelle: 304
+
+
+class HtmlCache:
+    """
+    Cache disque du HTML brut
+
+    - meta/<sha256(url)>.json: validateurs HTTP, hash de contenu, date de téléchargement
+    - html/<hash>.html.gz: contenu compressé, partagé par les URLs au contenu identique
+
+    Les répertoires sont créés à la première écriture (pas à l'import du module).
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.meta_dir = cache_dir / "meta"
+        self.html_dir = cache_dir / "html"
+        self._dirs_ready = False
+
+    def _ensure_dirs(self) -> None:
+        if not self._dirs_ready:
+            self.meta_dir.mkdir(parents=True, exist_ok=True)
+            self.html_dir.mkdir(parents=True, exist_ok=True)
+            self._dirs_ready = True
+
+    def _meta_path(self, url: str) -> Path:
+        return self.meta_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _html_path(self, digest: str) -> Path:
+        return self.html_dir / f"{digest}.html.gz"
+
+    def get_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_path(url), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            # Le contenu a pu être purgé indépendamment
+            return meta if self._html_path(meta["content_hash"]).exists() else None
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def get_html(self, digest: str) -> Optional[str]:
+        try:
+            with gzip.open(self._html_path(digest), "rt", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, url: str, html: str, etag: Optional[str], last_modified: Optional[str]) -> str:
+        digest = content_hash(html)
+        html_path = self._html_path(digest)
+        self._ensure_dirs()
+        if not html_path.exists():
+            tmp = html_path.with_suffix(".tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                f.write(html)
+            tmp.replace(html_path)
+        self.touch(url, {
+            "url": url,
+            "content_hash": digest,
+            "etag": etag,
+            "last_modified": last_modified,
+        })
+        return digest
+
+    def touch(self, url: str, meta: Dict[str, Any]) -> None:
+        """Réécrit la métadonnée avec la date de validation courante"""
+        meta = {**meta, "fetched_at": time.time()}
+        self._ensure_dirs()
+        path = self._meta_path(url)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        tmp.replace(path)
+
+    def purge(self, max_age_s: float) -> int:
+        """Supprime les fichiers plus anciens que max_age_s (métadonnées et contenus)"""
+        cutoff = time.time() - max_age_s
+        removed = 0
+        for directory in (self.meta_dir, self.html_dir):
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+
+class NewsScraperClient:
+    """Client de scraping partagé (pool, limite par hôte, cache conditionnel)"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.max_connections = int(os.getenv("NEWS_SCRAPER_MAX_CONNECTIONS", "20"))
+        self.per_host_limit = int(os.getenv("NEWS_SCRAPER_PER_HOST", "2"))
+        # Durée pendant laquelle le HTML en cache est réutilisé sans requête
+        self.fresh_s = float(os.getenv("NEWS_HTML_CACHE_FRESH_S", "3600"))
+        self.max_age_s = float(os.getenv("NEWS_HTML_CACHE_MAX_AGE_DAYS", "7")) * 86400
+        self.purge_interval_s = float(os.getenv("NEWS_HTML_CACHE_PURGE_H", "24")) * 3600
+
+        if cache_dir is None:
+            base = Path("/app/cache") if os.path.exists("/app") else Path("./cache")
+            cache_dir = Path(os.getenv("NEWS_HTML_CACHE_DIR", str(base / "news_html")))
+        self.cache = HtmlCache(cache_dir)
+
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._purge_task: Optional[asyncio.Task] = None
+
+        logger.info(
+            f"🌐 NewsScraperClient initialisé (max={self.max_connections}, par hôte={self.per_host_limit}, "
+            f"cache={cache_dir})"
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Client httpx partagé, créé au premier usage"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    def start(self) -> None:
+        """Lance la purge périodique du cache local"""
+        if self._purge_task is None or self._purge_task.done():
+            self._purge_task = asyncio.create_task(self._purge_loop())
+
+    async def stop(self) -> None:
+        if self._purge_task:
+            self._purge_task.cancel()
+            try:
+                await self._purge_task
+            except asyncio.CancelledError:
+                pass
+            self._purge_task = None
+
+    async def _purge_loop(self) -> None:
+        while True:
+            try:
+                await self.purge_cache()
+            except Exception as e:
+                logger.error(f"❌ Erreur purge du cache HTML: {e}")
+            await asyncio.sleep(self.purge_interval_s)
+
+    async def close(self) -> None:
+        """Ferme le pool de connexions"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def fetch(self, url: str, timeout: Optional[float] = None, force: bool = False) -> FetchResult:
+        """
+        Télécharge une page (ou la sert depuis le cache local)
+
+        Args:
+            timeout: Timeout de la requête (défaut du client si None)
+            force: Ignorer la fraîcheur du cache (requête conditionnelle quand même)
+
+        Une erreur d'écriture du cache local (disque plein, droits) n'échoue pas
+        le téléchargement: le cache n'est qu'une optimisation.
+
+        Raises:
+            httpx.HTTPStatusError / httpx.HTTPError comme client.get
+        """
+        meta = await asyncio.to_thread(self.cache.get_meta, url)
+
+        if meta and not force and time.time() - meta.get("fetched_at", 0) < self.fresh_s:
+            html = await asyncio.to_thread(self.cache.get_html, meta["content_hash"])
+            if html is not None:
+                logger.debug(f"💾 HTML servi depuis le cache local: {url}")
+                return FetchResult(url, html, meta["content_hash"], from_cache=True)
+
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        kwargs = {"headers": headers}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+
+        async with self._host_semaphore(url):
+            response = await self.client.get(url, **kwargs)
+
+        if response.status_code == 304 and meta:
+            html = await asyncio.to_thread(self.cache.get_html, meta["content_hash"])
+            if html is not None:
+                try:
+                    await asyncio.to_thread(self.cache.touch, url, meta)
+                except OSError as e:
+                    logger.warning(f"⚠️ Cache HTML non mis à jour pour {url}: {e}")
+                logger.debug(f"💾 Page inchangée (304): {url}")
+                return FetchResult(url, html, meta["content_hash"], not_modified=True)
+            # Contenu perdu: nouvelle requête sans validateurs
+            async with self._host_semaphore(url):
+                response = await self.client.get(url, **{**kwargs, "headers": {}})
+
+        response.raise_for_status()
+        html = response.text
+        try:
+            digest = await asyncio.to_thread(
+                self.cache.put, url, html,
+                response.headers.get("etag"), response.headers.get("last-modified")
+            )
+        except OSError as e:
+            logger.warning(f"⚠️ Cache HTML non écrit pour {url}: {e}")
+            digest = content_hash(html)
+        return FetchResult(url, html, digest)
+
+    async def purge_cache(self) -> int:
+        """Supprime les entrées du cache local plus anciennes que NEWS_HTML_CACHE_MAX_AGE_DAYS"""
+        removed = await asyncio.to_thread(self.cache.purge, self.max_age_s)
+        if removed:
+            logger.info(f"🗑️ Cache HTML: {removed} fichiers expirés supprimés")
+        return removed
+
+
+# Instance globale
+news_scraper = NewsScraperClient()
@@ -1,30 +1,38 @@
 """
 Service de traitement des actualités LinkedIn
-- Scraping du contenu HTML
+- Scraping du contenu HTML (client partagé, voir scraper_client)
+- Extraction du texte hors boucle d'événements (voir extractor)
 - Génération de résumés via OpenAI
 - Génération d'embeddings
+- Ingestion: appels OpenAI asynchrones regroupés en micro-lots (voir ai_pipeline),
+  ou différés vers l'API Batch (NEWS_PROCESSING_MODE=batch, voir batch_processor)
 - Stockage en base de données
 - Cache Redis avec TTL
-- Retry logic avec backoff exponentiel
+- Réutilisation par empreinte de contenu et regroupement des quasi-doublons
+- Échecs repris en différé avec backoff exponentiel persistant (voir retry_scheduler)
 - Parallélisation avec semaphore
 - Métriques et logging
 """
 import logging
 import httpx
-from bs4 import BeautifulSoup
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from openai import OpenAI
 import os
-import re
 import asyncio
 from datetime import datetime
 import time
 
-from .database import news_db
+from .database import news_db, ProcessingLog
 from .models import NewsArticle
 from .cache_manager import news_cache
 from .metrics import news_metrics
 from .news_logger import news_logger
+from .embedding_storage import embedding_storage
+from .url_canonicalizer import canonicalize_url, canonicalize_urls
+from .scraper_client import news_scraper
+from .extractor import news_extractor, content_fingerprint
+from .ai_pipeline import news_ai_pipeline, summary_prompts
+from .batch_processor import news_batch_processor
 
 logger = logging.getLogger(__name__)
 
@@ -37,8 +45,14 @@ class NewsProcessor:
         self.model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         self.embedding_model = "text-embedding-3-small"
         self.max_concurrency = int(os.getenv("MAX_NEWS_CONCURRENCY", "5"))
-        self.max_retries = 3
+        # Tentatives max par URL (la première comprise), reprises par NewsRetryScheduler
+        self.max_retries = int(os.getenv("NEWS_RETRY_MAX_ATTEMPTS", "3"))
+        self.retry_base_delay_s = float(os.getenv("NEWS_RETRY_BASE_DELAY_S", "60"))
+        self.retry_max_delay_s = float(os.getenv("NEWS_RETRY_MAX_DELAY_S", "3600"))
         self.debug_mode = os.getenv("DEBUG_NEWS", "false").lower() == "true"
+        # Quasi-doublons: seuil cosinus strict contre les actualités récentes (1 = désactivé)
+        self.duplicate_threshold = float(os.getenv("NEWS_DUPLICATE_THRESHOLD", "0.95"))
+        self.duplicate_window_days = float(os.getenv("NEWS_DUPLICATE_WINDOW_DAYS", "3"))
 
         # Semaphore pour limiter la parallélisation
         self.semaphore = asyncio.Semaphore(self.max_concurrency)
@@ -47,75 +61,37 @@ class NewsProcessor:
 
     async def scrape_linkedin_news(self, url: str, retry_attempt: int = 0) -> Optional[str]:
         """
-        Scrape le contenu d'une page LinkedIn News avec retry logic
+        Scrape le contenu d'une page LinkedIn News (timeout allongé pour les reprises)
 
         Args:
             url: URL de l'actualité
             retry_attempt: Numéro de tentative (0 = première tentative)
         """
         try:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Accept-Language": "fr-FR,fr;q=0.9,en;q=0.8",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Connection": "keep-alive",
-            }
-
             # Timeout avec backoff exponentiel
             timeout = 30.0 + (retry_attempt * 10)
 
-            async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # Supprimer les scripts et styles
-                for script in soup(["script", "style", "nav", "footer", "header"]):
-                    script.decompose()
-
-                # Tentative d'extraction du contenu principal
-                content = None
+            # Client partagé: cache local, requête conditionnelle, limite par hôte
+            page = await news_scraper.fetch(url, timeout=timeout, force=retry_attempt > 0)
 
-                # Tentative 1: Recherche des balises article
-                article = soup.find("article")
-                if article:
-                    content = article.get_text(separator=" ", strip=True)
+            # Extraction hors de la boucle d'événements (pool, parseur lxml, arrêt à 3000 caractères)
+            content = await news_extractor.extract(page.html)
 
-                # Tentative 2: Recherche de divs avec classes communes LinkedIn
-                if not content:
-                    main_content = soup.find("div", class_=re.compile(r"(article|content|main|post)"))
-                    if main_content:
-                        content = main_content.get_text(separator=" ", strip=True)
+            if content:
+                logger.info(f"✅ Scraping réussi: {url} ({len(content)} caractères)")
 
-                # Tentative 3: Extraction de tout le body
-                if not content:
-                    body = soup.find("body")
-                    if body:
-                        content = body.get_text(separator=" ", strip=True)
+                # Log debug du contenu
+                if self.debug_mode:
+                    news_logger.log_scraping_debug(url, content, len(content))
 
-                # Nettoyage du contenu
-                if content:
-                    # Supprimer les espaces multiples
-                    content = re.sub(r'\s+', ' ', content)
-                    # Limiter à 3000 caractères pour le résumé
-                    content = content[:3000].strip()
-
-                    logger.info(f"✅ Scraping réussi: {url} ({len(content)} caractères)")
-
-                    # Log debug du contenu
-                    if self.debug_mode:
-                        news_logger.log_scraping_debug(url, content, len(content))
-
-                    return content
-                else:
-                    logger.warning(f"⚠️ Aucun contenu trouvé pour: {url}")
-                    return None
+                return content
+            else:
+                logger.warning(f"⚠️ Aucun contenu trouvé pour: {url}")
+                return None
 
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 429:  # Too Many Requests
-                logger.warning(f"⚠️ Rate limit atteint pour {url}, retry {retry_attempt + 1}/{self.max_retries}")
+                logger.warning(f"⚠️ Rate limit atteint pour {url}, tentative {retry_attempt + 1}/{self.max_retries}")
             else:
                 logger.error(f"❌ Erreur HTTP {e.response.status_code} lors du scraping de {url}")
             raise
@@ -131,24 +107,7 @@ class NewsProcessor:
         Génère un résumé court du contenu via GPT
         """
         try:
-            if lang == "en":
-                system_prompt = "You are a professional summarizer. Create concise, informative summaries."
-                user_prompt = f"""Summarize the following LinkedIn article in 2-3 sentences (max 100 words).
-Focus on the key information and main message.
-
-Content:
-{content}
-
-Summary:"""
-            else:
-                system_prompt = "Tu es un expert en résumé. Crée des résumés concis et informatifs."
-                user_prompt = f"""Résume cet article LinkedIn en 2-3 phrases (max 100 mots).
-Concentre-toi sur les informations clés et le message principal.
-
-Contenu:
-{content}
-
-Résumé:"""
+            system_prompt, user_prompt = summary_prompts(content, lang)
 
             response = self.openai_client.chat.completions.create(
                 model=self.model_name,
@@ -179,9 +138,15 @@ Résumé:"""
         Génère un embedding du texte via OpenAI
         """
         try:
+            # Sortie raccourcie côté API si une dimension réduite est configurée
+            extra = {}
+            if embedding_storage.request_dimensions:
+                extra["dimensions"] = embedding_storage.request_dimensions
+
             response = self.openai_client.embeddings.create(
                 model=self.embedding_model,
-                input=text
+                input=text,
+                **extra
             )
 
             embedding = response.data[0].embedding
@@ -201,188 +166,259 @@ Résumé:"""
         self,
         url: str,
         title: str,
-        lang: str = "fr"
+        lang: str = "fr",
+        attempt: int = 0
     ) -> bool:
         """
-        Traite une URL avec retry logic et backoff exponentiel
+        Traite une URL en une tentative
+
+        Un échec n'est pas réessayé dans la requête: il est enregistré en base avec
+        la date de la prochaine tentative (backoff exponentiel persistant), reprise
+        par NewsRetryScheduler.
+
+        Args:
+            attempt: Nombre d'échecs déjà enregistrés (0 = premier traitement)
 
         Returns:
             True si traitement réussi, False sinon
         """
         start_time = time.time()
 
-        for attempt in range(self.max_retries):
-            try:
-                # Étape 1: Scraping
-                content = await self.scrape_linkedin_news(url, retry_attempt=attempt)
-                if not content:
-                    logger.warning(f"⚠️ Impossible de scraper {url}, tentative {attempt + 1}/{self.max_retries}")
-                    if attempt < self.max_retries - 1:
-                        await asyncio.sleep(2 ** attempt)  # Backoff: 1s, 2s, 4s
-                        continue
-                    else:
-                        # Dernier échec: insérer quand même avec seulement le titre
-                        await news_db.insert_news(url, title, None, lang, None)
-                        await news_db.update_processing_metadata(
-                            url,
-                            retry_count=self.max_retries,
-                            last_error="Scraping failed after retries"
-                        )
-                        duration_ms = (time.time() - start_time) * 1000
-                        news_logger.log_processing(url, "error", duration_ms, "Scraping failed", {"lang": lang, "retries": self.max_retries})
-                        await news_db.log_processing(url, "error", duration_ms, "Scraping failed", {"lang": lang, "retries": self.max_retries})
-                        return False
-
+        try:
+            # Étape 1: Scraping
+            content = await self.scrape_linkedin_news(url, retry_attempt=attempt)
+            if not content:
+                logger.warning(f"⚠️ Impossible de scraper {url} (tentative {attempt + 1}/{self.max_retries})")
+                await self._record_failure(url, title, lang, "Scraping failed", start_time)
+                return False
+
+            # Contenu déjà résumé et vectorisé (même URL ou autre URL): réutilisation
+            fingerprint = content_fingerprint(content)
+            source_url = await news_db.find_processed_by_hash(fingerprint, url)
+            log_metadata = {"lang": lang, "title": title}
+            if source_url == url:
+                logger.info(f"♻️ Contenu inchangé: résumé et embedding conservés pour {url}")
+                await news_db.touch_news(url, title, log=self._success_log(start_time, log_metadata))
+                news_metrics.increment_content_reused()
+            elif source_url:
+                logger.info(f"♻️ Contenu identique à {source_url}: résumé et embedding réutilisés")
+                log_metadata["reused_from"] = source_url
+                await news_db.insert_duplicate(
+                    url, title, lang, source_url, fingerprint, log=self._success_log(start_time, log_metadata)
+                )
+                news_metrics.increment_content_reused()
+            elif news_batch_processor.enabled:
+                # Mode différé: résumé et embedding produits par l'API Batch
+                log_metadata["summary_status"] = "pending"
+                await news_batch_processor.defer(
+                    url, title, lang, content, fingerprint, log=self._success_log(start_time, log_metadata)
+                )
+            else:
                 # Étape 2: Résumé
-                summary = self.generate_summary(content, lang)
+                summary = await news_ai_pipeline.summarize(content, lang)
+                summarized = bool(summary)
                 if not summary:
                     logger.warning(f"⚠️ Impossible de générer un résumé pour {url}")
                     summary = content[:200] + "..."
 
                 # Étape 3: Embedding du résumé
-                embedding = self.generate_embedding(summary)
+                embedding = await news_ai_pipeline.embed(summary)
                 if not embedding:
                     logger.warning(f"⚠️ Impossible de générer un embedding pour {url}")
 
-                # Étape 4: Stockage
-                await news_db.insert_news(url, title, summary, lang, embedding)
-
-                # Métadonnées de traitement
-                duration_ms = (time.time() - start_time) * 1000
-                await news_db.update_processing_metadata(url, processing_time_ms=duration_ms)
-
-                # Logging
-                news_logger.log_processing(url, "success", duration_ms, metadata={"lang": lang, "title": title})
-                await news_db.log_processing(url, "success", duration_ms, metadata={"lang": lang, "title": title})
-
-                # Métriques
-                news_metrics.record_processing_time(duration_ms)
-                news_metrics.increment_total_processed()
-                news_metrics.increment_processed_today()
-                news_metrics.set_last_update()
-
-                logger.info(f"✅ Actualité traitée avec succès: {url} ({duration_ms:.0f}ms)")
-                return True
-
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 429 and attempt < self.max_retries - 1:
-                    # Rate limit: attendre plus longtemps
-                    backoff_time = (2 ** attempt) * 2  # 2s, 4s, 8s
-                    logger.warning(f"⚠️ Rate limit, attente {backoff_time}s avant retry")
-                    await asyncio.sleep(backoff_time)
-                    continue
-                else:
-                    # Autre erreur HTTP ou dernier essai
-                    error_msg = f"HTTP {e.response.status_code}"
-                    duration_ms = (time.time() - start_time) * 1000
-                    await news_db.update_processing_metadata(url, retry_count=attempt + 1, last_error=error_msg)
-                    news_logger.log_processing(url, "error", duration_ms, error_msg, {"lang": lang, "attempt": attempt + 1})
-                    await news_db.log_processing(url, "error", duration_ms, error_msg, {"lang": lang, "attempt": attempt + 1})
-                    if attempt >= self.max_retries - 1:
-                        return False
-
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"❌ Erreur traitement de {url} (tentative {attempt + 1}/{self.max_retries}): {e}")
-
-                if attempt < self.max_retries - 1:
-                    # Backoff exponentiel: 1s, 4s, 8s
-                    backoff_time = 2 ** attempt
-                    await asyncio.sleep(backoff_time)
-                    continue
-                else:
-                    # Dernier échec
-                    duration_ms = (time.time() - start_time) * 1000
-                    try:
-                        await news_db.insert_news(url, title, None, lang, None)
-                        await news_db.update_processing_metadata(
-                            url,
-                            retry_count=self.max_retries,
-                            last_error=error_msg[:500]
+                # Étape 4: Même histoire publiée sous une autre URL récente
+                duplicate_of = None
+                if embedding and self.duplicate_threshold < 1:
+                    duplicate = await news_db.find_near_duplicate(
+                        embedding, lang, url, self.duplicate_threshold, self.duplicate_window_days
+                    )
+                    if duplicate:
+                        duplicate_of = duplicate["url"]
+                        logger.info(
+                            f"🔗 Quasi-doublon de {duplicate_of} (similarité {duplicate['similarity']:.3f}): {url}"
                         )
-                    except:
-                        pass
-                    news_logger.log_processing(url, "error", duration_ms, error_msg, {"lang": lang, "retries": self.max_retries})
-                    await news_db.log_processing(url, "error", duration_ms, error_msg, {"lang": lang, "retries": self.max_retries})
-                    return False
+                        news_metrics.increment_near_duplicate()
+
+                # Étape 5: Stockage, durée de traitement et log en une requête
+                # (empreinte seulement si le résultat est réutilisable)
+                reusable_hash = fingerprint if summarized and embedding else None
+                if duplicate_of:
+                    log_metadata["duplicate_of"] = duplicate_of
+                    await news_db.insert_duplicate(
+                        url, title, lang, duplicate_of, reusable_hash, log=self._success_log(start_time, log_metadata)
+                    )
+                else:
+                    await news_db.insert_news(
+                        url, title, summary, lang, embedding,
+                        content_hash=reusable_hash, log=self._success_log(start_time, log_metadata)
+                    )
 
-        return False
+            # Logging fichier
+            duration_ms = (time.time() - start_time) * 1000
+            news_logger.log_processing(url, "success", duration_ms, metadata=log_metadata)
 
-    async def process_url(self, url: str, title: str, lang: str = "fr") -> bool:
+            # Métriques
+            news_metrics.record_processing_time(duration_ms)
+            news_metrics.increment_total_processed()
+            news_metrics.increment_processed_today()
+            news_metrics.set_last_update()
+
+            logger.info(f"✅ Actualité traitée avec succès: {url} ({duration_ms:.0f}ms)")
+            return True
+
+        except Exception as e:
+            error_msg = f"HTTP {e.response.status_code}" if isinstance(e, httpx.HTTPStatusError) else str(e)
+            logger.error(f"❌ Erreur traitement de {url} (tentative {attempt + 1}/{self.max_retries}): {error_msg}")
+            await self._record_failure(url, title, lang, error_msg, start_time)
+            return False
+
+    @staticmethod
+    def _success_log(start_time: float, metadata: Dict[str, Any]) -> ProcessingLog:
+        """Ligne de log écrite avec l'actualité (durée mesurée avant l'écriture)"""
+        return ProcessingLog("success", (time.time() - start_time) * 1000, metadata=metadata)
+
+    async def _record_failure(self, url: str, title: str, lang: str, error_msg: str, start_time: float) -> None:
+        """Enregistre l'échec, programme la prochaine tentative et journalise"""
+        duration_ms = (time.time() - start_time) * 1000
+        log_metadata = {"lang": lang, "max_attempts": self.max_retries}
+        try:
+            # Échec, prochaine tentative et ligne de log en une requête
+            failures = await news_db.record_failure(
+                url, title, lang, error_msg,
+                self.max_retries, self.retry_base_delay_s, self.retry_max_delay_s,
+                log=ProcessingLog("error", duration_ms, error_msg, log_metadata)
+            )
+        except Exception as e:
+            logger.error(f"❌ Erreur enregistrement de l'échec pour {url}: {e}")
+            news_logger.log_processing(url, "error", duration_ms, error_msg, log_metadata)
+            return
+
+        if failures >= self.max_retries:
+            news_metrics.record_retry("exhausted")
+            logger.warning(f"⚠️ Abandon après {failures} tentatives: {url}")
+        else:
+            news_metrics.record_retry("scheduled")
+
+        news_logger.log_processing(url, "error", duration_ms, error_msg, {**log_metadata, "attempt": failures})
+
+    async def split_known_urls(self, urls: List[str], lang: str) -> Tuple[List[str], List[str]]:
         """
-        Point d'entrée principal pour traiter une URL
-        Gère le cache et la parallélisation avec semaphore
+        Sépare les URLs déjà connues des nouvelles en deux requêtes au total:
+        un MGET Redis puis un `url = ANY($1)` Postgres pour les absentes du cache
+
+        Les URLs trouvées en base seulement sont remises en cache en un pipeline.
 
         Returns:
-            True si traitement réussi, False sinon
+            (URLs connues, URLs à traiter)
         """
-        async with self.semaphore:  # Limite la concurrence
-            # Vérifier le cache Redis
-            if news_cache.is_cached(url):
+        cached = await news_cache.get_cached_urls(urls)
+        remaining = [url for url in urls if url not in cached]
+        in_db = await news_db.existing_urls(remaining) if remaining else set()
+
+        if in_db:
+            await news_cache.set_cached_many({
+                url: {"title": self.title_from_url(url), "lang": lang} for url in in_db
+            })
+
+        for url in urls:
+            if url in cached:
                 logger.info(f"⚡ Cache hit: {url}")
                 news_metrics.increment_cache_hit()
                 news_logger.log_processing(url, "cached", metadata={"lang": lang})
-                return True
-
-            # Vérifier si existe en base
-            exists = await news_db.url_exists(url)
-            if exists:
+            elif url in in_db:
                 logger.info(f"⚡ Existe en DB, refresh cache: {url}")
-                # Remettre en cache
-                news_cache.set_cached(url, {"title": title, "lang": lang})
                 news_metrics.increment_cache_hit()
                 news_logger.log_processing(url, "cached", metadata={"lang": lang, "source": "db"})
-                return True
 
-            # Cache miss: traiter l'URL
+        known = [url for url in urls if url in cached or url in in_db]
+        new = [url for url in remaining if url not in in_db]
+        return known, new
+
+    @staticmethod
+    def title_from_url(url: str) -> str:
+        """Titre basique extrait de l'URL"""
+        return url.split("/")[-1] or "LinkedIn News"
+
+    async def process_new_url(self, url: str, title: str, lang: str) -> bool:
+        """Traite une URL absente du cache et de la base (concurrence limitée)"""
+        async with self.semaphore:  # Limite la concurrence
             news_metrics.increment_cache_miss()
             success = await self.process_url_with_retry(url, title, lang)
 
             # Si succès, mettre en cache
             if success:
-                news_cache.set_cached(url, {"title": title, "lang": lang})
+                await news_cache.set_cached(url, {"title": title, "lang": lang})
 
             return success
 
+    async def process_url(self, url: str, title: str, lang: str = "fr") -> bool:
+        """
+        Point d'entrée pour traiter une URL isolée
+        Gère le cache et la parallélisation avec semaphore
+
+        Returns:
+            True si traitement réussi, False sinon
+        """
+        url = canonicalize_url(url)
+        known, _ = await self.split_known_urls([url], lang)
+        if known:
+            return True
+        return await self.process_new_url(url, title, lang)
+
     async def process_urls_batch(
         self,
         urls: List[str],
         lang: str = "fr"
-    ) -> Dict[str, int]:
+    ) -> Dict[str, Any]:
         """
         Traite un lot d'URLs en parallèle (avec semaphore)
 
+        Les URLs sont canonicalisées et dédoublonnées, puis vérifiées en bloc
+        (cache puis base): seules les nouvelles sont scrapées.
+
         Returns:
-            {"registered": X, "skipped": Y}
+            {"registered": X, "skipped": Y, "processed_urls": [...]}
         """
-        logger.info(f"🧠 Traitement de {len(urls)} URLs (max_concurrency={self.max_concurrency})")
+        canonical_urls = canonicalize_urls(urls)
+        logger.info(
+            f"🧠 Traitement de {len(canonical_urls)} URLs uniques sur {len(urls)} "
+            f"(max_concurrency={self.max_concurrency})"
+        )
 
-        # Préparer les tâches
-        tasks = []
-        for url in urls:
-            # Extraire un titre basique depuis l'URL
-            title = url.split("/")[-1] or "LinkedIn News"
-            tasks.append(self.process_url(url, title, lang))
+        known, new = await self.split_known_urls(canonical_urls, lang)
 
         # Exécuter en parallèle avec asyncio.gather
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(
+            *(self.process_new_url(url, self.title_from_url(url), lang) for url in new),
+            return_exceptions=True
+        )
 
-        # Compter les résultats
-        registered = sum(1 for r in results if r is True)
-        skipped = sum(1 for r in results if r is False or isinstance(r, Exception))
+        # Compter les résultats (doublons et échecs comptés comme ignorés)
+        processed_urls = known + [url for url, r in zip(new, results) if r is True]
+        registered = len(processed_urls)
+        skipped = len(urls) - registered
 
-        logger.info(f"📊 Résultat batch: {registered} enregistrées, {skipped} ignorées/échouées")
+        logger.info(
+            f"📊 Résultat batch: {registered} enregistrées ({len(known)} déjà connues), "
+            f"{skipped} ignorées/échouées"
+        )
 
-        return {"registered": registered, "skipped": skipped}
+        return {"registered": registered, "skipped": skipped, "processed_urls": processed_urls}
 
     async def search_similar_news(
         self,
         query: str,
         lang: str = "fr",
-        limit: int = 3
+        limit: int = 3,
+        min_similarity: Optional[float] = None,
+        max_age_days: Optional[float] = None
     ) -> List[Dict[str, Any]]:
         """
-        Recherche les actualités similaires à une requête
+        Recherche les actualités récentes similaires à une requête
+
+        Args:
+            min_similarity: Seuil appliqué en SQL (None = aucun)
+            max_age_days: Fenêtre de fraîcheur (None = NEWS_FRESHNESS_DAYS)
         """
         try:
             # Générer l'embedding de la requête
@@ -392,7 +428,13 @@ Résumé:"""
                 return []
 
             # Recherche vectorielle
-            results = await news_db.vector_search(query_embedding, lang, limit)
+            results = await news_db.vector_search(
+                query_embedding,
+                lang,
+                limit,
+                min_similarity=min_similarity,
+                max_age_days=max_age_days
+            )
 
             logger.info(f"🔍 Recherche pour '{query[:50]}...': {len(results)} résultats")
             return results
@@ -12,6 +12,7 @@ from metrics import news_metrics
 from news_logger import news_logger
 from database import news_db
 from service import news_processor
+from redis_pool import news_redis
 
 
 async def test_cache_manager():
@@ -20,35 +21,35 @@ async def test_cache_manager():
 
     # Test 1: Set cache
     url = "https://test.com/news/1"
-    success = news_cache.set_cached(url, {"title": "Test", "lang": "fr"})
+    success = await news_cache.set_cached(url, {"title": "Test", "lang": "fr"})
     assert success, "❌ Échec set_cached"
     print("✅ set_cached fonctionne")
 
     # Test 2: Is cached
-    is_cached = news_cache.is_cached(url)
+    is_cached = await news_cache.is_cached(url)
     assert is_cached, "❌ Échec is_cached"
     print("✅ is_cached fonctionne")
 
     # Test 3: Get metadata
-    metadata = news_cache.get_cached_metadata(url)
+    metadata = await news_cache.get_cached_metadata(url)
     assert metadata is not None, "❌ Échec get_cached_metadata"
     assert metadata["url"] == url, "❌ URL incorrecte dans metadata"
     print(f"✅ get_cached_metadata fonctionne: {metadata}")
 
     # Test 4: Refresh TTL
-    refreshed = news_cache.refresh_ttl(url)
+    refreshed = await news_cache.refresh_ttl(url)
     assert refreshed, "❌ Échec refresh_ttl"
     print("✅ refresh_ttl fonctionne")
 
     # Test 5: Invalidate
-    invalidated = news_cache.invalidate(url)
+    invalidated = await news_cache.invalidate(url)
     assert invalidated, "❌ Échec invalidate"
-    is_cached_after = news_cache.is_cached(url)
+    is_cached_after = await news_cache.is_cached(url)
     assert not is_cached_after, "❌ URL encore en cache après invalidation"
     print("✅ invalidate fonctionne")
 
     # Test 6: Cache stats
-    stats = news_cache.get_cache_stats()
+    stats = await news_cache.get_cache_stats()
     assert stats["status"] == "connected", "❌ Redis non connecté"
     print(f"✅ get_cache_stats fonctionne: {stats}")
 
@@ -66,9 +67,9 @@ async def test_metrics():
     print("✅ record_processing_time fonctionne")
 
     # Test 2: Get avg
-    avg = news_metrics.get_avg_processing_time()
+    avg = (await news_metrics.get_all_stats())["avg_processing_time_ms"]
     assert avg > 0, "❌ Moyenne nulle"
-    print(f"✅ get_avg_processing_time: {avg:.2f}ms")
+    print(f"✅ avg_processing_time_ms: {avg:.2f}ms")
 
     # Test 3: Increment counters
     news_metrics.increment_total_processed()
@@ -78,7 +79,7 @@ async def test_metrics():
     print("✅ Incrémentations fonctionnent")
 
     # Test 4: Get stats
-    stats = news_metrics.get_all_stats()
+    stats = await news_metrics.get_all_stats()
     assert stats["total_processed"] > 0, "❌ total_processed nul"
     assert stats["cache_hits"] > 0, "❌ cache_hits nul"
     print(f"✅ get_all_stats fonctionne: {stats}")
@@ -220,6 +221,7 @@ async def run_all_tests():
     print("=" * 60)
 
     try:
+        await news_redis.connect()
         await test_cache_manager()
         await test_metrics()
         await test_logger()
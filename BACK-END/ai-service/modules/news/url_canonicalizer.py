@@ -0,0 +1,52 @@
+"""
+Normalisation des URLs d'actualités avant déduplication
+- Suppression des paramètres de tracking (trackingId, utm_*, ...)
+- Schéma et hôte en minuscules, fragment et slash final supprimés
+- Paramètres restants triés: deux variantes d'une même URL ont la même clé
+"""
+from typing import List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# Paramètres sans effet sur le contenu de la page
+TRACKING_PARAMS = {
+    "trackingid", "trk", "trkinfo", "refid", "lipi", "licu", "midtoken", "midsig",
+    "eid", "otptoken", "original_referer", "fbclid", "gclid", "msclkid", "mc_cid", "mc_eid",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Forme canonique d'une URL d'actualité
+
+    Ex: "https://www.LinkedIn.com/news/story/ia-123/?trackingId=abc#x"
+        -> "https://www.linkedin.com/news/story/ia-123"
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        return url
+
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    )
+    path = parts.path.rstrip("/")
+
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def canonicalize_urls(urls: List[str]) -> List[str]:
+    """URLs canoniques sans doublons, dans l'ordre d'arrivée"""
+    seen = {}
+    for url in urls:
+        if url and url.strip():
+            seen.setdefault(canonicalize_url(url), None)
+    return list(seen)
@@ -0,0 +1,278 @@
+"""
+Préchargement périodique du corpus d'actualités
+- Pages d'index LinkedIn News configurées par langue (NEWS_WARMUP_SEEDS):
+  les liens d'actualités qu'elles contiennent sont enregistrés via la file de
+  jobs (scraping, résumé et embedding hors des requêtes interactives)
+- Une fois les jobs terminés: cache Redis rempli avec les actualités récentes,
+  index vectoriels existants préchargés (pg_prewarm si l'extension est créée,
+  migration 013, sinon une recherche par langue qui parcourt l'index); leur
+  construction reste à NewsIndexManager
+- Exécuté au démarrage puis toutes les NEWS_WARMUP_INTERVAL_H heures, par un
+  seul worker à chaque fois (cycle réservé dans news_warmup_state)
+"""
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any
+from urllib.parse import urljoin
+
+import lxml.html
+import lxml.etree
+
+from .database import news_db
+from .cache_manager import news_cache
+from .index_manager import news_index_manager, index_name_for, INDEX_TYPE_EXACT
+from .jobs import news_jobs, JOB_COMPLETED
+from .scraper_client import news_scraper
+from .url_canonicalizer import canonicalize_urls
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_STORY_PATTERN = r"/news/story/"
+
+# Pages d'index LinkedIn News par défaut (NEWS_WARMUP_SEEDS="" pour ne rien découvrir)
+DEFAULT_SEEDS = '{"fr": ["https://fr.linkedin.com/news/"], "en": ["https://www.linkedin.com/news/"]}'
+
+
+def parse_seeds(raw: Optional[str]) -> Dict[str, List[str]]:
+    """
+    Liste de pages d'index par langue
+
+    Format JSON: {"fr": ["https://fr.linkedin.com/news/"], "en": [...]}
+    """
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        logger.error("❌ NEWS_WARMUP_SEEDS invalide (JSON attendu)")
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {
+        str(lang): [url for url in urls if isinstance(url, str) and url]
+        for lang, urls in data.items()
+        if isinstance(urls, list)
+    }
+
+
+def extract_story_links(html: str, base_url: str, pattern: str = DEFAULT_STORY_PATTERN, limit: int = 50) -> List[str]:
+    """Liens d'actualités d'une page d'index (URLs absolues, ordre du document, sans doublons)"""
+    if not html or not html.strip():
+        return []
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        return []
+
+    story_re = re.compile(pattern)
+    links: List[str] = []
+    seen = set()
+    for anchor in doc.iter("a"):
+        href = (anchor.get("href") or "").strip()
+        if not href or not story_re.search(href):
+            continue
+        url = urljoin(base_url, href)
+        if url not in seen:
+            seen.add(url)
+            links.append(url)
+            if len(links) >= limit:
+                break
+    return links
+
+
+class NewsWarmupScheduler:
+    """Enregistrement anticipé des actualités du jour et préchauffage des caches"""
+
+    def __init__(self):
+        self.enabled = os.getenv("NEWS_WARMUP_ENABLED", "true").lower() == "true"
+        self.seeds = parse_seeds(os.getenv("NEWS_WARMUP_SEEDS", DEFAULT_SEEDS))
+        self.story_pattern = os.getenv("NEWS_WARMUP_LINK_PATTERN", DEFAULT_STORY_PATTERN)
+        self.max_links = int(os.getenv("NEWS_WARMUP_MAX_LINKS", "50"))
+        self.interval_s = float(os.getenv("NEWS_WARMUP_INTERVAL_H", "6")) * 3600
+        # Attente max des jobs d'enregistrement avant le préchauffage
+        self.job_timeout_s = float(os.getenv("NEWS_WARMUP_JOB_TIMEOUT_S", "900"))
+        self.job_poll_s = float(os.getenv("NEWS_WARMUP_JOB_POLL_S", "10"))
+
+        self._task: Optional[asyncio.Task] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+
+        logger.info(
+            f"🔥 NewsWarmupScheduler initialisé (enabled={self.enabled}, "
+            f"langues={sorted(self.seeds)}, toutes les {self.interval_s / 3600:.1f}h)"
+        )
+
+    async def initialize_schema(self, conn) -> None:
+        """Crée la table de réservation des cycles si nécessaire"""
+        await conn.execute("""
+            CREATE TABLE IF NOT EXISTS news_warmup_state (
+                id INT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+                started_at TIMESTAMP NOT NULL
+            );
+        """)
+
+    async def start(self) -> None:
+        """Crée le schéma et lance le préchargement (immédiat puis périodique)"""
+        if not self.enabled or not news_db.pool:
+            return
+        async with news_db.pool.acquire() as conn:
+            await self.initialize_schema(conn)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                if await self.claim_cycle():
+                    await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur préchargement des actualités: {e}")
+            await asyncio.sleep(self.interval_s)
+
+    async def claim_cycle(self) -> bool:
+        """
+        Réserve le cycle pour ce worker (faux si un autre l'a lancé il y a moins d'un intervalle)
+
+        Une seule instruction: un worker concurrent attend le verrou de ligne puis
+        réévalue la condition sur la date déjà mise à jour.
+        """
+        async with news_db.pool.acquire() as conn:
+            claimed = await conn.fetchval(
+                """
+                INSERT INTO news_warmup_state (id, started_at) VALUES (1, NOW())
+                ON CONFLICT (id) DO UPDATE SET started_at = NOW()
+                WHERE news_warmup_state.started_at < NOW() - make_interval(secs => $1::float)
+                RETURNING started_at
+                """,
+                # Marge pour les décalages entre les boucles des workers
+                self.interval_s * 0.9
+            )
+        if claimed is None:
+            logger.info("🔥 Préchargement déjà lancé par un autre worker")
+        return claimed is not None
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Un cycle complet: enregistrement des actualités du jour puis préchauffage"""
+        start = time.perf_counter()
+        report: Dict[str, Any] = {"langs": {}}
+
+        jobs = []
+        for lang, seed_urls in self.seeds.items():
+            links = await self.discover(seed_urls)
+            report["langs"][lang] = {"discovered": len(links)}
+            if links:
+                status = await news_jobs.enqueue(links, lang)
+                report["langs"][lang]["job_id"] = status["job_id"]
+                jobs.append(status["job_id"])
+
+        await self.wait_for_jobs(jobs)
+
+        report["cached_urls"] = await self.warm_cache()
+        report["indexes"] = await self.warm_indexes()
+        report["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        self.last_report = report
+
+        logger.info(f"🔥 Préchargement terminé: {report}")
+        return report
+
+    async def discover(self, seed_urls: List[str]) -> List[str]:
+        """Liens d'actualités des pages d'index (canonicalisés, dédoublonnés)"""
+        links: List[str] = []
+        for seed_url in seed_urls:
+            try:
+                page = await news_scraper.fetch(seed_url, force=True)
+            except Exception as e:
+                logger.warning(f"⚠️ Page d'index inaccessible {seed_url}: {e}")
+                continue
+            links += await asyncio.to_thread(
+                extract_story_links, page.html, seed_url, self.story_pattern, self.max_links
+            )
+        return canonicalize_urls(links)[:self.max_links]
+
+    async def wait_for_jobs(self, job_ids: List[str]) -> None:
+        """Attend la fin des jobs d'enregistrement (borné par NEWS_WARMUP_JOB_TIMEOUT_S)"""
+        deadline = time.monotonic() + self.job_timeout_s
+        pending = list(job_ids)
+        while pending and time.monotonic() < deadline:
+            statuses = [await news_jobs.get_status(job_id) for job_id in pending]
+            pending = [
+                job_id for job_id, status in zip(pending, statuses)
+                if status and status["status"] != JOB_COMPLETED
+            ]
+            if pending:
+                await asyncio.sleep(self.job_poll_s)
+        if pending:
+            logger.warning(f"⚠️ Préchargement: {len(pending)} jobs encore en cours, préchauffage sans attendre")
+
+    async def warm_cache(self) -> int:
+        """Met en cache Redis les actualités de la fenêtre de fraîcheur (un pipeline)"""
+        async with news_db.pool.acquire() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT url, title, lang FROM news
+                WHERE processed = TRUE
+                  AND scraped_at >= NOW() - $1::float8 * INTERVAL '1 day'
+                """,
+                news_db.freshness_days
+            )
+        entries = {row["url"]: {"title": row["title"], "lang": row["lang"]} for row in rows}
+        if entries:
+            await news_cache.set_cached_many(entries)
+        return len(entries)
+
+    async def warm_indexes(self) -> Dict[str, Any]:
+        """
+        Charge en mémoire les pages des index vectoriels existants (sans les construire)
+
+        pg_prewarm ne charge que les index partiels par langue, pas la table; sans
+        l'extension, une recherche par langue (embedding d'une actualité récente)
+        parcourt l'index.
+        """
+        active = await news_index_manager.load_state(news_db.pool)
+        indexes = {
+            lang: index_name_for(lang, kind)
+            for lang, kind in active.items() if kind != INDEX_TYPE_EXACT
+        }
+        if not indexes:
+            return {"method": None, "indexes": {}}
+
+        async with news_db.pool.acquire() as conn:
+            if await conn.fetchval("SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_prewarm')"):
+                blocks = {}
+                for name in indexes.values():
+                    if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", name):
+                        blocks[name] = await conn.fetchval("SELECT pg_prewarm($1::regclass)", name)
+                return {"method": "pg_prewarm", "indexes": blocks}
+
+            samples = await conn.fetch(
+                """
+                SELECT DISTINCT ON (lang) lang, embedding::text AS embedding
+                FROM news
+                WHERE embedding IS NOT NULL AND lang = ANY($1::text[])
+                ORDER BY lang, scraped_at DESC
+                """,
+                list(indexes)
+            )
+
+        for row in samples:
+            await news_db.vector_search(json.loads(row["embedding"]), row["lang"], limit=3)
+        return {"method": "search", "langs": [row["lang"] for row in samples]}
+
+
+# Instance globale
+news_warmup = NewsWarmupScheduler()
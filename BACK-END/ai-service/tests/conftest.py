@@ -11,6 +11,9 @@ os.environ.setdefault("GOOGLE_CLIENT_ID_WEB", "test-client-id-web")
 os.environ.setdefault("USER_SERVICE_URL", "http://test:8444")
 os.environ.setdefault("JWT_SECRET", "test-jwt-secret")
 
+import uuid
+from contextlib import asynccontextmanager
+
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi.testclient import TestClient
@@ -60,3 +63,42 @@ def client(mock_user):
         yield test_client
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def news_database():
+    """
+    Base PostgreSQL (pgvector) jetable pour les tests de la couche base du module news
+
+    Nécessite NEWS_TEST_DATABASE_URL (connexion à une base d'administration, ex.
+    postgresql://postgres@localhost/postgres); sinon le test est ignoré.
+    Usage, dans la boucle du test:
+        async with news_database() as db:  # news_db global branché sur la base
+            ...
+    """
+    admin_url = os.getenv("NEWS_TEST_DATABASE_URL")
+    if not admin_url:
+        pytest.skip("NEWS_TEST_DATABASE_URL non défini")
+
+    import asyncpg
+    from modules.news.database import news_db
+
+    @asynccontextmanager
+    async def open_database():
+        name = f"news_test_{uuid.uuid4().hex[:12]}"
+        admin = await asyncpg.connect(admin_url)
+        await admin.execute(f"CREATE DATABASE {name}")
+        previous_pool = news_db.pool
+        try:
+            news_db.pool = await asyncpg.create_pool(admin_url, database=name, min_size=1, max_size=5)
+            try:
+                await news_db.initialize_schema()
+                yield news_db
+            finally:
+                await news_db.pool.close()
+        finally:
+            news_db.pool = previous_pool
+            await admin.execute(f"DROP DATABASE IF EXISTS {name} WITH (FORCE)")
+            await admin.close()
+
+    return open_database
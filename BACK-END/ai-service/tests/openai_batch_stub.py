@@ -0,0 +1,124 @@
+"""
+Serveur Batch OpenAI local (httpx.MockTransport) pour les tests du mode différé.
+
+Implémente les routes utilisées par OpenAIBatchClient:
+- POST /v1/files (purpose=batch)
+- POST /v1/batches, GET /v1/batches (liste), GET /v1/batches/{id}
+- GET /v1/files/{id}/content
+
+Un batch est "in_progress" au premier GET puis "completed": le fichier de
+sortie contient un résumé ou un embedding factice par ligne d'entrée (sauf
+les custom_id listés dans fail_ids, renvoyés en erreur). Comme chez OpenAI, les
+erreurs vont dans un fichier à part (error_file_id); si toutes les requêtes ont
+échoué, le batch est "completed" sans output_file_id.
+"""
+
+import json
+import re
+import time
+from typing import Dict, Any, Optional, Set
+
+import httpx
+
+
+class OpenAIBatchStub:
+    def __init__(self, fail_ids: Set[str] = frozenset(), dimensions: int = 3):
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.fail_ids = set(fail_ids)
+        self.dimensions = dimensions
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    # ------------------------------------------------------------------
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if request.method == "POST" and path.endswith("/files"):
+            return self._upload(request)
+        if request.method == "POST" and path.endswith("/batches"):
+            return self._create_batch(json.loads(request.content))
+        if request.method == "GET" and path.endswith("/batches"):
+            return httpx.Response(200, json={
+                "object": "list", "has_more": False,
+                "data": [self._batch(batch_id, "validating") for batch_id in reversed(list(self.batches))]
+            })
+        match = re.search(r"/batches/([^/]+)$", path)
+        if request.method == "GET" and match and match.group(1) in self.batches:
+            return self._retrieve(match.group(1))
+        match = re.search(r"/files/([^/]+)/content$", path)
+        if request.method == "GET" and match:
+            return httpx.Response(200, content=self.files[match.group(1)])
+        return httpx.Response(404, json={"error": {"message": f"unknown route {path}"}})
+
+    def _upload(self, request: httpx.Request) -> httpx.Response:
+        # Corps multipart: le contenu JSONL est entre les en-têtes de la partie "file"
+        body = request.content
+        start = body.index(b'{"custom_id"')
+        end = body.rindex(b"}\n") + 2
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = body[start:end]
+        return httpx.Response(200, json=self._file(file_id, "batch"))
+
+    def _create_batch(self, payload: Dict[str, Any]) -> httpx.Response:
+        batch_id = f"batch_{len(self.batches)}"
+        self.batches[batch_id] = {
+            "input_file_id": payload["input_file_id"],
+            "endpoint": payload["endpoint"],
+            "metadata": payload.get("metadata"),
+            "polls": 0,
+            "done": False,
+            "output_file_id": None,
+            "error_file_id": None,
+        }
+        return httpx.Response(200, json=self._batch(batch_id, "validating"))
+
+    def _retrieve(self, batch_id: str) -> httpx.Response:
+        batch = self.batches[batch_id]
+        batch["polls"] += 1
+        if batch["polls"] == 1:
+            return httpx.Response(200, json=self._batch(batch_id, "in_progress"))
+        if not batch["done"]:
+            self._run(batch)
+            batch["done"] = True
+        return httpx.Response(200, json=self._batch(batch_id, "completed"))
+
+    def _run(self, batch: Dict[str, Any]) -> None:
+        lines, errors = [], []
+        for raw in self.files[batch["input_file_id"]].decode("utf-8").splitlines():
+            entry = json.loads(raw)
+            custom_id = entry["custom_id"]
+            if custom_id in self.fail_ids:
+                errors.append({"custom_id": custom_id, "response": None,
+                               "error": {"code": "server_error", "message": "stub failure"}})
+                continue
+            if batch["endpoint"] == "/v1/embeddings":
+                body = {"data": [{"index": 0, "embedding": [0.1] * self.dimensions}]}
+            else:
+                body = {"choices": [{"message": {"content": f"Résumé de {custom_id}"}}]}
+            lines.append({"custom_id": custom_id, "response": {"status_code": 200, "body": body}, "error": None})
+        batch["output_file_id"] = self._store(lines)
+        batch["error_file_id"] = self._store(errors)
+
+    def _store(self, lines) -> Optional[str]:
+        if not lines:
+            return None
+        file_id = f"file-{len(self.files)}"
+        self.files[file_id] = "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+        return file_id
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _file(file_id: str, purpose: str) -> Dict[str, Any]:
+        return {"id": file_id, "object": "file", "bytes": 0, "created_at": int(time.time()),
+                "filename": "news_batch.jsonl", "purpose": purpose, "status": "processed"}
+
+    def _batch(self, batch_id: str, status: str) -> Dict[str, Any]:
+        batch = self.batches[batch_id]
+        return {"id": batch_id, "object": "batch", "endpoint": batch["endpoint"],
+                "input_file_id": batch["input_file_id"], "completion_window": "24h",
+                "status": status, "output_file_id": batch["output_file_id"],
+                "error_file_id": batch["error_file_id"], "metadata": batch["metadata"],
+                "created_at": int(time.time())}
@@ -0,0 +1,118 @@
+"""
+Tests des micro-lots OpenAI de l'ingestion des actualités.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from modules.news.ai_pipeline import MicroBatcher, NewsAIPipeline, parse_batch_summaries, batch_summary_prompts
+from modules.news.metrics import NewsMetrics
+
+
+class TestMicroBatcher:
+    """Tests du regroupement des soumissions concurrentes"""
+
+    def test_concurrent_submissions_share_a_batch(self):
+        calls = []
+
+        async def handler(items):
+            calls.append(list(items))
+            return [item.upper() for item in items]
+
+        async def run():
+            batcher = MicroBatcher("test", handler, max_size=3, max_wait_s=0.01)
+            return await asyncio.gather(*(batcher.submit(x) for x in ["a", "b", "c", "d"]))
+
+        results = asyncio.run(run())
+        assert results == ["A", "B", "C", "D"]
+        # Lot plein envoyé immédiatement, le reste après l'attente
+        assert calls == [["a", "b", "c"], ["d"]]
+
+    def test_handler_error_is_propagated_to_each_caller(self):
+        async def handler(items):
+            raise RuntimeError("quota")
+
+        async def run():
+            batcher = MicroBatcher("test", handler, max_size=2, max_wait_s=0.01)
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_short_result_list_fails_every_caller(self):
+        async def handler(items):
+            return items[:1]
+
+        async def run():
+            batcher = MicroBatcher("test", handler, max_size=3, max_wait_s=0.01)
+            return await asyncio.wait_for(
+                asyncio.gather(*(batcher.submit(x) for x in "abc"), return_exceptions=True),
+                timeout=1
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+
+class TestBatchSummaries:
+    """Tests du format JSON des résumés groupés"""
+
+    def test_prompt_numbers_articles(self):
+        _, user_prompt = batch_summary_prompts(["premier", "second"], "fr")
+        assert "[0]\npremier" in user_prompt
+        assert "[1]\nsecond" in user_prompt
+
+    def test_parse_maps_ids_and_flags_missing(self):
+        raw = json.dumps({"summaries": [{"id": 1, "summary": " B "}, {"id": 7, "summary": "x"}]})
+        assert parse_batch_summaries(raw, 2) == [None, "B"]
+        assert parse_batch_summaries("pas du json", 2) == [None, None]
+
+
+class TestAiBatchMetrics:
+    """Tests des métriques par lot"""
+
+    def test_tokens_per_article_and_latency(self):
+        metrics = NewsMetrics()
+        metrics.record_ai_batch("embeddings", 4, 120.0, 400)
+        metrics.record_ai_batch("embeddings", 2, 80.0, 200)
+
+        stats = metrics._ai_batch_stats(metrics.ai_counters)["embeddings"]
+        assert stats["batches"] == 2
+        assert stats["avg_batch_size"] == 3.0
+        assert stats["tokens_per_article"] == 100.0
+        assert stats["avg_batch_latency_ms"] == 100.0
+        # Un compteur de tokens ne remplit pas le tampon à lui seul
+        assert metrics._pending_count() == 6
+
+
+class FakeCompletions:
+    """chat.completions.create: réponse groupée puis réponses individuelles"""
+
+    def __init__(self, batch_content):
+        self.batch_content = batch_content
+
+    async def create(self, **kwargs):
+        content = self.batch_content if "response_format" in kwargs else "Résumé individuel"
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(total_tokens=10)
+        )
+
+
+class TestSummaryFallbackMetrics:
+    """Tests du comptage des articles avec repli individuel"""
+
+    def test_each_article_counted_once(self):
+        pipeline = NewsAIPipeline()
+        raw = json.dumps({"summaries": [{"id": 0, "summary": "A"}]})
+        pipeline._client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(raw)))
+        metrics = NewsMetrics()
+
+        with patch("modules.news.ai_pipeline.news_metrics", metrics):
+            summaries = asyncio.run(pipeline._summarize_batch(["a", "b", "c"], "fr"))
+
+        assert summaries == ["A", "Résumé individuel", "Résumé individuel"]
+        assert metrics.ai_counters["summaries"]["items"] == 3
+        assert metrics.ai_counters["summaries"]["batches"] == 3
@@ -0,0 +1,295 @@
+"""
+Tests du mode différé (API Batch OpenAI) contre le serveur Batch local.
+"""
+
+import asyncio
+import json
+
+import httpx
+from openai import AsyncOpenAI
+
+from modules.news.batch_processor import (
+    NewsBatchProcessor,
+    OpenAIBatchClient,
+    build_summary_request,
+    build_embedding_request,
+    parse_batch_output,
+    news_id_from,
+    to_jsonl,
+    STAGE_SUMMARY,
+    STAGE_EMBEDDING,
+    STATUS_SUBMITTING,
+)
+from tests.openai_batch_stub import OpenAIBatchStub
+
+
+def make_client(stub):
+    http_client = httpx.AsyncClient(transport=stub.transport())
+    return OpenAIBatchClient(AsyncOpenAI(api_key="test", base_url="http://stub/v1", http_client=http_client))
+
+
+class TestBatchRequests:
+    """Tests des lignes JSONL envoyées"""
+
+    def test_summary_request_uses_realtime_prompt(self):
+        request = build_summary_request(42, "Contenu de l'article", "fr", "gpt-4o-mini")
+        assert request["custom_id"] == "news-42"
+        assert request["url"] == "/v1/chat/completions"
+        assert "Contenu de l'article" in request["body"]["messages"][1]["content"]
+        assert news_id_from(request["custom_id"]) == 42
+
+    def test_embedding_request_dimensions_optional(self):
+        assert "dimensions" not in build_embedding_request(1, "texte", "text-embedding-3-small")["body"]
+        assert build_embedding_request(1, "texte", "text-embedding-3-small", 512)["body"]["dimensions"] == 512
+
+    def test_jsonl_one_request_per_line(self):
+        data = to_jsonl([build_embedding_request(i, "t", "m") for i in range(3)])
+        lines = data.decode("utf-8").strip().split("\n")
+        assert [json.loads(line)["custom_id"] for line in lines] == ["news-0", "news-1", "news-2"]
+
+
+class TestParseBatchOutput:
+    """Tests de la lecture du fichier de sortie"""
+
+    def test_errors_and_invalid_lines_are_skipped(self):
+        output = "\n".join([
+            json.dumps({"custom_id": "news-1", "response": {"status_code": 200, "body": {
+                "choices": [{"message": {"content": " Résumé "}}]}}}),
+            json.dumps({"custom_id": "news-2", "response": None, "error": {"code": "server_error"}}),
+            json.dumps({"custom_id": "news-3", "response": {"status_code": 429, "body": {}}}),
+            "pas du json",
+        ])
+        assert parse_batch_output(output, STAGE_SUMMARY) == {1: "Résumé"}
+
+    def test_embeddings(self):
+        output = json.dumps({"custom_id": "news-7", "response": {"status_code": 200, "body": {
+            "data": [{"embedding": [0.5, 0.25]}]}}})
+        assert parse_batch_output(output, STAGE_EMBEDDING) == {7: [0.5, 0.25]}
+
+
+class TestOpenAIBatchClient:
+    """Aller-retour complet contre le serveur Batch local"""
+
+    def test_submit_poll_and_download(self):
+        stub = OpenAIBatchStub(fail_ids={"news-2"})
+        client = make_client(stub)
+
+        async def run():
+            requests = [build_summary_request(i, f"article {i}", "fr", "gpt-4o-mini") for i in (1, 2)]
+            batch_id = await client.submit(requests, "/v1/chat/completions")
+            first = await client.retrieve(batch_id)
+            second = await client.retrieve(batch_id)
+            output = await client.download(second["output_file_id"])
+            return first, second, output
+
+        first, second, output = asyncio.run(run())
+        assert first["status"] == "in_progress"
+        assert second["status"] == "completed"
+        # L'article en échec n'a pas de résultat: il sera remis en file
+        assert parse_batch_output(output, STAGE_SUMMARY) == {1: "Résumé de news-1"}
+
+    def test_embedding_batch(self):
+        stub = OpenAIBatchStub(dimensions=4)
+        client = make_client(stub)
+
+        async def run():
+            batch_id = await client.submit([build_embedding_request(5, "résumé", "m")], "/v1/embeddings")
+            await client.retrieve(batch_id)
+            info = await client.retrieve(batch_id)
+            return await client.download(info["output_file_id"])
+
+        assert parse_batch_output(asyncio.run(run()), STAGE_EMBEDDING) == {5: [0.1] * 4}
+
+
+async def defer_articles(db, processor, count):
+    async with db.pool.acquire() as conn:
+        await processor.initialize_schema(conn)
+    return [
+        await processor.defer(f"https://example.com/{i}", f"Titre {i}", "fr", f"article {i}", f"hash-{i}")
+        for i in range(count)
+    ]
+
+
+class TestBatchProcessorDatabase:
+    """File d'attente, réservation et application des résultats (PostgreSQL)"""
+
+    def test_defer_writes_news_item_and_log(self, news_database):
+        async def run():
+            async with news_database() as db:
+                processor = NewsBatchProcessor(make_client(OpenAIBatchStub()))
+                [news_id] = await defer_articles(db, processor, 1)
+                news = await db.pool.fetchrow("SELECT summary, summary_status, processed FROM news WHERE id = $1", news_id)
+                item = await db.pool.fetchrow("SELECT stage, batch_id, content FROM news_batch_items WHERE news_id = $1", news_id)
+                logs = await db.pool.fetchval("SELECT count(*) FROM news_processing_log WHERE url = 'https://example.com/0'")
+                return news, item, logs
+
+        news, item, logs = asyncio.run(run())
+        assert (news["summary"], news["summary_status"], news["processed"]) == (None, "pending", False)
+        assert (item["stage"], item["batch_id"], item["content"]) == ("summary", None, "article 0")
+        assert logs == 1
+
+    def test_concurrent_submits_never_share_items(self, news_database):
+        stub = OpenAIBatchStub()
+
+        async def run():
+            async with news_database() as db:
+                processor = NewsBatchProcessor(make_client(stub))
+                await defer_articles(db, processor, 6)
+                submitted = await asyncio.gather(*(processor.submit_pending(STAGE_SUMMARY, force=True) for _ in range(3)))
+                assigned = await db.pool.fetch("SELECT batch_id, count(*) AS n FROM news_batch_items GROUP BY batch_id")
+                batches = await db.pool.fetch("SELECT id, status, item_count FROM news_batches")
+                return submitted, assigned, batches
+
+        submitted, assigned, batches = asyncio.run(run())
+        created = [batch_id for batch_id in submitted if batch_id]
+        # Chaque article part dans un seul batch, aucun provisoire ne reste
+        sent = [
+            json.loads(line)["custom_id"]
+            for batch in stub.batches.values()
+            for line in stub.files[batch["input_file_id"]].decode("utf-8").splitlines()
+        ]
+        assert len(sent) == len(set(sent)) == 6
+        assert len(stub.batches) == len(created)
+        assert sum(row["n"] for row in assigned) == 6
+        assert all(row["batch_id"] in created for row in assigned)
+        assert sorted(row["id"] for row in batches) == sorted(created)
+        assert all(row["status"] == "in_progress" for row in batches)
+
+    def test_failed_submit_attaches_batch_created_by_openai(self, news_database):
+        stub = OpenAIBatchStub()
+
+        class LostResponseClient(OpenAIBatchClient):
+            # Batch créé chez OpenAI, réponse perdue (timeout, arrêt)
+            async def submit(self, requests, endpoint, claim_id=None):
+                await super().submit(requests, endpoint, claim_id=claim_id)
+                raise TimeoutError("réponse perdue")
+
+        async def run():
+            async with news_database() as db:
+                client = make_client(stub)
+                processor = NewsBatchProcessor(LostResponseClient(client.client))
+                await defer_articles(db, processor, 2)
+                try:
+                    await processor.submit_pending(STAGE_SUMMARY, force=True)
+                except TimeoutError:
+                    pass
+                return await db.pool.fetch("SELECT DISTINCT batch_id FROM news_batch_items")
+
+        rows = asyncio.run(run())
+        assert [row["batch_id"] for row in rows] == list(stub.batches)
+
+    def test_orphan_claim_without_batch_is_released(self, news_database):
+        async def run():
+            async with news_database() as db:
+                processor = NewsBatchProcessor(make_client(OpenAIBatchStub()))
+                processor.claim_timeout_s = 0
+                [news_id] = await defer_articles(db, processor, 1)
+                await db.pool.execute(
+                    "INSERT INTO news_batches (id, stage, status, item_count, created_at) "
+                    "VALUES ('claim-x', 'summary', $1, 1, NOW() - INTERVAL '1 hour')",
+                    STATUS_SUBMITTING
+                )
+                await db.pool.execute("UPDATE news_batch_items SET batch_id = 'claim-x' WHERE news_id = $1", news_id)
+
+                recovered = await processor.recover_claims()
+                item = await db.pool.fetchval("SELECT batch_id FROM news_batch_items WHERE news_id = $1", news_id)
+                batches = await db.pool.fetchval("SELECT count(*) FROM news_batches")
+                return recovered, item, batches
+
+        assert asyncio.run(run()) == (1, None, 0)
+
+    def test_poll_error_does_not_block_other_batches(self, news_database):
+        stub = OpenAIBatchStub()
+
+        async def run():
+            async with news_database() as db:
+                processor = NewsBatchProcessor(make_client(stub))
+                await defer_articles(db, processor, 2)
+                batch_id = await processor.submit_pending(STAGE_SUMMARY, force=True)
+                # Batch inconnu d'OpenAI (404) suivi avant le batch valide
+                await db.pool.execute(
+                    "INSERT INTO news_batches (id, stage, item_count, created_at) "
+                    "VALUES ('batch_unknown', 'summary', 0, NOW() - INTERVAL '1 hour')"
+                )
+                await processor.poll()
+                applied = await processor.poll()
+                status = await db.pool.fetchval("SELECT status FROM news_batches WHERE id = $1", batch_id)
+                return applied, status
+
+        assert asyncio.run(run()) == (2, "completed")
+
+    def test_items_without_result_are_abandoned_after_max_attempts(self, news_database):
+        stub = OpenAIBatchStub()
+
+        async def run():
+            async with news_database() as db:
+                processor = NewsBatchProcessor(make_client(stub))
+                processor.max_attempts = 2
+                ok_id, failing_id = await defer_articles(db, processor, 2)
+                stub.fail_ids = {f"news-{failing_id}"}
+
+                requeued = []
+                for _ in range(2):
+                    batch_id = await processor.submit_pending(STAGE_SUMMARY, force=True)
+                    await processor.batch_client.retrieve(batch_id)
+                    await processor.poll()
+                    requeued.append(await db.pool.fetchrow(
+                        "SELECT stage, batch_id, attempts FROM news_batch_items WHERE news_id = $1", failing_id
+                    ))
+                news = await db.pool.fetchrow("SELECT summary_status, last_error FROM news WHERE id = $1", failing_id)
+                ok = await db.pool.fetchrow("SELECT summary, summary_status FROM news WHERE id = $1", ok_id)
+                errors = await db.pool.fetchval("SELECT count(*) FROM news_processing_log WHERE status = 'error'")
+                return requeued, news, ok, errors
+
+        requeued, news, ok, errors = asyncio.run(run())
+        assert (requeued[0]["batch_id"], requeued[0]["attempts"]) == (None, 1)
+        assert requeued[1] is None
+        # Second batch: seul l'article en échec, donc aucun fichier de sortie
+        assert news["summary_status"] == "failed"
+        assert news["last_error"].startswith("batch completed without output")
+        assert ok["summary_status"] == "summarized" and ok["summary"].startswith("Résumé de news-")
+        assert errors == 1
+
+    def test_batch_with_only_errors_is_released(self, news_database):
+        stub = OpenAIBatchStub()
+
+        async def run():
+            async with news_database() as db:
+                processor = NewsBatchProcessor(make_client(stub))
+                news_ids = await defer_articles(db, processor, 2)
+                stub.fail_ids = {f"news-{news_id}" for news_id in news_ids}
+                batch_id = await processor.submit_pending(STAGE_SUMMARY, force=True)
+                await processor.batch_client.retrieve(batch_id)
+                applied = await processor.poll()
+                batch = await db.pool.fetchrow("SELECT status, error FROM news_batches WHERE id = $1", batch_id)
+                items = await db.pool.fetch("SELECT batch_id, attempts FROM news_batch_items")
+                return stub.batches[batch_id], applied, batch, items
+
+        stub_batch, applied, batch, items = asyncio.run(run())
+        assert stub_batch["output_file_id"] is None and stub_batch["error_file_id"]
+        assert applied == 0
+        assert batch["status"] == "failed" and "without output" in batch["error"]
+        assert [(row["batch_id"], row["attempts"]) for row in items] == [(None, 1), (None, 1)]
+
+    def test_stale_batch_does_not_overwrite_requeued_item(self, news_database):
+        stub = OpenAIBatchStub()
+
+        async def run():
+            async with news_database() as db:
+                processor = NewsBatchProcessor(make_client(stub))
+                [news_id] = await defer_articles(db, processor, 1)
+                old_batch = await processor.submit_pending(STAGE_SUMMARY, force=True)
+                # Article rattaché depuis à un autre batch
+                await db.pool.execute(
+                    "INSERT INTO news_batches (id, stage, item_count) VALUES ('batch_new', 'summary', 1)"
+                )
+                await db.pool.execute("UPDATE news_batch_items SET batch_id = 'batch_new' WHERE news_id = $1", news_id)
+
+                await processor.apply_results(old_batch, STAGE_SUMMARY, {news_id: "Résumé périmé"})
+                news = await db.pool.fetchrow("SELECT summary, summary_status FROM news WHERE id = $1", news_id)
+                item = await db.pool.fetchrow("SELECT stage, batch_id FROM news_batch_items WHERE news_id = $1", news_id)
+                return news, item
+
+        news, item = asyncio.run(run())
+        assert (news["summary"], news["summary_status"]) == (None, "pending")
+        assert (item["stage"], item["batch_id"]) == ("summary", "batch_new")
@@ -0,0 +1,65 @@
+"""
+Tests des statistiques du cache News (sans KEYS).
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from modules.news.cache_manager import NewsCacheManager
+
+
+class TestCacheStats:
+    """Les stats lisent l'index maintenu a l'ecriture"""
+
+    def test_stats_use_index_not_keys(self):
+        cache = NewsCacheManager()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[{"used_memory_human": "1M"}, {"connected_clients": 3}])
+        client = MagicMock()
+        client.zcount = AsyncMock(return_value=42)
+        client.pipeline.return_value = pipe
+        client.keys = AsyncMock()
+
+        with patch("modules.news.cache_manager.news_redis.ensure", AsyncMock(return_value=client)):
+            stats = asyncio.run(cache.get_cache_stats())
+            asyncio.run(cache.get_cache_stats())
+
+        assert stats["cached_urls"] == 42
+        assert stats["redis_info"]["connected_clients"] == 3
+        client.keys.assert_not_called()
+        # INFO mis en cache entre deux appels
+        pipe.execute.assert_awaited_once()
+
+    def test_set_cached_tracks_expiry_in_index(self):
+        cache = NewsCacheManager()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True, 1, 0])
+        client = MagicMock()
+        client.pipeline.return_value = pipe
+
+        with patch("modules.news.cache_manager.news_redis.ensure", AsyncMock(return_value=client)):
+            assert asyncio.run(cache.set_cached("https://x.test/a", {"lang": "fr"}))
+
+        pipe.setex.assert_called_once()
+        index_key, mapping = pipe.zadd.call_args[0]
+        assert index_key == "news:cache_index"
+        assert "https://x.test/a" in mapping
+
+    def test_start_keeps_reference_to_index_task(self):
+        cache = NewsCacheManager()
+        client = MagicMock()
+        client.exists = AsyncMock(return_value=0)
+
+        async def run():
+            with patch("modules.news.cache_manager.news_redis.ensure", AsyncMock(return_value=client)), \
+                 patch.object(cache, "reconcile_index", AsyncMock()) as reconcile:
+                cache.start()
+                task = cache._index_task
+                await task
+                await cache.stop()
+                return task, reconcile
+
+        task, reconcile = asyncio.run(run())
+        assert task.done()
+        reconcile.assert_awaited_once()
+        assert cache._index_task is None
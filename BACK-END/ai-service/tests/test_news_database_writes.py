@@ -0,0 +1,131 @@
+"""
+Tests de l'écriture groupée actualité + log (une requête par article).
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from modules.news.database import ProcessingLog, with_log
+
+
+class TestProcessingLog:
+    """Tests des paramètres de la ligne de log"""
+
+    def test_params_serialize_metadata(self):
+        log = ProcessingLog("success", 12.5, metadata={"lang": "fr"})
+        status, duration_ms, error, metadata = log.params()
+        assert (status, duration_ms, error) == ("success", 12.5, None)
+        assert json.loads(metadata) == {"lang": "fr"}
+
+    def test_empty_metadata_is_null(self):
+        assert ProcessingLog("error", error_message="HTTP 500").params() == ["error", None, "HTTP 500", None]
+
+
+class TestWithLog:
+    """Tests de la CTE d'écriture"""
+
+    def test_log_params_follow_write_params(self):
+        sql = with_log("UPDATE news SET title = $2 WHERE url = $1 RETURNING id, url", 3)
+        assert "WITH written AS (UPDATE news" in sql
+        assert "SELECT COALESCE(written.url, $1), $3, $4, $5, $6::jsonb" in sql
+        assert sql.strip().endswith("SELECT * FROM written")
+
+    def test_extra_metadata_is_merged(self):
+        sql = with_log("INSERT INTO news (url) VALUES ($1) RETURNING id, url, retry_count", 2,
+                       "jsonb_build_object('attempt', retry_count)")
+        assert "COALESCE($5::jsonb, '{}'::jsonb) || jsonb_build_object('attempt', retry_count)" in sql
+
+
+RETRY = {"max_attempts": 3, "base_delay_s": 60, "max_delay_s": 3600}
+
+
+class TestRetryStateReset:
+    """Un succès remet à zéro le compteur d'échecs (PostgreSQL)"""
+
+    @pytest.mark.parametrize("success", ["insert_news", "touch_news", "insert_duplicate"])
+    def test_success_resets_retry_count(self, news_database, success):
+        url = "https://example.com/a"
+
+        async def run():
+            async with news_database() as db:
+                await db.insert_news("https://example.com/canonical", "Canonique", "Résumé", "fr")
+                for _ in range(2):
+                    await db.record_failure(url, "Titre", "fr", "HTTP 500", **RETRY)
+
+                if success == "insert_news":
+                    await db.insert_news(url, "Titre", "Résumé", "fr")
+                elif success == "touch_news":
+                    await db.touch_news(url, "Titre")
+                else:
+                    await db.insert_duplicate(url, "Titre", "fr", "https://example.com/canonical")
+                reset = await db.pool.fetchrow(
+                    "SELECT retry_count, last_error, next_retry_at FROM news WHERE url = $1", url
+                )
+
+                # Nouvel échec: toutes les tentatives sont de nouveau disponibles
+                attempt = await db.record_failure(url, "Titre", "fr", "HTTP 503", **RETRY)
+                next_retry_at = await db.pool.fetchval("SELECT next_retry_at FROM news WHERE url = $1", url)
+                return reset, attempt, next_retry_at
+
+        reset, attempt, next_retry_at = asyncio.run(run())
+        assert (reset["retry_count"], reset["last_error"], reset["next_retry_at"]) == (0, None, None)
+        assert attempt == 1
+        assert next_retry_at is not None
+
+
+LOGS_SQL = "SELECT status, error_message, metadata FROM news_processing_log WHERE url = $1 ORDER BY id"
+
+
+class TestLogRows:
+    """La ligne de log ne dépend pas du nombre de lignes écrites (PostgreSQL)"""
+
+    def test_insert_writes_one_log_row(self, news_database):
+        async def run():
+            async with news_database() as db:
+                await db.insert_news("https://example.com/a", "A", "Résumé", "fr",
+                                     log=ProcessingLog("success", 10.0, metadata={"lang": "fr"}))
+                return await db.pool.fetch(LOGS_SQL, "https://example.com/a")
+
+        logs = asyncio.run(run())
+        assert [(row["status"], json.loads(row["metadata"])) for row in logs] == [("success", {"lang": "fr"})]
+
+    def test_touch_missing_url_still_logged(self, news_database):
+        async def run():
+            async with news_database() as db:
+                await db.touch_news("https://example.com/missing", "Titre", log=ProcessingLog("unchanged", 5.0))
+                news = await db.pool.fetchval("SELECT count(*) FROM news")
+                return news, await db.pool.fetch(LOGS_SQL, "https://example.com/missing")
+
+        news, logs = asyncio.run(run())
+        assert news == 0
+        assert [row["status"] for row in logs] == ["unchanged"]
+
+    def test_duplicate_of_missing_canonical_still_logged(self, news_database):
+        async def run():
+            async with news_database() as db:
+                news_id = await db.insert_duplicate(
+                    "https://example.com/copy", "Copie", "fr", "https://example.com/missing",
+                    log=ProcessingLog("duplicate", 5.0)
+                )
+                news = await db.pool.fetchval("SELECT count(*) FROM news")
+                return news_id, news, await db.pool.fetch(LOGS_SQL, "https://example.com/copy")
+
+        news_id, news, logs = asyncio.run(run())
+        assert (news_id, news) == (None, 0)
+        assert [row["status"] for row in logs] == ["duplicate"]
+
+    def test_failure_log_carries_attempt(self, news_database):
+        url = "https://example.com/a"
+
+        async def run():
+            async with news_database() as db:
+                for _ in range(2):
+                    await db.record_failure(url, "Titre", "fr", "HTTP 500", **RETRY,
+                                            log=ProcessingLog("error", error_message="HTTP 500"))
+                return await db.pool.fetch(LOGS_SQL, url)
+
+        logs = asyncio.run(run())
+        assert [json.loads(row["metadata"])["attempt"] for row in logs] == [1, 2]
+        assert {row["error_message"] for row in logs} == {"HTTP 500"}
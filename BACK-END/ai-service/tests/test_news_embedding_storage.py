@@ -0,0 +1,106 @@
+"""
+Tests du format de stockage des embeddings et de l'evaluation du rappel.
+"""
+
+import asyncio
+import math
+import random
+
+import pytest
+
+from modules.news.embedding_storage import (
+    EmbeddingStorage,
+    truncate_embedding,
+    to_half_precision,
+    binary_quantize,
+    hamming_distance,
+    PRECISION_BINARY,
+)
+from modules.news.embedding_eval import evaluate_configs
+from modules.news.database import EmbeddingColumnMismatch
+
+
+class TestReductionFunctions:
+    """Tests des fonctions pures de reduction / quantisation"""
+
+    def test_truncate_renormalizes(self):
+        result = truncate_embedding([3.0, 4.0, 12.0], 2)
+        assert result == pytest.approx([0.6, 0.8])
+        assert math.sqrt(sum(x * x for x in result)) == pytest.approx(1.0)
+
+    def test_half_precision_rounds(self):
+        result = to_half_precision([0.1, 1.0])
+        assert result[1] == 1.0
+        assert result[0] != 0.1
+        assert result[0] == pytest.approx(0.1, abs=1e-4)
+
+    def test_binary_quantize_and_hamming(self):
+        assert binary_quantize([0.5, -0.2, 0.0, 0.3]) == 0b1001
+        assert hamming_distance(0b1001, 0b1111) == 2
+
+
+class TestEmbeddingStorage:
+    """Tests de la configuration de stockage"""
+
+    def test_default_is_full_precision(self, monkeypatch):
+        monkeypatch.delenv("NEWS_EMBEDDING_DIMENSIONS", raising=False)
+        monkeypatch.delenv("NEWS_EMBEDDING_PRECISION", raising=False)
+        storage = EmbeddingStorage()
+        assert storage.column_type == "vector(1536)"
+        assert storage.opclass == "vector_cosine_ops"
+        assert storage.request_dimensions is None
+
+    def test_reduced_halfvec(self, monkeypatch):
+        monkeypatch.setenv("NEWS_EMBEDDING_DIMENSIONS", "512")
+        monkeypatch.setenv("NEWS_EMBEDDING_PRECISION", "halfvec")
+        storage = EmbeddingStorage()
+        assert storage.column_type == "halfvec(512)"
+        assert storage.opclass == "halfvec_cosine_ops"
+        assert storage.request_dimensions == 512
+        assert storage.cast("$5") == "$5::halfvec(512)"
+        assert len(storage.prepare([0.1] * 1536)) == 512
+
+    def test_binary_indexes_quantized_expression_and_reranks(self, monkeypatch):
+        monkeypatch.setenv("NEWS_EMBEDDING_DIMENSIONS", "256")
+        monkeypatch.setenv("NEWS_EMBEDDING_PRECISION", PRECISION_BINARY)
+        storage = EmbeddingStorage()
+        assert storage.column_type == "halfvec(256)"
+        assert storage.opclass == "bit_hamming_ops"
+        assert storage.index_expression == "(binary_quantize(embedding)::bit(256))"
+        sql = storage.search_sql(select="url", where="lang = $2")
+        assert "<~>" in sql
+        assert "candidates" in sql
+
+    def test_invalid_configuration_raises(self, monkeypatch):
+        monkeypatch.setenv("NEWS_EMBEDDING_PRECISION", "int8")
+        with pytest.raises(ValueError):
+            EmbeddingStorage()
+
+
+class TestColumnTypeCheck:
+    """Démarrage refusé si news.embedding n'a pas le type configuré (PostgreSQL)"""
+
+    def test_mismatched_column_refuses_to_start(self, news_database):
+        async def run():
+            async with news_database() as db:
+                await db.pool.execute("ALTER TABLE news ALTER COLUMN embedding TYPE vector(3)")
+                with pytest.raises(EmbeddingColumnMismatch):
+                    await db.initialize_schema()
+                # Les outils de migration passent outre
+                await db.initialize_schema(check_embedding_type=False)
+
+        asyncio.run(run())
+
+
+class TestEvaluateConfigs:
+    """Tests du calcul de rappel@k"""
+
+    def test_full_precision_has_perfect_recall(self):
+        rng = random.Random(42)
+        corpus = [[rng.gauss(0, 1) for _ in range(64)] for _ in range(40)]
+        results = evaluate_configs(corpus, list(range(10)), [(64, "vector"), (16, "binary")], k=3)
+
+        assert results[0]["recall_at_k"] == 1.0
+        assert results[0]["size_ratio"] == 1.0
+        assert 0.0 <= results[1]["recall_at_k"] <= 1.0
+        assert results[1]["index_entry_bytes"] < results[0]["index_entry_bytes"]
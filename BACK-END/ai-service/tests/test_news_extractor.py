@@ -0,0 +1,74 @@
+"""
+Tests de l'extraction du texte principal des pages d'actualités.
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from modules.news.extractor import (
+    NewsExtractor,
+    content_fingerprint,
+    extract_article_text,
+    extract_article_text_legacy,
+)
+
+FIXTURE = Path(__file__).resolve().parent.parent / "linkedin_news_raw.html"
+
+
+class TestExtractArticleText:
+    """Tests de la fonction pure d'extraction"""
+
+    def test_prefers_article_and_skips_boilerplate(self):
+        html = """
+        <html><body>
+          <header>Menu</header>
+          <div class="main-content">Texte du div</div>
+          <article>Titre <script>var x = 1;</script><b>important</b>   suite</article>
+        </body></html>
+        """
+        assert extract_article_text(html) == "Titre important suite"
+
+    def test_falls_back_to_main_div_then_body(self):
+        assert extract_article_text('<div class="post-body"> Corps  du\n post </div>') == "Corps du post"
+        assert extract_article_text("<body><p>Seulement</p><footer>pied</footer></body>") == "Seulement"
+
+    def test_stops_at_budget(self):
+        html = "<article>" + "<p>mot</p>" * 5000 + "</article>"
+        content = extract_article_text(html, max_chars=100)
+        assert len(content) <= 100
+        assert content.startswith("mot mot")
+
+    def test_empty_page(self):
+        assert extract_article_text("") is None
+        assert extract_article_text("<html><body><nav>Menu</nav></body></html>") is None
+
+    @pytest.mark.skipif(not FIXTURE.exists(), reason="page LinkedIn sauvegardée absente")
+    def test_matches_legacy_extraction_on_saved_page(self):
+        html = FIXTURE.read_text(encoding="utf-8")
+        assert extract_article_text(html) == extract_article_text_legacy(html)
+
+
+class TestContentFingerprint:
+    """Tests de l'empreinte de contenu"""
+
+    def test_ignores_case_and_whitespace(self):
+        assert content_fingerprint("TotalEnergies  condamné\n pour greenwashing") == \
+            content_fingerprint("totalenergies condamné pour greenwashing ")
+
+    def test_differs_on_content_change(self):
+        assert content_fingerprint("Article v1") != content_fingerprint("Article v2")
+
+
+class TestNewsExtractor:
+    """Tests de l'exécution dans un pool"""
+
+    def test_extract_in_thread_pool(self, monkeypatch):
+        monkeypatch.setenv("NEWS_EXTRACT_EXECUTOR", "thread")
+        extractor = NewsExtractor()
+        try:
+            content = asyncio.run(extractor.extract("<article>Bonjour</article>"))
+        finally:
+            extractor.close()
+        assert content == "Bonjour"
@@ -0,0 +1,91 @@
+"""
+Tests du choix et de la maintenance des index vectoriels du module News.
+"""
+
+import asyncio
+
+from modules.news.index_manager import (
+    NewsIndexManager,
+    MAINTENANCE_LOCK,
+    choose_index_plan,
+    compute_drift,
+    index_name_for,
+    INDEX_TYPE_EXACT,
+    INDEX_TYPE_HNSW,
+    INDEX_TYPE_IVFFLAT,
+)
+
+
+class TestChooseIndexPlan:
+    """Tests pour choose_index_plan"""
+
+    def test_small_table_uses_exact_scan(self):
+        """Sous le seuil, aucun index n'est cree (scan exact)"""
+        assert choose_index_plan(0)["type"] == INDEX_TYPE_EXACT
+        assert choose_index_plan(999)["type"] == INDEX_TYPE_EXACT
+
+    def test_medium_table_uses_hnsw(self):
+        """Volume intermediaire: HNSW"""
+        plan = choose_index_plan(5000)
+        assert plan["type"] == INDEX_TYPE_HNSW
+        assert plan["params"] == {"m": 16, "ef_construction": 64}
+
+    def test_large_table_uses_ivfflat_with_sized_lists(self):
+        """Grand volume: IVFFlat avec lists = rows / 1000 puis sqrt(rows)"""
+        plan = choose_index_plan(1_000_000)
+        assert plan["type"] == INDEX_TYPE_IVFFLAT
+        assert plan["params"]["lists"] == 1000
+
+        plan = choose_index_plan(4_000_000)
+        assert plan["params"]["lists"] == 2000
+
+    def test_thresholds_are_configurable(self):
+        """Les seuils peuvent etre ajustes"""
+        plan = choose_index_plan(200, exact_threshold=100, ivfflat_threshold=150)
+        assert plan["type"] == INDEX_TYPE_IVFFLAT
+        assert plan["params"]["lists"] == 10
+
+    def test_lists_below_one_million_rows(self):
+        """Sous 1M lignes (seuil abaissé): lists = rows / 1000"""
+        plan = choose_index_plan(500_000, ivfflat_threshold=100_000)
+        assert plan["params"]["lists"] == 500
+
+
+class TestDriftAndNaming:
+    """Tests pour compute_drift et index_name_for"""
+
+    def test_drift_ratio(self):
+        assert compute_drift(1000, 1500) == 0.5
+        assert compute_drift(1000, 500) == 0.5
+        assert compute_drift(1000, 1000) == 0.0
+
+    def test_drift_from_empty_build(self):
+        """Un index construit sans donnees derive infiniment des la premiere ligne"""
+        assert compute_drift(0, 10) == float("inf")
+        assert compute_drift(0, 0) == 0.0
+
+    def test_index_name_is_sql_safe(self):
+        assert index_name_for("fr", INDEX_TYPE_HNSW) == "news_embedding_hnsw_fr_idx"
+        assert index_name_for("pt-BR'; DROP", INDEX_TYPE_HNSW) == "news_embedding_hnsw_pt_br___drop_idx"
+
+
+class TestMaintenance:
+    """Tests de la maintenance des index (PostgreSQL)"""
+
+    def test_skipped_while_another_instance_holds_the_lock(self, news_database):
+        async def run():
+            async with news_database() as db:
+                manager = NewsIndexManager()
+                async with db.pool.acquire() as other:
+                    await other.execute("SELECT pg_advisory_lock(hashtext($1))", MAINTENANCE_LOCK)
+                    skipped = await manager.ensure_indexes(db.pool)
+                    await other.execute("SELECT pg_advisory_unlock(hashtext($1))", MAINTENANCE_LOCK)
+
+                await db.pool.execute(
+                    "INSERT INTO news_index_state (lang, index_name, index_type) VALUES ('fr', NULL, 'exact')"
+                )
+                return skipped, await manager.load_state(db.pool)
+
+        skipped, active = asyncio.run(run())
+        assert skipped == {}
+        assert active == {"fr": INDEX_TYPE_EXACT}
@@ -0,0 +1,162 @@
+"""
+Tests du calcul d'état des jobs d'enregistrement.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from modules.news.jobs import NewsJobQueue, build_job_status, JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED
+
+
+def make_job(**overrides):
+    job = {
+        "id": uuid.uuid4(),
+        "lang": "fr",
+        "total": 6,
+        "known": 2,
+        "duplicates": 1,
+        "created_at": datetime(2025, 10, 25, 18, 0),
+        "finished_at": None,
+    }
+    job.update(overrides)
+    return job
+
+
+class TestBuildJobStatus:
+    """Tests de build_job_status"""
+
+    def test_queued_job(self):
+        status = build_job_status(make_job(), {"pending": 3})
+        assert status["status"] == JOB_QUEUED
+        assert status["queued"] == 3
+        assert status["registered"] == 2
+        assert status["skipped"] == 1
+
+    def test_running_job_counts_progress(self):
+        status = build_job_status(make_job(), {"pending": 1, "running": 1, "done": 1})
+        assert status["status"] == JOB_RUNNING
+        assert status["registered"] == 3
+
+    def test_completed_job_reports_failures(self):
+        job = make_job(finished_at=datetime(2025, 10, 25, 18, 5))
+        status = build_job_status(job, {"done": 2, "failed": 1}, ["https://example.com/x"])
+        assert status["status"] == JOB_COMPLETED
+        assert status["registered"] == 4
+        assert status["skipped"] == 2
+        assert status["failed_urls"] == ["https://example.com/x"]
+        assert status["finished_at"] == "2025-10-25T18:05:00"
+
+    def test_job_with_only_known_urls_is_completed(self):
+        status = build_job_status(make_job(known=6, duplicates=0), {})
+        assert status["status"] == JOB_COMPLETED
+        assert status["queued"] == 0
+
+
+class TestCompleteJob:
+    """Tests de la clôture des jobs (PostgreSQL)"""
+
+    def test_concurrent_last_items_close_the_job(self, news_database):
+        async def run():
+            async with news_database() as db:
+                queue = NewsJobQueue()
+                job_id = uuid.uuid4()
+                # Assez d'URLs terminées en même temps pour que les workers se croisent
+                urls = [f"https://example.com/{i}" for i in range(20)]
+                async with db.pool.acquire() as conn:
+                    await queue.initialize_schema(conn)
+                    await conn.execute(
+                        "INSERT INTO news_jobs (id, lang, total) VALUES ($1, 'fr', $2)", job_id, len(urls)
+                    )
+                    await conn.executemany(
+                        "INSERT INTO news_job_items (job_id, url, lang, status) VALUES ($1, $2, 'fr', 'running')",
+                        [(job_id, url) for url in urls]
+                    )
+
+                await asyncio.gather(*(
+                    queue._complete({"job_id": job_id, "url": url}, True, None) for url in urls
+                ))
+                return await db.pool.fetchval("SELECT finished_at FROM news_jobs WHERE id = $1", job_id)
+
+        assert asyncio.run(run()) is not None
+
+    def test_job_stays_open_while_items_pending(self, news_database):
+        async def run():
+            async with news_database() as db:
+                queue = NewsJobQueue()
+                job_id = uuid.uuid4()
+                async with db.pool.acquire() as conn:
+                    await queue.initialize_schema(conn)
+                    await conn.execute("INSERT INTO news_jobs (id, lang, total) VALUES ($1, 'fr', 2)", job_id)
+                    await conn.execute(
+                        "INSERT INTO news_job_items (job_id, url, lang, status) "
+                        "VALUES ($1, 'https://a', 'fr', 'running'), ($1, 'https://b', 'fr', 'pending')",
+                        job_id
+                    )
+
+                await queue._complete({"job_id": job_id, "url": "https://a"}, False, "HTTP 500")
+                return await db.pool.fetchrow(
+                    "SELECT j.finished_at, i.status, i.error FROM news_jobs j "
+                    "JOIN news_job_items i ON i.job_id = j.id AND i.url = 'https://a' WHERE j.id = $1",
+                    job_id
+                )
+
+        row = asyncio.run(run())
+        assert row["finished_at"] is None
+        assert (row["status"], row["error"]) == ("failed", "HTTP 500")
+
+
+def insert_item(conn, job_id, url, claimed_ago_s):
+    return conn.execute(
+        "INSERT INTO news_job_items (job_id, url, lang, status, claimed_at) "
+        "VALUES ($1, $2, 'fr', 'running', NOW() - $3::int * INTERVAL '1 second')",
+        job_id, url, claimed_ago_s
+    )
+
+
+class TestLeases:
+    """Tests de la reprise des URLs abandonnées (PostgreSQL)"""
+
+    def test_sweep_requeues_expired_and_renews_own_items(self, news_database):
+        async def run():
+            async with news_database() as db:
+                queue = NewsJobQueue()
+                queue.lease_s = 60
+                job_id = uuid.uuid4()
+                async with db.pool.acquire() as conn:
+                    await queue.initialize_schema(conn)
+                    await conn.execute("INSERT INTO news_jobs (id, lang, total) VALUES ($1, 'fr', 3)", job_id)
+                    await insert_item(conn, job_id, "https://a", 120)
+                    await insert_item(conn, job_id, "https://b", 120)
+                    await insert_item(conn, job_id, "https://c", 10)
+                # https://b est en cours de traitement dans cette instance
+                queue._in_progress.add((job_id, "https://b"))
+
+                recovered = await queue._sweep()
+                rows = await db.pool.fetch(
+                    "SELECT url, status FROM news_job_items WHERE job_id = $1 ORDER BY url", job_id
+                )
+                return recovered, [(row["url"], row["status"]) for row in rows]
+
+        recovered, rows = asyncio.run(run())
+        assert recovered == 1
+        assert rows == [("https://a", "pending"), ("https://b", "running"), ("https://c", "running")]
+
+    def test_failed_completion_requeues_item(self, news_database):
+        async def run():
+            async with news_database() as db:
+                queue = NewsJobQueue()
+                queue.poll_interval_s = 0
+                job_id = uuid.uuid4()
+                async with db.pool.acquire() as conn:
+                    await queue.initialize_schema(conn)
+                    await conn.execute("INSERT INTO news_jobs (id, lang, total) VALUES ($1, 'fr', 1)", job_id)
+                    await insert_item(conn, job_id, "https://a", 0)
+
+                with patch.object(queue, "_complete", AsyncMock(side_effect=ConnectionError("db down"))) as complete:
+                    await queue._finish({"job_id": job_id, "url": "https://a"}, True, None)
+                status = await db.pool.fetchval("SELECT status FROM news_job_items WHERE job_id = $1", job_id)
+                return complete.await_count, status
+
+        assert asyncio.run(run()) == (3, "pending")
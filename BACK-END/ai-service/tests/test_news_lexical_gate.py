@@ -0,0 +1,65 @@
+"""
+Tests du filtre lexical place devant la recherche vectorielle.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from modules.news.lexical_gate import extract_terms, build_tsquery, news_lexical_gate
+from modules.news.metrics import NewsMetrics
+
+
+class TestExtractTerms:
+    """Tests pour extract_terms / build_tsquery"""
+
+    def test_keeps_significant_words_by_frequency(self):
+        text = "L'intelligence artificielle transforme l'emploi. L'emploi change avec l'IA."
+        terms = extract_terms(text, "fr")
+        assert terms[0] == "emploi"
+        assert "intelligence" in terms
+        assert "avec" not in terms
+        # Mots trop courts ignores
+        assert "ia" not in terms
+
+    def test_drops_digits_and_punctuation(self):
+        terms = extract_terms("Budget 2025 : +12% ! (hausse) & 'inflation'", "fr")
+        assert terms == ["budget", "hausse", "inflation"]
+
+    def test_english_stopwords(self):
+        assert extract_terms("This would have been about hiring", "en") == ["hiring"]
+
+    def test_build_tsquery_is_a_disjunction(self):
+        assert build_tsquery(["ia", "emploi"]) == "ia | emploi"
+
+
+class TestGateMetrics:
+    """Tests des compteurs de precision du filtre"""
+
+    def test_precision_and_shadow_miss_rate(self):
+        metrics = NewsMetrics()
+
+        metrics.record_gate_decision(passed=False)
+        metrics.record_gate_decision(passed=True, vector_hit=True)
+        metrics.record_gate_decision(passed=True, vector_hit=False)
+        metrics.record_gate_decision(passed=False, vector_hit=True, shadow=True)
+
+        stats = asyncio.run(metrics.get_gate_stats())
+        assert stats["skipped"] == 1
+        assert stats["passed"] == 2
+        assert stats["shadow_checked"] == 1
+        assert stats["precision"] == 0.5
+        assert stats["skip_rate"] == 0.25
+        assert stats["shadow_miss_rate"] == 1.0
+
+
+class TestGatedSearch:
+    """Tests de gated_search"""
+
+    def test_skips_embedding_when_gate_rejects(self):
+        with patch.object(news_lexical_gate, "may_match", AsyncMock(return_value=False)), \
+             patch.object(news_lexical_gate, "shadow_rate", 0.0), \
+             patch("modules.news.lexical_gate.news_processor.search_similar_news", new_callable=AsyncMock) as search:
+            results = asyncio.run(news_lexical_gate.gated_search("un post", "fr"))
+
+        assert results == []
+        search.assert_not_called()
@@ -0,0 +1,156 @@
+"""
+Tests des partitions mensuelles de news_processing_log et des statistiques (PostgreSQL).
+"""
+
+import asyncio
+from pathlib import Path
+
+from modules.news.database import ProcessingLog
+from modules.news.embedding_storage import embedding_storage
+from modules.news.log_partitions import NewsLogPartitionManager
+
+MIGRATION_011 = Path(__file__).resolve().parents[2] / "database" / "migrations" / "011_partition_news_processing_log.sql"
+
+PARTITIONS_SQL = """
+    SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'news_processing_log'::regclass ORDER BY 1
+"""
+
+
+async def insert_log(conn, created_at_sql, status="success"):
+    await conn.execute(
+        f"INSERT INTO news_processing_log (url, status, created_at) VALUES ('https://example.com', $1, {created_at_sql})",
+        status
+    )
+
+
+class TestPartitionFunctions:
+    """Tests de news_create_log_partitions / news_purge_log_partitions"""
+
+    def test_current_and_next_months_exist(self, news_database):
+        async def run():
+            async with news_database() as db:
+                return [row["relname"] for row in await db.pool.fetch(PARTITIONS_SQL)]
+
+        partitions = asyncio.run(run())
+        assert "news_processing_log_default" in partitions
+        assert len(partitions) == 4
+
+    def test_past_months_created_from_date(self, news_database):
+        async def run():
+            async with news_database() as db:
+                created = await db.pool.fetchval(
+                    "SELECT news_create_log_partitions(2, (CURRENT_DATE - INTERVAL '3 months')::date)"
+                )
+                async with db.pool.acquire() as conn:
+                    await insert_log(conn, "NOW() - INTERVAL '3 months'")
+                default_rows = await db.pool.fetchval("SELECT count(*) FROM news_processing_log_default")
+                return created, default_rows
+
+        assert asyncio.run(run()) == (3, 0)
+
+    def test_rows_in_default_are_moved_into_new_partition(self, news_database):
+        async def run():
+            async with news_database() as db:
+                async with db.pool.acquire() as conn:
+                    # Mois sans partition: la ligne tombe dans DEFAULT
+                    await insert_log(conn, "NOW() + INTERVAL '6 months'")
+                    await insert_log(conn, "NOW() + INTERVAL '6 months'", status="error")
+                    in_default = await conn.fetchval("SELECT count(*) FROM news_processing_log_default")
+
+                    await conn.fetchval("SELECT news_create_log_partitions(6)")
+                    partition = await conn.fetchval(
+                        "SELECT 'news_processing_log_' || TO_CHAR(NOW() + INTERVAL '6 months', 'YYYY_MM')"
+                    )
+                    moved = await conn.fetchval(f"SELECT count(*) FROM {partition}")
+                    left = await conn.fetchval("SELECT count(*) FROM news_processing_log_default")
+                    # Le déplacement ne recompte pas les lignes
+                    events = await conn.fetchval("SELECT sum(events) FROM news_processing_daily")
+                return in_default, moved, left, events
+
+        assert asyncio.run(run()) == (2, 2, 0, 2)
+
+    def test_purge_drops_months_past_retention(self, news_database):
+        async def run():
+            async with news_database() as db:
+                await db.pool.fetchval(
+                    "SELECT news_create_log_partitions(0, (CURRENT_DATE - INTERVAL '6 months')::date)"
+                )
+                dropped = await db.pool.fetchval("SELECT news_purge_log_partitions(90)")
+                remaining = len(await db.pool.fetch(PARTITIONS_SQL))
+                return dropped, remaining
+
+        dropped, remaining = asyncio.run(run())
+        assert dropped >= 2
+        # Mois dans la rétention (3 à 4) + 2 mois d'avance + DEFAULT
+        assert 6 <= remaining <= 7
+
+    def test_maintain_reports_created_partitions(self, news_database):
+        async def run():
+            async with news_database() as db:
+                manager = NewsLogPartitionManager()
+                manager.months_ahead = 3
+                return await manager.maintain(db.pool)
+
+        assert asyncio.run(run()) == {"partitioned": True, "created": 1, "dropped": 0}
+
+
+class TestMigration011:
+    """Conversion d'une table de logs existante"""
+
+    def test_history_lands_in_monthly_partitions(self, news_database):
+        async def run():
+            async with news_database() as db:
+                async with db.pool.acquire() as conn:
+                    await conn.execute("DROP TABLE news_processing_log CASCADE")
+                    await conn.execute("DROP TABLE news_processing_daily")
+                    await conn.execute("""
+                        CREATE TABLE news_processing_log (
+                            id SERIAL PRIMARY KEY, url TEXT NOT NULL, status VARCHAR(50) NOT NULL,
+                            duration_ms FLOAT, error_message TEXT, metadata JSONB,
+                            created_at TIMESTAMP DEFAULT NOW()
+                        )
+                    """)
+                    await conn.execute("""
+                        INSERT INTO news_processing_log (url, status, created_at)
+                        SELECT 'https://example.com/' || d, 'success', NOW() - d * INTERVAL '1 day'
+                        FROM generate_series(0, 200, 10) d
+                    """)
+
+                    await conn.execute(MIGRATION_011.read_text(encoding="utf-8"))
+
+                    copied = await conn.fetchval("SELECT count(*) FROM news_processing_log")
+                    in_default = await conn.fetchval("SELECT count(*) FROM news_processing_log_default")
+                    events = await conn.fetchval("SELECT sum(events) FROM news_processing_daily")
+                return copied, in_default, events
+
+        copied, in_default, events = asyncio.run(run())
+        assert 9 <= copied <= 13
+        assert in_default == 0
+        assert events == 21
+
+
+class TestStatsFromDb:
+    """Tests de get_stats_from_db"""
+
+    def test_reprocessed_urls_and_failures_counted_once(self, news_database):
+        async def run():
+            embedding = [0.1] * embedding_storage.dimensions
+            async with news_database() as db:
+                for _ in range(2):
+                    await db.insert_news("https://example.com/a", "A", "Résumé", "fr", embedding,
+                                         log=ProcessingLog("success", 100.0))
+                await db.insert_news("https://example.com/b", "B", "Résumé", "fr", embedding,
+                                     log=ProcessingLog("success", 300.0))
+                for _ in range(3):
+                    await db.record_failure("https://example.com/c", "C", "fr", "HTTP 500", 5, 60, 3600,
+                                            log=ProcessingLog("error", error_message="HTTP 500"))
+                return await db.get_stats_from_db()
+
+        stats = asyncio.run(run())
+        assert stats["total_news"] == 2
+        assert stats["failed_with_retry"] == 1
+        assert (stats["success_events"], stats["error_events"]) == (3, 3)
+        assert stats["processed_today"] == 3
+        assert round(stats["avg_processing_time_ms"], 1) == 166.7
+        assert stats["last_update"] is not None
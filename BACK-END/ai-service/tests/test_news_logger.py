@@ -0,0 +1,67 @@
+"""
+Tests du journal JSONL append-only du module News.
+"""
+
+import json
+
+from modules.news.news_logger import NewsLogger, JsonlLogWriter, iter_lines_reversed
+
+
+def make_logger(tmp_path, monkeypatch, max_bytes=10 * 1024 * 1024):
+    monkeypatch.setenv("NEWS_LOG_MAX_BYTES", str(max_bytes))
+    monkeypatch.setenv("NEWS_LOG_BACKUP_COUNT", "3")
+    news_logger = NewsLogger()
+    news_logger.writer.close()
+    news_logger.logs_dir = tmp_path
+    news_logger.logs_file = tmp_path / "news_logs.jsonl"
+    news_logger.debug_file = tmp_path / "news_debug.log"
+    news_logger.writer = JsonlLogWriter(news_logger.logs_file, news_logger.max_bytes, news_logger.backup_count)
+    return news_logger
+
+
+class TestIterLinesReversed:
+    """Tests de la lecture inverse"""
+
+    def test_reads_lines_from_end_across_blocks(self, tmp_path):
+        path = tmp_path / "lines.txt"
+        path.write_text("".join(f"line-{i}\n" for i in range(100)))
+
+        lines = list(iter_lines_reversed(path, block_size=16))
+
+        assert lines[0] == "line-99"
+        assert lines[-1] == "line-0"
+        assert len(lines) == 100
+
+
+class TestNewsLogger:
+    """Tests de l'écriture en arrière-plan et de la rotation"""
+
+    def test_recent_and_error_logs_newest_first(self, tmp_path, monkeypatch):
+        news_logger = make_logger(tmp_path, monkeypatch)
+        for i in range(10):
+            status = "error" if i % 3 == 0 else "success"
+            news_logger.log_processing(f"https://example.com/{i}", status)
+        news_logger.flush()
+
+        lines = news_logger.logs_file.read_text().splitlines()
+        assert len(lines) == 10
+        assert json.loads(lines[0])["url"] == "https://example.com/0"
+
+        recent = news_logger.get_recent_logs(limit=3)
+        assert [log["url"] for log in recent] == [f"https://example.com/{i}" for i in (9, 8, 7)]
+
+        errors = news_logger.get_error_logs(limit=2)
+        assert [log["url"] for log in errors] == ["https://example.com/9", "https://example.com/6"]
+
+    def test_rotation_keeps_history_readable(self, tmp_path, monkeypatch):
+        news_logger = make_logger(tmp_path, monkeypatch, max_bytes=200)
+        for i in range(6):
+            news_logger.log_processing(f"https://example.com/{i}", "success")
+            # Une écriture à la fois pour déclencher la rotation entre les entrées
+            news_logger.flush()
+
+        assert (tmp_path / "news_logs.jsonl.1").exists()
+        assert not (tmp_path / "news_logs.jsonl.4").exists()
+
+        recent = news_logger.get_recent_logs(limit=2)
+        assert [log["url"] for log in recent] == ["https://example.com/5", "https://example.com/4"]
@@ -0,0 +1,116 @@
+"""
+Tests des metriques News: ecritures bufferisees et pipeline Redis.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from modules.news.metrics import NewsMetrics
+
+
+def _fake_client():
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    client = MagicMock()
+    client.pipeline.return_value = pipe
+    return client, pipe
+
+
+class TestMetricsBuffering:
+    """Les ecritures ne font aucun I/O et sont regroupees au flush"""
+
+    def test_increments_are_aggregated_into_one_pipeline(self):
+        metrics = NewsMetrics()
+        client, pipe = _fake_client()
+
+        for _ in range(3):
+            metrics.increment_cache_hit()
+        metrics.record_processing_time(120.0)
+        metrics.record_processing_time(80.0)
+
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=client)):
+            asyncio.run(metrics.flush())
+
+        pipe.incrby.assert_called_once_with("news:metrics:cache_hits", 3)
+        pipe.lpush.assert_called_once_with("news:metrics:processing_times", 120.0, 80.0)
+        pipe.execute.assert_awaited_once()
+        assert not metrics._has_pending()
+
+    def test_memory_fallback_when_redis_is_down(self):
+        metrics = NewsMetrics()
+        metrics.increment_total_processed()
+        metrics.increment_processed_today()
+        metrics.record_processing_time(100.0)
+
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=None)):
+            stats = asyncio.run(metrics.get_all_stats())
+
+        assert stats["total_processed"] == 1
+        assert stats["processed_today"] == 1
+        assert stats["avg_processing_time_ms"] == 100.0
+
+    def test_reuse_and_duplicate_counters(self):
+        metrics = NewsMetrics()
+        client, pipe = _fake_client()
+
+        metrics.increment_content_reused()
+        metrics.increment_near_duplicate()
+        metrics.increment_near_duplicate()
+
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=client)):
+            asyncio.run(metrics.flush())
+
+        pipe.incrby.assert_any_call("news:metrics:content_reused", 1)
+        pipe.incrby.assert_any_call("news:metrics:near_duplicates", 2)
+
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=None)):
+            stats = asyncio.run(metrics.get_all_stats())
+
+        assert stats["content_reused"] == 1
+        assert stats["near_duplicates"] == 2
+
+    def test_failed_pipeline_keeps_deltas_for_next_flush(self):
+        metrics = NewsMetrics()
+        client, pipe = _fake_client()
+        pipe.execute = AsyncMock(side_effect=ConnectionError("redis down"))
+
+        metrics.increment_cache_hit()
+        metrics.record_processing_time(50.0)
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=client)), \
+             patch("modules.news.metrics.news_redis.mark_unavailable"):
+            asyncio.run(metrics.flush())
+
+        # Écritures arrivées après l'échec: fusionnées avec les deltas remis en attente
+        metrics.increment_cache_hit()
+        metrics.record_processing_time(70.0)
+        client, pipe = _fake_client()
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=client)):
+            asyncio.run(metrics.flush())
+
+        pipe.incrby.assert_called_once_with("news:metrics:cache_hits", 2)
+        pipe.lpush.assert_called_once_with("news:metrics:processing_times", 50.0, 70.0)
+        assert not metrics._has_pending()
+
+    def test_deltas_wait_while_redis_is_down(self):
+        metrics = NewsMetrics()
+        metrics.increment_total_processed()
+
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=None)):
+            asyncio.run(metrics.flush())
+        assert metrics._has_pending()
+
+        client, pipe = _fake_client()
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=client)):
+            asyncio.run(metrics.flush())
+        pipe.incrby.assert_called_once_with("news:metrics:total_processed", 1)
+
+    def test_pending_times_bounded_while_redis_is_down(self):
+        metrics = NewsMetrics()
+        for duration_ms in range(250):
+            metrics.record_processing_time(float(duration_ms))
+
+        with patch("modules.news.metrics.news_redis.ensure", AsyncMock(return_value=None)):
+            asyncio.run(metrics.flush())
+
+        assert len(metrics._pending_times) == 100
+        assert metrics._pending_times[0] == 150.0
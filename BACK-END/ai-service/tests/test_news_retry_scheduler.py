@@ -0,0 +1,68 @@
+"""
+Tests de la reprise différée des URLs d'actualités en échec.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from modules.news.metrics import NewsMetrics
+from modules.news.retry_scheduler import NewsRetryScheduler
+from modules.news.service import news_processor
+
+
+class TestFailureIsScheduled:
+    """Un échec est enregistré en base sans attente dans la requête"""
+
+    def run_failure(self, failures):
+        metrics = NewsMetrics()
+        record_failure = AsyncMock(return_value=failures)
+        with patch.object(news_processor, "scrape_linkedin_news", AsyncMock(return_value=None)), \
+                patch("modules.news.service.news_db.record_failure", record_failure), \
+                patch("modules.news.service.news_db.log_processing", AsyncMock()), \
+                patch("modules.news.service.news_metrics", metrics), \
+                patch("modules.news.service.asyncio.sleep", AsyncMock()) as sleep:
+            result = asyncio.run(news_processor.process_url_with_retry("https://example.com/a", "a", "fr"))
+        return result, record_failure, sleep, metrics
+
+    def test_single_attempt_then_scheduled(self):
+        result, record_failure, sleep, metrics = self.run_failure(1)
+        assert result is False
+        record_failure.assert_awaited_once()
+        assert record_failure.await_args.args[:4] == ("https://example.com/a", "a", "fr", "Scraping failed")
+        sleep.assert_not_awaited()
+        assert metrics.retry_counters["scheduled"] == 1
+        assert metrics.retry_counters["exhausted"] == 0
+
+    def test_last_attempt_is_exhausted(self):
+        _, _, _, metrics = self.run_failure(news_processor.max_retries)
+        assert metrics.retry_counters["exhausted"] == 1
+        assert metrics.retry_counters["scheduled"] == 0
+
+
+class TestRetryScheduler:
+    """Tests d'un cycle de reprise"""
+
+    def test_claimed_urls_are_reprocessed(self):
+        metrics = NewsMetrics()
+        rows = [
+            {"url": "https://example.com/ok", "title": "ok", "lang": "fr", "retry_count": 1},
+            {"url": "https://example.com/ko", "title": "ko", "lang": "en", "retry_count": 2},
+        ]
+        process = AsyncMock(side_effect=lambda url, *args, **kwargs: url.endswith("ok"))
+        set_cached = AsyncMock()
+
+        with patch("modules.news.retry_scheduler.news_db.claim_retries", AsyncMock(return_value=rows)), \
+                patch.object(news_processor, "process_url_with_retry", process), \
+                patch("modules.news.retry_scheduler.news_cache.set_cached", set_cached), \
+                patch("modules.news.retry_scheduler.news_metrics", metrics):
+            claimed = asyncio.run(NewsRetryScheduler().run_once())
+
+        assert claimed == 2
+        assert process.await_args_list[1].kwargs == {"attempt": 2}
+        set_cached.assert_awaited_once_with("https://example.com/ok", {"title": "ok", "lang": "fr"})
+        assert metrics.retry_counters["attempted"] == 2
+        assert metrics.retry_counters["succeeded"] == 1
+
+    def test_nothing_due(self):
+        with patch("modules.news.retry_scheduler.news_db.claim_retries", AsyncMock(return_value=[])):
+            assert asyncio.run(NewsRetryScheduler().run_once()) == 0
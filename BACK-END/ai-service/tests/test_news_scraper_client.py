@@ -0,0 +1,130 @@
+"""
+Tests du client de scraping partagé (cache local et requêtes conditionnelles).
+"""
+
+import asyncio
+
+import httpx
+
+from modules.news.scraper_client import NewsScraperClient, content_hash
+
+URL = "https://www.linkedin.com/news/story/ia-emploi-123"
+HTML = "<html><body><article>Contenu de l'actualité</article></body></html>"
+
+
+def make_client(tmp_path, handler, monkeypatch, fresh_s="3600"):
+    monkeypatch.setenv("NEWS_HTML_CACHE_FRESH_S", fresh_s)
+    return NewsScraperClient(cache_dir=tmp_path, transport=httpx.MockTransport(handler))
+
+
+class TestNewsScraperClient:
+    """Tests de NewsScraperClient.fetch"""
+
+    def test_fresh_cache_skips_network(self, tmp_path, monkeypatch):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, text=HTML, headers={"ETag": '"v1"'})
+
+        scraper = make_client(tmp_path, handler, monkeypatch)
+
+        async def run():
+            first = await scraper.fetch(URL)
+            second = await scraper.fetch(URL)
+            await scraper.close()
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert len(calls) == 1
+        assert not first.from_cache
+        assert second.from_cache
+        assert second.html == HTML
+        assert second.content_hash == first.content_hash
+
+    def test_stale_cache_sends_conditional_request(self, tmp_path, monkeypatch):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=HTML, headers={"ETag": '"v1"', "Last-Modified": "Sat, 25 Oct 2025 18:00:00 GMT"})
+
+        scraper = make_client(tmp_path, handler, monkeypatch, fresh_s="0")
+
+        async def run():
+            await scraper.fetch(URL)
+            result = await scraper.fetch(URL)
+            await scraper.close()
+            return result
+
+        result = asyncio.run(run())
+        assert len(calls) == 2
+        assert calls[1].headers["If-Modified-Since"] == "Sat, 25 Oct 2025 18:00:00 GMT"
+        assert result.not_modified
+        assert result.html == HTML
+
+    def test_identical_content_is_stored_once(self, tmp_path, monkeypatch):
+        scraper = make_client(tmp_path, lambda request: httpx.Response(200, text=HTML), monkeypatch)
+
+        async def run():
+            await scraper.fetch(URL)
+            await scraper.fetch(URL + "-bis")
+            await scraper.close()
+
+        asyncio.run(run())
+        assert len(list((tmp_path / "html").iterdir())) == 1
+        assert len(list((tmp_path / "meta").iterdir())) == 2
+
+    def test_cache_dirs_created_on_first_write(self, tmp_path):
+        cache_dir = tmp_path / "news_html"
+        scraper = NewsScraperClient(cache_dir=cache_dir, transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, text=HTML)
+        ))
+        assert not cache_dir.exists()
+        assert asyncio.run(scraper.purge_cache()) == 0
+
+        async def run():
+            await scraper.fetch(URL)
+            await scraper.close()
+
+        asyncio.run(run())
+        assert (cache_dir / "meta").is_dir() and (cache_dir / "html").is_dir()
+
+    def test_cache_write_error_does_not_fail_fetch(self, tmp_path, monkeypatch):
+        scraper = make_client(tmp_path, lambda request: httpx.Response(200, text=HTML), monkeypatch)
+
+        def disk_full(*args):
+            raise OSError(28, "No space left on device")
+
+        monkeypatch.setattr(scraper.cache, "put", disk_full)
+
+        async def run():
+            result = await scraper.fetch(URL)
+            await scraper.close()
+            return result
+
+        result = asyncio.run(run())
+        assert result.html == HTML
+        assert result.content_hash == content_hash(HTML)
+
+    def test_purge_runs_periodically_until_stopped(self, tmp_path):
+        scraper = NewsScraperClient(cache_dir=tmp_path)
+        scraper.purge_interval_s = 0.01
+        purges = []
+
+        async def purge_cache():
+            purges.append(1)
+            return 0
+
+        scraper.purge_cache = purge_cache
+
+        async def run():
+            scraper.start()
+            await asyncio.sleep(0.1)
+            await scraper.stop()
+
+        asyncio.run(run())
+        assert len(purges) >= 2
+        assert scraper._purge_task is None
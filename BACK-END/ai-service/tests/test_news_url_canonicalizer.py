@@ -0,0 +1,36 @@
+"""
+Tests de la canonicalisation des URLs d'actualités.
+"""
+
+from modules.news.url_canonicalizer import canonicalize_url, canonicalize_urls
+
+
+class TestCanonicalizeUrl:
+    """Tests de canonicalize_url"""
+
+    def test_strips_tracking_params_fragment_and_trailing_slash(self):
+        url = "https://www.LinkedIn.com/news/story/ia-emploi-123/?trackingId=abc%3D%3D&utm_source=share#top"
+        assert canonicalize_url(url) == "https://www.linkedin.com/news/story/ia-emploi-123"
+
+    def test_keeps_and_sorts_meaningful_params(self):
+        url = "https://example.com/a?b=2&trk=x&a=1"
+        assert canonicalize_url(url) == "https://example.com/a?a=1&b=2"
+
+    def test_leaves_non_absolute_urls_untouched(self):
+        assert canonicalize_url(" not-a-url ") == "not-a-url"
+
+
+class TestCanonicalizeUrls:
+    """Tests du dédoublonnage"""
+
+    def test_deduplicates_variants_in_order(self):
+        urls = [
+            "https://www.linkedin.com/news/story/b-2/",
+            "https://www.linkedin.com/news/story/a-1/?trackingId=x",
+            "https://www.linkedin.com/news/story/b-2",
+            "",
+        ]
+        assert canonicalize_urls(urls) == [
+            "https://www.linkedin.com/news/story/b-2",
+            "https://www.linkedin.com/news/story/a-1",
+        ]
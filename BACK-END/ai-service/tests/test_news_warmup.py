@@ -0,0 +1,102 @@
+"""
+Tests de la découverte des actualités à précharger.
+"""
+
+import asyncio
+
+from modules.news.embedding_storage import embedding_storage
+from modules.news.index_manager import news_index_manager
+from modules.news.warmup import NewsWarmupScheduler, parse_seeds, extract_story_links, DEFAULT_SEEDS
+
+
+class TestParseSeeds:
+    """Tests de NEWS_WARMUP_SEEDS"""
+
+    def test_seeds_by_language(self):
+        seeds = parse_seeds('{"fr": ["https://fr.linkedin.com/news/"], "en": ["https://www.linkedin.com/news/", ""]}')
+        assert seeds == {"fr": ["https://fr.linkedin.com/news/"], "en": ["https://www.linkedin.com/news/"]}
+
+    def test_default_seeds_cover_fr_and_en(self):
+        assert set(parse_seeds(DEFAULT_SEEDS)) == {"fr", "en"}
+        assert parse_seeds("") == {}
+
+    def test_invalid_or_missing(self):
+        assert parse_seeds(None) == {}
+        assert parse_seeds("pas du json") == {}
+        assert parse_seeds('["https://www.linkedin.com/news/"]') == {}
+
+
+class TestExtractStoryLinks:
+    """Tests de l'extraction des liens d'une page d'index"""
+
+    HTML = """
+    <html><body>
+      <nav><a href="/feed/">Fil</a></nav>
+      <a href="/news/story/ia-generative-6543/">IA générative</a>
+      <a href="https://fr.linkedin.com/news/story/marche-emploi-1234/?trk=news">Emploi</a>
+      <a href="/news/story/ia-generative-6543/">IA générative (bis)</a>
+      <a href="/in/someone/">Profil</a>
+    </body></html>
+    """
+
+    def test_story_links_are_absolute_and_unique(self):
+        links = extract_story_links(self.HTML, "https://fr.linkedin.com/news/")
+        assert links == [
+            "https://fr.linkedin.com/news/story/ia-generative-6543/",
+            "https://fr.linkedin.com/news/story/marche-emploi-1234/?trk=news",
+        ]
+
+    def test_limit_and_empty_page(self):
+        assert len(extract_story_links(self.HTML, "https://fr.linkedin.com/news/", limit=1)) == 1
+        assert extract_story_links("", "https://fr.linkedin.com/news/") == []
+
+
+class TestWarmupDatabase:
+    """Réservation des cycles et préchargement des index (PostgreSQL)"""
+
+    def test_one_worker_claims_each_cycle(self, news_database):
+        async def run():
+            async with news_database() as db:
+                workers = [NewsWarmupScheduler() for _ in range(4)]
+                async with db.pool.acquire() as conn:
+                    await workers[0].initialize_schema(conn)
+                first = await asyncio.gather(*(worker.claim_cycle() for worker in workers))
+
+                # Cycle suivant: le précédent date de plus d'un intervalle
+                await db.pool.execute("UPDATE news_warmup_state SET started_at = NOW() - INTERVAL '7 hours'")
+                second = await asyncio.gather(*(worker.claim_cycle() for worker in workers))
+                return first, second
+
+        first, second = asyncio.run(run())
+        assert first.count(True) == 1
+        assert second.count(True) == 1
+
+    def test_warm_indexes_never_builds_indexes(self, news_database, monkeypatch):
+        async def fail(*args, **kwargs):
+            raise AssertionError("ensure_indexes ne doit pas être appelé")
+
+        monkeypatch.setattr(news_index_manager, "ensure_indexes", fail)
+        monkeypatch.setattr(news_index_manager, "active_indexes", {})
+
+        async def run():
+            async with news_database() as db:
+                warmup = NewsWarmupScheduler()
+                # Sous le seuil: scan exact, rien à précharger
+                await db.pool.execute(
+                    "INSERT INTO news_index_state (lang, index_name, index_type) VALUES ('en', NULL, 'exact')"
+                )
+                nothing = await warmup.warm_indexes()
+
+                await db.pool.execute(
+                    "INSERT INTO news_index_state (lang, index_name, index_type) VALUES ('fr', 'idx', 'hnsw')"
+                )
+                await db.insert_news("https://example.com/fr", "Titre", "Résumé", "fr",
+                                     [0.1] * embedding_storage.dimensions)
+                await db.insert_news("https://example.com/en", "Title", "Summary", "en",
+                                     [0.1] * embedding_storage.dimensions)
+                return nothing, await warmup.warm_indexes()
+
+        nothing, warmed = asyncio.run(run())
+        assert nothing == {"method": None, "indexes": {}}
+        # Base de test sans pg_prewarm: repli sur une recherche, langues indexées seulement
+        assert warmed == {"method": "search", "langs": ["fr"]}
@@ -0,0 +1,21 @@
+-- Migration 003: Cycle de vie des index vectoriels de la table news
+-- Remplace l'index IVFFlat global (entraîné sur une table vide au démarrage)
+-- par des index partiels par langue gérés par NewsIndexManager (ai-service).
+
+-- L'index global est supprimé: le filtre lang était appliqué après le scan ANN
+DROP INDEX CONCURRENTLY IF EXISTS news_embedding_idx;
+
+-- État des index par langue (type, paramètres, volume au moment du build)
+CREATE TABLE IF NOT EXISTS news_index_state (
+    lang VARCHAR(10) PRIMARY KEY,
+    index_name TEXT,
+    index_type VARCHAR(20) NOT NULL,  -- 'exact', 'hnsw', 'ivfflat'
+    params JSONB,                     -- {"m": 16, "ef_construction": 64} ou {"lists": 1000}
+    row_count_at_build INT NOT NULL DEFAULT 0,
+    built_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE news_index_state IS 'État des index vectoriels partiels par langue (reconstruits selon la dérive du volume)';
+
+-- Les index partiels (news_embedding_<type>_<lang>_idx) sont créés au démarrage de
+-- l'ai-service selon le volume de chaque langue, voir modules/news/index_manager.py
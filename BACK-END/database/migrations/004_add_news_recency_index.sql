@@ -0,0 +1,11 @@
+-- Migration 004: Recherche des actualités bornée à une fenêtre de fraîcheur
+-- La recherche vectorielle ne considère que les actualités récentes d'une langue
+-- (NEWS_FRESHNESS_DAYS, 7 jours par défaut) et les classe par similarité + décroissance temporelle.
+
+-- Index composite: borne le jeu de candidats par langue et date de scraping
+CREATE INDEX IF NOT EXISTS idx_news_lang_scraped_at ON news(lang, scraped_at DESC);
+
+-- L'index par langue seule est couvert par le préfixe de l'index composite
+DROP INDEX IF EXISTS idx_news_lang;
+
+COMMENT ON INDEX idx_news_lang_scraped_at IS 'Fenêtre de fraîcheur de la recherche vectorielle (lang, scraped_at)';
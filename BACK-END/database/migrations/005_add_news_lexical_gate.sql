@@ -0,0 +1,16 @@
+-- Migration 005: Index plein texte pour le filtre lexical du mode smart-summary
+-- Si un post ne partage aucun terme avec une actualité récente, l'ai-service
+-- n'appelle pas l'API embeddings (voir modules/news/lexical_gate.py).
+
+-- Colonne générée: maintenue automatiquement à chaque INSERT / UPDATE
+ALTER TABLE news ADD COLUMN IF NOT EXISTS search_tsv tsvector
+GENERATED ALWAYS AS (
+    to_tsvector(
+        CASE WHEN lang = 'en' THEN 'english'::regconfig ELSE 'french'::regconfig END,
+        coalesce(title, '') || ' ' || coalesce(summary, '')
+    )
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_news_search_tsv ON news USING gin (search_tsv);
+
+COMMENT ON COLUMN news.search_tsv IS 'Termes du titre et du résumé (filtre lexical avant recherche vectorielle)';
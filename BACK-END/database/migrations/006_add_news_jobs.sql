@@ -0,0 +1,37 @@
+-- Migration 006: Jobs d'enregistrement asynchrone des actualités
+-- POST /news/register met les URLs inconnues en file et répond en 202;
+-- les workers de l'ai-service (voir modules/news/jobs.py) les traitent.
+
+CREATE TABLE IF NOT EXISTS news_jobs (
+    id UUID PRIMARY KEY,
+    lang VARCHAR(10) NOT NULL,
+    total INT NOT NULL,
+    known INT NOT NULL DEFAULT 0,
+    duplicates INT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    finished_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS news_job_items (
+    job_id UUID NOT NULL REFERENCES news_jobs(id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    lang VARCHAR(10) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    error TEXT,
+    enqueued_at TIMESTAMP DEFAULT NOW(),
+    claimed_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    PRIMARY KEY (job_id, url)
+);
+
+-- Une URL ne peut être en file qu'une fois, tous jobs confondus
+CREATE UNIQUE INDEX IF NOT EXISTS idx_news_job_items_active_url
+ON news_job_items(url) WHERE status IN ('pending', 'running');
+
+-- File des URLs en attente (réservation FOR UPDATE SKIP LOCKED)
+CREATE INDEX IF NOT EXISTS idx_news_job_items_pending
+ON news_job_items(enqueued_at) WHERE status = 'pending';
+
+COMMENT ON TABLE news_jobs IS 'Jobs d''enregistrement d''actualités (POST /news/register)';
+COMMENT ON TABLE news_job_items IS 'URLs en file par job: pending -> running -> done | failed';
@@ -0,0 +1,11 @@
+-- Migration 007: Empreinte du contenu scrapé
+-- Si le texte normalisé d'une actualité correspond à une ligne déjà résumée
+-- et vectorisée (même URL ou autre URL), l'ai-service réutilise son résumé et
+-- son embedding au lieu d'appeler OpenAI (voir NewsProcessor.process_url_with_retry).
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_news_content_hash
+ON news(content_hash) WHERE content_hash IS NOT NULL;
+
+COMMENT ON COLUMN news.content_hash IS 'SHA-256 du texte extrait normalisé (NFKC, casse, espaces)';
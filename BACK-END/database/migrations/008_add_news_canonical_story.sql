@@ -0,0 +1,12 @@
+-- Migration 008: Regroupement des quasi-doublons d'actualités
+-- Une même histoire publiée sous plusieurs URLs (slug, langue) est rattachée à
+-- l'actualité canonique: la ligne du doublon n'a pas d'embedding et n'apparaît
+-- donc pas dans la recherche vectorielle (voir NewsProcessor.process_url_with_retry).
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS canonical_id INT
+REFERENCES news(id) ON DELETE SET NULL;
+
+CREATE INDEX IF NOT EXISTS idx_news_canonical_id
+ON news(canonical_id) WHERE canonical_id IS NOT NULL;
+
+COMMENT ON COLUMN news.canonical_id IS 'Actualité canonique si cette URL est un quasi-doublon (NULL sinon)';
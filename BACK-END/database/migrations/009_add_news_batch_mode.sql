@@ -0,0 +1,33 @@
+-- Migration 009: Mode différé des résumés d'actualités (API Batch OpenAI)
+-- Avec NEWS_PROCESSING_MODE=batch, l'actualité est enregistrée sans résumé
+-- (summary_status = 'pending') et son texte attend dans news_batch_items;
+-- NewsBatchProcessor soumet les batchs et applique les résultats en bloc.
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS summary_status VARCHAR(20) NOT NULL DEFAULT 'done';
+
+CREATE TABLE IF NOT EXISTS news_batches (
+    id TEXT PRIMARY KEY,
+    stage VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'in_progress',
+    item_count INT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    completed_at TIMESTAMP,
+    error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS news_batch_items (
+    news_id INT PRIMARY KEY REFERENCES news(id) ON DELETE CASCADE,
+    lang VARCHAR(10) NOT NULL,
+    content TEXT NOT NULL,
+    content_hash TEXT,
+    stage VARCHAR(20) NOT NULL DEFAULT 'summary',
+    batch_id TEXT REFERENCES news_batches(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_news_batch_items_unassigned
+ON news_batch_items(stage, created_at) WHERE batch_id IS NULL;
+
+COMMENT ON COLUMN news.summary_status IS 'pending: résumé en attente d''un batch OpenAI, summarized: embedding en attente, done: traité';
+COMMENT ON TABLE news_batches IS 'Batchs OpenAI soumis (id = identifiant OpenAI)';
+COMMENT ON TABLE news_batch_items IS 'Actualités en attente de résumé ou d''embedding différé';
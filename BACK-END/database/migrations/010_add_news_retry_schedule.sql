@@ -0,0 +1,11 @@
+-- Migration 010: Reprise différée des actualités en échec
+-- Un échec de traitement incrémente retry_count et programme next_retry_at
+-- (backoff exponentiel); NewsRetryScheduler réserve les URLs dues par
+-- FOR UPDATE SKIP LOCKED. NULL: aucune reprise prévue (succès ou abandon).
+
+ALTER TABLE news ADD COLUMN IF NOT EXISTS next_retry_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_news_next_retry_at
+ON news(next_retry_at) WHERE next_retry_at IS NOT NULL AND processed = FALSE;
+
+COMMENT ON COLUMN news.next_retry_at IS 'Date de la prochaine tentative de traitement (NULL si aucune)';
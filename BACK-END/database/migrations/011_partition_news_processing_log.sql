@@ -0,0 +1,186 @@
+-- Migration 011: Partitionnement mensuel de news_processing_log
+-- Une ligne par succès, échec et tentative, sans rétention jusqu'ici.
+-- La table devient partitionnée par mois sur created_at (comme analytics.events):
+-- - news_create_log_partitions(months_ahead, from_date): de from_date au mois
+--   courant + 2 mois d'avance; les lignes du mois présentes dans DEFAULT sont
+--   déplacées dans la nouvelle partition avant son rattachement
+-- - news_purge_log_partitions(retention_days): DROP des mois hors rétention
+-- - news_processing_daily: compteurs journaliers par statut (trigger par instruction),
+--   lus par NewsDatabase.get_stats_from_db au lieu de parcourir les tables
+-- Les lignes existantes dans la rétention (90 jours) sont recopiées.
+
+-- 1. Mise de côté de la table non partitionnée
+DO $$
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('news_processing_log')) = 'r' THEN
+        ALTER TABLE news_processing_log RENAME TO news_processing_log_legacy;
+        ALTER SEQUENCE IF EXISTS news_processing_log_id_seq RENAME TO news_processing_log_legacy_id_seq;
+        DROP INDEX IF EXISTS idx_news_processing_url;
+        DROP INDEX IF EXISTS idx_news_processing_status;
+        DROP INDEX IF EXISTS idx_news_processing_created_at;
+    END IF;
+END;
+$$;
+
+-- 2. Table partitionnée (la clé primaire inclut la clé de partition)
+CREATE TABLE IF NOT EXISTS news_processing_log (
+    id BIGSERIAL,
+    url TEXT NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    duration_ms FLOAT,
+    error_message TEXT,
+    metadata JSONB,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS news_processing_log_default
+    PARTITION OF news_processing_log DEFAULT;
+
+-- Un seul index (consultation par URL); la date est couverte par l'élagage des partitions
+CREATE INDEX IF NOT EXISTS idx_news_processing_log_url
+    ON news_processing_log(url, created_at DESC);
+
+-- 3. Création et purge des partitions
+DROP FUNCTION IF EXISTS news_create_log_partitions(INTEGER);
+
+CREATE OR REPLACE FUNCTION news_create_log_partitions(
+    months_ahead INTEGER DEFAULT 2,
+    from_date DATE DEFAULT CURRENT_DATE
+)
+RETURNS INTEGER AS $$
+DECLARE
+    month_start DATE := DATE_TRUNC('month', from_date)::date;
+    last_month DATE := (DATE_TRUNC('month', CURRENT_DATE) + make_interval(months => months_ahead))::date;
+    month_end DATE;
+    partition_name TEXT;
+    created INTEGER := 0;
+BEGIN
+    -- Mois de from_date jusqu'au mois courant + months_ahead
+    WHILE month_start <= last_month LOOP
+        month_end := (month_start + INTERVAL '1 month')::date;
+        partition_name := 'news_processing_log_' || TO_CHAR(month_start, 'YYYY_MM');
+        IF to_regclass(partition_name) IS NULL THEN
+            -- Les lignes du mois déjà tombées dans DEFAULT empêcheraient la création:
+            -- elles sont déplacées dans la nouvelle table avant son rattachement
+            -- (verrou: aucune insertion dans DEFAULT entre le déplacement et l'ATTACH)
+            LOCK TABLE news_processing_log_default IN ACCESS EXCLUSIVE MODE;
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE news_processing_log INCLUDING DEFAULTS)',
+                partition_name
+            );
+            EXECUTE format(
+                'WITH moved AS ('
+                '    DELETE FROM news_processing_log_default'
+                '    WHERE created_at >= %L AND created_at < %L RETURNING *'
+                ') INSERT INTO %I SELECT * FROM moved',
+                month_start, month_end, partition_name
+            );
+            EXECUTE format(
+                'ALTER TABLE news_processing_log ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, month_end
+            );
+            created := created + 1;
+        END IF;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION news_purge_log_partitions(retention_days INTEGER DEFAULT 90)
+RETURNS INTEGER AS $$
+DECLARE
+    partition_record RECORD;
+    cutoff DATE := DATE_TRUNC('month', CURRENT_DATE - retention_days)::date;
+    dropped INTEGER := 0;
+BEGIN
+    -- Mois entièrement antérieurs à la rétention
+    FOR partition_record IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'news_processing_log'::regclass
+          AND c.relname ~ '^news_processing_log_[0-9]{4}_[0-9]{2}$'
+    LOOP
+        IF TO_DATE(RIGHT(partition_record.relname, 7), 'YYYY_MM') < cutoff THEN
+            EXECUTE format('DROP TABLE %I', partition_record.relname);
+            dropped := dropped + 1;
+        END IF;
+    END LOOP;
+
+    -- Lignes arrivées dans la partition par défaut (mois sans partition)
+    DELETE FROM news_processing_log_default WHERE created_at < cutoff;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Mois repris de l'historique (étape 5) + mois courant et 2 mois d'avance
+SELECT news_create_log_partitions(2, (DATE_TRUNC('month', CURRENT_DATE - 90))::date);
+
+-- 4. Compteurs journaliers pré-agrégés
+CREATE TABLE IF NOT EXISTS news_processing_daily (
+    day DATE NOT NULL,
+    status VARCHAR(50) NOT NULL,
+    events BIGINT NOT NULL DEFAULT 0,
+    total_duration_ms DOUBLE PRECISION NOT NULL DEFAULT 0,
+    timed_events BIGINT NOT NULL DEFAULT 0,
+    last_at TIMESTAMP,
+    PRIMARY KEY (day, status)
+);
+
+CREATE OR REPLACE FUNCTION news_processing_daily_refresh()
+RETURNS trigger AS $$
+BEGIN
+    INSERT INTO news_processing_daily AS d (day, status, events, total_duration_ms, timed_events, last_at)
+    SELECT created_at::date, status, count(*), coalesce(sum(duration_ms), 0), count(duration_ms), max(created_at)
+    FROM new_rows
+    GROUP BY 1, 2
+    ON CONFLICT (day, status) DO UPDATE
+    SET events = d.events + EXCLUDED.events,
+        total_duration_ms = d.total_duration_ms + EXCLUDED.total_duration_ms,
+        timed_events = d.timed_events + EXCLUDED.timed_events,
+        last_at = GREATEST(d.last_at, EXCLUDED.last_at);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- 5. Reprise de l'historique: compteurs sur tout l'historique, lignes dans la rétention
+DO $$
+BEGIN
+    IF to_regclass('news_processing_log_legacy') IS NOT NULL THEN
+        INSERT INTO news_processing_daily (day, status, events, total_duration_ms, timed_events, last_at)
+        SELECT created_at::date, status, count(*), coalesce(sum(duration_ms), 0), count(duration_ms), max(created_at)
+        FROM news_processing_log_legacy
+        WHERE created_at IS NOT NULL
+        GROUP BY 1, 2
+        ON CONFLICT (day, status) DO NOTHING;
+
+        INSERT INTO news_processing_log (url, status, duration_ms, error_message, metadata, created_at)
+        SELECT url, status, duration_ms, error_message, metadata, created_at
+        FROM news_processing_log_legacy
+        WHERE created_at >= DATE_TRUNC('month', CURRENT_DATE - 90);
+
+        DROP TABLE news_processing_log_legacy;
+    END IF;
+END;
+$$;
+
+-- Trigger créé après la reprise (les lignes recopiées sont déjà comptées)
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'trg_news_processing_daily'
+          AND tgrelid = 'news_processing_log'::regclass
+    ) THEN
+        CREATE TRIGGER trg_news_processing_daily
+            AFTER INSERT ON news_processing_log
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION news_processing_daily_refresh();
+    END IF;
+END;
+$$;
+
+COMMENT ON TABLE news_processing_log IS 'Logs de traitement des actualités, partitionnés par mois (rétention NEWS_LOG_RETENTION_DAYS)';
+COMMENT ON TABLE news_processing_daily IS 'Compteurs journaliers par statut alimentés par trigger sur news_processing_log';
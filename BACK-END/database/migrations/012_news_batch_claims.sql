@@ -0,0 +1,11 @@
+-- Migration 012: Réservation des articles et plafond de reprise en mode batch
+-- NewsBatchProcessor réserve les articles (FOR UPDATE SKIP LOCKED) sous un
+-- batch provisoire (status = 'submitting') avant l'appel à OpenAI, puis le
+-- remplace par l'identifiant OpenAI. attempts compte les batchs terminés sans
+-- résultat pour l'article; au-delà de NEWS_BATCH_MAX_ATTEMPTS il quitte la file.
+
+ALTER TABLE news_batch_items ADD COLUMN IF NOT EXISTS attempts INT NOT NULL DEFAULT 0;
+
+COMMENT ON COLUMN news_batch_items.attempts IS 'Batchs terminés sans résultat pour cet article';
+COMMENT ON COLUMN news.summary_status IS 'pending: résumé en attente d''un batch OpenAI, summarized: embedding en attente, done: traité, failed: abandonné après NEWS_BATCH_MAX_ATTEMPTS batchs';
+COMMENT ON COLUMN news_batches.status IS 'submitting: articles réservés, soumission en cours (id provisoire claim-...); sinon statut OpenAI suivi';
@@ -0,0 +1,14 @@
+-- Migration 013: Préchargement des actualités (NewsWarmupScheduler)
+-- pg_prewarm est créée ici (droits superutilisateur) et non plus par le service:
+-- le préchargement vérifie seulement sa présence et charge les index vectoriels
+-- partiels par langue. Sans l'extension, repli sur une recherche par langue.
+-- news_warmup_state réserve chaque cycle pour un seul worker.
+
+CREATE EXTENSION IF NOT EXISTS pg_prewarm;
+
+CREATE TABLE IF NOT EXISTS news_warmup_state (
+    id INT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    started_at TIMESTAMP NOT NULL
+);
+
+COMMENT ON TABLE news_warmup_state IS 'Date du dernier cycle de préchargement (une ligne, réservée par le worker qui le lance)';
@@ -0,0 +1,29 @@
+"""Add encryption_key_rotations table
+
+Checkpoint du job de re-chiffrement (utils/key_rotation.py): une ligne par clé
+cible, avec le dernier id de users traité pour reprendre un job interrompu.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '012_add_encryption_key_rotations'
+down_revision = '011_create_usage_trends_weekly_and_refresh'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'encryption_key_rotations',
+        sa.Column('key_id', sa.String(32), primary_key=True),
+        sa.Column('last_user_id', sa.String(36), nullable=True),
+        sa.Column('rows_scanned', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rows_rotated', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('encryption_key_rotations')
@@ -3,12 +3,17 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass
 import os
+import uuid
 from typing import Optional
 import logging
+import httpx
 
 from database import get_db
-from models import User
+from models import User, RoleType
+from utils.user_cache import user_snapshot_cache, UserSnapshot
+from utils.google_auth import google_token_verifier, GoogleTokenError
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
@@ -29,19 +34,37 @@ def find_user_by_email(db: Session, email: str) -> Optional[User]:
             return user
     return None
 
+def get_user_snapshot(db: Session, email: str) -> Optional[UserSnapshot]:
+    """
+    Instantané (id, role, is_active) d'un utilisateur.
+
+    Servi par user_snapshot_cache; find_user_by_email n'est appelé qu'en cas
+    d'absence ou d'expiration.
+    """
+    snapshot = user_snapshot_cache.get_by_email(email)
+    if snapshot is None:
+        user = find_user_by_email(db, email)
+        if user is None:
+            return None
+        snapshot = user_snapshot_cache.put(user, email)
+    return snapshot
+
 SECRET_KEY = os.getenv("JWT_SECRET", "your-secret-key-here")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.getenv("JWT_EXPIRATION_HOURS", "24"))
+# Désactivable si les claims ne doivent jamais remplacer la lecture en base
+CLAIMS_FAST_PATH = os.getenv("AUTH_CLAIMS_FAST_PATH", "true").lower() == "true"
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Créer un token JWT"""
     to_encode = data.copy()
+    now = datetime.now(timezone.utc)
     if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.now(timezone.utc) + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+        expire = now + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -73,7 +96,22 @@ async def get_current_user(
     payload = verify_token(token)
 
     user_email = payload.get("sub")
-    user = find_user_by_email(db, user_email)
+    snapshot = user_snapshot_cache.get_by_email(user_email)
+    if snapshot is not None and not snapshot.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Compte utilisateur inactif",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Instantané en cache: chargement par clé primaire au lieu du parcours par email
+    user = db.get(User, snapshot.id) if snapshot is not None else None
+    if user is None:
+        user = find_user_by_email(db, user_email)
+        if user is not None:
+            user_snapshot_cache.put(user, user_email)
+        elif snapshot is not None:
+            user_snapshot_cache.invalidate(snapshot.id, publish=False)
 
     if user is None:
         raise HTTPException(
@@ -91,6 +129,95 @@ async def get_current_user(
 
     return user
 
+@dataclass(frozen=True)
+class TokenClaims:
+    """
+    Identité, rôle et dates de trial portés par un JWT signé.
+
+    Expose les mêmes attributs que User pour ces champs (TrialManager.get_trial_status
+    accepte l'un ou l'autre).
+    """
+    id: uuid.UUID
+    email: str
+    role: RoleType
+    trial_started_at: Optional[datetime] = None
+    trial_ends_at: Optional[datetime] = None
+    grace_ends_at: Optional[datetime] = None
+    linkedin_profile_captured_at: Optional[datetime] = None
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> Optional["TokenClaims"]:
+        """Claims d'un token émis par create_user_token (None si incomplet, ex: ancien token)."""
+        trial = payload.get("trial")
+        try:
+            if trial is None:
+                return None
+            return cls(
+                id=uuid.UUID(payload["user_id"]),
+                email=payload["sub"],
+                role=RoleType(payload["role"]),
+                **{field: _parse_claim_date(trial.get(field)) for field in TRIAL_CLAIMS}
+            )
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return None
+
+    @classmethod
+    def from_user(cls, user: User) -> "TokenClaims":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            **{field: getattr(user, field) for field in TRIAL_CLAIMS}
+        )
+
+    def transition_due(self) -> bool:
+        """Fin de trial ou de grâce atteinte: TrialManager doit faire la transition en base."""
+        now = datetime.now(timezone.utc)
+        if self.role == RoleType.PREMIUM and self.trial_ends_at and self.trial_ends_at <= now:
+            return True
+        if self.role == RoleType.MEDIUM and self.grace_ends_at and self.grace_ends_at <= now:
+            return True
+        return False
+
+
+TRIAL_CLAIMS = ("trial_started_at", "trial_ends_at", "grace_ends_at", "linkedin_profile_captured_at")
+
+
+def _parse_claim_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+async def get_current_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> TokenClaims:
+    """
+    Variante de get_current_user pour les endpoints en lecture: identité et rôle
+    lus dans les claims signés, sans accès base.
+
+    Repli sur get_current_user (chargement de l'utilisateur) si:
+    - le token est antérieur au dernier changement de l'utilisateur (rôle,
+      activation, trial) connu de user_snapshot_cache (synchronisé par Redis)
+    - les changements des autres workers ne sont pas connus (Redis coupé), ou
+      un changement local n'a pas encore pu être publié aux autres workers
+    - le token ne porte pas tous les claims (émis avant leur ajout)
+    """
+    payload = verify_token(credentials.credentials)
+    claims = TokenClaims.from_payload(payload)
+    if (
+        claims is None
+        or not CLAIMS_FAST_PATH
+        or not user_snapshot_cache.changes_synced
+        or user_snapshot_cache.changed_since(claims.id, payload.get("iat", 0))
+    ):
+        user = await get_current_user(credentials, db)
+        return TokenClaims.from_user(user)
+    return claims
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Récupérer l'utilisateur actuel actif"""
     if not current_user.is_active:
@@ -106,76 +233,33 @@ def create_user_token(user: User) -> str:
         "sub": user.email,
         "user_id": str(user.id),
         "role": user.role.value,
-        "name": user.name
+        "name": user.name,
+        # Dates de trial pour get_current_claims (/api/trial/status sans accès base)
+        "trial": {
+            field: getattr(user, field).isoformat() if getattr(user, field) else None
+            for field in TRIAL_CLAIMS
+        }
     }
     return create_access_token(token_data)
 
-def verify_google_token(google_token: str) -> dict:
-    """Vérifier un token Google avec l'API Google"""
+async def verify_google_token(google_token: str) -> dict:
+    """
+    Vérifier un token Google (ID token vérifié localement, access token via userinfo).
+
+    Voir utils.google_auth: clés publiques Google en cache, client HTTP partagé.
+    """
     try:
-        from google.oauth2 import id_token
-        from google.auth.transport import requests
-        
-        GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
-        if not GOOGLE_CLIENT_ID:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Configuration Google OAuth manquante"
-            )
-        
-        # Vérifier le token avec Google
-        idinfo = id_token.verify_oauth2_token(
-            google_token, requests.Request(), GOOGLE_CLIENT_ID
-        )
-        
-        # Vérifier que le token est bien pour notre application
-        if idinfo['aud'] != GOOGLE_CLIENT_ID:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token Google invalide - audience incorrecte"
-            )
-        
-        return {
-            "email": idinfo.get("email"),
-            "name": idinfo.get("name"),
-            "sub": idinfo.get("sub"),
-            "picture": idinfo.get("picture"),
-            "email_verified": idinfo.get("email_verified", False)
-        }
-        
-    except ImportError:
-        # Si la lib google n'est pas installée, on utilise un fallback pour les tests
-        import jwt
-        try:
-            # Tentative de décodage basique (sans vérification de signature pour les tests)
-            decoded = jwt.decode(google_token, options={"verify_signature": False})
-            return {
-                "email": decoded.get("email", "test@example.com"),
-                "name": decoded.get("name", "Test User"),
-                "sub": decoded.get("sub", "test_user_id"),
-                "picture": decoded.get("picture"),
-                "email_verified": True
-            }
-        except:
-            # En dernier recours, token de test fixe
-            if google_token == "test_token":
-                return {
-                    "email": "test@example.com",
-                    "name": "Test User",
-                    "sub": "test_user_id",
-                    "picture": None,
-                    "email_verified": True
-                }
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token Google invalide - impossible de vérifier"
-            )
-    
-    except Exception as e:
+        return await google_token_verifier.verify(google_token)
+    except GoogleTokenError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token Google invalide: {str(e)}"
         )
+    except httpx.HTTPError:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur lors de la vérification du token Google"
+        )
 
 class AuthManager:
     """Gestionnaire d'authentification"""
@@ -10,10 +10,13 @@ from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 
 from database import engine, Base, get_db
-from routers import users, subscriptions, permissions, auth, stripe, blacklist, admin, analytics, trial
+from routers import users, subscriptions, permissions, auth, stripe, blacklist, admin, analytics, trial, bootstrap
 from utils.partition_manager import create_analytics_partitions, purge_old_analytics
 from utils.trial_manager import check_trial_expirations
 from utils.materialized_view_refresh import refresh_admin_materialized_views
+from utils.user_cache import user_snapshot_cache
+from utils.google_auth import google_token_verifier
+from utils.encrypted_types import shutdown_decrypt_pool
 from version import VERSION
 from health.analytics_checks import check_events_volume, check_future_partitions
 
@@ -71,9 +74,15 @@ async def lifespan(app: FastAPI):
     scheduler.start()
     logger.info("scheduler_started", service="user-service", version=VERSION)
 
+    # Invalidations du cache utilisateur entre workers (Redis pub/sub)
+    user_snapshot_cache.start()
+
     yield
 
     # Shutdown
+    await user_snapshot_cache.stop()
+    await google_token_verifier.close()
+    shutdown_decrypt_pool()
     scheduler.shutdown()
     logger.info("scheduler_stopped", service="user-service")
 
@@ -95,6 +104,7 @@ app.add_middleware(
     allow_credentials=cors_credentials,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # /api/bootstrap: revalidation If-None-Match
 )
 
 app.include_router(users.router, prefix="/api/users", tags=["users"])
@@ -106,6 +116,7 @@ app.include_router(blacklist.router, prefix="/api/blacklist", tags=["blacklist"]
 app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
 app.include_router(trial.router, prefix="/api/trial", tags=["trial"])
+app.include_router(bootstrap.router, prefix="/api/bootstrap", tags=["bootstrap"])
 
 @app.get("/health")
 async def health_check():
@@ -6,7 +6,7 @@ import uuid
 import enum
 import hashlib
 from database import Base
-from utils.encrypted_types import EncryptedString
+from utils.encrypted_types import EncryptedString, encrypted_column
 
 class RoleType(str, enum.Enum):
     FREE = "FREE"
@@ -23,9 +23,10 @@ class User(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     # Colonnes chiffrées pour la sécurité des données personnelles
-    email = Column(EncryptedString(512), unique=True, nullable=False, index=True)
-    name = Column(EncryptedString(512))
-    google_id = Column(EncryptedString(512), unique=True, index=True)
+    # (déchiffrées au premier accès à email/name/google_id, voir encrypted_column)
+    _email = Column("email", EncryptedString(512), unique=True, nullable=False, index=True)
+    _name = Column("name", EncryptedString(512))
+    _google_id = Column("google_id", EncryptedString(512), unique=True, index=True)
     role = Column(ENUM(RoleType), default=RoleType.FREE, nullable=False)
     stripe_customer_id = Column(String(255), unique=True, nullable=True, index=True)
     stripe_subscription_id = Column(String(255), unique=True, nullable=True, index=True)
@@ -35,7 +36,7 @@ class User(Base):
     is_active = Column(Boolean, default=True)
 
     # Phase 2 — LinkedIn Profile Capture & Trial
-    linkedin_profile_id = Column(EncryptedString(512), nullable=True)  # Chiffré (RGPD)
+    _linkedin_profile_id = Column("linkedin_profile_id", EncryptedString(512), nullable=True)  # Chiffré (RGPD)
     linkedin_profile_id_hash = Column(String(64), unique=True, nullable=True, index=True)  # SHA256 en clair pour lookup rapide
     linkedin_profile_captured_at = Column(DateTime(timezone=True), nullable=True)
     trial_started_at = Column(DateTime(timezone=True), nullable=True)
@@ -43,6 +44,11 @@ class User(Base):
     grace_ends_at = Column(DateTime(timezone=True), nullable=True, index=True)
     trial_reminder_sent_at = Column(DateTime(timezone=True), nullable=True)  # Phase 04 - Garde-fou rappel J-3
 
+    email = encrypted_column("_email")
+    name = encrypted_column("_name")
+    google_id = encrypted_column("_google_id")
+    linkedin_profile_id = encrypted_column("_linkedin_profile_id")
+
     subscriptions = relationship("Subscription", back_populates="user")
     usage_logs = relationship("UsageLog", back_populates="user")
 
@@ -97,6 +103,18 @@ class RoleChangeHistory(Base):
     reason = Column(Text)  # Raison du changement (optionnel)
     meta_data = Column(JSON)  # Données supplémentaires (optionnel)
 
+class EncryptionKeyRotation(Base):
+    """Progression du re-chiffrement de users vers une clé (utils/key_rotation.py)."""
+    __tablename__ = "encryption_key_rotations"
+
+    key_id = Column(String(32), primary_key=True)  # Clé cible (principale)
+    last_user_id = Column(String(36), nullable=True)  # Dernier id traité (reprise)
+    rows_scanned = Column(Integer, default=0, nullable=False)
+    rows_rotated = Column(Integer, default=0, nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
 class StripeEvent(Base):
     __tablename__ = "stripe_events"
 
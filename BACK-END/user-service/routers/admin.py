@@ -24,7 +24,9 @@ from schemas.admin import (
 )
 from utils.admin_auth import require_admin
 from utils.role_manager import RoleManager
+from utils.user_cache import user_snapshot_cache
 from utils.cost_calculator import calculate_cost_eur
+from utils.encrypted_types import decrypt_many_async
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -98,11 +100,12 @@ async def get_token_usage(
         UsageLog.meta_data.isnot(None)
     ).all()
 
-    # Pre-charger les noms des utilisateurs (decryptes automatiquement par le modele)
+    # Pre-charger les noms des utilisateurs (dechiffres en lot, seul le nom est lu)
     user_ids = set(log.user_id for log in logs if log.meta_data)
     users_map = {}
     if user_ids:
         users = db.query(User).filter(User.id.in_(user_ids)).all()
+        await decrypt_many_async(users, "name")
         users_map = {user.id: user.name for user in users}
 
     # Agreger par user_id
@@ -320,11 +323,12 @@ async def get_users_consumption(
     """)
     consumption_result = db.execute(consumption_query, {"days": days}).fetchall()
 
-    # Recuperer les user_ids pour charger les emails decryptes via ORM
+    # Recuperer les user_ids pour charger les emails (dechiffres en lot)
     user_ids = [row.user_id for row in consumption_result]
     users_map = {}
     if user_ids:
         users = db.query(User).filter(User.id.in_(user_ids)).all()
+        await decrypt_many_async(users, "email")
         users_map = {user.id: user.email for user in users}
 
     # Construire les items
@@ -699,6 +703,8 @@ async def update_user(
         changes.append(f"is_active: {not update.is_active} -> {update.is_active}")
 
     if changes:
+        # Role, activation ou dates de trial: claims des tokens existants perimes
+        user_snapshot_cache.invalidate_on_commit(db, user.id)
         db.commit()
         db.refresh(user)
         logger.info(f"Admin {current_user.id} a modifie user {user_id}: {', '.join(changes)}")
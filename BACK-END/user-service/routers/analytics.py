@@ -7,8 +7,7 @@ import json
 import logging
 
 from database import get_db
-from auth import find_user_by_email
-from models import User
+from auth import get_user_snapshot
 from schemas.analytics import AnalyticsEventCreate, AnalyticsEventResponse
 
 logger = logging.getLogger(__name__)
@@ -22,7 +21,7 @@ async def track_event(
     db: Session = Depends(get_db)
 ):
     """Track an analytics event. Uses email for internal service-to-service auth."""
-    user = find_user_by_email(db, event.email)
+    user = get_user_snapshot(db, event.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
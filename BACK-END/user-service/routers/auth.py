@@ -3,7 +3,6 @@ from sqlalchemy.orm import Session
 from sqlalchemy import text
 from pydantic import BaseModel
 from typing import Optional
-import httpx
 import os
 import uuid
 import json
@@ -11,7 +10,7 @@ from datetime import datetime, timezone
 
 from database import get_db
 from models import User
-from auth import create_user_token, AuthManager
+from auth import create_user_token, verify_google_token, AuthManager
 from schemas.user import UserResponse
 from utils.trial_manager import TrialManager
 
@@ -33,21 +32,9 @@ async def login_with_google(
 ):
     """Connexion avec un token Google OAuth"""
     try:
-        # Vérifier le token Google en appelant l'API Google
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers={"Authorization": f"Bearer {request.google_token}"}
-            )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Token Google invalide"
-                )
-            
-            google_user_info = response.json()
-        
+        # Vérifier le token Google (ID token: signature vérifiée localement)
+        google_user_info = await verify_google_token(request.google_token)
+
         # Authentifier ou créer l'utilisateur
         is_new_user = False
         existing_user = None
@@ -62,7 +49,7 @@ async def login_with_google(
 
         user = AuthManager.authenticate_user(
             email=google_user_info["email"],
-            google_id=google_user_info.get("id") or google_user_info.get("sub"),
+            google_id=google_user_info["sub"],
             name=google_user_info.get("name"),
             db=db
         )
@@ -115,11 +102,8 @@ async def login_with_google(
             user=UserResponse.from_orm(user)
         )
         
-    except httpx.HTTPError:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Erreur lors de la vérification du token Google"
-        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
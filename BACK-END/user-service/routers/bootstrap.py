@@ -0,0 +1,124 @@
+"""
+Router FastAPI pour le demarrage de l'extension.
+
+- GET /api/bootstrap : profil, fonctionnalites du role, quota, trial et
+  configuration client en une seule reponse
+
+Remplace au demarrage les appels /config/complete, /api/users/quota-status et
+/api/trial/status. La reponse porte un ETag calcule sur l'ensemble des
+sections: l'extension renvoie If-None-Match et recoit 304 tant que rien n'a
+change (role, quota du jour, trial, configuration).
+"""
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+import hashlib
+import json
+import logging
+import os
+
+from database import get_db
+from auth import get_current_user
+from models import User
+from schemas.user import UserResponse
+from utils.feature_flags import FEATURES
+from utils.quota_manager import QuotaManager
+from utils.trial_manager import TrialManager
+from version import VERSION
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Toujours revalider: l'ETag evite de retransferer, pas de servir un etat perime
+CACHE_CONTROL = "private, no-cache"
+
+
+def get_client_config() -> dict:
+    """
+    Configuration client (sans secrets), meme forme que /config/complete de l'ai-service.
+
+    Les URLs viennent de BACKEND_EXTERNAL_URL / USER_SERVICE_EXTERNAL_URL; non
+    definies, ce sont des placeholders et l'extension recharge la configuration
+    depuis l'ai-service.
+    """
+    return {
+        "backend_version": VERSION,
+        "urls": {
+            "backend": os.getenv("BACKEND_EXTERNAL_URL", "__AI_API_URL__"),
+            "user_service": os.getenv("USER_SERVICE_EXTERNAL_URL", "__USERS_API_URL__")
+        },
+        "features": {
+            "google_auth": os.getenv("ENABLE_GOOGLE_AUTH", "true").lower() == "true",
+            "quota_enforcement": os.getenv("ENABLE_QUOTA_ENFORCEMENT", "true").lower() == "true",
+            "analytics": os.getenv("ENABLE_ANALYTICS", "true").lower() == "true"
+        },
+        "environment": os.getenv("ENVIRONMENT", "development")
+    }
+
+
+def build_bootstrap(db: Session, user: User) -> dict:
+    role_features = FEATURES.get(user.role.value, FEATURES["FREE"])
+    quota_manager = QuotaManager(db)
+
+    return {
+        "user": UserResponse.from_orm(user),
+        "features": {
+            "role": user.role.value,
+            "features": role_features,
+            "available_upgrades": [
+                role for role in ["MEDIUM", "PREMIUM"]
+                if role != user.role.value
+            ]
+        },
+        "quota": {
+            "user_id": user.id,
+            "role": user.role.value,
+            "daily_limit": role_features["daily_generations"],
+            "used_today": quota_manager.get_daily_usage(user.id),
+            "remaining": quota_manager.get_remaining_quota(user.id),
+            "reset_time": quota_manager.get_next_reset_time()
+        },
+        "trial": TrialManager.get_trial_status(user),
+        "config": get_client_config()
+    }
+
+
+def bootstrap_etag(content: dict) -> str:
+    """ETag fort sur toutes les sections (JSON canonique)."""
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"))
+    return '"' + hashlib.sha256(canonical.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparaison faible (RFC 9110): W/"x" correspond a "x"
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+@router.get("")
+async def get_bootstrap(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Etat complet de l'utilisateur pour le demarrage de l'extension"""
+    # Verification inline de l'expiration du trial (fallback cron)
+    try:
+        TrialManager.check_user_trial_inline(db, current_user)
+        db.refresh(current_user)
+    except Exception as e:
+        logger.warning(f"Fallback trial check failed for user {current_user.id}: {e}")
+
+    content = jsonable_encoder(build_bootstrap(db, current_user))
+    etag = bootstrap_etag(content)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return JSONResponse(content=content, headers=headers)
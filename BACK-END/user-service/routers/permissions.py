@@ -6,7 +6,7 @@ from pydantic import BaseModel
 from database import get_db
 from models import User, UsageLog
 from schemas.user import PermissionsResponse, FeatureAccess, QuotaStatus
-from auth import get_current_user, find_user_by_email
+from auth import get_current_user, get_current_claims, get_user_snapshot, TokenClaims
 from utils.quota_manager import QuotaManager
 from utils.feature_flags import FEATURES
 
@@ -50,7 +50,7 @@ async def validate_action(
     db: Session = Depends(get_db)
 ):
     """Valider une action spécifique pour un utilisateur donné"""
-    user = find_user_by_email(db, request.email)
+    user = get_user_snapshot(db, request.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,7 +136,7 @@ async def record_usage(
     db: Session = Depends(get_db)
 ):
     """Enregistrer l'utilisation d'une fonctionnalité après une action réussie"""
-    user = find_user_by_email(db, request.email)
+    user = get_user_snapshot(db, request.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -165,7 +165,7 @@ async def record_usage(
 @router.get("/feature-access/{feature_name}", response_model=FeatureAccess)
 async def check_feature_access(
     feature_name: str,
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     """Vérifier l'accès à une fonctionnalité spécifique"""
     role_features = FEATURES.get(current_user.role.value, FEATURES["FREE"])
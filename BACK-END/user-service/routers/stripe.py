@@ -9,6 +9,7 @@ from datetime import datetime
 from database import get_db
 from models import User, StripeEvent, RoleType
 from auth import get_current_user
+from utils.user_cache import user_snapshot_cache
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
@@ -248,6 +249,7 @@ async def handle_checkout_completed(event: dict, db: Session):
             user.role = RoleType.MEDIUM
         elif plan == 'premium':
             user.role = RoleType.PREMIUM
+        user_snapshot_cache.invalidate_on_commit(db, user.id)
 
         # Phase 2 — Neutraliser le trial si l'utilisateur passe en payant
         if user.trial_ends_at is not None:
@@ -293,6 +295,7 @@ async def handle_invoice_paid(event: dict, db: Session):
         if user.trial_ends_at is not None:
             user.trial_ends_at = None
             user.grace_ends_at = None
+            user_snapshot_cache.invalidate_on_commit(db, user.id)
 
         db.commit()
 
@@ -359,6 +362,7 @@ async def handle_subscription_updated(event: dict, db: Session):
         if status in ['canceled', 'unpaid', 'incomplete_expired']:
             user.role = RoleType.FREE
             logger.info(f"Utilisateur {user.id} rétrogradé vers FREE suite à statut: {status}")
+            user_snapshot_cache.invalidate_on_commit(db, user.id)
 
         db.commit()
 
@@ -392,6 +396,7 @@ async def handle_subscription_deleted(event: dict, db: Session):
         user.role = RoleType.FREE
         user.subscription_status = 'canceled'
         user.stripe_subscription_id = None
+        user_snapshot_cache.invalidate_on_commit(db, user.id)
 
         db.commit()
 
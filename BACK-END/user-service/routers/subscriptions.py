@@ -7,8 +7,9 @@ from database import get_db
 from models import User, Subscription, UsageLog, RoleType
 from schemas.subscription import SubscriptionCreate, SubscriptionUpdate, SubscriptionResponse, UpgradeRequest, UsageLogResponse
 from schemas.user import RoleEnum
-from auth import get_current_user
+from auth import get_current_user, get_current_claims, TokenClaims
 from utils.feature_flags import FEATURES
+from utils.user_cache import user_snapshot_cache
 
 router = APIRouter()
 
@@ -72,6 +73,7 @@ async def upgrade_subscription(
     )
     
     current_user.role = upgrade_request.target_plan
+    user_snapshot_cache.invalidate_on_commit(db, current_user.id)
     
     db.add(new_subscription)
     db.commit()
@@ -116,6 +118,7 @@ async def downgrade_subscription(
     )
     
     current_user.role = target_plan
+    user_snapshot_cache.invalidate_on_commit(db, current_user.id)
     
     db.add(new_subscription)
     db.commit()
@@ -125,7 +128,7 @@ async def downgrade_subscription(
 
 @router.get("/features")
 async def get_subscription_features(
-    current_user: User = Depends(get_current_user)
+    current_user: TokenClaims = Depends(get_current_claims)
 ):
     """Récupérer les fonctionnalités disponibles pour l'abonnement actuel"""
     role_features = FEATURES.get(current_user.role.value, FEATURES["FREE"])
@@ -10,7 +10,7 @@ from sqlalchemy.orm import Session
 import logging
 
 from database import get_db
-from auth import get_current_user
+from auth import get_current_user, get_current_claims, TokenClaims
 from models import User
 from schemas.trial import (
     LinkedInProfileCaptureRequest,
@@ -73,9 +73,17 @@ async def capture_linkedin_profile(
 
 @router.get("/status", response_model=TrialStatusResponse)
 async def get_trial_status(
-    current_user: User = Depends(get_current_user),
+    claims: TokenClaims = Depends(get_current_claims),
     db: Session = Depends(get_db)
 ):
+    # Statut calcule depuis les claims; la base n'est lue que si une
+    # transition est due (verification inline de l'expiration, fallback cron)
+    if not claims.transition_due():
+        return TrialStatusResponse(**TrialManager.get_trial_status(claims))
+
+    current_user = db.get(User, claims.id)
+    if current_user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Utilisateur non trouvé")
     TrialManager.check_user_trial_inline(db, current_user)
     db.refresh(current_user)
 
@@ -11,6 +11,7 @@ from utils.quota_manager import QuotaManager
 from utils.feature_flags import FEATURES
 from utils.role_manager import RoleManager
 from utils.trial_manager import TrialManager
+from utils.user_cache import user_snapshot_cache
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +80,8 @@ async def update_user_profile(
     # Mettre à jour les autres champs
     for field, value in update_data.items():
         setattr(current_user, field, value)
+    if 'is_active' in update_data:
+        user_snapshot_cache.invalidate_on_commit(db, current_user.id)
 
     db.commit()
     db.refresh(current_user)
@@ -30,6 +30,7 @@ from database import Base, get_db
 from models import User, RoleType
 from auth import create_user_token
 from utils.encryption import EncryptionManager
+from utils.user_cache import user_snapshot_cache
 
 # Engine SQLite in-memory avec StaticPool pour les tests
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -63,6 +64,11 @@ def receive_load(target, context):
     if target.updated_at and target.updated_at.tzinfo is None:
         target.updated_at = target.updated_at.replace(tzinfo=timezone.utc)
 
+@event.listens_for(User, "refresh")
+def receive_refresh(target, context, attrs):
+    """Idem apres db.refresh() (qui ne declenche pas l'evenement load)."""
+    receive_load(target, context)
+
 TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
 
@@ -74,6 +80,8 @@ def db():
     """
     # Creer les tables
     Base.metadata.create_all(bind=test_engine)
+    # Le cache utilisateur est global: pas d'instantane d'un test precedent
+    user_snapshot_cache.clear()
 
     # Creer une session
     session = TestSessionLocal()
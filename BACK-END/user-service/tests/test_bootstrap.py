@@ -0,0 +1,67 @@
+"""
+Tests de l'endpoint /api/bootstrap.
+
+Couvre: sections de la reponse, ETag combine et 304, changement d'etat.
+"""
+
+from auth import create_user_token
+from models import RoleType
+from utils.role_manager import RoleManager
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestBootstrap:
+    """Tests du demarrage de l'extension en un appel."""
+
+    def test_all_sections_in_one_payload(self, client, create_test_user):
+        user = create_test_user(email="alice@test.com", name="Alice", role=RoleType.MEDIUM)
+
+        response = client.get("/api/bootstrap", headers=bearer(create_user_token(user)))
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["user"]["email"] == "alice@test.com"
+        assert body["features"]["role"] == "MEDIUM"
+        assert body["quota"]["daily_limit"] == body["features"]["features"]["daily_generations"]
+        assert body["quota"]["used_today"] == 0
+        assert body["trial"]["has_trial"] is False
+        assert "user_service" in body["config"]["urls"]
+        assert response.headers["etag"]
+
+    def test_repeat_call_returns_304(self, client, create_test_user):
+        headers = bearer(create_user_token(create_test_user(email="bob@test.com")))
+        etag = client.get("/api/bootstrap", headers=headers).headers["etag"]
+
+        response = client.get("/api/bootstrap", headers={**headers, "If-None-Match": f"W/{etag}"})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_role_change_changes_etag(self, client, db, create_test_user):
+        user = create_test_user(email="carol@test.com", role=RoleType.FREE)
+        headers = bearer(create_user_token(user))
+        etag = client.get("/api/bootstrap", headers=headers).headers["etag"]
+
+        RoleManager.change_user_role(db=db, user=user, new_role=RoleType.PREMIUM)
+        db.commit()
+
+        response = client.get("/api/bootstrap", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["quota"]["role"] == "PREMIUM"
+
+    def test_requires_authentication(self, client):
+        assert client.get("/api/bootstrap").status_code in (401, 403)
+
+    def test_config_urls_from_environment(self, client, create_test_user, monkeypatch):
+        monkeypatch.setenv("BACKEND_EXTERNAL_URL", "https://ai.example.com")
+        monkeypatch.setenv("USER_SERVICE_EXTERNAL_URL", "https://users.example.com")
+        headers = bearer(create_user_token(create_test_user(email="dave@test.com")))
+
+        urls = client.get("/api/bootstrap", headers=headers).json()["config"]["urls"]
+
+        assert urls == {"backend": "https://ai.example.com", "user_service": "https://users.example.com"}
@@ -0,0 +1,134 @@
+"""
+Tests de l'authentification par claims (get_current_claims).
+
+Couvre: endpoints en lecture sans acces base, repli apres changement de role
+ou desactivation, anciens tokens, statut trial depuis les claims.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+from auth import create_access_token, create_user_token
+from models import RoleType
+from utils.role_manager import RoleManager
+from utils.user_cache import user_snapshot_cache
+from tests.conftest import test_engine
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine, "before_cursor_execute", record)
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestClaimsFastPath:
+    """Tests des endpoints servis depuis les claims."""
+
+    def test_features_without_database(self, client, auth_headers):
+        headers = auth_headers(email="alice@test.com", role=RoleType.MEDIUM)
+
+        with count_queries() as statements:
+            response = client.get("/api/subscriptions/features", headers=headers)
+            access = client.get("/api/permissions/feature-access/custom_prompt", headers=headers)
+
+        assert response.status_code == 200 and access.status_code == 200
+        assert response.json()["role"] == "MEDIUM"
+        assert statements == []
+
+    def test_role_change_falls_back_to_database(self, client, db, create_test_user):
+        user = create_test_user(email="bob@test.com", role=RoleType.PREMIUM)
+        headers = bearer(create_user_token(user))
+
+        RoleManager.change_user_role(db=db, user=user, new_role=RoleType.FREE)
+        db.commit()
+
+        with count_queries() as statements:
+            response = client.get("/api/subscriptions/features", headers=headers)
+
+        assert response.json()["role"] == "FREE"
+        assert statements != []
+
+    def test_deactivated_user_rejected(self, client, db, create_test_user):
+        user = create_test_user(email="carol@test.com")
+        headers = bearer(create_user_token(user))
+
+        user.is_active = False
+        user_snapshot_cache.invalidate_on_commit(db, user.id)
+        db.commit()
+
+        assert client.get("/api/permissions/feature-access/custom_prompt", headers=headers).status_code == 401
+
+    def test_token_without_claims_uses_database(self, client, create_test_user):
+        user = create_test_user(email="dave@test.com", role=RoleType.PREMIUM)
+        token = create_access_token({"sub": user.email, "user_id": str(user.id), "role": "PREMIUM"})
+
+        with count_queries() as statements:
+            response = client.get("/api/subscriptions/features", headers=bearer(token))
+
+        assert response.json()["role"] == "PREMIUM"
+        assert statements != []
+
+    def test_unsynced_changes_use_database(self, client, auth_headers):
+        headers = auth_headers(email="erin@test.com")
+
+        # Redis configure mais abonnement inactif: changements des autres workers inconnus
+        with patch.object(user_snapshot_cache, "redis_url", "redis://unused"), count_queries() as statements:
+            assert client.get("/api/subscriptions/features", headers=headers).status_code == 200
+
+        assert statements != []
+
+
+class TestTrialStatusFromClaims:
+    """Tests de /api/trial/status."""
+
+    def test_active_trial_without_database(self, client, create_test_user):
+        now = datetime.now(timezone.utc)
+        user = create_test_user(
+            email="frank@test.com",
+            role=RoleType.PREMIUM,
+            linkedin_profile_id="https://linkedin.com/in/frank",
+            trial_started_at=now - timedelta(days=2),
+            trial_ends_at=now + timedelta(days=28),
+        )
+        headers = bearer(create_user_token(user))
+
+        with count_queries() as statements:
+            response = client.get("/api/trial/status", headers=headers)
+
+        body = response.json()
+        assert body["trial_active"] is True
+        assert body["has_linkedin_profile"] is True
+        assert statements == []
+
+    def test_due_transition_goes_through_database(
+        self, client, create_test_user, mock_track_trial_event, mock_send_trial_email
+    ):
+        now = datetime.now(timezone.utc)
+        user = create_test_user(
+            email="grace@test.com",
+            role=RoleType.PREMIUM,
+            linkedin_profile_id="https://linkedin.com/in/grace",
+            trial_started_at=now - timedelta(days=31),
+            trial_ends_at=now - timedelta(hours=1),
+        )
+        headers = bearer(create_user_token(user))
+
+        body = client.get("/api/trial/status", headers=headers).json()
+
+        assert body["role"] == "MEDIUM"
+        assert body["grace_active"] is True
@@ -0,0 +1,97 @@
+"""
+Tests du dechiffrement paresseux des colonnes EncryptedString.
+
+Couvre: dechiffrement au premier acces, memorisation, ecriture, decrypt_many.
+"""
+
+import asyncio
+from unittest.mock import patch
+from sqlalchemy import text
+
+from models import User
+from utils import encrypted_types
+from utils.encrypted_types import Ciphertext, decrypt_many, decrypt_many_async
+from utils.encryption import encryption_manager
+
+
+def reload_users(db):
+    db.expire_all()
+    return db.query(User).order_by(User.created_at).all()
+
+
+class TestLazyDecryption:
+    """Tests de l'attribut en clair encrypted_column."""
+
+    def test_loaded_values_stay_encrypted_until_read(self, db, create_test_user):
+        create_test_user(email="alice@test.com", name="Alice")
+        user = reload_users(db)[0]
+
+        with patch.object(encryption_manager, "decrypt", wraps=encryption_manager.decrypt) as decrypt:
+            assert user.role is not None
+            assert decrypt.call_count == 0
+            assert isinstance(user.__dict__["_email"], Ciphertext)
+
+            assert user.email == "alice@test.com"
+            assert user.email == "alice@test.com"
+            assert decrypt.call_count == 1
+
+        # La valeur memorisee ne rend pas l'instance "modifiee"
+        assert user not in db.dirty
+
+    def test_stored_value_is_encrypted(self, db, create_test_user):
+        create_test_user(email="bob@test.com")
+        stored = db.execute(text("SELECT email FROM users")).scalar()
+        assert stored != "bob@test.com"
+        assert encryption_manager.decrypt(stored) == "bob@test.com"
+
+    def test_write_after_lazy_read(self, db, create_test_user):
+        create_test_user(email="carol@test.com", name="Carol")
+        user = reload_users(db)[0]
+        user.name = "Caroline"
+        db.commit()
+
+        user = reload_users(db)[0]
+        assert user.name == "Caroline"
+        assert user.email == "carol@test.com"
+
+
+class TestDecryptMany:
+    """Tests du dechiffrement en lot."""
+
+    def test_serial_batch(self, db, create_test_user):
+        for i in range(3):
+            create_test_user(email=f"user{i}@test.com", name=f"User {i}")
+        users = reload_users(db)
+
+        decrypt_many(users, "email", workers=1)
+
+        with patch.object(encryption_manager, "decrypt") as decrypt:
+            assert [u.email for u in users] == [f"user{i}@test.com" for i in range(3)]
+            decrypt.assert_not_called()
+        assert isinstance(users[0].__dict__["_name"], Ciphertext)
+
+    def test_process_pool_batch(self, db, create_test_user):
+        for i in range(4):
+            create_test_user(email=f"user{i}@test.com", name=f"User {i}")
+        users = reload_users(db)
+
+        with patch("utils.encrypted_types.DECRYPT_PARALLEL_MIN", 0):
+            decrypt_many(users, "email", "name", workers=2)
+        encrypted_types.shutdown_decrypt_pool()
+
+        assert [(u.email, u.name) for u in users] == [(f"user{i}@test.com", f"User {i}") for i in range(4)]
+
+    def test_async_batch_uses_shared_pool(self, db, create_test_user):
+        for i in range(4):
+            create_test_user(email=f"user{i}@test.com", name=f"User {i}")
+        users = reload_users(db)
+
+        with patch("utils.encrypted_types.DECRYPT_PARALLEL_MIN", 0):
+            asyncio.run(decrypt_many_async(users, "email", workers=2))
+            pool = encrypted_types._decrypt_pool
+            decrypt_many(users, "name", workers=2)
+            assert encrypted_types._decrypt_pool is pool
+        encrypted_types.shutdown_decrypt_pool()
+
+        assert pool is not None
+        assert [(u.email, u.name) for u in users] == [(f"user{i}@test.com", f"User {i}") for i in range(4)]
@@ -0,0 +1,183 @@
+"""
+Tests de la verification des tokens Google.
+
+Couvre: verification locale des ID tokens contre un JWKS local, cache selon
+Cache-Control max-age, rotation des cles, repli userinfo pour les access
+tokens, /api/auth/login.
+"""
+
+import asyncio
+import base64
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwt
+
+from utils.google_auth import GoogleTokenVerifier, GoogleTokenError
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+
+
+def b64url_uint(value):
+    data = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+class GoogleStub:
+    """JWKS et userinfo servis localement (httpx.MockTransport)."""
+
+    def __init__(self, max_age=3600):
+        self.keys = {}
+        self.max_age = max_age
+        self.requests = []
+        self.add_key("k1")
+
+    def add_key(self, kid):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        numbers = private_key.public_key().public_numbers()
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        self.keys[kid] = (pem, {
+            "kid": kid, "kty": "RSA", "alg": "RS256", "use": "sig",
+            "n": b64url_uint(numbers.n), "e": b64url_uint(numbers.e),
+        })
+
+    def id_token(self, kid="k1", **overrides):
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "sub": "google-123",
+            "email": "alice@test.com",
+            "email_verified": True,
+            "name": "Alice",
+            "iat": now,
+            "exp": now + 3600,
+            **overrides,
+        }
+        return jwt.encode(claims, self.keys[kid][0], algorithm="RS256", headers={"kid": kid})
+
+    def handler(self, request):
+        self.requests.append(request.url.path)
+        if request.url.path == "/oauth2/v3/certs":
+            return httpx.Response(
+                200,
+                json={"keys": [jwk for _, jwk in self.keys.values()]},
+                headers={"Cache-Control": f"public, max-age={self.max_age}, must-revalidate"},
+            )
+        if request.headers.get("Authorization") == "Bearer ya29.valid":
+            return httpx.Response(200, json={"id": "google-456", "email": "bob@test.com", "name": "Bob"})
+        return httpx.Response(401, json={"error": "invalid_token"})
+
+    def verifier(self):
+        return GoogleTokenVerifier(transport=httpx.MockTransport(self.handler))
+
+
+@pytest.fixture
+def google(monkeypatch):
+    monkeypatch.setenv("GOOGLE_CLIENT_ID", CLIENT_ID)
+    return GoogleStub()
+
+
+class TestIdTokenVerification:
+    """Tests de la verification locale."""
+
+    def test_certs_fetched_once(self, google):
+        verifier = google.verifier()
+
+        async def verify_twice():
+            first = await verifier.verify(google.id_token())
+            second = await verifier.verify(google.id_token(sub="google-789"))
+            return first, second
+
+        first, second = asyncio.run(verify_twice())
+
+        assert first["email"] == "alice@test.com" and first["sub"] == "google-123"
+        assert second["sub"] == "google-789"
+        assert google.requests == ["/oauth2/v3/certs"]
+
+    def test_certs_refetched_after_max_age(self, google):
+        google.max_age = 0
+        verifier = google.verifier()
+
+        async def verify_twice():
+            await verifier.verify(google.id_token())
+            await verifier.verify(google.id_token())
+
+        asyncio.run(verify_twice())
+        assert verifier.stats["certs_fetches"] == 2
+
+    def test_new_key_triggers_refresh(self, google):
+        verifier = google.verifier()
+        verifier.min_refresh_interval_s = 0
+
+        async def verify_after_rotation():
+            await verifier.verify(google.id_token())
+            google.add_key("k2")
+            return await verifier.verify(google.id_token(kid="k2"))
+
+        assert asyncio.run(verify_after_rotation())["email"] == "alice@test.com"
+        assert verifier.stats["certs_fetches"] == 2
+
+    @pytest.mark.parametrize("overrides", [
+        {"aud": "other-client"},
+        {"iss": "https://evil.example.com"},
+        {"exp": int(time.time()) - 60},
+        {"email_verified": False},
+        {"email_verified": None},
+    ])
+    def test_invalid_claims_rejected(self, google, overrides):
+        with pytest.raises(GoogleTokenError):
+            asyncio.run(google.verifier().verify(google.id_token(**overrides)))
+
+    def test_forged_signature_rejected(self, google):
+        forged = GoogleStub()
+        with pytest.raises(GoogleTokenError):
+            asyncio.run(google.verifier().verify(forged.id_token()))
+
+
+class TestAccessTokenFallback:
+    """Tests du repli userinfo."""
+
+    def test_userinfo_cached(self, google):
+        verifier = google.verifier()
+
+        async def verify_twice():
+            await verifier.verify("ya29.valid")
+            return await verifier.verify("ya29.valid")
+
+        info = asyncio.run(verify_twice())
+        assert info == {
+            "email": "bob@test.com", "name": "Bob", "sub": "google-456",
+            "picture": None, "email_verified": False,
+        }
+        assert google.requests == ["/oauth2/v2/userinfo"]
+
+    def test_invalid_access_token(self, google):
+        with pytest.raises(GoogleTokenError):
+            asyncio.run(google.verifier().verify("ya29.revoked"))
+
+
+class TestLogin:
+    """Tests de /api/auth/login."""
+
+    def test_login_with_id_token(self, client, google):
+        with patch("auth.google_token_verifier", google.verifier()):
+            response = client.post("/api/auth/login", json={"google_token": google.id_token()})
+
+        assert response.status_code == 200
+        assert response.json()["user"]["email"] == "alice@test.com"
+        assert "/oauth2/v2/userinfo" not in google.requests
+
+    def test_login_with_invalid_token(self, client, google):
+        with patch("auth.google_token_verifier", google.verifier()):
+            response = client.post("/api/auth/login", json={"google_token": google.id_token(aud="other")})
+
+        assert response.status_code == 401
@@ -0,0 +1,151 @@
+"""
+Tests de la rotation des cles de chiffrement.
+
+Couvre: identifiant de cle dans le texte chiffre, MultiFernet, job de
+re-chiffrement (pool de processus, reprise sur checkpoint).
+"""
+
+import os
+import uuid
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy import create_engine, event, select, text
+
+from database import Base
+from models import User, EncryptionKeyRotation
+from utils.encryption import EncryptionManager, key_id_for
+from utils.key_rotation import KeyRotationJob, reencrypt_rows, users_table
+
+OLD_KEY = os.environ["ENCRYPTION_KEY"]
+NEW_KEY = Fernet.generate_key().decode()
+
+
+@pytest.fixture
+def rotated_keys(monkeypatch):
+    """Nouvelle cle principale 'k2', l'ancienne reste disponible pour le dechiffrement."""
+    monkeypatch.setenv("ENCRYPTION_KEYS", f"k2:{NEW_KEY},{OLD_KEY}")
+    return EncryptionManager()
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """SQLite fichier en WAL: lecture en flux et ecritures sur deux connexions."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'rotation.db'}")
+
+    @event.listens_for(engine, "connect")
+    def set_wal(dbapi_conn, connection_record):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+    Base.metadata.create_all(bind=engine, tables=[users_table, EncryptionKeyRotation.__table__])
+    yield engine
+    engine.dispose()
+
+
+def encrypt_old(value, key_id=True):
+    token = Fernet(OLD_KEY.encode()).encrypt(value.encode()).decode()
+    return f"{key_id_for(OLD_KEY)}:{token}" if key_id else token
+
+
+def insert_users(engine, count):
+    rows = []
+    for i in range(count):
+        rows.append({
+            "id": uuid.uuid4(),
+            "email": encrypt_old(f"user{i}@test.com"),
+            "name": encrypt_old(f"User {i}"),
+            "google_id": None,
+            # Valeur chiffree avant l'ajout des identifiants de cle
+            "linkedin_profile_id": encrypt_old(f"profile-{i}", key_id=False),
+            "role": "FREE",
+            "is_active": True,
+        })
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, email, name, google_id, linkedin_profile_id, role, is_active) "
+            "VALUES (:id, :email, :name, :google_id, :linkedin_profile_id, :role, :is_active)"
+        ), [{**row, "id": row["id"].hex} for row in rows])
+    return sorted(row["id"] for row in rows)
+
+
+def stored_values(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT id, email, name, google_id, linkedin_profile_id FROM users ORDER BY id"
+        )).fetchall()
+
+
+class TestKeyIds:
+    """Tests de l'identifiant de cle embarque."""
+
+    def test_ciphertext_carries_key_id(self):
+        manager = EncryptionManager()
+        encrypted = manager.encrypt("alice@test.com")
+        assert encrypted.startswith(f"{key_id_for(OLD_KEY)}:")
+        assert manager.decrypt(encrypted) == "alice@test.com"
+
+    def test_old_and_legacy_values_still_decrypt(self, rotated_keys):
+        legacy = encrypt_old("legacy", key_id=False)
+        prefixed = encrypt_old("old")
+
+        assert rotated_keys.primary_key_id == "k2"
+        assert rotated_keys.decrypt(legacy) == "legacy"
+        assert rotated_keys.decrypt(prefixed) == "old"
+        assert rotated_keys.needs_rotation(prefixed)
+        assert rotated_keys.rotate(prefixed).startswith("k2:")
+        assert not rotated_keys.needs_rotation(rotated_keys.encrypt("new"))
+
+    def test_unknown_key_id_is_rejected(self, rotated_keys):
+        with pytest.raises(ValueError):
+            rotated_keys.decrypt("zz:" + Fernet(NEW_KEY.encode()).encrypt(b"x").decode())
+
+
+class TestKeyRotationJob:
+    """Tests du job de re-chiffrement."""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_all_rows_rotated(self, file_engine, rotated_keys, workers):
+        insert_users(file_engine, 7)
+
+        summary = KeyRotationJob(file_engine, chunk_size=3, workers=workers, manager=rotated_keys).run()
+
+        assert summary["rows_scanned"] == 7
+        assert summary["rows_rotated"] == 7
+        for row in stored_values(file_engine):
+            assert row.email.startswith("k2:") and row.linkedin_profile_id.startswith("k2:")
+            assert row.google_id is None
+        with file_engine.connect() as conn:
+            checkpoint = conn.execute(select(EncryptionKeyRotation.__table__)).mappings().one()
+        assert checkpoint["completed_at"] is not None
+
+        emails = sorted(rotated_keys.decrypt(row.email) for row in stored_values(file_engine))
+        assert emails == sorted(f"user{i}@test.com" for i in range(7))
+
+    def test_resumes_after_checkpoint(self, file_engine, rotated_keys):
+        ids = insert_users(file_engine, 5)
+        with file_engine.begin() as conn:
+            conn.execute(EncryptionKeyRotation.__table__.insert().values(
+                key_id="k2", last_user_id=str(ids[1]), rows_scanned=2, rows_rotated=2
+            ))
+
+        summary = KeyRotationJob(file_engine, chunk_size=2, workers=1, manager=rotated_keys).run()
+
+        assert summary["rows_scanned"] == 3
+        rotated = [row.email.startswith("k2:") for row in stored_values(file_engine)]
+        assert rotated == [False, False, True, True, True]
+
+    def test_concurrent_write_is_not_overwritten(self, file_engine, rotated_keys):
+        insert_users(file_engine, 1)
+        job = KeyRotationJob(file_engine, workers=1, manager=rotated_keys)
+        row = stored_values(file_engine)[0]
+        updates = reencrypt_rows([(uuid.UUID(row.id), *row[1:])], rotated_keys)
+
+        # L'utilisateur change de nom entre la lecture et l'ecriture du job
+        fresh_name = rotated_keys.encrypt("Renamed")
+        with file_engine.begin() as conn:
+            conn.execute(text("UPDATE users SET name = :name"), {"name": fresh_name})
+            conn.execute(job._update, updates)
+
+        stored = stored_values(file_engine)[0]
+        assert stored.name == fresh_name
+        assert stored.email.startswith("k2:")
@@ -0,0 +1,228 @@
+"""
+Tests du cache des instantanes utilisateur (id, role, is_active).
+
+Couvre: TTL/LRU, invalidation au commit (RoleManager), messages pub/sub,
+endpoints servis depuis le cache.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from structlog.testing import capture_logs
+
+import auth
+from models import RoleType
+from utils.role_manager import RoleManager
+from utils.user_cache import UserSnapshotCache, user_snapshot_cache
+
+
+def make_user(role=RoleType.FREE, is_active=True):
+    return SimpleNamespace(id=uuid.uuid4(), role=role, is_active=is_active)
+
+
+class TestUserSnapshotCache:
+    """Tests des bornes et des cles du cache."""
+
+    def test_lookup_by_email_and_id(self):
+        cache = UserSnapshotCache()
+        user = make_user(RoleType.PREMIUM)
+        cache.put(user, "alice@test.com")
+
+        assert cache.get_by_email("alice@test.com").role == RoleType.PREMIUM
+        assert cache.get(str(user.id)).id == user.id
+        assert cache.get_by_email("Alice@test.com") is None
+
+    def test_expired_entries_are_dropped(self):
+        cache = UserSnapshotCache()
+        cache.ttl_s = 0
+        cache.put(make_user(), "alice@test.com")
+
+        assert cache.get_by_email("alice@test.com") is None
+        assert cache._email_ids == {}
+
+    def test_lru_evicts_least_recently_used(self):
+        cache = UserSnapshotCache()
+        cache.max_entries = 2
+        first, second, third = make_user(), make_user(), make_user()
+        cache.put(first, "first@test.com")
+        cache.put(second, "second@test.com")
+        cache.get(first.id)
+        cache.put(third, "third@test.com")
+
+        assert cache.get_by_email("second@test.com") is None
+        assert cache.get_by_email("first@test.com") is not None
+        assert cache.get_by_email("third@test.com") is not None
+
+    def test_message_from_other_worker_invalidates(self):
+        cache = UserSnapshotCache()
+        user = make_user()
+        cache.put(user, "alice@test.com")
+
+        cache.handle_message(json.dumps({"user_id": str(user.id), "origin": cache.instance_id}))
+        assert cache.get(user.id) is not None
+
+        cache.handle_message(json.dumps({"user_id": str(user.id), "origin": "other-worker"}))
+        assert cache.get(user.id) is None
+
+
+class FlakyRedis:
+    """Client Redis synchrone dont les premiers envois echouent."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.published = []
+
+    def pipeline(self, transaction=False):
+        commands = []
+        redis = self
+
+        class Pipeline:
+            def hset(self, key, field, value):
+                commands.append(("hset", field))
+
+            def publish(self, channel, message):
+                commands.append(("publish", json.loads(message)["user_id"]))
+
+            def execute(self):
+                if redis.failures:
+                    redis.failures -= 1
+                    raise ConnectionError("redis down")
+                redis.published.extend(commands)
+
+        return Pipeline()
+
+
+class TestPublishFailures:
+    """Tests de la publication des changements aux autres workers."""
+
+    def make_cache(self, failures):
+        cache = UserSnapshotCache()
+        cache.redis_url = "redis://test"
+        cache._subscribed = True
+        cache._publisher = FlakyRedis(failures)
+        return cache
+
+    def test_failed_publish_falls_back_to_database_until_retried(self):
+        cache = self.make_cache(failures=1)
+        user_id = uuid.uuid4()
+
+        cache.invalidate(user_id)
+        assert not cache.changes_synced
+        assert not cache.flush_unpublished()
+        assert cache._publisher.published == []
+
+        # Retente avant la fin du delai de reconnexion: rien n'est envoye
+        assert not cache.flush_unpublished()
+        cache._publisher_retry_at = 0
+        assert cache.flush_unpublished()
+
+        assert cache.changes_synced
+        assert cache._publisher.published == [("hset", str(user_id)), ("publish", str(user_id))]
+
+    def test_changes_during_backoff_are_queued(self):
+        cache = self.make_cache(failures=1)
+        first, second = uuid.uuid4(), uuid.uuid4()
+
+        cache.invalidate(first)
+        assert not cache.flush_unpublished()
+        cache.invalidate(second)
+        cache._publisher_retry_at = 0
+        cache.flush_unpublished()
+
+        assert {user_id for _, user_id in cache._publisher.published} == {str(first), str(second)}
+        assert cache.changes_synced
+
+    def test_publish_does_not_block_caller(self):
+        cache = self.make_cache(failures=0)
+        user_id = uuid.uuid4()
+
+        cache.invalidate(user_id)
+        # Sans thread de publication, le changement reste en attente
+        assert cache._publisher.published == []
+
+        cache._start_publisher()
+        deadline = time.monotonic() + 2
+        while not cache.changes_synced and time.monotonic() < deadline:
+            time.sleep(0.01)
+        asyncio.run(cache.stop())
+
+        assert cache._publisher_thread is None
+        assert cache.changes_synced
+
+    def test_pending_changes_reported_at_stop(self):
+        cache = self.make_cache(failures=100)
+        cache.reconnect_s = 0.1
+        cache._start_publisher()
+        cache.invalidate(uuid.uuid4())
+
+        with capture_logs() as logs:
+            asyncio.run(cache.stop())
+
+        assert {"event": "user_cache_publish_dropped", "pending": 1, "log_level": "warning"} in logs
+
+
+class TestInvalidationOnCommit:
+    """Tests de l'invalidation declenchee par les changements de role."""
+
+    def test_role_change_invalidates_after_commit(self, db, create_test_user):
+        user = create_test_user(email="bob@test.com", role=RoleType.FREE)
+        user_snapshot_cache.put(user, "bob@test.com")
+
+        with patch.object(user_snapshot_cache, "_publish") as publish:
+            RoleManager.change_user_role(db=db, user=user, new_role=RoleType.PREMIUM)
+            # Instantane recharge avant le commit (autre requete)
+            user_snapshot_cache.put(user, "bob@test.com")
+            db.commit()
+
+        assert user_snapshot_cache.get(user.id) is None
+        publish.assert_called_once_with(user.id)
+
+    def test_rollback_discards_pending_invalidations(self, db, create_test_user):
+        user = create_test_user(email="carol@test.com")
+
+        with patch.object(user_snapshot_cache, "_publish") as publish:
+            RoleManager.change_user_role(db=db, user=user, new_role=RoleType.MEDIUM)
+            db.rollback()
+            db.commit()
+
+        publish.assert_not_called()
+
+
+class TestCachedEndpoints:
+    """Tests des endpoints servis depuis le cache."""
+
+    def test_validate_action_reuses_snapshot(self, client, db, create_test_user):
+        user = create_test_user(email="dave@test.com", role=RoleType.FREE)
+        payload = {"email": "dave@test.com", "feature": "custom_prompt"}
+
+        with patch("auth.find_user_by_email", wraps=auth.find_user_by_email) as find:
+            first = client.post("/api/permissions/validate-action", json=payload)
+            second = client.post("/api/permissions/validate-action", json=payload)
+
+            assert first.status_code == 200 and second.status_code == 200
+            assert find.call_count == 1
+
+            RoleManager.change_user_role(db=db, user=user, new_role=RoleType.PREMIUM)
+            db.commit()
+            third = client.post("/api/permissions/validate-action", json=payload)
+
+        assert find.call_count == 2
+        assert third.json()["role"] == "PREMIUM"
+
+    def test_deactivated_user_rejected(self, client, db, create_test_user):
+        user = create_test_user(email="erin@test.com")
+        headers = {"Authorization": f"Bearer {auth.create_user_token(user)}"}
+
+        assert client.get("/api/permissions/feature-access/custom_prompt", headers=headers).status_code == 200
+
+        user.is_active = False
+        user_snapshot_cache.invalidate_on_commit(db, user.id)
+        db.commit()
+
+        response = client.get("/api/permissions/feature-access/custom_prompt", headers=headers)
+        assert response.status_code == 401
+        assert user_snapshot_cache.get_by_email("erin@test.com").is_active is False
@@ -1,11 +1,36 @@
 """
 Types SQLAlchemy personnalisés pour le chiffrement automatique des colonnes.
+
+Le déchiffrement est paresseux: la colonne garde le texte chiffré au chargement
+(Ciphertext) et l'attribut en clair (encrypted_column) ne le déchiffre qu'au
+premier accès, puis le mémorise sur l'instance. Les rapports qui lisent un champ
+chiffré sur beaucoup de lignes peuvent le déchiffrer en lot avec decrypt_many
+(decrypt_many_async depuis un handler async).
 """
 
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import inspect
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.types import TypeDecorator, String
-from typing import Optional
+from typing import Optional, Iterable, List
 from utils.encryption import encryption_manager
 
+# Parallélisation de decrypt_many (processus: Fernet est lié au CPU et au GIL)
+DECRYPT_WORKERS = int(os.getenv("ENCRYPTION_DECRYPT_WORKERS", str(os.cpu_count() or 1)))
+DECRYPT_PARALLEL_MIN = int(os.getenv("ENCRYPTION_DECRYPT_PARALLEL_MIN", "2000"))
+
+# Pool de processus partagé, créé au premier lot parallèle (voir shutdown_decrypt_pool)
+_decrypt_pool: Optional[ProcessPoolExecutor] = None
+_decrypt_pool_lock = threading.Lock()
+
+
+class Ciphertext(str):
+    """Valeur chiffrée telle que lue en base, pas encore déchiffrée."""
+
 
 class EncryptedString(TypeDecorator):
     """
@@ -50,21 +75,152 @@ class EncryptedString(TypeDecorator):
         if value is None:
             return None
 
+        # Valeur jamais déchiffrée (copie d'un attribut chiffré): déjà chiffrée
+        if isinstance(value, Ciphertext):
+            return str(value)
+
         return encryption_manager.encrypt(value)
 
     def process_result_value(self, value: Optional[str], dialect) -> Optional[str]:
         """
         Appelé lors de la lecture depuis la base.
-        Déchiffre la valeur avant de la retourner.
+        Marque la valeur comme chiffrée; le déchiffrement est fait par
+        encrypted_column au premier accès.
 
         Args:
             value: La valeur chiffrée stockée en base
             dialect: Le dialecte SQL
 
         Returns:
-            La valeur déchiffrée
+            La valeur chiffrée (Ciphertext)
         """
         if value is None:
             return None
 
-        return encryption_manager.decrypt(value)
+        return Ciphertext(value)
+
+
+def encrypted_column(column_attr: str) -> hybrid_property:
+    """
+    Attribut en clair d'une colonne EncryptedString mappée sous column_attr.
+
+    Usage dans un modèle:
+        _email = Column("email", EncryptedString(512), nullable=False)
+        email = encrypted_column("_email")
+
+    - Lecture: déchiffrée au premier accès puis mémorisée sur l'instance, sans
+      marquer l'objet comme modifié
+    - Écriture: valeur en clair, chiffrée au flush
+    - Requêtes: User.email désigne la colonne
+    """
+
+    def fget(instance):
+        value = getattr(instance, column_attr)
+        if isinstance(value, Ciphertext):
+            value = encryption_manager.decrypt(value)
+            set_committed_value(instance, column_attr, value)
+        return value
+
+    def fset(instance, value):
+        setattr(instance, column_attr, value)
+
+    def expr(cls):
+        return getattr(cls, column_attr)
+
+    fget.column_attr = column_attr
+    return hybrid_property(fget, fset, expr=expr)
+
+
+def _decrypt_chunk(values: List[str]) -> List[str]:
+    """Déchiffrement d'un lot dans un processus de travail (clés lues dans l'environnement)."""
+    return [encryption_manager.decrypt(value) for value in values]
+
+
+def _get_decrypt_pool() -> ProcessPoolExecutor:
+    global _decrypt_pool
+    with _decrypt_pool_lock:
+        if _decrypt_pool is None:
+            _decrypt_pool = ProcessPoolExecutor(max_workers=max(DECRYPT_WORKERS, 1))
+        return _decrypt_pool
+
+
+def shutdown_decrypt_pool() -> None:
+    """Arrête le pool de processus de decrypt_many (arrêt du service)."""
+    global _decrypt_pool
+    with _decrypt_pool_lock:
+        if _decrypt_pool is not None:
+            _decrypt_pool.shutdown(wait=False, cancel_futures=True)
+            _decrypt_pool = None
+
+
+def _pending_values(instances: Iterable, fields) -> List[tuple]:
+    """(instance, attribut, valeur) des champs encore chiffrés."""
+    pending = []
+    for instance in instances:
+        descriptors = inspect(type(instance)).all_orm_descriptors
+        for field in fields:
+            column_attr = descriptors[field].fget.column_attr
+            value = getattr(instance, column_attr)
+            if isinstance(value, Ciphertext):
+                pending.append((instance, column_attr, value))
+    return pending
+
+
+def _chunks(values: List[str], workers: Optional[int]) -> List[List[str]]:
+    """Lots à répartir sur le pool; un seul lot (déchiffrement sur place) pour les petits volumes."""
+    workers = DECRYPT_WORKERS if workers is None else workers
+    if workers <= 1 or len(values) < DECRYPT_PARALLEL_MIN:
+        return [values]
+    size = -(-len(values) // workers)
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def _store(pending: List[tuple], plaintexts: List[str]) -> None:
+    for (instance, column_attr, _), plain in zip(pending, plaintexts):
+        set_committed_value(instance, column_attr, plain)
+
+
+def decrypt_many(instances: Iterable, *fields: str, workers: Optional[int] = None) -> None:
+    """
+    Déchiffre en lot des attributs encrypted_column d'instances chargées.
+
+    Les valeurs encore chiffrées sont réparties sur le pool de processus partagé
+    au-delà de ENCRYPTION_DECRYPT_PARALLEL_MIN valeurs, puis mémorisées sur les
+    instances: les accès suivants (user.email, ...) ne déchiffrent plus rien.
+
+    Args:
+        instances: Instances du modèle (ex: résultats de db.query(User).all())
+        fields: Noms des attributs en clair (ex: "email", "name")
+        workers: Nombre de lots (défaut: ENCRYPTION_DECRYPT_WORKERS)
+    """
+    pending = _pending_values(instances, fields)
+    if not pending:
+        return
+
+    chunks = _chunks([value for _, _, value in pending], workers)
+    if len(chunks) == 1:
+        plaintexts = _decrypt_chunk(chunks[0])
+    else:
+        results = _get_decrypt_pool().map(_decrypt_chunk, chunks)
+        plaintexts = [plain for chunk in results for plain in chunk]
+    _store(pending, plaintexts)
+
+
+async def decrypt_many_async(instances: Iterable, *fields: str, workers: Optional[int] = None) -> None:
+    """
+    decrypt_many sans bloquer la boucle asyncio (handlers async).
+
+    Les petits lots sont déchiffrés dans le pool de threads par défaut, les
+    grands sur le pool de processus partagé (run_in_executor).
+    """
+    pending = _pending_values(instances, fields)
+    if not pending:
+        return
+
+    loop = asyncio.get_running_loop()
+    chunks = _chunks([value for _, _, value in pending], workers)
+    executor = None if len(chunks) == 1 else _get_decrypt_pool()
+    results = await asyncio.gather(*(
+        loop.run_in_executor(executor, _decrypt_chunk, chunk) for chunk in chunks
+    ))
+    _store(pending, [plain for chunk in results for plain in chunk])
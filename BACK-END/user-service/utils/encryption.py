@@ -1,53 +1,98 @@
 """
 Module de chiffrement/déchiffrement pour les données sensibles en base de données.
 Utilise Fernet (cryptographie symétrique) avec la clé définie dans ENCRYPTION_KEY.
+
+Rotation des clés:
+- ENCRYPTION_KEYS="kid2:<clé>,kid1:<ancienne clé>" (la première chiffre, toutes
+  déchiffrent); sans identifiant, l'id est dérivé de la clé (empreinte SHA256)
+- Le texte chiffré est préfixé par l'id de sa clé ("<kid>:<jeton Fernet>");
+  les valeurs sans préfixe (avant rotation) sont essayées avec toutes les clés
+- Re-chiffrement des données existantes: utils/key_rotation.py
 """
 
 import os
-from typing import Optional
-from cryptography.fernet import Fernet
+import re
+import hashlib
+from typing import Optional, Dict
+from cryptography.fernet import Fernet, MultiFernet
 from dotenv import load_dotenv
 
 load_dotenv("../.env")
 load_dotenv()
 
+KEY_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+
+
+def key_id_for(key: str) -> str:
+    """Identifiant dérivé d'une clé (8 caractères de son empreinte SHA256)."""
+    return hashlib.sha256(key.encode()).hexdigest()[:8]
+
+
+def parse_keys(raw: str) -> Dict[str, str]:
+    """
+    Clés ordonnées depuis ENCRYPTION_KEYS ("kid:clé" ou "clé", séparées par des virgules).
+
+    Returns:
+        Dictionnaire {kid: clé}, la clé principale en premier
+    """
+    keys: Dict[str, str] = {}
+    for entry in raw.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kid, sep, key = entry.partition(":")
+        if not sep:
+            kid, key = key_id_for(entry), entry
+        if not KEY_ID_PATTERN.match(kid):
+            raise ValueError(f"Identifiant de clé invalide dans ENCRYPTION_KEYS: {kid!r}")
+        keys[kid] = key
+    return keys
+
+
 class EncryptionManager:
     """Gestionnaire de chiffrement/déchiffrement des données sensibles."""
 
     def __init__(self):
-        """Initialise le gestionnaire avec la clé de chiffrement depuis .env"""
-        encryption_key = os.getenv("ENCRYPTION_KEY")
+        """Initialise le gestionnaire avec les clés de chiffrement depuis .env"""
+        raw_keys = os.getenv("ENCRYPTION_KEYS") or os.getenv("ENCRYPTION_KEY")
 
-        if not encryption_key:
+        if not raw_keys:
             raise ValueError(
                 "ENCRYPTION_KEY n'est pas définie dans les variables d'environnement. "
                 "Veuillez définir cette clé dans le fichier .env"
             )
 
         try:
-            self.fernet = Fernet(encryption_key.encode())
+            self.fernets = {kid: Fernet(key.encode()) for kid, key in parse_keys(raw_keys).items()}
         except Exception as e:
             raise ValueError(
                 f"La clé ENCRYPTION_KEY n'est pas valide. "
                 f"Utilisez Fernet.generate_key() pour générer une nouvelle clé. Erreur: {str(e)}"
             )
+        if not self.fernets:
+            raise ValueError("ENCRYPTION_KEYS ne contient aucune clé")
+
+        self.primary_key_id = next(iter(self.fernets))
+        self.fernet = self.fernets[self.primary_key_id]
+        # Valeurs sans identifiant de clé (chiffrées avant la rotation)
+        self.multi_fernet = MultiFernet(list(self.fernets.values()))
 
     def encrypt(self, data: str) -> Optional[str]:
         """
-        Chiffre une chaîne de caractères.
+        Chiffre une chaîne de caractères avec la clé principale.
 
         Args:
             data: La chaîne à chiffrer
 
         Returns:
-            La chaîne chiffrée en base64, ou None si data est None
+            "<kid>:<jeton Fernet>", ou None si data est None
         """
         if data is None:
             return None
 
         try:
             encrypted_bytes = self.fernet.encrypt(data.encode())
-            return encrypted_bytes.decode()
+            return f"{self.primary_key_id}:{encrypted_bytes.decode()}"
         except Exception as e:
             raise ValueError(f"Erreur lors du chiffrement: {str(e)}")
 
@@ -65,11 +110,37 @@ class EncryptionManager:
             return None
 
         try:
-            decrypted_bytes = self.fernet.decrypt(encrypted_data.encode())
+            kid, token = self.split(encrypted_data)
+            if kid is None:
+                decrypted_bytes = self.multi_fernet.decrypt(token.encode())
+            elif kid in self.fernets:
+                decrypted_bytes = self.fernets[kid].decrypt(token.encode())
+            else:
+                raise ValueError(f"clé {kid!r} absente de ENCRYPTION_KEYS")
             return decrypted_bytes.decode()
         except Exception as e:
             raise ValueError(f"Erreur lors du déchiffrement: {str(e)}")
 
+    @staticmethod
+    def split(encrypted_data: str):
+        """Sépare l'identifiant de clé du jeton Fernet (kid None si absent)."""
+        kid, sep, token = encrypted_data.partition(":")
+        if not sep:
+            return None, encrypted_data
+        return kid, token
+
+    def needs_rotation(self, encrypted_data: Optional[str]) -> bool:
+        """Vrai si la valeur n'est pas chiffrée avec la clé principale."""
+        if encrypted_data is None:
+            return False
+        return self.split(encrypted_data)[0] != self.primary_key_id
+
+    def rotate(self, encrypted_data: Optional[str]) -> Optional[str]:
+        """Re-chiffre une valeur avec la clé principale (inchangée si déjà à jour)."""
+        if not self.needs_rotation(encrypted_data):
+            return encrypted_data
+        return self.encrypt(self.decrypt(encrypted_data))
+
     def encrypt_if_not_none(self, data: Optional[str]) -> Optional[str]:
         """
         Chiffre une chaîne seulement si elle n'est pas None.
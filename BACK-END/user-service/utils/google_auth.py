@@ -0,0 +1,227 @@
+"""
+Verification des tokens Google pour /api/auth/login.
+
+- ID token (JWT RS256): signature verifiee localement avec les cles publiques
+  Google (JWKS), mises en cache selon le Cache-Control max-age de la reponse;
+  un kid inconnu (rotation des cles chez Google) force un rechargement; un
+  token dont l'email n'est pas verifie (email_verified) est refuse
+- Access token OAuth (chrome.identity.getAuthToken): pas verifiable localement,
+  appel userinfo; le resultat est garde GOOGLE_USERINFO_CACHE_S secondes (60
+  par defaut) pour les logins repetes avec le meme token. Un token revoque chez
+  Google reste donc accepte jusqu'a cette duree; 0 desactive le cache
+- Un seul client httpx (pool de connexions) pour tous les appels a Google,
+  ferme dans le lifespan
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import time
+from typing import Optional
+
+import httpx
+import structlog
+from jose import jwt, JWTError
+
+logger = structlog.get_logger(__name__)
+
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenError(Exception):
+    """Token Google refuse (signature, audience, expiration, userinfo)."""
+
+
+def looks_like_id_token(token: str) -> bool:
+    """Un ID token est un JWT (trois segments); un access token Google ne l'est pas."""
+    return token.count(".") == 2
+
+
+class GoogleTokenVerifier:
+    """Verification des tokens Google avec JWKS en cache et client HTTP partage."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.certs_url = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+        self.userinfo_url = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
+        # Duree de cache si Google n'envoie pas de max-age
+        self.default_max_age_s = int(os.getenv("GOOGLE_CERTS_DEFAULT_MAX_AGE_S", "3600"))
+        # Delai minimal entre deux rechargements forces par un kid inconnu
+        self.min_refresh_interval_s = float(os.getenv("GOOGLE_CERTS_MIN_REFRESH_S", "60"))
+        # Borne la duree pendant laquelle un access token revoque reste accepte
+        self.userinfo_cache_s = float(os.getenv("GOOGLE_USERINFO_CACHE_S", "60"))
+        self.userinfo_cache_max = int(os.getenv("GOOGLE_USERINFO_CACHE_MAX_ENTRIES", "10000"))
+        self.timeout_s = float(os.getenv("GOOGLE_HTTP_TIMEOUT_S", "5"))
+
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._keys: dict = {}
+        self._keys_expire_at = 0.0
+        self._keys_fetched_at = 0.0
+        self._keys_lock: Optional[asyncio.Lock] = None
+        self._userinfo: dict = {}
+        self.stats = {"local": 0, "userinfo": 0, "userinfo_cached": 0, "certs_fetches": 0}
+
+    @property
+    def client_ids(self) -> list:
+        # Lu a chaque appel: main.py charge le .env apres l'import des modules
+        client_ids = os.getenv("GOOGLE_CLIENT_IDS") or os.getenv("GOOGLE_CLIENT_ID", "")
+        return [c.strip() for c in client_ids.split(",") if c.strip()]
+
+    # --- Client HTTP partage ---
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=self.timeout_s,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # --- Point d'entree ---
+
+    async def verify(self, token: str) -> dict:
+        """
+        Retourne les infos utilisateur (email, name, sub, picture, email_verified).
+
+        Leve GoogleTokenError si le token est refuse, httpx.HTTPError si Google
+        est injoignable.
+        """
+        if looks_like_id_token(token):
+            return await self.verify_id_token(token)
+        return await self.fetch_userinfo(token)
+
+    # --- ID token: verification locale ---
+
+    async def verify_id_token(self, token: str) -> dict:
+        client_ids = self.client_ids
+        if not client_ids:
+            raise GoogleTokenError("GOOGLE_CLIENT_ID non configure")
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError as e:
+            raise GoogleTokenError(f"En-tete invalide: {e}")
+
+        key = await self._get_key(header.get("kid"))
+        if key is None:
+            raise GoogleTokenError("Cle de signature inconnue")
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                issuer=GOOGLE_ISSUERS,
+                options={"verify_aud": False},
+            )
+        except JWTError as e:
+            raise GoogleTokenError(str(e))
+
+        # Plusieurs client ids possibles (extension, site admin)
+        audience = claims.get("aud")
+        audiences = audience if isinstance(audience, list) else [audience]
+        if not any(aud in client_ids for aud in audiences):
+            raise GoogleTokenError("Audience incorrecte")
+        if not claims.get("email"):
+            raise GoogleTokenError("Email absent du token")
+        # Booleen dans les ID tokens Google, parfois la chaine "true"
+        if str(claims.get("email_verified", False)).lower() != "true":
+            raise GoogleTokenError("Email non verifie")
+
+        self.stats["local"] += 1
+        return {
+            "email": claims["email"],
+            "name": claims.get("name"),
+            "sub": claims.get("sub"),
+            "picture": claims.get("picture"),
+            "email_verified": bool(claims.get("email_verified", False)),
+        }
+
+    async def _get_key(self, kid: Optional[str]) -> Optional[dict]:
+        now = time.monotonic()
+        if now >= self._keys_expire_at:
+            await self._refresh_keys(force=False)
+        elif kid not in self._keys and now - self._keys_fetched_at >= self.min_refresh_interval_s:
+            # Nouvelle cle publiee avant l'expiration de notre cache
+            await self._refresh_keys(force=True)
+        return self._keys.get(kid)
+
+    async def _refresh_keys(self, force: bool) -> None:
+        if self._keys_lock is None:
+            self._keys_lock = asyncio.Lock()
+        async with self._keys_lock:
+            # Une autre requete a recharge les cles pendant l'attente du verrou
+            if not force and time.monotonic() < self._keys_expire_at:
+                return
+            if force and time.monotonic() - self._keys_fetched_at < self.min_refresh_interval_s:
+                return
+
+            response = await self.client.get(self.certs_url)
+            response.raise_for_status()
+            keys = {key["kid"]: key for key in response.json().get("keys", []) if "kid" in key}
+            max_age = self._max_age(response.headers)
+
+            now = time.monotonic()
+            self._keys = keys
+            self._keys_fetched_at = now
+            self._keys_expire_at = now + max_age
+            self.stats["certs_fetches"] += 1
+            logger.info("google_certs_fetched", keys=len(keys), max_age_s=max_age)
+
+    def _max_age(self, headers: httpx.Headers) -> int:
+        match = MAX_AGE_PATTERN.search(headers.get("cache-control", ""))
+        if not match:
+            return self.default_max_age_s
+        try:
+            age = int(headers.get("age", "0"))
+        except ValueError:
+            age = 0
+        return max(int(match.group(1)) - age, 0)
+
+    # --- Access token: userinfo ---
+
+    async def fetch_userinfo(self, token: str) -> dict:
+        cache_key = hashlib.sha256(token.encode()).hexdigest()
+        cached = self._userinfo.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            self.stats["userinfo_cached"] += 1
+            return cached[1]
+
+        response = await self.client.get(self.userinfo_url, headers={"Authorization": f"Bearer {token}"})
+        if response.status_code != 200:
+            raise GoogleTokenError("Token Google invalide")
+        data = response.json()
+        if not data.get("email"):
+            raise GoogleTokenError("Email absent de userinfo")
+
+        info = {
+            "email": data["email"],
+            "name": data.get("name"),
+            "sub": data.get("id") or data.get("sub"),
+            "picture": data.get("picture"),
+            "email_verified": bool(data.get("verified_email", data.get("email_verified", False))),
+        }
+        self.stats["userinfo"] += 1
+        if self.userinfo_cache_s > 0:
+            self._store_userinfo(cache_key, info)
+        return info
+
+    def _store_userinfo(self, cache_key: str, info: dict) -> None:
+        now = time.monotonic()
+        if len(self._userinfo) >= self.userinfo_cache_max:
+            self._userinfo = {k: v for k, v in self._userinfo.items() if v[0] > now}
+            while len(self._userinfo) >= self.userinfo_cache_max:
+                self._userinfo.pop(next(iter(self._userinfo)))
+        self._userinfo[cache_key] = (now + self.userinfo_cache_s, info)
+
+
+# Instance globale
+google_token_verifier = GoogleTokenVerifier()
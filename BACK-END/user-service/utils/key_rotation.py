@@ -0,0 +1,233 @@
+"""
+Re-chiffrement des colonnes chiffrées de users vers la clé principale.
+
+Après avoir placé la nouvelle clé en tête de ENCRYPTION_KEYS (et redéployé le
+service pour que les nouvelles écritures l'utilisent):
+    python -m utils.key_rotation [--chunk-size 1000] [--workers 4] [--restart]
+
+- Lecture en flux (curseur côté serveur) dans l'ordre des id, à partir du
+  dernier id traité: un job interrompu reprend là où il s'est arrêté
+- Déchiffrement / re-chiffrement réparti sur un pool de processus
+- Écriture par lots: une colonne n'est remplacée que si elle n'a pas changé
+  depuis la lecture (pas de verrou de table, pas d'écrasement d'une écriture
+  concurrente); le checkpoint est mis à jour dans la même transaction
+- Débit (lignes/s) journalisé à chaque lot
+"""
+
+import argparse
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+import structlog
+from sqlalchemy import String, bindparam, case, select
+from sqlalchemy.engine import Engine
+
+from models import User, EncryptionKeyRotation
+from utils.encryption import EncryptionManager
+
+logger = structlog.get_logger(__name__)
+
+ENCRYPTED_COLUMNS = ("email", "name", "google_id", "linkedin_profile_id")
+
+users_table = User.__table__
+checkpoints_table = EncryptionKeyRotation.__table__
+
+
+def reencrypt_rows(rows: List[Tuple], manager: EncryptionManager) -> List[dict]:
+    """
+    Paramètres de mise à jour des lignes (id, *ENCRYPTED_COLUMNS) à re-chiffrer.
+
+    Les colonnes déjà chiffrées avec la clé principale (ou NULL) gardent
+    old_/new_ à None: la condition de mise à jour est alors fausse.
+    """
+    updates = []
+    for row in rows:
+        params = {"b_id": row[0]}
+        changed = False
+        for column, value in zip(ENCRYPTED_COLUMNS, row[1:]):
+            if manager.needs_rotation(value):
+                params[f"old_{column}"] = value
+                params[f"new_{column}"] = manager.rotate(value)
+                changed = True
+            else:
+                params[f"old_{column}"] = None
+                params[f"new_{column}"] = None
+        if changed:
+            updates.append(params)
+    return updates
+
+
+# --- Processus de travail ---
+
+_worker_manager: Optional[EncryptionManager] = None
+
+
+def _init_worker() -> None:
+    global _worker_manager
+    _worker_manager = EncryptionManager()
+
+
+def _reencrypt_chunk(rows: List[Tuple]) -> List[dict]:
+    return reencrypt_rows(rows, _worker_manager)
+
+
+def _update_statement():
+    """UPDATE par lot: chaque colonne n'est remplacée que si elle vaut encore old_<col>."""
+    values = {
+        column: case(
+            (
+                users_table.c[column] == bindparam(f"old_{column}", type_=String()),
+                bindparam(f"new_{column}", type_=String()),
+            ),
+            else_=users_table.c[column],
+        )
+        for column in ENCRYPTED_COLUMNS
+    }
+    # Le re-chiffrement n'est pas une modification de l'utilisateur
+    values["updated_at"] = users_table.c.updated_at
+    return users_table.update().where(users_table.c.id == bindparam("b_id")).values(values)
+
+
+class KeyRotationJob:
+    """Job de re-chiffrement reprenable (checkpoint dans encryption_key_rotations)."""
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        chunk_size: int = 1000,
+        workers: Optional[int] = None,
+        manager: Optional[EncryptionManager] = None,
+    ):
+        if engine is None:
+            from database import engine
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.manager = manager or EncryptionManager()
+        self.key_id = self.manager.primary_key_id
+        self._update = _update_statement()
+
+    def run(self, restart: bool = False) -> dict:
+        checkpoint = self._load_checkpoint(restart)
+        if checkpoint["completed_at"] is not None:
+            logger.info("key_rotation_already_completed", key_id=self.key_id)
+            return checkpoint
+
+        query = select(users_table.c.id, *(users_table.c[c] for c in ENCRYPTED_COLUMNS)).order_by(users_table.c.id)
+        if checkpoint["last_user_id"]:
+            query = query.where(users_table.c.id > uuid.UUID(checkpoint["last_user_id"]))
+
+        logger.info(
+            "key_rotation_started",
+            key_id=self.key_id,
+            resume_after=checkpoint["last_user_id"],
+            workers=self.workers,
+            chunk_size=self.chunk_size,
+        )
+        self._started = time.perf_counter()
+        self._stats = {"rows_scanned": 0, "rows_rotated": 0}
+
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) if self.workers > 1 else None
+        in_flight = deque()
+        try:
+            with self.engine.connect() as reader:
+                result = reader.execution_options(stream_results=True, yield_per=self.chunk_size).execute(query)
+                for partition in result.partitions(self.chunk_size):
+                    rows = [(row[0], *(str(v) if v is not None else None for v in row[1:])) for row in partition]
+                    in_flight.append((rows[-1][0], len(rows), self._submit(pool, rows)))
+                    # Écritures dans l'ordre de lecture: le checkpoint reste contigu
+                    while len(in_flight) > self.workers:
+                        self._write(*in_flight.popleft())
+            while in_flight:
+                self._write(*in_flight.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                checkpoints_table.update()
+                .where(checkpoints_table.c.key_id == self.key_id)
+                .values(completed_at=datetime.now(timezone.utc))
+            )
+
+        elapsed = time.perf_counter() - self._started
+        summary = {
+            "key_id": self.key_id,
+            **self._stats,
+            "duration_s": round(elapsed, 2),
+            "rows_per_s": round(self._stats["rows_scanned"] / elapsed, 1) if elapsed else None,
+        }
+        logger.info("key_rotation_completed", **summary)
+        return summary
+
+    def _submit(self, pool: Optional[ProcessPoolExecutor], rows: List[Tuple]) -> Future:
+        if pool is not None:
+            return pool.submit(_reencrypt_chunk, rows)
+        future = Future()
+        future.set_result(reencrypt_rows(rows, self.manager))
+        return future
+
+    def _write(self, last_id, scanned: int, future: Future) -> None:
+        updates = future.result()
+        with self.engine.begin() as conn:
+            if updates:
+                conn.execute(self._update, updates)
+            conn.execute(
+                checkpoints_table.update()
+                .where(checkpoints_table.c.key_id == self.key_id)
+                .values(
+                    last_user_id=str(last_id),
+                    rows_scanned=checkpoints_table.c.rows_scanned + scanned,
+                    rows_rotated=checkpoints_table.c.rows_rotated + len(updates),
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
+
+        self._stats["rows_scanned"] += scanned
+        self._stats["rows_rotated"] += len(updates)
+        elapsed = time.perf_counter() - self._started
+        logger.info(
+            "key_rotation_progress",
+            key_id=self.key_id,
+            last_user_id=str(last_id),
+            rows_scanned=self._stats["rows_scanned"],
+            rows_rotated=self._stats["rows_rotated"],
+            rows_per_s=round(self._stats["rows_scanned"] / elapsed, 1) if elapsed else None,
+        )
+
+    def _load_checkpoint(self, restart: bool) -> dict:
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                select(checkpoints_table).where(checkpoints_table.c.key_id == self.key_id)
+            ).mappings().first()
+            if row is None:
+                conn.execute(checkpoints_table.insert().values(key_id=self.key_id, rows_scanned=0, rows_rotated=0))
+            elif restart:
+                conn.execute(
+                    checkpoints_table.update()
+                    .where(checkpoints_table.c.key_id == self.key_id)
+                    .values(last_user_id=None, rows_scanned=0, rows_rotated=0, completed_at=None,
+                            started_at=datetime.now(timezone.utc))
+                )
+            else:
+                return dict(row)
+        return {"key_id": self.key_id, "last_user_id": None, "rows_scanned": 0, "rows_rotated": 0, "completed_at": None}
+
+
+if __name__ == "__main__":
+    from logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description="Re-chiffre les colonnes chiffrées de users avec la clé principale")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Lignes par lot (défaut: 1000)")
+    parser.add_argument("--workers", type=int, default=None, help="Processus de travail (défaut: nombre de CPU)")
+    parser.add_argument("--restart", action="store_true", help="Ignore le checkpoint et reprend depuis le début")
+    args = parser.parse_args()
+
+    configure_logging()
+    KeyRotationJob(chunk_size=args.chunk_size, workers=args.workers).run(restart=args.restart)
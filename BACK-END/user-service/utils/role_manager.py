@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 import uuid
 from models import User, RoleType, RoleChangeHistory
+from utils.user_cache import user_snapshot_cache
 
 
 class RoleManager:
@@ -59,6 +60,7 @@ class RoleManager:
 
         # Mettre à jour le rôle de l'utilisateur
         user.role = new_role
+        user_snapshot_cache.invalidate_on_commit(db, user.id)
 
         # Ajouter l'entrée d'historique à la session
         db.add(history_entry)
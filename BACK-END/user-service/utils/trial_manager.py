@@ -20,6 +20,7 @@ from sqlalchemy.exc import IntegrityError
 
 from models import User, RoleType
 from utils.role_manager import RoleManager
+from utils.user_cache import user_snapshot_cache
 from notifications.email_sender import send_trial_email
 from notifications.templates import (
     get_trial_expiring_soon_html,
@@ -125,6 +126,7 @@ class TrialManager:
         user.linkedin_profile_id = linkedin_profile_id
         user.linkedin_profile_id_hash = profile_hash
         user.linkedin_profile_captured_at = now
+        user_snapshot_cache.invalidate_on_commit(db, user.id)
 
         # Verifier si l'utilisateur peut beneficier du trial (doit etre FREE)
         if user.role != RoleType.FREE:
@@ -229,6 +231,7 @@ class TrialManager:
                 action="no_transition"
             )
             user.trial_ends_at = None
+            user_snapshot_cache.invalidate_on_commit(db, user.id)
             db.commit()
             return False
 
@@ -251,6 +254,7 @@ class TrialManager:
             db.commit()
         except ValueError:
             user.grace_ends_at = grace_end
+            user_snapshot_cache.invalidate_on_commit(db, user.id)
             db.commit()
 
         # Track trial_expired event
@@ -334,6 +338,7 @@ class TrialManager:
                 action="no_transition"
             )
             user.grace_ends_at = None
+            user_snapshot_cache.invalidate_on_commit(db, user.id)
             db.commit()
             return False
 
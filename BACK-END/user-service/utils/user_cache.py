@@ -0,0 +1,357 @@
+"""
+Cache en memoire des instantanes utilisateur (id, role, is_active).
+
+get_current_user, validate_action, record_usage et track_event n'ont besoin que
+de ces trois champs: l'instantane evite de retrouver la ligne User (parcours et
+dechiffrement de la table) a chaque appel.
+
+- Bornes TTL (USER_CACHE_TTL_S) et LRU (USER_CACHE_MAX_ENTRIES)
+- Cles: index d'email (SHA256, comme linkedin_profile_id_hash) et id
+- Invalidation apres commit (RoleManager, webhooks Stripe, transitions trial,
+  admin), propagee aux autres workers via le canal Redis USER_CACHE_CHANNEL
+- Date du dernier changement par utilisateur (hash Redis relu au demarrage):
+  les claims d'un JWT emis avant ce changement ne sont plus fiables
+  (auth.get_current_claims)
+- Publication par un thread dedie: le hook after_commit ne fait que mettre le
+  changement en attente, sans appel Redis bloquant dans la boucle asyncio
+- Un changement dont la publication echoue reste en attente et est renvoye
+  toutes les reconnect_s secondes; tant qu'il n'est pas publie, changes_synced
+  est faux et get_current_claims repasse par la base. Ceux encore en attente a
+  l'arret sont abandonnes (warning user_cache_publish_dropped)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Union
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import User, RoleType
+
+logger = structlog.get_logger(__name__)
+
+# Cle de Session.info: ids a invalider au prochain commit
+PENDING_INVALIDATIONS = "user_cache_invalidations"
+
+
+def email_index(email: str) -> str:
+    """Index SHA256 de l'email (meme comparaison exacte que find_user_by_email)."""
+    return hashlib.sha256(email.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Champs d'un User utilises pour l'autorisation."""
+    id: uuid.UUID
+    role: RoleType
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(id=user.id, role=user.role, is_active=bool(user.is_active))
+
+
+class UserSnapshotCache:
+    """
+    Cache LRU + TTL des instantanes, partage par les requetes d'un worker.
+
+    Les autres workers sont prevenus par Redis pub/sub; si Redis est
+    indisponible, le TTL borne la duree de validite d'un instantane perime.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("USER_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl_s = float(os.getenv("USER_CACHE_TTL_S", "300"))
+        self.max_entries = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+        self.redis_url = os.getenv("REDIS_URL")
+        self.channel = os.getenv("USER_CACHE_CHANNEL", "user-service:user-cache:invalidate")
+        self.reconnect_s = float(os.getenv("USER_CACHE_RECONNECT_S", "5"))
+        self.changes_key = os.getenv("USER_CACHE_CHANGES_KEY", "user-service:user-cache:changed")
+        # Au-dela de la duree de vie d'un JWT, un changement ne concerne plus aucun token
+        self.changes_window_s = float(os.getenv("JWT_EXPIRATION_HOURS", "24")) * 3600
+
+        # Identifiant du worker: ses propres messages sont ignores a la reception
+        self.instance_id = uuid.uuid4().hex
+        self._entries: "OrderedDict[uuid.UUID, tuple]" = OrderedDict()
+        self._email_ids: dict = {}
+        self._changed_at: dict = {}
+        # Changements locaux pas encore publies sur Redis: id -> date du changement
+        self._unpublished: dict = {}
+        self._subscribed = False
+        self._lock = threading.Lock()
+        self._publisher = None
+        self._publisher_retry_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._publisher_thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    # --- Lecture / ecriture ---
+
+    def get(self, user_id: Union[uuid.UUID, str]) -> Optional[UserSnapshot]:
+        if not self.enabled:
+            return None
+        user_id = self._as_uuid(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            expires_at, snapshot, _ = entry
+            if expires_at <= time.monotonic():
+                self._drop(user_id)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.stats["hits"] += 1
+            return snapshot
+
+    def get_by_email(self, email: str) -> Optional[UserSnapshot]:
+        if not self.enabled or not email:
+            return None
+        user_id = self._email_ids.get(email_index(email))
+        if user_id is None:
+            self.stats["misses"] += 1
+            return None
+        return self.get(user_id)
+
+    def put(self, user: User, email: Optional[str] = None) -> UserSnapshot:
+        """Enregistre l'instantane d'un User charge (indexe aussi par email si fourni)."""
+        snapshot = UserSnapshot.from_user(user)
+        if not self.enabled:
+            return snapshot
+        key = email_index(email) if email else None
+        with self._lock:
+            self._drop(snapshot.id)
+            self._entries[snapshot.id] = (time.monotonic() + self.ttl_s, snapshot, key)
+            if key:
+                self._email_ids[key] = snapshot.id
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._drop(oldest_id)
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._email_ids.clear()
+
+    def _drop(self, user_id: uuid.UUID) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry and entry[2] and self._email_ids.get(entry[2]) == user_id:
+            del self._email_ids[entry[2]]
+
+    @staticmethod
+    def _as_uuid(user_id: Union[uuid.UUID, str]) -> uuid.UUID:
+        return user_id if isinstance(user_id, uuid.UUID) else uuid.UUID(str(user_id))
+
+    # --- Invalidation ---
+
+    def invalidate(self, user_id: Union[uuid.UUID, str], publish: bool = True) -> None:
+        """Retire l'instantane localement et previent les autres workers."""
+        user_id = self._as_uuid(user_id)
+        with self._lock:
+            self._drop(user_id)
+            self._changed_at[user_id] = time.time()
+        self.stats["invalidations"] += 1
+        if publish:
+            self._publish(user_id)
+
+    def invalidate_on_commit(self, db: Session, user_id: Union[uuid.UUID, str]) -> None:
+        """
+        Invalide tout de suite puis a nouveau au commit de la session.
+
+        Le second passage retire un instantane recharge par une autre requete
+        entre la modification et le commit; c'est lui qui publie sur Redis.
+        """
+        self.invalidate(user_id, publish=False)
+        db.info.setdefault(PENDING_INVALIDATIONS, set()).add(self._as_uuid(user_id))
+
+    def changed_since(self, user_id: Union[uuid.UUID, str], issued_at: float) -> bool:
+        """Vrai si l'utilisateur a change (role, activation, trial) depuis issued_at."""
+        changed_at = self._changed_at.get(self._as_uuid(user_id))
+        if changed_at is None:
+            return False
+        if changed_at < time.time() - self.changes_window_s:
+            self._changed_at.pop(self._as_uuid(user_id), None)
+            return False
+        return changed_at >= issued_at
+
+    @property
+    def changes_synced(self) -> bool:
+        """
+        Les changements des autres workers sont-ils connus ?
+
+        Sans Redis configure (un seul worker), les changements locaux suffisent;
+        avec Redis, il faut que l'abonnement soit actif et que les changements
+        locaux aient ete publies (sinon les autres workers les ignorent).
+        """
+        return not self.redis_url or (self._subscribed and not self._unpublished)
+
+    def _publish(self, user_id: uuid.UUID) -> None:
+        """Met le changement en attente; le thread de publication l'envoie."""
+        if not self.redis_url:
+            return
+        with self._lock:
+            self._unpublished[user_id] = self._changed_at.get(user_id, time.time())
+        self._wake.set()
+
+    def flush_unpublished(self) -> bool:
+        """Publie les changements en attente; faux s'il en reste."""
+        if time.monotonic() < self._publisher_retry_at:
+            return False
+        with self._lock:
+            pending = dict(self._unpublished)
+        if not pending:
+            return True
+        try:
+            if self._publisher is None:
+                import redis
+                self._publisher = redis.Redis.from_url(
+                    self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+                )
+            pipe = self._publisher.pipeline(transaction=False)
+            for user_id, changed_at in pending.items():
+                pipe.hset(self.changes_key, str(user_id), changed_at)
+                pipe.publish(self.channel, json.dumps({"user_id": str(user_id), "origin": self.instance_id}))
+            pipe.execute()
+        except Exception as e:
+            # Pas de nouvelle tentative avant reconnect_s (Redis injoignable)
+            self._publisher_retry_at = time.monotonic() + self.reconnect_s
+            logger.warning("user_cache_publish_failed", pending=len(pending), error=str(e))
+            return False
+        with self._lock:
+            for user_id, changed_at in pending.items():
+                if self._unpublished.get(user_id) == changed_at:
+                    del self._unpublished[user_id]
+        return True
+
+    def handle_message(self, data: Union[str, bytes]) -> None:
+        """Message recu sur le canal d'invalidation."""
+        try:
+            message = json.loads(data)
+            if message.get("origin") == self.instance_id:
+                return
+            self.invalidate(message["user_id"], publish=False)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning("user_cache_invalid_message", error=str(e))
+
+    # --- Abonnement Redis (lifespan) ---
+
+    def start(self) -> None:
+        if not self.enabled or not self.redis_url:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        self._start_publisher()
+
+    def _start_publisher(self) -> None:
+        if self._publisher_thread is None or not self._publisher_thread.is_alive():
+            self._stopping.clear()
+            self._publisher_thread = threading.Thread(
+                target=self._publish_loop, name="user-cache-publisher", daemon=True
+            )
+            self._publisher_thread.start()
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        if self._publisher_thread is not None:
+            # Derniere tentative de publication par le thread avant son arret
+            self._stopping.set()
+            self._wake.set()
+            await asyncio.to_thread(self._publisher_thread.join, self.reconnect_s)
+            self._publisher_thread = None
+        if self._unpublished:
+            logger.warning("user_cache_publish_dropped", pending=len(self._unpublished))
+        if self._publisher is not None:
+            try:
+                self._publisher.close()
+            except Exception:
+                pass
+            self._publisher = None
+
+    async def _listen(self) -> None:
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.from_url(self.redis_url, decode_responses=True)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Changements publies avant l'abonnement (demarrage, coupure)
+                await self._load_changes(client)
+                self._subscribed = True
+                logger.info("user_cache_subscribed", channel=self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations perdues pendant la coupure: on repart d'un cache vide
+                self.clear()
+                logger.warning("user_cache_subscription_lost", error=str(e))
+            finally:
+                self._subscribed = False
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(self.reconnect_s)
+
+    def _publish_loop(self) -> None:
+        """Thread de publication: au reveil (_publish) et toutes les reconnect_s secondes."""
+        while True:
+            self._wake.wait(self.reconnect_s)
+            self._wake.clear()
+            if self._unpublished:
+                self.flush_unpublished()
+            if self._stopping.is_set():
+                return
+
+    async def _load_changes(self, client) -> None:
+        """Relit le hash des changements et purge ceux qui ne concernent plus aucun token."""
+        cutoff = time.time() - self.changes_window_s
+        expired = []
+        for user_id, changed_at in (await client.hgetall(self.changes_key)).items():
+            changed_at = float(changed_at)
+            if changed_at < cutoff:
+                expired.append(user_id)
+                continue
+            user_id = self._as_uuid(user_id)
+            with self._lock:
+                self._changed_at[user_id] = max(changed_at, self._changed_at.get(user_id, 0.0))
+        if expired:
+            await client.hdel(self.changes_key, *expired)
+
+
+# Instance globale
+user_snapshot_cache = UserSnapshotCache()
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(PENDING_INVALIDATIONS, ()):
+        user_snapshot_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_invalidations(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_INVALIDATIONS, None)
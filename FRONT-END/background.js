@@ -16,10 +16,33 @@ try {
 let BACKEND_URL = API_CONFIG.AI_SERVICE_URL;
 let USER_SERVICE_URL = API_CONFIG.USER_SERVICE_URL;
 const REQUEST_TIMEOUT = 15000;
+// Suivi d'un job /news/register: scraping + résumé + embedding côté backend
+const NEWS_JOB_TIMEOUT = 45000;
+const NEWS_JOB_POLL_INTERVAL = 2000;
 const RETRY_COUNT = 2;
 const EXTENSION_ID = chrome.runtime.id; // DYNAMIQUE
 
-// Charger la configuration depuis le backend
+// Appliquer les URLs d'une configuration (/config/complete ou /api/bootstrap)
+// Retourne true si les deux URLs ont été fournies (hors placeholders)
+function applyConfigUrls(config) {
+  if (config && config.urls) {
+    // Ignorer les placeholders (commençant par __)
+    const isPlaceholder = (url) => !url || url.startsWith('__');
+
+    if (!isPlaceholder(config.urls.backend)) {
+      BACKEND_URL = config.urls.backend;
+    }
+    if (!isPlaceholder(config.urls.user_service)) {
+      USER_SERVICE_URL = config.urls.user_service;
+    }
+    console.log('✅ Configuration backend chargée (URLs effectives):', { BACKEND_URL, USER_SERVICE_URL });
+    return !isPlaceholder(config.urls.backend) && !isPlaceholder(config.urls.user_service);
+  }
+  return false;
+}
+
+// Charger la configuration depuis le backend (utilisateur non connecté, ou
+// /api/bootstrap sans URLs exploitables)
 async function loadBackendConfig() {
   try {
     const response = await fetch(`${BACKEND_URL}/config/complete`, {
@@ -31,18 +54,7 @@ async function loadBackendConfig() {
 
     if (response.ok) {
       const config = await response.json();
-      if (config.urls) {
-        // Ignorer les placeholders (commençant par __)
-        const isPlaceholder = (url) => url && url.startsWith('__');
-
-        if (config.urls.backend && !isPlaceholder(config.urls.backend)) {
-          BACKEND_URL = config.urls.backend;
-        }
-        if (config.urls.user_service && !isPlaceholder(config.urls.user_service)) {
-          USER_SERVICE_URL = config.urls.user_service;
-        }
-        console.log('✅ Configuration backend chargée (URLs effectives):', { BACKEND_URL, USER_SERVICE_URL });
-      }
+      applyConfigUrls(config);
       return config;
     }
   } catch (error) {
@@ -53,6 +65,8 @@ async function loadBackendConfig() {
 
 // État global
 let isAuthenticated = false;
+// Dernier /api/bootstrap réussi avec des URLs de configuration exploitables
+let bootstrapConfigLoaded = false;
 
 // Vérifier l'authentification
 async function checkAuthentication() {
@@ -69,10 +83,11 @@ async function checkAuthentication() {
     });
 
     isAuthenticated = !!token;
+    bootstrapConfigLoaded = false;
 
     // Si authentifié, récupérer et stocker le profil utilisateur
     if (isAuthenticated && token) {
-      await fetchAndStoreUserProfile(token);
+      bootstrapConfigLoaded = await fetchAndStoreUserProfile(token);
     }
 
     return isAuthenticated;
@@ -83,134 +98,144 @@ async function checkAuthentication() {
   }
 }
 
-// Récupérer le profil utilisateur Google et le stocker
-async function fetchAndStoreUserProfile(token) {
-  try {
-    // Récupérer le profil Google
-    const response = await fetch('https://www.googleapis.com/oauth2/v2/userinfo', {
-      headers: { 'Authorization': `Bearer ${token}` }
-    });
+// Empreinte du token Google: le JWT stocké n'est réutilisé que pour le même
+// compte (le token Google lui-même n'est pas stocké)
+async function googleTokenFingerprint(googleToken) {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(googleToken));
+  return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
 
-    if (response.ok) {
-      const userData = await response.json();
-      console.log('📊 Profil utilisateur Google récupéré:', userData.email);
+// JWT user-service: réutilisé tant qu'il est accepté, sinon nouveau login
+async function getUserServiceJwt(googleToken, forceLogin = false) {
+  const fingerprint = await googleTokenFingerprint(googleToken);
+  if (!forceLogin) {
+    const storage = await chrome.storage.local.get(['user_service_jwt', 'user_service_jwt_for']);
+    if (storage.user_service_jwt && storage.user_service_jwt_for === fingerprint) {
+      return storage.user_service_jwt;
+    }
+  }
 
-      // Récupérer le plan utilisateur depuis le user-service
-      let userPlan = 'FREE';
-      let jwtToken = null;
-      try {
-        // D'abord, vérifier/créer l'utilisateur et obtenir le JWT
-        console.log('🔐 Vérification utilisateur Google...');
-        const verifyResponse = await fetch(`${USER_SERVICE_URL}/api/users/verify-google`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({
-            google_id: userData.id || userData.sub,
-            email: userData.email,
-            name: userData.name
-          })
-        });
+  const authResponse = await fetch(`${USER_SERVICE_URL}/api/auth/login`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ google_token: googleToken })
+  });
 
-        if (!verifyResponse.ok) {
-          console.warn('⚠️ Erreur verify-google:', verifyResponse.status);
-          throw new Error('Erreur verification Google');
-        }
+  if (!authResponse.ok) {
+    throw new Error(`Erreur auth/login: ${authResponse.status}`);
+  }
 
-        // Ensuite, se connecter pour obtenir le JWT
-        console.log('🔑 Récupération du JWT...');
-        const authResponse = await fetch(`${USER_SERVICE_URL}/api/auth/login`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ google_token: token })
-        });
+  const authData = await authResponse.json();
+  await chrome.storage.local.set({
+    user_service_jwt: authData.access_token,
+    user_service_jwt_for: fingerprint
+  });
+  console.log('✅ JWT obtenu');
+  return authData.access_token;
+}
 
-        if (!authResponse.ok) {
-          console.warn('⚠️ Erreur auth/login:', authResponse.status);
-          throw new Error('Erreur authentification backend');
-        }
+// Profil, role, quota, trial et configuration en un seul appel.
+// La dernière réponse est gardée avec son ETag: si rien n'a changé,
+// le user-service répond 304 et le cache est réutilisé.
+async function fetchBootstrap(googleToken) {
+  const cached = await chrome.storage.local.get(['bootstrap_cache', 'bootstrap_etag']);
+
+  for (let attempt = 1; attempt <= 2; attempt++) {
+    // 2e tentative: JWT expiré ou révoqué, nouveau login
+    const jwtToken = await getUserServiceJwt(googleToken, attempt > 1);
+    const headers = { 'Authorization': `Bearer ${jwtToken}` };
+    if (cached.bootstrap_cache && cached.bootstrap_etag) {
+      headers['If-None-Match'] = cached.bootstrap_etag;
+    }
 
-        const authData = await authResponse.json();
-        jwtToken = authData.access_token;
-        console.log('✅ JWT obtenu');
-
-        // Maintenant, récupérer le quota avec le JWT
-        const quotaResponse = await fetch(`${USER_SERVICE_URL}/api/users/quota-status`, {
-          method: 'GET',
-          headers: {
-            'Authorization': `Bearer ${jwtToken}`,
-            'Content-Type': 'application/json'
-          },
-          mode: 'cors'
-        });
+    const response = await fetch(`${USER_SERVICE_URL}/api/bootstrap`, {
+      method: 'GET',
+      headers,
+      mode: 'cors',
+      cache: 'no-store'
+    });
 
-        if (quotaResponse.ok) {
-          const quotaData = await quotaResponse.json();
-          userPlan = quotaData.role || 'FREE';
-          console.log('✅ Plan utilisateur récupéré:', userPlan);
+    if (response.status === 401) {
+      continue;
+    }
+    if (response.status === 304) {
+      console.log('✅ Bootstrap inchangé (304)');
+      return cached.bootstrap_cache;
+    }
+    if (!response.ok) {
+      throw new Error(`Erreur bootstrap: ${response.status}`);
+    }
 
-          // Stocker l'user_id
-          if (quotaData.user_id) {
-            await chrome.storage.local.set({
-              user_id: quotaData.user_id
-            });
-          }
-        } else {
-          console.warn('⚠️ Erreur quota-status:', quotaResponse.status);
-        }
-      } catch (e) {
-        console.warn('⚠️ Impossible de récupérer le plan utilisateur:', e);
-      }
+    const bootstrap = await response.json();
+    await chrome.storage.local.set({
+      bootstrap_cache: bootstrap,
+      bootstrap_etag: response.headers.get('ETag')
+    });
+    return bootstrap;
+  }
 
-      // Stocker dans chrome.storage.local
-      await chrome.storage.local.set({
-        user_name: userData.name || null,
-        user_plan: userPlan,
-        user_picture: userData.picture || null
-      });
+  throw new Error('Bootstrap: authentification refusée');
+}
 
-      // V3 Story 2.1 — Synchroniser le cache blacklist au login (Premium uniquement)
-      if (userPlan === 'PREMIUM') {
-        try {
-          await syncBlacklistCache(null);
-          console.log('✅ Blacklist cache synchronise au login');
-        } catch (e) {
-          console.warn('⚠️ Erreur sync blacklist au login:', e);
-        }
-      }
+// Stocker l'état renvoyé par /api/bootstrap (mêmes clés que les anciens appels);
+// retourne true si la configuration contenait les URLs
+async function applyBootstrap(bootstrap) {
+  const configLoaded = applyConfigUrls(bootstrap.config);
+
+  const trialStatus = bootstrap.trial;
+  await chrome.storage.local.set({
+    user_id: bootstrap.user.id,
+    user_email: bootstrap.user.email,
+    user_name: bootstrap.user.name || null,
+    user_plan: bootstrap.features.role,
+    // Phase 2 — Status trial
+    trial_status_cache: trialStatus,
+    trial_status_cached_at: Date.now(),
+    trial_ends_at: trialStatus.trial_ends_at || null,
+    grace_ends_at: trialStatus.grace_ends_at || null,
+    linkedin_profile_captured: trialStatus.has_linkedin_profile || false
+  });
+  return configLoaded;
+}
 
-      // Phase 2 — Recuperer et stocker le status trial
+// Récupérer le profil utilisateur et le stocker; retourne true si /api/bootstrap
+// a réussi et fourni les URLs de configuration
+async function fetchAndStoreUserProfile(token) {
+  try {
+    const bootstrap = await fetchBootstrap(token);
+    const configLoaded = await applyBootstrap(bootstrap);
+    const userPlan = bootstrap.features.role;
+    console.log('✅ Plan utilisateur récupéré:', userPlan);
+
+    // Photo de profil: seule donnée propre à Google, récupérée une fois
+    const storage = await chrome.storage.local.get(['user_picture']);
+    if (!storage.user_picture) {
       try {
-        // reutiliser jwtToken deja obtenu dans fetchAndStoreUserProfile
-        if (jwtToken) {
-          const trialResponse = await fetch(`${USER_SERVICE_URL}/api/trial/status`, {
-            method: 'GET',
-            headers: {
-              'Authorization': `Bearer ${jwtToken}`,
-              'Content-Type': 'application/json'
-            },
-            mode: 'cors'
-          });
-
-          if (trialResponse.ok) {
-            const trialStatus = await trialResponse.json();
-            await chrome.storage.local.set({
-              trial_status_cache: trialStatus,
-              trial_status_cached_at: Date.now(),
-              trial_ends_at: trialStatus.trial_ends_at || null,
-              grace_ends_at: trialStatus.grace_ends_at || null,
-              linkedin_profile_captured: trialStatus.has_linkedin_profile || false,
-              user_plan: trialStatus.role
-            });
-            console.log('[Phase2] Trial status synchronise au login:', trialStatus.role);
-          }
+        const response = await fetch('https://www.googleapis.com/oauth2/v2/userinfo', {
+          headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (response.ok) {
+          const userData = await response.json();
+          await chrome.storage.local.set({ user_picture: userData.picture || null });
         }
       } catch (e) {
-        console.warn('[Phase2] Erreur sync trial au login:', e);
+        console.warn('⚠️ Impossible de récupérer la photo de profil:', e);
       }
+    }
 
+    // V3 Story 2.1 — Synchroniser le cache blacklist au login (Premium uniquement)
+    if (userPlan === 'PREMIUM') {
+      try {
+        await syncBlacklistCache(null);
+        console.log('✅ Blacklist cache synchronise au login');
+      } catch (e) {
+        console.warn('⚠️ Erreur sync blacklist au login:', e);
+      }
     }
+    return configLoaded;
   } catch (error) {
     console.error('❌ Erreur récupération profil utilisateur:', error);
+    return false;
   }
 }
 
@@ -239,11 +264,9 @@ async function makeBackendRequest(endpoint, data, token) {
         plan: userPlan
       };
 
-      // Timeout adapté : 45s pour le scraping des news, 15s pour le reste
-      const timeout = endpoint === '/news/register' ? 45000 : REQUEST_TIMEOUT;
-
+      // /news/register répond immédiatement (job asynchrone): timeout standard
       const controller = new AbortController();
-      const timeoutId = setTimeout(() => controller.abort(), timeout);
+      const timeoutId = setTimeout(() => controller.abort(), REQUEST_TIMEOUT);
 
       const response = await fetch(`${BACKEND_URL}${endpoint}`, {
         method: 'POST',
@@ -373,6 +396,7 @@ chrome.runtime.onMessage.addListener((request, sender, sendResponse) => {
 	    // Déconnexion : nettoyer les données utilisateur
 	    chrome.storage.local.remove([
 	      'user_id', 'user_email', 'user_name', 'user_plan', 'user_picture',
+	      'user_service_jwt', 'user_service_jwt_for', 'bootstrap_cache', 'bootstrap_etag',
 	      // Phase 2 — Donnees trial
 	      'trial_ends_at', 'grace_ends_at',
 	      'linkedin_profile_captured',
@@ -649,74 +673,23 @@ async function handleGetQuotaInfo(sendResponse) {
     const userInfo = await chrome.storage.local.get(['user_email', 'user_name', 'user_plan', 'user_picture']);
     console.log('📦 handleGetQuotaInfo: Storage data:', userInfo);
 
-    // Obtenir un JWT pour accéder au backend
-    let jwtToken = token; // Par défaut, utiliser le token Google (au cas où)
-    try {
-      // Récupérer les infos utilisateur Google
-      const googleResponse = await fetch('https://www.googleapis.com/oauth2/v2/userinfo', {
-        headers: { 'Authorization': `Bearer ${token}` }
-      });
-
-      if (googleResponse.ok) {
-        await googleResponse.json(); // Consommer la réponse
-
-        // Authentifier avec le backend pour obtenir le JWT
-        const authResponse = await fetch(`${USER_SERVICE_URL}/api/auth/login`, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ google_token: token })
-        });
-
-        if (authResponse.ok) {
-          const authData = await authResponse.json();
-          jwtToken = authData.access_token;
-          console.log('✅ handleGetQuotaInfo: JWT obtenu');
-        } else {
-          console.warn('⚠️ handleGetQuotaInfo: Impossible d\'obtenir le JWT, utilisation du token Google');
-        }
-      }
-    } catch (jwtError) {
-      console.warn('⚠️ handleGetQuotaInfo: Erreur JWT:', jwtError);
-    }
-
-    // Récupérer le quota depuis le user-service
+    // Role et quota depuis /api/bootstrap (304 si inchangé depuis le dernier appel)
     try {
-      const response = await fetch(`${USER_SERVICE_URL}/api/users/quota-status`, {
-        method: 'GET',
-        headers: {
-          'Authorization': `Bearer ${jwtToken}`,
-          'Content-Type': 'application/json'
-        },
-        mode: 'cors'
+      const bootstrap = await fetchBootstrap(token);
+      await applyBootstrap(bootstrap);
+      const quotaData = bootstrap.quota;
+      const finalRole = quotaData.role || userInfo.user_plan || 'FREE';
+      console.log('🎫 handleGetQuotaInfo: Final role:', finalRole);
+      sendResponse({
+        email: bootstrap.user.email || userInfo.user_email || null,
+        name: bootstrap.user.name || userInfo.user_name || null,
+        picture: userInfo.user_picture || null,
+        role: finalRole,
+        remaining: quotaData.remaining || 0,
+        limit: quotaData.daily_limit || 5
       });
-
-      if (response.ok) {
-        const quotaData = await response.json();
-        console.log('✅ handleGetQuotaInfo: Backend quota data:', quotaData);
-        const finalRole = quotaData.role || userInfo.user_plan || 'FREE';
-        console.log('🎫 handleGetQuotaInfo: Final role:', finalRole);
-        sendResponse({
-          email: userInfo.user_email || null,
-          name: userInfo.user_name || null,
-          picture: userInfo.user_picture || null,
-          role: finalRole,
-          remaining: quotaData.remaining || 0,
-          limit: quotaData.daily_limit || 5
-        });
-      } else {
-        console.warn('⚠️ handleGetQuotaInfo: Backend error', response.status);
-        // Fallback avec les données du storage
-        sendResponse({
-          email: userInfo.user_email || null,
-          name: userInfo.user_name || null,
-          picture: userInfo.user_picture || null,
-          role: userInfo.user_plan || 'FREE',
-          remaining: 5,
-          limit: 5
-        });
-      }
     } catch (apiError) {
-      console.warn('⚠️ User-service non disponible, utilisation des données du storage');
+      console.warn('⚠️ User-service non disponible, utilisation des données du storage:', apiError);
       sendResponse({
         email: userInfo.user_email || null,
         name: userInfo.user_name || null,
@@ -732,6 +705,53 @@ async function handleGetQuotaInfo(sendResponse) {
   }
 }
 
+// Suivre un job d'enregistrement jusqu'à sa fin, borné à NEWS_JOB_TIMEOUT:
+// la requête en cours est interrompue (AbortController) à l'expiration
+async function pollNewsJob(jobId, token) {
+  const controller = new AbortController();
+  const timeoutId = setTimeout(() => controller.abort(), NEWS_JOB_TIMEOUT);
+
+  try {
+    while (true) {
+      const response = await fetch(`${BACKEND_URL}/news/jobs/${jobId}`, {
+        method: 'GET',
+        headers: { 'Authorization': `Bearer ${token}` },
+        mode: 'cors',
+        credentials: 'omit',
+        signal: controller.signal
+      });
+
+      if (!response.ok) {
+        console.warn(`⚠️ Suivi du job ${jobId} interrompu: HTTP ${response.status}`);
+        return null;
+      }
+
+      const job = await response.json();
+      if (job.status === 'completed') {
+        console.log(`✅ Job ${jobId} terminé: ${job.registered || 0} enregistrée(s), ${job.skipped || 0} ignorée(s)`);
+        return job;
+      }
+
+      await new Promise((resolve, reject) => {
+        const waitId = setTimeout(resolve, NEWS_JOB_POLL_INTERVAL);
+        controller.signal.addEventListener('abort', () => {
+          clearTimeout(waitId);
+          reject(new DOMException('Aborted', 'AbortError'));
+        }, { once: true });
+      });
+    }
+  } catch (error) {
+    if (error.name === 'AbortError') {
+      console.warn(`⚠️ Job ${jobId} toujours en cours après ${NEWS_JOB_TIMEOUT / 1000}s, suivi abandonné`);
+    } else {
+      console.warn(`⚠️ Erreur suivi du job ${jobId}:`, error);
+    }
+    return null;
+  } finally {
+    clearTimeout(timeoutId);
+  }
+}
+
 async function handleRegisterNews(data, sendResponse) {
   try {
     // Vérifier l'authentification
@@ -774,25 +794,34 @@ async function handleRegisterNews(data, sendResponse) {
     // Faire la requête vers le backend
     const result = await makeBackendRequest('/news/register', requestData, token);
 
-    // Log des résultats
+    // Log des résultats (traitement asynchrone côté backend)
     const registered = result.registered || 0;
     const skipped = result.skipped || 0;
-    const total = registered + skipped;
-
-    if (registered > 0 && skipped > 0) {
-      console.log(`✅ ${registered} actualité(s) enregistrée(s), ${skipped} ignorée(s) (déjà existante(s))`);
-    } else if (registered > 0) {
-      console.log(`✅ ${registered} actualité(s) enregistrée(s) avec succès`);
-    } else if (skipped > 0) {
-      console.log(`⚠️ ${skipped} actualité(s) ignorée(s) (déjà existante(s))`);
+    const queued = result.queued || 0;
+
+    if (queued > 0) {
+      console.log(`📬 ${queued} actualité(s) en cours de traitement (job ${result.job_id})`);
+    }
+    if (registered > 0) {
+      console.log(`✅ ${registered} actualité(s) déjà enregistrée(s)`);
+    }
+    if (skipped > 0) {
+      console.log(`⚠️ ${skipped} actualité(s) ignorée(s) (doublon(s) ou déjà en file)`);
+    }
+
+    // Suivi du job en arrière-plan (le content script n'attend pas la fin)
+    if (queued > 0 && result.job_id) {
+      pollNewsJob(result.job_id, token);
     }
 
     // Retourner le résultat au content script
     sendResponse({
       success: true,
+      jobId: result.job_id,
+      status: result.status,
+      queued: queued,
       registered: result.registered,
-      skipped: result.skipped,
-      results: result.results
+      skipped: result.skipped
     });
 
   } catch (error) {
@@ -1289,14 +1318,17 @@ async function initializeExtension() {
   BACKEND_URL = API_CONFIG.AI_SERVICE_URL;
   USER_SERVICE_URL = API_CONFIG.USER_SERVICE_URL;
 
-  // Charger la configuration au démarrage
-  await loadBackendConfig();
-
   if (chrome.runtime.id !== EXTENSION_ID) {
     console.warn('⚠️ ATTENTION: Extension ID différent du configuré!');
   }
 
+  // Connecté: la configuration arrive avec /api/bootstrap; sinon (déconnecté,
+  // user-service injoignable, login refusé, URLs non configurées côté
+  // user-service) elle est chargée séparément
   await checkAuthentication();
+  if (!bootstrapConfigLoaded) {
+    await loadBackendConfig();
+  }
 
   // Phase 2 — Verifier les notifications trial
   await checkTrialNotifications();
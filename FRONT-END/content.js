@@ -5187,7 +5187,7 @@
         }
 
         if (response && response.success) {
-          console.log(`✅ ${response.registered || 0} actualités enregistrées, ${response.skipped || 0} ignorées (déjà en base)`);
+          console.log(`✅ ${response.registered || 0} actualités déjà enregistrées, ${response.queued || 0} en cours de traitement, ${response.skipped || 0} ignorées`);
         } else if (response && response.error) {
           console.error('❌ Erreur backend:', response.error);
         }